@@ -0,0 +1,6 @@
+"""
+Benchmarks and simulations.
+
+Each module is a standalone script, run from the repository root with
+``python -m benchmarks.<module>``.
+"""
@@ -0,0 +1,101 @@
+"""
+Access Log Benchmark
+Measures what the access log costs the gateway.
+
+First the bare cost of appending a record to the ring, then end-to-end
+throughput of product searches through the in-process app with the
+access log off, binary and JSONL. The mock backend's simulated network
+delay is switched off so that gateway-side cost dominates. Each
+configuration reports requests per second, the records written and any
+dropped because the writer fell a whole ring behind.
+
+Usage:
+    python -m benchmarks.access_log_benchmark [--requests R] [--appends A]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import Optional
+
+import httpx
+
+from src.backend.handlers import BaseHandler
+from src.gateway import create_app
+from src.metrics import AccessLog
+
+
+def time_appends(directory: str, appends: int) -> float:
+    """Nanoseconds per append, with the writer draining in the background."""
+    log = AccessLog(os.path.join(directory, "appends.log"), capacity=appends + 1)
+    start = time.perf_counter_ns()
+    for _ in range(appends):
+        log.append("198.51.100.1", "/products/search", "allowed", 200, 0.0042)
+    elapsed = time.perf_counter_ns() - start
+    log.close()
+    return elapsed / appends
+
+
+async def throughput(path: Optional[str], log_format: str, requests: int, concurrency: int) -> dict:
+    """Requests per second through the gateway, and what the log wrote."""
+    app = create_app(
+        capacity=10 ** 9,
+        refill_rate=10 ** 9,
+        access_log_path=path,
+        access_log_format=log_format
+    )
+    transport = httpx.ASGITransport(app=app, client=("198.51.100.1", 4000))
+    remaining = iter(range(requests))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://gateway") as client:
+        async def shopper() -> None:
+            for _ in remaining:
+                response = await client.get("/products/search?category=books&limit=5")
+                assert response.status_code == 200
+
+        # Warm up routing and the catalog
+        await client.get("/products/search?category=books&limit=5")
+        start = time.perf_counter()
+        await asyncio.gather(*(shopper() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    access_log = app.state.access_log
+    stats = {"written": 0, "dropped": 0, "bytes": 0}
+    if access_log is not None:
+        access_log.close()
+        stats = {
+            "written": access_log.written,
+            "dropped": access_log.dropped,
+            "bytes": os.path.getsize(path),
+        }
+    return {"rps": requests / elapsed, **stats}
+
+
+async def run(requests: int, appends: int, concurrency: int) -> None:
+    BaseHandler.simulate_delay = lambda self, deadline=None: None
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"append: {time_appends(directory, appends):.0f} ns/record")
+        print(f"{'access log':<12}{'req/s':>10}{'written':>10}{'dropped':>10}{'bytes/req':>11}")
+        for label, log_format in (("off", "binary"), ("binary", "binary"), ("jsonl", "jsonl")):
+            path = None if label == "off" else os.path.join(directory, f"access.{label}")
+            result = await throughput(path, log_format, requests, concurrency)
+            per_request = result["bytes"] / requests if result["bytes"] else 0
+            print(
+                f"{label:<12}{result['rps']:>10.0f}{result['written']:>10}"
+                f"{result['dropped']:>10}{per_request:>11.1f}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--appends", type=int, default=200_000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.appends, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
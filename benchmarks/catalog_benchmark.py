@@ -0,0 +1,133 @@
+"""
+Catalog Benchmark
+Compares the columnar catalog with a plain list of product dicts.
+
+A synthetic catalogue is built both ways and the same searches are run
+against each: the list-of-dicts baseline filters and sorts the whole
+category per request, the columnar catalog slices a prebuilt
+permutation. Reports build time, memory held and per-query latency.
+
+Usage:
+    python -m benchmarks.catalog_benchmark [--products N] [--queries Q]
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from src.backend.catalog import ProductCatalog
+
+
+CATEGORIES = ("electronics", "clothing", "books", "home")
+
+
+def synthetic_products(count: int, seed: int) -> Dict[str, List[Dict[str, Any]]]:
+    """Random products spread evenly over the categories."""
+    rng = random.Random(seed)
+    products: Dict[str, List[Dict[str, Any]]] = {category: [] for category in CATEGORIES}
+    for product_id in range(count):
+        category = CATEGORIES[product_id % len(CATEGORIES)]
+        products[category].append({
+            "id": product_id,
+            "name": f"{category.title()} item {product_id % 5000}",
+            "price": round(rng.uniform(1, 2000), 2),
+            "in_stock": rng.random() < 0.8,
+        })
+    return products
+
+
+def list_search(products: Dict[str, List[Dict[str, Any]]], query: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Baseline: filter and sort the category's dicts on every request."""
+    rows = products[query["category"]]
+    if query["in_stock"] is not None:
+        rows = [p for p in rows if p["in_stock"] == query["in_stock"]]
+    if query["min_price"] is not None:
+        rows = [p for p in rows if p["price"] >= query["min_price"]]
+    if query["sort_by"] == "price_asc":
+        rows = sorted(rows, key=lambda p: (p["price"], p["id"]))
+    elif query["sort_by"] == "price_desc":
+        rows = sorted(rows, key=lambda p: (-p["price"], p["id"]))
+    offset = (query["page"] - 1) * query["limit"]
+    return rows[offset:offset + query["limit"]]
+
+
+def catalog_search(catalog: ProductCatalog, query: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Columnar search, decoding only the page."""
+    _, rows = catalog.search(**query)
+    return [catalog.record(row) for row in rows]
+
+
+def random_queries(count: int, seed: int) -> List[Dict[str, Any]]:
+    """Mixed sort orders, filters and pages."""
+    rng = random.Random(seed)
+    return [
+        {
+            "category": rng.choice(CATEGORIES),
+            "page": rng.randint(1, 50),
+            "limit": 20,
+            "sort_by": rng.choice(("relevance", "price_asc", "price_desc")),
+            "in_stock": rng.choice((None, True)),
+            "min_price": rng.choice((None, 500.0)),
+        }
+        for _ in range(count)
+    ]
+
+
+def measure_build(build: Callable[[], Any]) -> Tuple[Any, float, float]:
+    """Build something, returning it with its build time and traced memory."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    built = build()
+    elapsed = time.perf_counter() - start
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return built, elapsed, memory
+
+
+def time_queries(search: Callable[[Dict[str, Any]], Any], queries: List[Dict[str, Any]]) -> List[float]:
+    """Latency of each query, sorted."""
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query)
+        latencies.append(time.perf_counter() - start)
+    return sorted(latencies)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    products, list_build, list_memory = measure_build(
+        lambda: synthetic_products(args.products, args.seed)
+    )
+    catalog, catalog_build, catalog_memory = measure_build(
+        lambda: ProductCatalog.from_dict(products)
+    )
+    queries = random_queries(args.queries, args.seed)
+
+    # Both engines must agree before their speed is worth comparing
+    for query in queries[:20]:
+        assert list_search(products, query) == catalog_search(catalog, query)
+
+    print(f"{'engine':<10}{'build':>10}{'memory':>12}{'p50':>12}{'p99':>12}")
+    for name, build, memory, search in (
+        ("dicts", list_build, list_memory, lambda q: list_search(products, q)),
+        ("columnar", catalog_build, catalog_memory, lambda q: catalog_search(catalog, q)),
+    ):
+        latencies = time_queries(search, queries)
+        p50 = latencies[len(latencies) // 2]
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(
+            f"{name:<10}{build:>9.2f}s{memory / 2 ** 20:>10.1f}MB"
+            f"{p50 * 1000:>10.3f}ms{p99 * 1000:>10.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Catalog Load Benchmark
+Compares gateway startup on a JSON catalogue with a memory-mapped one.
+
+A synthetic catalogue is written both as JSON and as a catalog file.
+Each is then loaded in a fresh interpreter, the way a new worker would,
+and the time until the first search is answered and the resident memory
+added by the catalogue are reported. Memory is split into private
+(anonymous) pages, paid again by every worker, and file-backed pages,
+which workers mapping the same file share.
+
+Usage:
+    python -m benchmarks.catalog_load_benchmark [--products N]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict
+
+from benchmarks.catalog_benchmark import synthetic_products
+from src.backend import ProductCatalog, load_catalog, write_catalog
+
+
+def rss_kib() -> Dict[str, int]:
+    """Private and file-backed resident memory of this process, in KiB."""
+    fields = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            if name in ("RssAnon", "RssFile"):
+                fields[name] = int(value.split()[0])
+    return fields
+
+
+def load(kind: str, path: str) -> Dict[str, float]:
+    """Load a catalogue and answer one search; runs in the child process."""
+    before = rss_kib()
+    start = time.perf_counter()
+    if kind == "json":
+        with open(path) as f:
+            catalog = ProductCatalog.from_dict(json.load(f))
+    else:
+        catalog = load_catalog(path)
+    _, rows = catalog.search("books", page=3, sort_by="price_asc")
+    [catalog.record(row) for row in rows]
+    elapsed = time.perf_counter() - start
+    after = rss_kib()
+    return {
+        "seconds": elapsed,
+        "private_mib": (after["RssAnon"] - before["RssAnon"]) / 1024,
+        "shared_mib": (after["RssFile"] - before["RssFile"]) / 1024,
+    }
+
+
+def measure(kind: str, path: str) -> Dict[str, float]:
+    """Run load() in a fresh interpreter."""
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.catalog_load_benchmark", "--child", kind, path],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--child", nargs=2, metavar=("KIND", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(load(*args.child)))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        products = synthetic_products(args.products, args.seed)
+        json_path = os.path.join(directory, "catalog.json")
+        with open(json_path, "w") as f:
+            json.dump(products, f)
+        mapped_path = os.path.join(directory, "catalog.pcat")
+        write_catalog(ProductCatalog.from_dict(products), mapped_path)
+        del products
+
+        print(f"{'format':<8}{'file':>10}{'startup':>10}{'private':>11}{'shared':>11}")
+        for kind, path in (("json", json_path), ("mmap", mapped_path)):
+            result = measure(kind, path)
+            print(
+                f"{kind:<8}{os.path.getsize(path) / 2 ** 20:>8.1f}MB"
+                f"{result['seconds'] * 1000:>8.1f}ms"
+                f"{result['private_mib']:>9.1f}MB{result['shared_mib']:>9.1f}MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
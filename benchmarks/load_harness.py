@@ -0,0 +1,343 @@
+"""
+Load Harness
+Drives the gateway in-process with shopper, scraper and botnet traffic.
+
+An app from create_app is called through its ASGI interface, no server
+or network involved, by a mix of asyncio virtual users:
+- shoppers browse a few pages of a category with think time in between
+- scrapers each walk every page of every category from a single IP, as
+  fast as they are answered
+- a botnet walks the same pages with its requests spread over a pool of
+  rotating IPs, so no single address looks busy
+
+Each virtual user sends its own client address to the app. For every
+class the harness reports throughput, latency percentiles and how many
+requests were blocked (429, 403 or held past the timeout by the
+tarpit). Block accuracy sums up how well the gateway told the classes
+apart: bot requests blocked, and shopper requests blocked by mistake.
+
+Usage:
+    python -m benchmarks.load_harness [--duration S] [--shoppers N] [--scrapers N]
+        [--bots N] [--botnet-ips N] [--tarpit] [--backend-delay] [--json FILE]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import httpx
+
+from src.backend.handlers import BaseHandler, ProductSearchHandler
+from src.gateway import create_app
+from src.metrics import LatencyHistogram
+
+
+CLASSES = ("shopper", "scraper", "botnet")
+BOT_CLASSES = ("scraper", "botnet")
+CATEGORIES = tuple(ProductSearchHandler.PRODUCTS_DB)
+PAGE_LIMIT = 2
+CLIENT_HEADER = "x-load-client"
+
+
+def with_client_address(app):
+    """
+    Wrap an ASGI app so each request's client address comes from a header.
+
+    The harness shares one HTTP client between all virtual users; this
+    lets each of them still appear to the gateway under its own IP.
+    """
+    header = CLIENT_HEADER.encode()
+
+    async def wrapped(scope, receive, send):
+        if scope["type"] == "http":
+            for name, value in scope["headers"]:
+                if name == header:
+                    scope = dict(scope, client=(value.decode(), 40000))
+                    break
+        await app(scope, receive, send)
+
+    return wrapped
+
+
+class ClassStats:
+    """
+    Outcomes and latencies of one class of virtual users.
+
+    Args:
+        name: Class name
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.requests = 0
+        self.served = 0
+        self.blocked = 0
+        self.stalled = 0
+        self.errors = 0
+        self.latency = LatencyHistogram()
+
+    def record(self, status: Optional[int], latency: float) -> None:
+        """
+        Count one request.
+
+        Args:
+            status: Response status, or None if it timed out
+            latency: Seconds until the response (or the timeout)
+        """
+        self.requests += 1
+        self.latency.record(latency)
+        if status is None:
+            self.stalled += 1
+        elif status in (403, 429):
+            self.blocked += 1
+        elif status < 400:
+            self.served += 1
+        else:
+            self.errors += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        """Throughput, outcomes and latency percentiles in milliseconds."""
+        latency = self.latency.percentiles((50, 90, 99))
+        refused = self.blocked + self.stalled
+        return {
+            "requests": self.requests,
+            "rps": round(self.requests / elapsed, 1),
+            "served": self.served,
+            "blocked": self.blocked,
+            "stalled": self.stalled,
+            "errors": self.errors,
+            "blocked_percent": round(refused / self.requests * 100, 2) if self.requests else 0.0,
+            "latency_ms": {
+                f"p{p:g}": None if value is None else round(value * 1000, 2)
+                for p, value in latency.items()
+            },
+        }
+
+
+class LoadHarness:
+    """
+    Runs virtual users against an in-process app until a deadline.
+
+    Args:
+        app: ASGI app from create_app
+        duration: Seconds to generate load for
+        timeout: Seconds before a request counts as stalled
+        think_time: Mean seconds a shopper waits between pages
+        botnet_ips: Size of the botnet's address pool
+        seed: Random seed
+    """
+
+    def __init__(
+        self,
+        app,
+        duration: float,
+        timeout: float = 2.0,
+        think_time: float = 0.5,
+        botnet_ips: int = 1000,
+        seed: int = 7
+    ):
+        self.app = app
+        self.duration = duration
+        self.timeout = timeout
+        self.think_time = think_time
+        self.botnet_ips = botnet_ips
+        self.seed = seed
+        self.stats = {name: ClassStats(name) for name in CLASSES}
+        self._deadline = 0.0
+        self._client: Optional[httpx.AsyncClient] = None
+        self._next_bot_ip = 0
+
+    async def run(self, shoppers: int, scrapers: int, bots: int) -> Dict[str, Any]:
+        """
+        Generate load and report it.
+
+        Args:
+            shoppers: Concurrent shoppers, each from its own IP
+            scrapers: Concurrent single-IP scrapers
+            bots: Concurrent botnet workers sharing the address pool
+
+        Returns:
+            Per-class summaries and the block accuracy
+        """
+        transport = httpx.ASGITransport(app=with_client_address(self.app))
+        async with httpx.AsyncClient(transport=transport, base_url="http://gateway") as client:
+            self._client = client
+            users = (
+                [self._shopper(n) for n in range(shoppers)]
+                + [self._scraper(n) for n in range(scrapers)]
+                + [self._bot(n) for n in range(bots)]
+            )
+            start = time.perf_counter()
+            self._deadline = start + self.duration
+            await asyncio.gather(*users)
+            elapsed = time.perf_counter() - start
+        return self.report(elapsed)
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        """Summaries per class, overall throughput and block accuracy."""
+        classes = {name: stats.summary(elapsed) for name, stats in self.stats.items()}
+        bots = [self.stats[name] for name in BOT_CLASSES]
+        bot_requests = sum(s.requests for s in bots)
+        bot_refused = sum(s.blocked + s.stalled for s in bots)
+        shopper = self.stats["shopper"]
+        total = sum(s.requests for s in self.stats.values())
+        return {
+            "elapsed_seconds": round(elapsed, 2),
+            "requests": total,
+            "rps": round(total / elapsed, 1),
+            "classes": classes,
+            "accuracy": {
+                "bot_requests_blocked_percent": (
+                    round(bot_refused / bot_requests * 100, 2) if bot_requests else None
+                ),
+                "bot_pages_served": sum(s.served for s in bots),
+                "shopper_requests_blocked_percent": classes["shopper"]["blocked_percent"],
+                "shoppers_served_percent": (
+                    round(shopper.served / shopper.requests * 100, 2) if shopper.requests else None
+                ),
+            },
+        }
+
+    async def _get(self, name: str, client_ip: str, params: Dict[str, Any]) -> Tuple[Optional[int], int]:
+        """
+        Send one search and record its outcome.
+
+        Returns:
+            The status (None if it timed out) and the category's page
+            count, 0 unless the page was served
+        """
+        started = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(
+                self._client.get(
+                    "/products/search", params=params, headers={CLIENT_HEADER: client_ip}
+                ),
+                self.timeout
+            )
+        except asyncio.TimeoutError:
+            self.stats[name].record(None, time.perf_counter() - started)
+            return None, 0
+        self.stats[name].record(response.status_code, time.perf_counter() - started)
+        if response.status_code != 200:
+            return response.status_code, 0
+        return 200, response.json()["data"]["data"]["total_pages"]
+
+    async def _pause(self, seconds: float) -> None:
+        """Sleep, but not past the deadline."""
+        await asyncio.sleep(max(0.0, min(seconds, self._deadline - time.perf_counter())))
+
+    def _running(self) -> bool:
+        return time.perf_counter() < self._deadline
+
+    async def _shopper(self, n: int) -> None:
+        rng = random.Random(self.seed * 1_000_003 + n)
+        client_ip = f"10.1.{n >> 8 & 255}.{n & 255}"
+        # Stagger arrivals so shoppers do not all start in the same tick
+        await self._pause(rng.uniform(0, self.think_time))
+        while self._running():
+            category = rng.choice(CATEGORIES)
+            sort_by = rng.choice(("relevance", "relevance", "price_asc", "price_desc"))
+            for page in range(1, rng.randint(1, 3) + 1):
+                await self._get("shopper", client_ip, {
+                    "category": category, "page": page, "limit": PAGE_LIMIT, "sort_by": sort_by,
+                })
+                await self._pause(rng.expovariate(1 / self.think_time))
+                if not self._running():
+                    return
+
+    async def _scraper(self, n: int) -> None:
+        client_ip = f"203.0.113.{n & 255}"
+        while self._running():
+            for category in CATEGORIES:
+                await self._walk("scraper", category, lambda: client_ip)
+
+    async def _bot(self, n: int) -> None:
+        rng = random.Random(self.seed * 7_000_003 + n)
+        while self._running():
+            await self._walk("botnet", rng.choice(CATEGORIES), self._bot_ip)
+
+    def _bot_ip(self) -> str:
+        """Every botnet request leaves from the next address in the pool."""
+        index = self._next_bot_ip = (self._next_bot_ip + 1) % self.botnet_ips
+        return f"198.51.{index >> 8 & 255}.{index & 255}"
+
+    async def _walk(self, name: str, category: str, client_ip: Callable[[], str]) -> None:
+        """Request every page of a category in turn, retrying refused pages."""
+        page = 1
+        while self._running():
+            status, pages = await self._get(name, client_ip(), {
+                "category": category, "page": page, "limit": PAGE_LIMIT,
+            })
+            if status == 200:
+                if page >= pages:
+                    return
+                page += 1
+            elif status is not None and status not in (403, 429):
+                return
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Render a report as text tables."""
+    lines = [
+        f"{report['requests']} requests in {report['elapsed_seconds']}s ({report['rps']} req/s)",
+        "",
+        f"{'class':<10}{'requests':>10}{'req/s':>9}{'served':>9}{'blocked':>9}"
+        f"{'stalled':>9}{'errors':>8}{'blocked %':>11}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}",
+    ]
+    for name, row in report["classes"].items():
+        latency = row["latency_ms"]
+        lines.append(
+            f"{name:<10}{row['requests']:>10}{row['rps']:>9}{row['served']:>9}{row['blocked']:>9}"
+            f"{row['stalled']:>9}{row['errors']:>8}{row['blocked_percent']:>11}"
+            + "".join(f"{str(latency[p]):>9}" for p in ("p50", "p90", "p99"))
+        )
+    lines.append("")
+    for key, value in report["accuracy"].items():
+        lines.append(f"{key}: {value}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load")
+    parser.add_argument("--shoppers", type=int, default=50)
+    parser.add_argument("--scrapers", type=int, default=1)
+    parser.add_argument("--bots", type=int, default=10, help="Concurrent botnet workers")
+    parser.add_argument("--botnet-ips", type=int, default=1000, help="Addresses the botnet rotates over")
+    parser.add_argument("--think-time", type=float, default=0.5, help="Mean shopper pause in seconds")
+    parser.add_argument("--timeout", type=float, default=2.0, help="Seconds before a request counts as stalled")
+    parser.add_argument("--capacity", type=int, default=100, help="Rate limit capacity per client")
+    parser.add_argument("--refill-rate", type=float, default=10.0, help="Tokens per second per client")
+    parser.add_argument("--tarpit", action="store_true", help="Tarpit flagged scrapers")
+    parser.add_argument(
+        "--backend-delay", action="store_true",
+        help="Keep the mock backend's 10-100ms simulated network delay"
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="Also write the report as JSON to this file")
+    args = parser.parse_args()
+
+    if not args.backend_delay:
+        BaseHandler.simulate_delay = lambda self, deadline=None: None
+    app = create_app(capacity=args.capacity, refill_rate=args.refill_rate, tarpit=args.tarpit)
+    harness = LoadHarness(
+        app,
+        duration=args.duration,
+        timeout=args.timeout,
+        think_time=args.think_time,
+        botnet_ips=args.botnet_ips,
+        seed=args.seed
+    )
+    report = asyncio.run(harness.run(args.shoppers, args.scrapers, args.bots))
+
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Microbenchmarks
+Times the limiter, metrics and backend hot paths against a stored baseline.
+
+Each case times one operation in a loop, a few repeats over, and reports
+the median and best time per operation. Results can be written as JSON
+and compared with a baseline from an earlier run: a case whose median
+is slower than the baseline by more than the threshold is a regression,
+and the run exits with status 1, so a performance change can be shown
+and then kept from slipping back.
+
+Timings depend on the machine. The stored baseline was recorded on one
+machine; record a new one with --save-baseline before comparing on
+another. Each operation is called through a Python function, which adds
+the same small constant to every case.
+
+Usage:
+    python -m benchmarks.microbench [--baseline FILE] [--output FILE] [--threshold 0.25]
+    python -m benchmarks.microbench --save-baseline
+    python -m benchmarks.microbench --only rate_limiter
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.backend.catalog import ProductCatalog
+from src.backend.handlers import ProductSearchHandler
+from src.metrics import MetricsManager
+from src.rate_limiting.rate_limiter import RateLimiter
+from src.rate_limiting.token_bucket import TokenBucket
+
+from .catalog_benchmark import synthetic_products
+
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# (name, setup, operations per repeat); setup returns the operation
+Case = Tuple[str, Callable[[], Callable[[], Any]], int]
+
+
+def token_bucket() -> Callable[[], Any]:
+    """TokenBucket.allow_request on a bucket that never runs dry."""
+    bucket = TokenBucket(capacity=10 ** 12, refill_rate=10.0)
+    return bucket.allow_request
+
+
+def rate_limiter(clients: int) -> Callable[[], Callable[[], Any]]:
+    """RateLimiter.is_allowed with this many clients already known."""
+    def setup() -> Callable[[], Any]:
+        limiter = RateLimiter(capacity=10 ** 12, refill_rate=10.0)
+        ids = [f"10.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}" for n in range(clients)]
+        for client_id in ids:
+            limiter.is_allowed(client_id)
+        # Look clients up in random order, as traffic would
+        keys = itertools.cycle(random.Random(7).choices(ids, k=min(clients, 100_000)))
+        is_allowed = limiter.is_allowed
+        return lambda: is_allowed(next(keys))
+    return setup
+
+
+def record_request() -> Callable[[], Any]:
+    """MetricsManager.record_request for an allowed search."""
+    manager = MetricsManager()
+    return lambda: manager.record_request(False, 0.0125, "/products/search", 200)
+
+
+def get_metrics(records: int) -> Callable[[], Callable[[], Any]]:
+    """MetricsManager.get_metrics after this many recorded requests."""
+    def setup() -> Callable[[], Any]:
+        manager = MetricsManager()
+        rng = random.Random(7)
+        for _ in range(records):
+            status = rng.choice((200, 200, 200, 429, 500))
+            manager.record_request(status == 429, rng.uniform(0.001, 0.2), "/products/search", status)
+        return manager.get_metrics
+    return setup
+
+
+def product_search(products: Optional[int]) -> Callable[[], Callable[[], Any]]:
+    """ProductSearchHandler.handle on the default or a synthetic catalog."""
+    def setup() -> Callable[[], Any]:
+        catalog = None if products is None else ProductCatalog.from_dict(synthetic_products(products, 7))
+        handler = ProductSearchHandler(catalog)
+        # The network delay would swamp the handler's own work
+        handler.simulate_delay = lambda deadline=None: None
+        queries = itertools.cycle([
+            {"category": "electronics", "page": 1, "limit": 20},
+            {"category": "books", "page": 2, "limit": 2, "sort_by": "price_asc"},
+            {"category": "home", "page": 1, "limit": 20, "sort_by": "price_desc", "in_stock": True},
+        ])
+        return lambda: handler.handle(next(queries))
+    return setup
+
+
+def cases(clients: int, records: int, products: int) -> List[Case]:
+    """Every benchmark case, with operations per repeat sized to ~0.1s or more."""
+    return [
+        ("token_bucket.allow_request", token_bucket, 200_000),
+        ("rate_limiter.is_allowed[1 client]", rate_limiter(1), 200_000),
+        (f"rate_limiter.is_allowed[{clients} clients]", rate_limiter(clients), 200_000),
+        ("metrics_manager.record_request", record_request, 50_000),
+        (f"metrics_manager.get_metrics[{records} records]", get_metrics(records), 50),
+        ("product_search.handle", product_search(None), 20_000),
+        (f"product_search.handle[{products} products]", product_search(products), 5_000),
+    ]
+
+
+def measure(operation: Callable[[], Any], number: int, repeats: int) -> Dict[str, float]:
+    """Median and best nanoseconds per call over several repeats."""
+    operation()
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            operation()
+        samples.append((time.perf_counter_ns() - start) / number)
+    return {
+        "ns_per_op": round(statistics.median(samples), 1),
+        "best_ns_per_op": round(min(samples), 1),
+        "ops_per_repeat": number,
+        "repeats": repeats,
+    }
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float
+) -> List[Tuple[str, float, float, float]]:
+    """
+    Compare medians with a baseline.
+
+    Args:
+        results: Case name to measurement
+        baseline: Case name to measurement from an earlier run
+        threshold: Allowed slowdown, e.g. 0.25 for 25%
+
+    Returns:
+        (name, baseline ns, current ns, ratio) of every regressed case
+    """
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        ratio = result["ns_per_op"] / before["ns_per_op"]
+        if ratio > 1 + threshold:
+            regressions.append((name, before["ns_per_op"], result["ns_per_op"], ratio))
+    return regressions
+
+
+def environment() -> Dict[str, str]:
+    """Where the results were measured."""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "system": platform.system(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=1_000_000, help="Clients in the large limiter case")
+    parser.add_argument("--records", type=int, default=100_000, help="Requests recorded before get_metrics")
+    parser.add_argument("--products", type=int, default=100_000, help="Products in the large catalog case")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--only", help="Run only cases whose name contains this")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", default=BASELINE, help="Baseline JSON to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown before failing")
+    args = parser.parse_args()
+
+    results: Dict[str, Dict[str, float]] = {}
+    print(f"{'case':<48}{'median':>12}{'best':>12}")
+    for name, setup, number in cases(args.clients, args.records, args.products):
+        if args.only and args.only not in name:
+            continue
+        result = results[name] = measure(setup(), number, args.repeats)
+        print(f"{name:<48}{result['ns_per_op']:>10.0f}ns{result['best_ns_per_op']:>10.0f}ns")
+
+    report = {"environment": environment(), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"\nSaved baseline to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; record one with --save-baseline")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get("environment") != report["environment"]:
+        print("\nWarning: the baseline was recorded in a different environment")
+
+    regressions = compare(results, baseline["results"], args.threshold)
+    if not regressions:
+        print(f"\nNo regressions beyond {args.threshold:.0%} of {args.baseline}")
+        return
+    print(f"\nRegressions beyond {args.threshold:.0%}:")
+    for name, before, after, ratio in regressions:
+        print(f"  {name}: {before:.0f}ns -> {after:.0f}ns ({ratio:.2f}x)")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Routing Benchmark
+Compares the radix route tree with a linear scan over compiled regexes.
+
+Registers a few thousand REST-style routes (static, parameterised and
+wildcard), then matches a mix of paths against both routers: the
+baseline tries each route's regex in turn like a naive router would,
+the tree walks one node per path segment. Reports ns per match.
+
+Usage:
+    python -m benchmarks.routing_benchmark [--resources N] [--lookups L]
+"""
+
+import argparse
+import random
+import re
+import time
+from typing import Callable, List, Optional, Tuple
+
+from src.backend.route_tree import RouteTree
+
+
+def synthetic_routes(resources: int) -> List[str]:
+    """Route patterns for a number of versioned REST resources."""
+    patterns = []
+    for version in ("v1", "v2"):
+        for index in range(resources):
+            base = f"/api/{version}/resource{index}"
+            patterns += [
+                base,
+                f"{base}/search",
+                f"{base}/{{item_id:int}}",
+                f"{base}/{{item_id:int}}/history",
+                f"{base}/{{item_id:int}}/children/{{child}}",
+            ]
+    patterns.append("/static/{path:path}")
+    return patterns
+
+
+def synthetic_paths(resources: int, count: int, seed: int) -> List[str]:
+    """Request paths hitting random routes, with a few misses."""
+    rng = random.Random(seed)
+    paths = []
+    for _ in range(count):
+        base = f"/api/{rng.choice(('v1', 'v2'))}/resource{rng.randrange(resources)}"
+        item = rng.randrange(10 ** 6)
+        paths.append(rng.choice((
+            base,
+            f"{base}/search",
+            f"{base}/{item}",
+            f"{base}/{item}/history",
+            f"{base}/{item}/children/c{item}",
+            f"{base}/{item}/unknown",
+            f"/static/css/{item}.css",
+        )))
+    return paths
+
+
+def regex_router(patterns: List[str]) -> Callable[[str], Optional[str]]:
+    """A router trying one compiled regex per route, in order."""
+    converters = {"int": r"(?P<\1>[0-9]+)", "path": r"(?P<\1>.*)", "": r"(?P<\1>[^/]+)"}
+    compiled: List[Tuple[re.Pattern, str]] = []
+    for pattern in patterns:
+        regex = re.sub(
+            r"\{(\w+)(?::(\w+))?\}",
+            lambda m: converters[m.group(2) or ""].replace(r"\1", m.group(1)),
+            pattern.rstrip("/")
+        )
+        compiled.append((re.compile(regex + "/?$"), pattern))
+
+    def match(path: str) -> Optional[str]:
+        for regex, pattern in compiled:
+            if regex.match(path):
+                return pattern
+        return None
+
+    return match
+
+
+def tree_router(patterns: List[str]) -> Callable[[str], Optional[str]]:
+    """A router backed by the compiled route tree."""
+    tree = RouteTree()
+    for pattern in patterns:
+        tree.add(pattern, pattern)
+    tree.compile()
+
+    def match(path: str) -> Optional[str]:
+        found = tree.match(path)
+        return None if found is None else found.route.pattern
+
+    return match
+
+
+def time_lookups(match: Callable[[str], Optional[str]], paths: List[str]) -> float:
+    """Mean nanoseconds per match."""
+    start = time.perf_counter_ns()
+    for path in paths:
+        match(path)
+    return (time.perf_counter_ns() - start) / len(paths)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--resources", type=int, default=400)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    patterns = synthetic_routes(args.resources)
+    paths = synthetic_paths(args.resources, args.lookups, args.seed)
+    routers = (("regex", regex_router(patterns)), ("tree", tree_router(patterns)))
+
+    # Both routers must agree before their speed is worth comparing
+    for path in paths[:500]:
+        assert routers[0][1](path) == routers[1][1](path), path
+
+    print(f"{len(patterns)} routes, {len(paths)} lookups")
+    print(f"{'router':<10}{'ns/match':>12}")
+    for name, match in routers:
+        print(f"{name:<10}{time_lookups(match, paths):>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Tarpit Benchmark
+Shows that thousands of tarpitted connections do not slow down normal traffic.
+
+Normal shopper traffic is measured twice against the same in-process app:
+once on its own, and once while N flagged scraper connections are held
+in the tarpit. The scraper connections are driven as raw ASGI calls, so
+only gateway-side cost is counted; memory per tarpitted connection is
+measured with tracemalloc while they are opened.
+
+Usage:
+    python -m benchmarks.tarpit_benchmark [--connections N] [--requests R]
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from typing import Dict, List
+
+import httpx
+
+from src.gateway import create_app
+
+
+SCRAPER_IP = "203.0.113.7"
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def measure_shoppers(app, requests: int, concurrency: int) -> Dict[str, float]:
+    """Latency of normal traffic through the gateway."""
+    transport = httpx.ASGITransport(app=app, client=("198.51.100.1", 4000))
+    latencies: List[float] = []
+    remaining = iter(range(requests))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://gateway") as client:
+        async def shopper() -> None:
+            for _ in remaining:
+                start = time.perf_counter()
+                response = await client.get("/health")
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200
+
+        await asyncio.gather(*(shopper() for _ in range(concurrency)))
+
+    latencies.sort()
+    return {
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": latencies[-1] * 1000,
+    }
+
+
+async def open_scraper(app, hang_up: asyncio.Event) -> None:
+    """One scraper connection, held until ``hang_up`` is set."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/products/search",
+        "raw_path": b"/products/search",
+        "query_string": b"category=books",
+        "root_path": "",
+        "headers": [(b"host", b"gateway")],
+        "client": (SCRAPER_IP, 5000),
+        "server": ("gateway", 80),
+    }
+    sent_request = False
+
+    async def receive():
+        nonlocal sent_request
+        if not sent_request:
+            sent_request = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await hang_up.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def run(connections: int, requests: int, concurrency: int) -> None:
+    app = create_app(tarpit=True, max_tarpit_connections=connections)
+    app.state.suspicion_tracker.flag(SCRAPER_IP)
+    tarpit = app.state.tarpit
+    tarpit.drips = 3600
+
+    # Warm up routing and middleware
+    await measure_shoppers(app, 100, concurrency)
+    baseline = await measure_shoppers(app, requests, concurrency)
+
+    hang_up = asyncio.Event()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    scrapers = [asyncio.ensure_future(open_scraper(app, hang_up)) for _ in range(connections)]
+    while tarpit.active < connections:
+        await asyncio.sleep(0.05)
+    per_connection = (tracemalloc.get_traced_memory()[0] - before) / connections
+    tracemalloc.stop()
+
+    loaded = await measure_shoppers(app, requests, concurrency)
+    held = tarpit.active
+
+    hang_up.set()
+    await asyncio.gather(*scrapers)
+
+    print(f"tarpitted connections held: {held}")
+    print(f"memory per tarpitted connection: {per_connection / 1024:.1f} KiB")
+    print(f"{'shopper latency':<28}{'p50':>10}{'p99':>10}{'max':>10}")
+    for label, result in (("no tarpit load", baseline), (f"{held} tarpitted", loaded)):
+        print(
+            f"{label:<28}{result['p50_ms']:>8.2f}ms"
+            f"{result['p99_ms']:>8.2f}ms{result['max_ms']:>8.2f}ms"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--connections", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(run(args.connections, args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Text Search Benchmark
+Measures name search latency on a synthetic catalogue with millions of names.
+
+Names are drawn from a Zipf-like vocabulary (a few very common words, a
+long tail of rare ones, plus model numbers), so the posting lists range
+from a handful of rows to most of the catalogue. Reports index build
+time and size, then per-query latency for common, rare, prefix and
+multi-word queries, against a scan over all names.
+
+Usage:
+    python -m benchmarks.text_search_benchmark [--products N] [--queries Q]
+"""
+
+import argparse
+import random
+import time
+from typing import Dict, List
+
+from src.backend.catalog import ProductCatalog
+from src.backend.text_index import tokenize
+
+
+CATEGORIES = ("electronics", "clothing", "books", "home")
+COMMON_WORDS = ("black", "white", "pro", "mini", "max", "classic", "wireless", "set")
+RARE_WORDS = tuple(f"{a}{b}" for a in ("al", "bo", "cor", "dex", "el", "fa", "gor", "hul") for b in range(250))
+KINDS = ("cable", "lamp", "shirt", "novel", "chair", "phone", "speaker", "mug", "jacket", "desk")
+
+
+def synthetic_catalog(count: int, seed: int) -> ProductCatalog:
+    """Random products with realistic-looking names."""
+    rng = random.Random(seed)
+
+    def name() -> str:
+        words = [rng.choice(COMMON_WORDS)] if rng.random() < 0.6 else []
+        words.append(rng.choice(RARE_WORDS))
+        words.append(rng.choice(KINDS))
+        words.append(f"m{rng.randrange(100000)}")
+        return " ".join(words)
+
+    return ProductCatalog.from_records(
+        (CATEGORIES[i % len(CATEGORIES)], {
+            "id": i,
+            "name": name(),
+            "price": round(rng.uniform(1, 500), 2),
+            "in_stock": rng.random() < 0.8,
+        })
+        for i in range(count)
+    )
+
+
+def query_set(count: int, seed: int) -> Dict[str, List[str]]:
+    """Queries of each kind."""
+    rng = random.Random(seed)
+    return {
+        "common": [rng.choice(COMMON_WORDS) for _ in range(count)],
+        "rare": [rng.choice(RARE_WORDS) for _ in range(count)],
+        "prefix": [rng.choice(RARE_WORDS)[:3] for _ in range(count)],
+        "multi-word": [f"{rng.choice(COMMON_WORDS)} {rng.choice(KINDS)} {rng.choice(RARE_WORDS)[:2]}" for _ in range(count)],
+    }
+
+
+def scan(catalog: ProductCatalog, query: str) -> int:
+    """Baseline: test every distinct name against the query."""
+    tokens = tokenize(query)
+    matched = 0
+    for name in catalog.names:
+        words = tokenize(name)
+        if all(t in words for t in tokens[:-1]) and any(w.startswith(tokens[-1]) for w in words):
+            matched += 1
+    return matched
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=2_000_000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    catalog = synthetic_catalog(args.products, args.seed)
+    start = time.perf_counter()
+    index = catalog.text_index
+    build_seconds = time.perf_counter() - start
+    posting_bytes = sum(len(p.data) + 16 * len(p.block_offsets) for p in index.postings.values())
+    postings = sum(p.count for p in index.postings.values())
+    print(
+        f"{len(catalog)} products, {len(index.terms)} terms, {postings} postings: "
+        f"built in {build_seconds:.2f}s, {posting_bytes / 2 ** 20:.1f}MB "
+        f"({8 * posting_bytes / postings:.1f} bits per posting)"
+    )
+
+    print(f"{'query':<12}{'matches':>10}{'p50':>11}{'p99':>11}{'scan':>11}")
+    for kind, queries in query_set(args.queries, args.seed).items():
+        latencies, matches = [], 0
+        for query in queries:
+            started = time.perf_counter()
+            total, _ = catalog.search("books", q=query, sort_by="price_asc")
+            latencies.append(time.perf_counter() - started)
+            matches += total
+        latencies.sort()
+
+        started = time.perf_counter()
+        scan(catalog, queries[0])
+        scan_seconds = time.perf_counter() - started
+        print(
+            f"{kind:<12}{matches // len(queries):>10}"
+            f"{percentile(latencies, 0.5) * 1000:>9.2f}ms{percentile(latencies, 0.99) * 1000:>9.2f}ms"
+            f"{scan_seconds * 1000:>9.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
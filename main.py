@@ -9,21 +9,17 @@ The application is composed of independent modules following Single Responsibili
 - src/backend/ - Backend service
 - src/models/ - Data models
 - src/gateway/ - API gateway orchestration
+
+Settings come from the command line or GATEWAY_* environment variables,
+see ``python main.py --help``. By default one worker serves on port 8000
+with 100 requests of capacity refilled at ~0.167 per second (10 per minute).
 """
 
-import uvicorn
-from src.gateway import create_app
+from src.gateway.server import app_from_env, main
 
 
 if __name__ == "__main__":
-    # Create the FastAPI application
-    # Rate limiting: 100 requests per minute, tokens refill at ~0.167 per second (10 per minute)
-    app = create_app(capacity=100, refill_rate=0.167)
-
-    # Run the server
-    uvicorn.run(
-        app,
-        host="0.0.0.0",
-        port=8000,
-        log_level="info"
-    )
+    main()
+else:
+    # For ASGI servers pointed at main:app; one process only, see app_from_env
+    app = app_from_env()
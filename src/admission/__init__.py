@@ -0,0 +1,12 @@
+"""
+Admission package - load shedding in front of the backend.
+
+Modules:
+- priority: Priority classes and request classification
+- admission_queue: Bounded priority queue with CoDel-style shedding
+"""
+
+from .priority import Priority, PriorityClassifier
+from .admission_queue import AdmissionQueue, AdmissionRejected
+
+__all__ = ["Priority", "PriorityClassifier", "AdmissionQueue", "AdmissionRejected"]
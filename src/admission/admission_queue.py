@@ -0,0 +1,337 @@
+"""
+Admission Queue Module
+Single responsibility: Decide which requests reach the backend when it is saturated.
+
+This module:
+- Caps the number of requests in flight to the backend
+- Queues the overflow per priority class, serving higher classes first
+- Sheds waiters CoDel-style once queueing delay stays above target
+- Sheds waiters that outlive their class deadline
+- Tracks queue depth and sojourn time for export
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Optional
+
+from .priority import Priority
+
+
+DEFAULT_CLASS_DEADLINES: Dict[Priority, float] = {
+    Priority.TRUSTED: 2.0,
+    Priority.NORMAL: 1.0,
+    Priority.SUSPECT: 0.25,
+}
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed instead of admitted."""
+
+    def __init__(self, reason: str, priority: Priority):
+        super().__init__(f"Request shed ({reason})")
+        self.reason = reason
+        self.priority = priority
+
+
+class _Waiter:
+    """A request parked in the admission queue."""
+
+    __slots__ = ("future", "priority", "enqueued_at", "admitted")
+
+    def __init__(self, future: asyncio.Future, priority: Priority, enqueued_at: float):
+        self.future = future
+        self.priority = priority
+        self.enqueued_at = enqueued_at
+        self.admitted = False
+
+
+class _ClassStats:
+    """Counters for a single priority class."""
+
+    __slots__ = ("admitted", "shed", "sojourn_total", "sojourn_max")
+
+    def __init__(self):
+        self.admitted = 0
+        self.shed: Dict[str, int] = {}
+        self.sojourn_total = 0.0
+        self.sojourn_max = 0.0
+
+
+class AdmissionQueue:
+    """
+    Bounded, priority-aware admission queue in front of the backend.
+
+    Requests are admitted immediately while fewer than ``max_concurrency``
+    are in flight. Beyond that they wait in a per-class FIFO. When a slot
+    frees up the oldest waiter of the most important class is admitted,
+    unless CoDel says the queue has been standing above ``target_delay``
+    for a whole ``interval``, in which case the oldest waiter of the least
+    important class is shed instead. Crawlers therefore absorb overload
+    before shoppers see any extra latency.
+
+    Args:
+        max_concurrency: Max requests in flight to the backend
+        max_queue_size: Max requests waiting across all classes
+        target_delay: Acceptable standing queueing delay in seconds
+        interval: How long delay may exceed target before dropping starts
+        class_deadlines: Max seconds each class may wait before being shed
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 64,
+        max_queue_size: int = 256,
+        target_delay: float = 0.005,
+        interval: float = 0.1,
+        class_deadlines: Optional[Dict[Priority, float]] = None
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue_size = max_queue_size
+        self.target_delay = target_delay
+        self.interval = interval
+        self.class_deadlines = dict(DEFAULT_CLASS_DEADLINES)
+        if class_deadlines:
+            self.class_deadlines.update(class_deadlines)
+
+        self.in_flight = 0
+        self._queues: Dict[Priority, Deque[_Waiter]] = {p: deque() for p in Priority}
+        self._waiting = 0
+        self._stats: Dict[Priority, _ClassStats] = {p: _ClassStats() for p in Priority}
+
+        # CoDel state
+        self._first_above_time = 0.0
+        self._dropping = False
+        self._drop_count = 0
+        self._drop_next = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests currently waiting."""
+        return self._waiting
+
+    @asynccontextmanager
+    async def admit(self, priority: Priority, timeout: Optional[float] = None) -> AsyncIterator[None]:
+        """
+        Hold a backend slot for the duration of the block.
+
+        Args:
+            priority: Priority class of the request
+            timeout: Time left before the request's own deadline
+
+        Raises:
+            AdmissionRejected: If the request is shed
+        """
+        await self.acquire(priority, timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, priority: Priority, timeout: Optional[float] = None) -> None:
+        """
+        Wait for a backend slot.
+
+        Args:
+            priority: Priority class of the request
+            timeout: Time left before the request's own deadline; the
+                request waits no longer than this or its class deadline,
+                whichever is shorter
+
+        Raises:
+            AdmissionRejected: If the request is shed
+        """
+        if self.in_flight < self.max_concurrency and self._waiting == 0:
+            self.in_flight += 1
+            self._record_admit(priority, 0.0)
+            return
+
+        if self._waiting == 0:
+            # No standing queue: whatever CoDel saw last is over
+            self._reset_codel()
+
+        # While CoDel is dropping, the lowest class is refused up front:
+        # a fast 503 is cheaper for everyone than a slow one.
+        if self._dropping and priority == Priority.SUSPECT:
+            self._shed_now(priority, "overloaded")
+
+        if self._waiting >= self.max_queue_size and not self._evict_below(priority):
+            self._shed_now(priority, "queue_full")
+
+        wait = self.class_deadlines[priority]
+        if timeout is not None:
+            if timeout <= 0:
+                self._shed_now(priority, "deadline")
+            wait = min(wait, timeout)
+
+        waiter = _Waiter(
+            asyncio.get_running_loop().create_future(), priority, time.monotonic()
+        )
+        self._queues[priority].append(waiter)
+        self._waiting += 1
+
+        try:
+            await asyncio.wait_for(waiter.future, timeout=wait)
+        except asyncio.TimeoutError:
+            # The slot may have been handed over as the timeout fired
+            if waiter.admitted:
+                self.release()
+            else:
+                self._discard(waiter)
+            self._record_shed(priority, "deadline")
+            raise AdmissionRejected("deadline", priority) from None
+        except asyncio.CancelledError:
+            if waiter.admitted:
+                self.release()
+            else:
+                self._discard(waiter)
+            raise
+
+    def release(self) -> None:
+        """Return a backend slot and hand it to the next waiter."""
+        self.in_flight -= 1
+        self._dispatch()
+
+    def get_stats(self) -> Dict:
+        """
+        Get queue depth and sojourn time statistics.
+
+        Returns:
+            Dict with overall and per-class figures
+        """
+        classes = {}
+        for priority, stats in self._stats.items():
+            avg = stats.sojourn_total / stats.admitted if stats.admitted else 0.0
+            classes[priority.name.lower()] = {
+                "queue_depth": len(self._queues[priority]),
+                "admitted": stats.admitted,
+                "shed": dict(stats.shed),
+                "average_sojourn_ms": round(avg * 1000, 3),
+                "max_sojourn_ms": round(stats.sojourn_max * 1000, 3),
+            }
+
+        return {
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": self._waiting,
+            "max_queue_size": self.max_queue_size,
+            "dropping": self._dropping,
+            "classes": classes,
+        }
+
+    def _dispatch(self) -> None:
+        """Admit waiters while slots are free, applying CoDel on the way."""
+        while self.in_flight < self.max_concurrency and self._waiting:
+            now = time.monotonic()
+            waiter = self._peek_next()
+            if waiter.future.done():
+                # Timed out or cancelled, its task has not run cleanup yet
+                self._queues[waiter.priority].popleft()
+                self._waiting -= 1
+                continue
+            sojourn = now - waiter.enqueued_at
+
+            if self._codel_should_drop(sojourn, now):
+                victim = self._pop_lowest()
+                if victim.future.done():
+                    continue
+                self._record_shed(victim.priority, "codel")
+                victim.future.set_exception(AdmissionRejected("codel", victim.priority))
+                continue
+
+            self._queues[waiter.priority].popleft()
+            self._waiting -= 1
+            self.in_flight += 1
+            waiter.admitted = True
+            waiter.future.set_result(None)
+            self._record_admit(waiter.priority, sojourn)
+
+        if self._waiting == 0:
+            self._reset_codel()
+
+    def _codel_should_drop(self, sojourn: float, now: float) -> bool:
+        """CoDel control law: drop at increasing rate while delay stays high."""
+        if sojourn < self.target_delay:
+            self._reset_codel()
+            return False
+
+        if self._first_above_time == 0.0:
+            self._first_above_time = now + self.interval
+            return False
+        if now < self._first_above_time:
+            return False
+
+        if not self._dropping:
+            self._dropping = True
+            self._drop_count = 1
+            self._drop_next = now + self.interval
+            return True
+        if now >= self._drop_next:
+            self._drop_count += 1
+            self._drop_next = now + self.interval / math.sqrt(self._drop_count)
+            return True
+        return False
+
+    def _reset_codel(self) -> None:
+        """Leave the dropping state once the queue has drained."""
+        self._first_above_time = 0.0
+        self._dropping = False
+
+    def _peek_next(self) -> _Waiter:
+        """Oldest waiter of the most important non-empty class."""
+        for priority in Priority:
+            queue = self._queues[priority]
+            if queue:
+                return queue[0]
+        raise LookupError("admission queue is empty")
+
+    def _pop_lowest(self) -> _Waiter:
+        """Remove the oldest waiter of the least important non-empty class."""
+        for priority in reversed(Priority):
+            queue = self._queues[priority]
+            if queue:
+                self._waiting -= 1
+                return queue.popleft()
+        raise LookupError("admission queue is empty")
+
+    def _evict_below(self, priority: Priority) -> bool:
+        """Shed the newest waiter of a class less important than ``priority``."""
+        for lower in reversed(Priority):
+            if lower <= priority:
+                return False
+            queue = self._queues[lower]
+            if queue:
+                victim = queue.pop()
+                self._waiting -= 1
+                if victim.future.done():
+                    return True
+                self._record_shed(lower, "evicted")
+                victim.future.set_exception(AdmissionRejected("evicted", lower))
+                return True
+        return False
+
+    def _discard(self, waiter: _Waiter) -> None:
+        """Remove a waiter that gave up before being admitted."""
+        try:
+            self._queues[waiter.priority].remove(waiter)
+            self._waiting -= 1
+        except ValueError:
+            pass
+
+    def _shed_now(self, priority: Priority, reason: str) -> None:
+        """Refuse a request without queueing it."""
+        self._record_shed(priority, reason)
+        raise AdmissionRejected(reason, priority)
+
+    def _record_admit(self, priority: Priority, sojourn: float) -> None:
+        stats = self._stats[priority]
+        stats.admitted += 1
+        stats.sojourn_total += sojourn
+        if sojourn > stats.sojourn_max:
+            stats.sojourn_max = sojourn
+
+    def _record_shed(self, priority: Priority, reason: str) -> None:
+        shed = self._stats[priority].shed
+        shed[reason] = shed.get(reason, 0) + 1
@@ -0,0 +1,62 @@
+"""
+Priority Module
+Single responsibility: Assign an admission priority class to a request.
+
+Classes (lower value is served first):
+- TRUSTED: Allowlisted IPs and clients presenting a known API key
+- NORMAL: Anonymous shoppers
+- SUSPECT: Clients the suspicion tracker flags as likely crawlers
+"""
+
+from enum import IntEnum
+from typing import Iterable, Optional
+
+from src.detection import SuspicionTracker
+
+
+class Priority(IntEnum):
+    """Admission priority classes, most important first."""
+
+    TRUSTED = 0
+    NORMAL = 1
+    SUSPECT = 2
+
+
+class PriorityClassifier:
+    """
+    Maps a request to its admission priority class.
+
+    Args:
+        suspicion_tracker: Tracker used to spot likely crawlers
+        allowlist: Client IPs that are always trusted
+        api_keys: API keys that mark a client as authenticated
+    """
+
+    def __init__(
+        self,
+        suspicion_tracker: SuspicionTracker,
+        allowlist: Optional[Iterable[str]] = None,
+        api_keys: Optional[Iterable[str]] = None
+    ):
+        self.suspicion_tracker = suspicion_tracker
+        self.allowlist = frozenset(allowlist or ())
+        self.api_keys = frozenset(api_keys or ())
+
+    def classify(self, client_ip: str, api_key: Optional[str] = None) -> Priority:
+        """
+        Classify a request.
+
+        Args:
+            client_ip: Client IP address
+            api_key: API key sent with the request, if any
+
+        Returns:
+            Priority class for the admission queue
+        """
+        if client_ip in self.allowlist:
+            return Priority.TRUSTED
+        if api_key is not None and api_key in self.api_keys:
+            return Priority.TRUSTED
+        if self.suspicion_tracker.is_suspect(client_ip):
+            return Priority.SUSPECT
+        return Priority.NORMAL
@@ -6,8 +6,27 @@ Modules:
 - users_handler: Handles /users endpoint
 - data_handler: Handles /data endpoint
 - health_handler: Handles /health endpoint
+- deadline: Per-request latency budget
+- catalog: Columnar product catalog with sorted indices
+- catalog_file: Memory-mapped on-disk catalog format
+- catalog_build: Converts JSON/CSV product data into a catalog file
+- route_tree: Compiled radix tree matching endpoints to handlers
 """
 
+from .catalog import ProductCatalog
+from .catalog_file import CatalogFormatError, load_catalog, write_catalog
+from .route_tree import RouteError, RouteTree
+from .deadline import Deadline, DeadlineExceeded
 from .service import BackendService
 
-__all__ = ["BackendService"]
+__all__ = [
+    "BackendService",
+    "ProductCatalog",
+    "CatalogFormatError",
+    "load_catalog",
+    "write_catalog",
+    "RouteTree",
+    "RouteError",
+    "Deadline",
+    "DeadlineExceeded",
+]
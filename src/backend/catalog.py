@@ -0,0 +1,467 @@
+"""
+Product Catalog Module
+Single responsibility: Store products and answer paginated, sorted searches.
+
+Products are stored column by column in NumPy arrays instead of as one
+dict per product:
+- ids, prices, in_stock and category codes are flat arrays
+- names are interned: a table of unique strings plus an index column
+- for every sort order there is one permutation of all rows, grouped by
+  category, so a category's sorted rows are a slice (a view, not a copy)
+- price-sorted orders also keep their price column in sorted order, so
+  price ranges are found with a binary search
+
+A page is answered by slicing the right permutation and decoding only
+the rows on that page into dicts. Pages can be addressed by offset or,
+keyset style, by the position of the last row already seen: that is a
+binary search into the permutation, so deep pages cost no more than
+the first one.
+
+Text queries go through an inverted index over the names, built on the
+first query. The index's rows are then narrowed to the category and
+filters and sorted, which is cheap because matches are few.
+"""
+
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .text_index import TextIndex
+
+
+SORT_ORDERS = ("relevance", "price_asc", "price_desc")
+# Rows tested per step when filters are applied after a keyset seek
+SCAN_CHUNK = 256
+
+
+class ProductCatalog:
+    """
+    Columnar, indexed product catalog.
+
+    Args:
+        ids: Product ids
+        prices: Product prices
+        in_stock: Stock flags
+        category_codes: Index into ``categories`` for each product
+        name_codes: Index into ``names`` for each product
+        categories: Category names
+        names: Interned product names; any sequence of strings, so names
+            can be decoded on access
+        indices: Sort indices from a previous build (see index_arrays());
+            built from the columns if omitted
+    """
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        prices: np.ndarray,
+        in_stock: np.ndarray,
+        category_codes: np.ndarray,
+        name_codes: np.ndarray,
+        categories: List[str],
+        names: Sequence[str],
+        indices: Optional[Dict[str, np.ndarray]] = None
+    ):
+        self.ids = ids
+        self.prices = prices
+        self.in_stock = in_stock
+        self.category_codes = category_codes
+        self.name_codes = name_codes
+        self.categories = categories
+        self.names = names
+        self.category_index = {name: code for code, name in enumerate(categories)}
+        self._text_index: Optional[TextIndex] = None
+        self._text_lock = threading.Lock()
+        self._id_lookup: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        if indices is None:
+            self._build_indices()
+        else:
+            self._use_indices(indices)
+
+    @classmethod
+    def from_records(cls, records: Iterable[Tuple[str, Dict[str, Any]]]) -> "ProductCatalog":
+        """
+        Build a catalog from (category, product dict) pairs.
+
+        Args:
+            records: Pairs in relevance order; products need id, name,
+                price and in_stock
+
+        Returns:
+            New ProductCatalog
+        """
+        category_index: Dict[str, int] = {}
+        name_index: Dict[str, int] = {}
+        columns = _columns(records, category_index, name_index)
+        return cls(categories=list(category_index), names=list(name_index), **columns)
+
+    @classmethod
+    def from_dict(cls, products_by_category: Dict[str, List[Dict[str, Any]]]) -> "ProductCatalog":
+        """Build a catalog from a {category: [product, ...]} mapping."""
+        return cls.from_records(
+            (category, product)
+            for category, products in products_by_category.items()
+            for product in products
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def text_index(self) -> TextIndex:
+        """Inverted index over product names, built on first use."""
+        if self._text_index is None:
+            with self._text_lock:
+                if self._text_index is None:
+                    self._text_index = TextIndex.build(self.names, self.name_codes)
+        return self._text_index
+
+    def extended(self, records: Iterable[Tuple[str, Dict[str, Any]]]) -> "ProductCatalog":
+        """
+        Copy of the catalog with more products appended after the existing ones.
+
+        The catalog itself is left untouched, so searches running against
+        it are unaffected. Columns and sort indices are rebuilt; the text
+        index, if already built, is shared and only the new rows are
+        indexed into it.
+
+        Args:
+            records: (category, product dict) pairs, as for from_records()
+
+        Returns:
+            New ProductCatalog
+        """
+        category_index = dict(self.category_index)
+        name_index = {name: code for code, name in enumerate(self.names)}
+        added = _columns(records, category_index, name_index)
+        catalog = ProductCatalog(
+            categories=list(category_index),
+            names=list(name_index),
+            **{
+                column: np.concatenate((getattr(self, column), values))
+                for column, values in added.items()
+            }
+        )
+
+        # The index is append-only: this catalog never reads rows past its
+        # end, so the new rows can go straight into it. Only the newest
+        # generation may extend it
+        index = self._text_index
+        if index is not None and index.rows_indexed == len(self):
+            index.extend(len(self), (catalog.names[code] for code in added["name_codes"]))
+            catalog._text_index = index
+        return catalog
+
+    def has_category(self, category: str) -> bool:
+        """Check whether a category exists."""
+        return category in self.category_index
+
+    def search(
+        self,
+        category: str,
+        page: int = 1,
+        limit: int = 20,
+        sort_by: str = "relevance",
+        in_stock: Optional[bool] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        q: Optional[str] = None
+    ) -> Tuple[int, np.ndarray]:
+        """
+        Find one page of a category.
+
+        Args:
+            category: Category name (must exist)
+            page: Page number (1-indexed)
+            limit: Results per page
+            sort_by: One of SORT_ORDERS
+            in_stock: Only products with this stock flag, if given
+            min_price: Only products at or above this price, if given
+            max_price: Only products at or below this price, if given
+            q: Only products whose name matches this text, if given
+
+        Returns:
+            Tuple of (total matching products, row numbers on the page)
+        """
+        rows = self.matching_rows(category, sort_by, in_stock, min_price, max_price, q)
+        offset = (page - 1) * limit
+        return len(rows), rows[offset:offset + limit]
+
+    def search_after(
+        self,
+        category: str,
+        after: Optional[Sequence[float]] = None,
+        limit: int = 20,
+        sort_by: str = "relevance",
+        in_stock: Optional[bool] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        q: Optional[str] = None
+    ) -> Tuple[np.ndarray, bool]:
+        """
+        Find the page that follows a row, keyset style.
+
+        Seeks to ``after`` with a binary search, then scans forward only
+        as far as needed to fill the page.
+
+        Args:
+            category: Category name (must exist)
+            after: Position of the last row already seen, as returned by
+                position(); None for the first page
+            limit: Results per page
+            sort_by: One of SORT_ORDERS
+            in_stock: Only products with this stock flag, if given
+            min_price: Only products at or above this price, if given
+            max_price: Only products at or below this price, if given
+            q: Only products whose name matches this text, if given
+
+        Returns:
+            Tuple of (row numbers on the page, whether more rows follow)
+        """
+        if q:
+            rows = self._text_rows(category, sort_by, in_stock, min_price, max_price, q)
+            if after is not None:
+                rows = rows[self._after(rows, sort_by, after)]
+            return rows[:limit], len(rows) > limit
+
+        start, end, min_price, max_price = self._window(category, sort_by, min_price, max_price)
+        if after is not None:
+            start = max(start, self._seek(category, sort_by, after))
+
+        order = self._orders[sort_by]
+        if in_stock is None and min_price is None and max_price is None:
+            return order[start:min(end, start + limit)], start + limit < end
+
+        found: List[np.ndarray] = []
+        count = 0
+        while start < end and count <= limit:
+            rows = order[start:min(end, start + max(SCAN_CHUNK, limit))]
+            rows = rows[self._mask(rows, in_stock, min_price, max_price)]
+            found.append(rows)
+            count += len(rows)
+            start += max(SCAN_CHUNK, limit)
+
+        rows = np.concatenate(found) if found else order[:0]
+        return rows[:limit], len(rows) > limit
+
+    def matching_rows(
+        self,
+        category: str,
+        sort_by: str = "relevance",
+        in_stock: Optional[bool] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        q: Optional[str] = None
+    ) -> np.ndarray:
+        """All rows of a category that pass the filters, in sort order."""
+        if q:
+            return self._text_rows(category, sort_by, in_stock, min_price, max_price, q)
+        start, end, min_price, max_price = self._window(category, sort_by, min_price, max_price)
+        rows = self._orders[sort_by][start:end]
+        if in_stock is None and min_price is None and max_price is None:
+            return rows
+        return rows[self._mask(rows, in_stock, min_price, max_price)]
+
+    def find(self, product_id: int) -> Optional[int]:
+        """
+        Row of a product id.
+
+        Returns:
+            Row number, or None if no product has that id
+        """
+        if self._id_lookup is None:
+            # Built on first use; two threads racing just build it twice
+            order = np.argsort(self.ids, kind="stable")
+            self._id_lookup = (self.ids[order], order)
+        sorted_ids, order = self._id_lookup
+        position = int(np.searchsorted(sorted_ids, product_id))
+        if position < len(sorted_ids) and sorted_ids[position] == product_id:
+            return int(order[position])
+        return None
+
+    def category_of(self, row: int) -> str:
+        """Category name of a row."""
+        return self.categories[self.category_codes[row]]
+
+    def position(self, row: int, sort_by: str) -> List[float]:
+        """
+        Keyset position of a row in a sort order.
+
+        Returns:
+            ``[sort key, product id]``; the sort key is the price for
+            price orders and the insertion rank for relevance
+        """
+        key = int(row) if sort_by == "relevance" else float(self.prices[row])
+        return [key, int(self.ids[row])]
+
+    def record(self, row: int) -> Dict[str, Any]:
+        """Decode one row into a product dict."""
+        return {
+            "id": int(self.ids[row]),
+            "name": self.names[self.name_codes[row]],
+            "price": float(self.prices[row]),
+            "in_stock": bool(self.in_stock[row]),
+        }
+
+    def index_arrays(self) -> Dict[str, np.ndarray]:
+        """Sort indices as flat arrays, so they can be saved and reused."""
+        arrays = {f"order_{name}": order for name, order in self._orders.items()}
+        arrays.update({f"keys_{name}": keys for name, keys in self._sort_keys.items()})
+        arrays["bounds"] = np.array(self._bounds, dtype=np.int64).reshape(-1, 2)
+        return arrays
+
+    def _use_indices(self, indices: Dict[str, np.ndarray]) -> None:
+        """Adopt sort indices from index_arrays()."""
+        self._orders = {name: indices[f"order_{name}"] for name in SORT_ORDERS}
+        self._sort_keys = {
+            name: indices[f"keys_{name}"] for name in SORT_ORDERS if f"keys_{name}" in indices
+        }
+        self._bounds = [tuple(bound) for bound in indices["bounds"].tolist()]
+
+    def _build_indices(self) -> None:
+        """Build the per-order permutations and per-category bounds."""
+        codes = self.category_codes
+        # Row numbers fit in 32 bits for any realistic catalogue
+        index_type = np.int32 if len(codes) < 2 ** 31 else np.int64
+
+        self._orders: Dict[str, np.ndarray] = {
+            "relevance": np.argsort(codes, kind="stable").astype(index_type),
+            "price_asc": np.lexsort((self.ids, self.prices, codes)).astype(index_type),
+            "price_desc": np.lexsort((self.ids, -self.prices, codes)).astype(index_type),
+        }
+        self._sort_keys: Dict[str, np.ndarray] = {
+            "price_asc": self.prices[self._orders["price_asc"]],
+            "price_desc": -self.prices[self._orders["price_desc"]],
+        }
+
+        grouped = codes[self._orders["relevance"]]
+        all_codes = np.arange(len(self.categories))
+        starts = np.searchsorted(grouped, all_codes, side="left")
+        ends = np.searchsorted(grouped, all_codes, side="right")
+        self._bounds = list(zip(starts.tolist(), ends.tolist()))
+
+    def _window(
+        self,
+        category: str,
+        sort_by: str,
+        min_price: Optional[float],
+        max_price: Optional[float]
+    ) -> Tuple[int, int, Optional[float], Optional[float]]:
+        """
+        Narrow a category's run of a sort order as far as bisection allows.
+
+        Returns:
+            Tuple of (start, end) into the order, plus the price bounds
+            still to be applied as filters
+        """
+        start, end = self._bounds[self.category_index[category]]
+        keys = self._sort_keys.get(sort_by)
+        if keys is not None and (min_price is not None or max_price is not None):
+            # Price-sorted: the range is a contiguous run, found by bisection
+            span = self._price_span(keys[start:end], sort_by, min_price, max_price)
+            return start + span.start, start + span.stop, None, None
+        return start, end, min_price, max_price
+
+    def _text_rows(
+        self,
+        category: str,
+        sort_by: str,
+        in_stock: Optional[bool],
+        min_price: Optional[float],
+        max_price: Optional[float],
+        q: str
+    ) -> np.ndarray:
+        """Rows matching a text query that pass the filters, in sort order."""
+        rows = self.text_index.search(q, row_limit=len(self))
+        rows = rows[self.category_codes[rows] == self.category_index[category]]
+        rows = rows[self._mask(rows, in_stock, min_price, max_price)]
+        # Index rows come in row order, which is relevance order
+        if sort_by == "price_asc":
+            rows = rows[np.lexsort((self.ids[rows], self.prices[rows]))]
+        elif sort_by == "price_desc":
+            rows = rows[np.lexsort((self.ids[rows], -self.prices[rows]))]
+        return rows
+
+    def _after(self, rows: np.ndarray, sort_by: str, after: Sequence[float]) -> np.ndarray:
+        """Mask of the sorted rows that come after a keyset position."""
+        key, product_id = after
+        if sort_by == "relevance":
+            return rows > key
+        prices, ids = self.prices[rows], self.ids[rows]
+        beyond = prices > key if sort_by == "price_asc" else prices < key
+        return beyond | ((prices == key) & (ids > product_id))
+
+    def _seek(self, category: str, sort_by: str, after: Sequence[float]) -> int:
+        """Index into a sort order of the first row after a keyset position."""
+        key, product_id = after
+        start, end = self._bounds[self.category_index[category]]
+        order = self._orders[sort_by]
+
+        if sort_by == "relevance":
+            # Row numbers grow within a category's relevance run
+            return start + int(np.searchsorted(order[start:end], key, side="right"))
+
+        keys = self._sort_keys[sort_by][start:end]
+        key = -key if sort_by == "price_desc" else key
+        low = start + int(np.searchsorted(keys, key, side="left"))
+        high = start + int(np.searchsorted(keys, key, side="right"))
+        # Equal prices are ordered by id
+        return low + int(np.searchsorted(self.ids[order[low:high]], product_id, side="right"))
+
+    def _mask(
+        self,
+        rows: np.ndarray,
+        in_stock: Optional[bool],
+        min_price: Optional[float],
+        max_price: Optional[float]
+    ) -> np.ndarray:
+        """Boolean mask of the rows that pass the filters."""
+        mask = np.ones(len(rows), dtype=np.bool_)
+        if in_stock is not None:
+            mask &= self.in_stock[rows] == in_stock
+        if min_price is not None:
+            mask &= self.prices[rows] >= min_price
+        if max_price is not None:
+            mask &= self.prices[rows] <= max_price
+        return mask
+
+    @staticmethod
+    def _price_span(
+        keys: np.ndarray,
+        sort_by: str,
+        min_price: Optional[float],
+        max_price: Optional[float]
+    ) -> slice:
+        """Slice of a price-sorted key run that lies within a price range."""
+        if sort_by == "price_desc":
+            # Keys are negated prices, so the bounds swap roles
+            low = 0 if max_price is None else np.searchsorted(keys, -max_price, side="left")
+            high = len(keys) if min_price is None else np.searchsorted(keys, -min_price, side="right")
+        else:
+            low = 0 if min_price is None else np.searchsorted(keys, min_price, side="left")
+            high = len(keys) if max_price is None else np.searchsorted(keys, max_price, side="right")
+        return slice(int(low), int(high))
+
+
+def _columns(
+    records: Iterable[Tuple[str, Dict[str, Any]]],
+    category_index: Dict[str, int],
+    name_index: Dict[str, int]
+) -> Dict[str, np.ndarray]:
+    """Columns of new products, interning categories and names into the indexes given."""
+    ids, prices, in_stock, category_codes, name_codes = [], [], [], [], []
+    for category, product in records:
+        category_codes.append(category_index.setdefault(category, len(category_index)))
+        name_codes.append(name_index.setdefault(product["name"], len(name_index)))
+        ids.append(product["id"])
+        prices.append(product["price"])
+        in_stock.append(product["in_stock"])
+
+    return {
+        "ids": np.array(ids, dtype=np.int64),
+        "prices": np.array(prices, dtype=np.float64),
+        "in_stock": np.array(in_stock, dtype=np.bool_),
+        "category_codes": np.array(category_codes, dtype=np.int32),
+        "name_codes": np.array(name_codes, dtype=np.int32),
+    }
@@ -0,0 +1,100 @@
+"""
+Catalog Build Module
+Single responsibility: Convert JSON or CSV product data into a catalog file.
+
+Accepted inputs:
+- JSON object mapping category to a list of products (the PRODUCTS_DB shape)
+- JSON array of products that each carry a "category"
+- CSV with a header row and id, name, price, in_stock and category columns
+
+Products keep their input order, which is their relevance order.
+
+Usage:
+    python -m src.backend.catalog_build products.json catalog.pcat
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from typing import Any, Dict, Iterator, Tuple
+
+from .catalog import ProductCatalog
+from .catalog_file import write_catalog
+
+
+Record = Tuple[str, Dict[str, Any]]
+
+CSV_COLUMNS = ("id", "name", "price", "in_stock", "category")
+TRUE_VALUES = {"1", "true", "yes", "y", "t"}
+
+
+def read_json(path: str) -> Iterator[Record]:
+    """Yield (category, product) pairs from a JSON file."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    if isinstance(data, dict):
+        for category, products in data.items():
+            for product in products:
+                yield category.lower(), product
+    elif isinstance(data, list):
+        for product in data:
+            yield str(product["category"]).lower(), product
+    else:
+        raise ValueError("JSON catalog must be an object of categories or an array of products")
+
+
+def read_csv(path: str) -> Iterator[Record]:
+    """Yield (category, product) pairs from a CSV file, one row at a time."""
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        missing = set(CSV_COLUMNS) - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f"CSV catalog is missing columns: {sorted(missing)}")
+        for row in reader:
+            yield row["category"].lower(), {
+                "id": int(row["id"]),
+                "name": row["name"],
+                "price": float(row["price"]),
+                "in_stock": row["in_stock"].strip().lower() in TRUE_VALUES,
+            }
+
+
+def build(source: str, destination: str) -> ProductCatalog:
+    """
+    Build a catalog file from a JSON or CSV file.
+
+    Args:
+        source: Input path; the format is chosen by its extension
+        destination: Catalog file to write
+
+    Returns:
+        The catalog that was written
+    """
+    reader = read_csv if source.lower().endswith(".csv") else read_json
+    catalog = ProductCatalog.from_records(reader(source))
+    write_catalog(catalog, destination)
+    return catalog
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("source", help="JSON or CSV product data")
+    parser.add_argument("destination", help="Catalog file to write")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        catalog = build(args.source, args.destination)
+    except (OSError, ValueError, KeyError) as e:
+        sys.exit(f"catalog_build: {e}")
+    print(
+        f"Wrote {len(catalog)} products in {len(catalog.categories)} categories "
+        f"to {args.destination} in {time.perf_counter() - start:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Catalog File Module
+Single responsibility: Save and memory-map product catalogs on disk.
+
+A catalog file holds the catalog's columns, interned strings and sort
+indices as raw little-endian arrays:
+
+    magic (8 bytes) | header length (u64) | JSON header | padding | arrays
+
+The JSON header lists each array's dtype, shape and offset; every array
+starts on a 64-byte boundary. Loading maps the file and wraps each array
+in place, so there is nothing to parse or sort at startup and workers
+that map the same file share one copy of it in the page cache. Product
+names stay encoded until a row that needs them is decoded.
+"""
+
+import json
+import mmap
+import os
+import struct
+from typing import Dict, Iterable, List, Sequence, Union
+
+import numpy as np
+
+from .catalog import ProductCatalog
+
+
+MAGIC = b"PCAT0001"
+ALIGNMENT = 64
+_LENGTH = struct.Struct("<Q")
+
+
+class CatalogFormatError(Exception):
+    """Raised when a file is not a readable catalog file."""
+
+
+class StringTable(Sequence[str]):
+    """
+    Strings stored as one UTF-8 blob plus end offsets, decoded on access.
+
+    Args:
+        offsets: End offset of each string in ``blob``
+        blob: Concatenated UTF-8 bytes
+    """
+
+    def __init__(self, offsets: np.ndarray, blob: np.ndarray):
+        self.offsets = offsets
+        self.blob = blob
+
+    @classmethod
+    def from_strings(cls, strings: Iterable[str]) -> "StringTable":
+        """Encode strings into a table."""
+        encoded = [string.encode("utf-8") for string in strings]
+        offsets = np.cumsum([len(item) for item in encoded], dtype=np.int64)
+        return cls(offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8))
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, index: int) -> str:
+        end = int(self.offsets[index])
+        start = int(self.offsets[index - 1]) if index > 0 else 0
+        return self.blob[start:end].tobytes().decode("utf-8")
+
+
+def write_catalog(catalog: ProductCatalog, path: Union[str, os.PathLike]) -> None:
+    """
+    Save a catalog, sort indices included.
+
+    The file is written next to ``path`` and renamed into place, so
+    workers never map a half-written catalog.
+
+    Args:
+        catalog: Catalog to save
+        path: Destination file
+    """
+    names = catalog.names
+    if not isinstance(names, StringTable):
+        names = StringTable.from_strings(names)
+
+    arrays: Dict[str, np.ndarray] = {
+        "ids": catalog.ids,
+        "prices": catalog.prices,
+        "in_stock": catalog.in_stock,
+        "category_codes": catalog.category_codes,
+        "name_codes": catalog.name_codes,
+        "name_offsets": names.offsets,
+        "name_blob": names.blob,
+    }
+    arrays.update(catalog.index_arrays())
+
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder("<"))
+        arrays[name] = array
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _aligned(offset + array.nbytes)
+
+    header = json.dumps({"categories": list(catalog.categories), "arrays": layout}).encode()
+    data_start = _aligned(len(MAGIC) + _LENGTH.size + len(header))
+
+    temp_path = f"{os.fspath(path)}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(MAGIC + _LENGTH.pack(len(header)) + header)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(temp_path, path)
+
+
+def load_catalog(path: Union[str, os.PathLike]) -> ProductCatalog:
+    """
+    Memory-map a catalog file.
+
+    Args:
+        path: File written by write_catalog()
+
+    Returns:
+        ProductCatalog whose arrays are read-only views of the mapping
+
+    Raises:
+        CatalogFormatError: If the file is not a catalog file
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < len(MAGIC) + _LENGTH.size:
+            raise CatalogFormatError(f"{path} is too short to be a catalog file")
+        # The mapping outlives the file object; the arrays keep it alive
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if mapped[:len(MAGIC)] != MAGIC:
+        raise CatalogFormatError(f"{path} is not a catalog file")
+    (header_length,) = _LENGTH.unpack_from(mapped, len(MAGIC))
+    header_start = len(MAGIC) + _LENGTH.size
+    try:
+        header = json.loads(mapped[header_start:header_start + header_length])
+        data_start = _aligned(header_start + header_length)
+        arrays = {
+            name: _view(mapped, data_start + spec["offset"], spec["dtype"], spec["shape"])
+            for name, spec in header["arrays"].items()
+        }
+        return ProductCatalog(
+            ids=arrays.pop("ids"),
+            prices=arrays.pop("prices"),
+            in_stock=arrays.pop("in_stock"),
+            category_codes=arrays.pop("category_codes"),
+            name_codes=arrays.pop("name_codes"),
+            categories=header["categories"],
+            names=StringTable(arrays.pop("name_offsets"), arrays.pop("name_blob")),
+            indices=arrays
+        )
+    except (ValueError, KeyError, TypeError) as e:
+        raise CatalogFormatError(f"{path} has a corrupt header: {e}")
+
+
+def _view(mapped: mmap.mmap, offset: int, dtype: str, shape: List[int]) -> np.ndarray:
+    """Read-only array over part of the mapping."""
+    count = int(np.prod(shape)) if shape else 1
+    return np.frombuffer(mapped, dtype=np.dtype(dtype), count=count, offset=offset).reshape(shape)
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
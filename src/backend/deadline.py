@@ -0,0 +1,46 @@
+"""
+Deadline Module
+Single responsibility: Track how much of a request's latency budget is left.
+
+A Deadline is created when the gateway accepts a request and is handed
+down to the backend so work can stop as soon as nobody is waiting for it.
+"""
+
+import time
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request runs out of latency budget."""
+
+
+class Deadline:
+    """
+    Absolute expiry time for a single request.
+
+    Args:
+        budget: Seconds from now until the deadline expires
+    """
+
+    __slots__ = ("expires_at",)
+
+    def __init__(self, budget: float):
+        self.expires_at = time.monotonic() + budget
+
+    def remaining(self) -> float:
+        """Seconds left before expiry (never negative)."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        """True once the budget is used up."""
+        return time.monotonic() >= self.expires_at
+
+    def check(self) -> None:
+        """
+        Stop work that has outlived its budget.
+
+        Raises:
+            DeadlineExceeded: If the deadline has passed
+        """
+        if self.expired:
+            raise DeadlineExceeded("Request deadline exceeded")
@@ -4,31 +4,62 @@ Single responsibility: Each handler manages a single endpoint.
 
 Handlers:
 - ProductSearchHandler: Searches products by category (web crawler protection)
+- ProductDetailHandler: Looks up a single product by id
 - HealthHandler: Returns service health status
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Iterator, Optional, Tuple
 import time
 
+from .catalog import ProductCatalog, SORT_ORDERS
+from .deadline import Deadline, DeadlineExceeded
+
 
 class BaseHandler(ABC):
     """Base class for all backend handlers."""
 
-    def simulate_delay(self) -> None:
-        """Simulate network latency (10-100ms)."""
+    def simulate_delay(self, deadline: Optional[Deadline] = None) -> None:
+        """
+        Simulate network latency (10-100ms).
+
+        Args:
+            deadline: Request deadline; the wait is cut short when it expires
+
+        Raises:
+            DeadlineExceeded: If the deadline expires during the wait
+        """
         import random
         delay = random.uniform(0.01, 0.1)
+
+        if deadline is not None and delay >= deadline.remaining():
+            time.sleep(deadline.remaining())
+            raise DeadlineExceeded("Request deadline exceeded")
+
         time.sleep(delay)
 
     @abstractmethod
-    def handle(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    def handle(self, data: Dict[str, Any], deadline: Optional[Deadline] = None) -> Dict[str, Any]:
         """Handle a request. Must be implemented by subclass."""
         pass
 
+    def stream(self, data: Dict[str, Any], deadline: Optional[Deadline] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Handle a request as a stream of records.
+
+        Handlers with large responses override this to yield records
+        lazily; by default the whole response is a single record.
+        """
+        yield self.handle(data, deadline)
+
 
 class ProductSearchHandler(BaseHandler):
-    """Handles /products/search endpoint (anti-crawler protection)."""
+    """
+    Handles /products/search endpoint (anti-crawler protection).
+
+    Args:
+        catalog: Catalog to search; defaults to one built from PRODUCTS_DB
+    """
 
     PRODUCTS_DB = {
         "electronics": [
@@ -56,49 +87,144 @@ class ProductSearchHandler(BaseHandler):
         ],
     }
 
-    def handle(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    def __init__(self, catalog: Optional[ProductCatalog] = None):
+        self.catalog = catalog or ProductCatalog.from_dict(self.PRODUCTS_DB)
+
+    def add_products(self, records: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        """
+        Add products to the searchable catalog.
+
+        Searches already running finish against the previous catalog;
+        only the new names are added to the text index.
+
+        Args:
+            records: (category, product dict) pairs
+        """
+        self.catalog = self.catalog.extended(records)
+
+    def handle(self, data: Dict[str, Any], deadline: Optional[Deadline] = None) -> Dict[str, Any]:
         """Search for products by category (crawler protected)."""
-        self.simulate_delay()
+        records = self.stream(data, deadline)
+        header = next(records)
+        if header["status"] != "success":
+            return header
+
+        page_info = {key: value for key, value in header.items() if key != "status"}
+        return {
+            "status": "success",
+            "data": {**page_info, "results": list(records)}
+        }
+
+    def stream(self, data: Dict[str, Any], deadline: Optional[Deadline] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Search for products, yielding the page lazily.
+
+        The first record holds the status and pagination info; each
+        following record is one product. Nothing is copied up front, so
+        memory stays flat however large the page is.
+
+        Pages are addressed by ``page`` or, when ``after`` holds the
+        ``next_after`` position of the previous page, by keyset seek.
+        """
+        self.simulate_delay(deadline)
 
         category = data.get("category", "electronics").lower()
         page = data.get("page", 1)
         limit = data.get("limit", 20)
+        sort_by = data.get("sort_by") or "relevance"
 
         # Validate category
-        if category not in self.PRODUCTS_DB:
-            return {
+        if not self.catalog.has_category(category):
+            yield {
                 "status": "error",
-                "message": f"Category '{category}' not found. Available: {list(self.PRODUCTS_DB.keys())}"
+                "message": f"Category '{category}' not found. Available: {self.catalog.categories}"
             }
+            return
 
-        # Get products for category
-        products = self.PRODUCTS_DB[category]
-        total_results = len(products)
-
-        # Handle pagination
-        start = (page - 1) * limit
-        end = start + limit
-        paginated_results = products[start:end]
+        if sort_by not in SORT_ORDERS:
+            yield {
+                "status": "error",
+                "message": f"Unknown sort_by '{sort_by}'. Available: {list(SORT_ORDERS)}"
+            }
+            return
+
+        filters = {
+            "sort_by": sort_by,
+            "in_stock": data.get("in_stock"),
+            "min_price": data.get("min_price"),
+            "max_price": data.get("max_price"),
+            "q": data.get("q"),
+        }
+        after = data.get("after")
 
-        return {
-            "status": "success",
-            "data": {
+        if after is None:
+            total_results, page_rows = self.catalog.search(category, page=page, limit=limit, **filters)
+            has_more = page * limit < total_results
+            header = {
+                "status": "success",
                 "category": category,
                 "page": page,
                 "limit": limit,
+                "sort_by": sort_by,
                 "total_results": total_results,
                 "total_pages": (total_results + limit - 1) // limit,
-                "results": paginated_results
             }
+        else:
+            # Keyset page: a seek instead of an offset, and no total count,
+            # which would cost a pass over the whole category
+            page_rows, has_more = self.catalog.search_after(category, after=after, limit=limit, **filters)
+            header = {
+                "status": "success",
+                "category": category,
+                "limit": limit,
+                "sort_by": sort_by,
+            }
+
+        # Where the next page starts, for callers that paginate by keyset
+        header["next_after"] = (
+            self.catalog.position(page_rows[-1], sort_by) if has_more and len(page_rows) else None
+        )
+        yield header
+
+        # Only the rows on this page are decoded
+        for row in page_rows:
+            yield self.catalog.record(row)
+
+
+class ProductDetailHandler(BaseHandler):
+    """
+    Handles /products/{product_id} endpoint.
+
+    Args:
+        search: Search handler whose current catalog is used, so products
+            added to it can be looked up straight away
+    """
+
+    def __init__(self, search: ProductSearchHandler):
+        self.search = search
+
+    def handle(self, data: Dict[str, Any], deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """Return one product by id."""
+        self.simulate_delay(deadline)
+
+        catalog = self.search.catalog
+        product_id = data.get("product_id")
+        row = catalog.find(product_id) if isinstance(product_id, int) else None
+        if row is None:
+            return {"status": "error", "message": f"Product {product_id} not found"}
+
+        return {
+            "status": "success",
+            "data": {**catalog.record(row), "category": catalog.category_of(row)}
         }
 
 
 class HealthHandler(BaseHandler):
     """Handles /health endpoint."""
 
-    def handle(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    def handle(self, data: Dict[str, Any], deadline: Optional[Deadline] = None) -> Dict[str, Any]:
         """Return service health status."""
-        self.simulate_delay()
+        self.simulate_delay(deadline)
         return {
             "status": "healthy",
             "service": "e-commerce-api-gateway",
@@ -0,0 +1,267 @@
+"""
+Route Tree Module
+Single responsibility: Match request paths against registered route patterns.
+
+This module:
+- Parses patterns of static segments, ``{name}`` / ``{name:int}``
+  parameters and a trailing ``{name:path}`` wildcard
+- Compiles them into a radix tree whose single-child static chains are
+  collapsed into one multi-segment edge
+- Matches a path segment by segment with dict lookups, no regular
+  expressions; static segments win over parameters, parameters over
+  wildcards, backtracking when a branch dead-ends
+- Carries per-route metadata such as rate limit policy, cache TTL or
+  upstream pool
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class RouteError(Exception):
+    """Raised when a route pattern is invalid or conflicts with another route."""
+
+
+def _to_int(segment: str) -> Optional[int]:
+    # isdigit() alone accepts digits such as "²" that int() refuses
+    return int(segment) if segment.isascii() and segment.isdigit() else None
+
+
+CONVERTERS: Dict[str, Callable[[str], Any]] = {
+    "str": lambda segment: segment,
+    "int": _to_int,
+}
+
+
+class Route:
+    """
+    A registered route.
+
+    Args:
+        pattern: Route pattern, e.g. ``/products/{product_id:int}``
+        handler: Object the route dispatches to
+        metadata: Free-form per-route settings
+    """
+
+    __slots__ = ("pattern", "handler", "metadata")
+
+    def __init__(self, pattern: str, handler: Any, metadata: Dict[str, Any]):
+        self.pattern = pattern
+        self.handler = handler
+        self.metadata = metadata
+
+
+class RouteMatch:
+    """
+    A route matched to a path.
+
+    Args:
+        route: The matched route
+        params: Converted parameter values by name
+    """
+
+    __slots__ = ("route", "params")
+
+    def __init__(self, route: Route, params: Dict[str, Any]):
+        self.route = route
+        self.params = params
+
+    @property
+    def handler(self) -> Any:
+        return self.route.handler
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return self.route.metadata
+
+
+class _Node:
+    """Tree node while routes are being added."""
+
+    def __init__(self):
+        self.static: Dict[str, "_Node"] = {}
+        self.param: Optional[Tuple[str, str, "_Node"]] = None
+        self.wildcard: Optional[Tuple[str, Route]] = None
+        self.route: Optional[Route] = None
+
+
+class _Compiled:
+    """
+    Tree node used for matching.
+
+    ``edges`` maps the first segment of each static edge to the rest of
+    the edge's segments and the node it leads to.
+    """
+
+    __slots__ = ("edges", "param_name", "param_convert", "param_child", "wildcard_name", "wildcard_route", "route")
+
+    def __init__(self):
+        self.edges: Dict[str, Tuple[List[str], "_Compiled"]] = {}
+        self.param_name: Optional[str] = None
+        self.param_convert: Optional[Callable[[str], Any]] = None
+        self.param_child: Optional["_Compiled"] = None
+        self.wildcard_name: Optional[str] = None
+        self.wildcard_route: Optional[Route] = None
+        self.route: Optional[Route] = None
+
+
+def split_path(path: str) -> List[str]:
+    """Segments of a path; leading and trailing slashes are ignored."""
+    path = path.strip("/")
+    return path.split("/") if path else []
+
+
+class RouteTree:
+    """
+    Radix tree of route patterns.
+
+    Routes are added at startup and the tree is compiled on the first
+    match after a change.
+    """
+
+    def __init__(self):
+        self._root = _Node()
+        self._compiled: Optional[_Compiled] = None
+        self.routes: List[Route] = []
+
+    def add(self, pattern: str, handler: Any, replace: bool = False, **metadata: Any) -> Route:
+        """
+        Register a route.
+
+        Args:
+            pattern: Route pattern
+            handler: Object the route dispatches to
+            replace: Replace a route with the same pattern instead of
+                refusing it
+            **metadata: Per-route settings, returned with every match
+
+        Returns:
+            The new Route
+
+        Raises:
+            RouteError: If the pattern is malformed or already taken
+        """
+        route = Route(pattern, handler, metadata)
+        node = self._root
+        segments = split_path(pattern)
+
+        for i, segment in enumerate(segments):
+            if not (segment.startswith("{") and segment.endswith("}")):
+                if "{" in segment or "}" in segment:
+                    raise RouteError(f"Malformed segment '{segment}' in {pattern}")
+                node = node.static.setdefault(segment, _Node())
+                continue
+
+            name, _, kind = segment[1:-1].partition(":")
+            kind = kind or "str"
+            if not name.isidentifier():
+                raise RouteError(f"Bad parameter name '{name}' in {pattern}")
+
+            if kind == "path":
+                if i != len(segments) - 1:
+                    raise RouteError(f"Wildcard must be the last segment of {pattern}")
+                if node.wildcard is not None:
+                    self._displace(node.wildcard[1], pattern, replace)
+                node.wildcard = (name, route)
+                break
+
+            if kind not in CONVERTERS:
+                raise RouteError(f"Unknown parameter type '{kind}' in {pattern}")
+            if node.param is None:
+                node.param = (name, kind, _Node())
+            elif node.param[:2] != (name, kind):
+                raise RouteError(f"Parameter {segment} in {pattern} conflicts with an existing route")
+            node = node.param[2]
+        else:
+            if node.route is not None:
+                self._displace(node.route, pattern, replace)
+            node.route = route
+
+        self.routes.append(route)
+        self._compiled = None
+        return route
+
+    def compile(self) -> None:
+        """Build the matching tree from the routes added so far."""
+        self._compiled = self._compile(self._root)
+
+    def match(self, path: str) -> Optional[RouteMatch]:
+        """
+        Find the route for a path.
+
+        Args:
+            path: Request path
+
+        Returns:
+            RouteMatch, or None if no route matches
+        """
+        compiled = self._compiled
+        if compiled is None:
+            self.compile()
+            compiled = self._compiled
+
+        params: Dict[str, Any] = {}
+        route = _match(compiled, split_path(path), 0, params)
+        return None if route is None else RouteMatch(route, params)
+
+    def _displace(self, existing: Route, pattern: str, replace: bool) -> None:
+        """Drop a route that a new one takes the place of, if allowed."""
+        if not replace or existing.pattern != pattern:
+            raise RouteError(f"{pattern} conflicts with {existing.pattern}")
+        self.routes.remove(existing)
+
+    def _compile(self, node: _Node) -> _Compiled:
+        compiled = _Compiled()
+        compiled.route = node.route
+        for segment, child in node.static.items():
+            label = []
+            # Collapse chains of nodes that have nothing but one static child
+            while (
+                child.route is None and child.param is None and child.wildcard is None
+                and len(child.static) == 1
+            ):
+                (next_segment, child), = child.static.items()
+                label.append(next_segment)
+            compiled.edges[segment] = (label, self._compile(child))
+        if node.param is not None:
+            name, kind, child = node.param
+            compiled.param_name = name
+            compiled.param_convert = CONVERTERS[kind]
+            compiled.param_child = self._compile(child)
+        if node.wildcard is not None:
+            compiled.wildcard_name, compiled.wildcard_route = node.wildcard
+        return compiled
+
+
+def _match(node: _Compiled, segments: List[str], i: int, params: Dict[str, Any]) -> Optional[Route]:
+    """Depth-first match, preferring static over parameter over wildcard."""
+    if i == len(segments):
+        if node.route is not None:
+            return node.route
+        if node.wildcard_route is not None:
+            params[node.wildcard_name] = ""
+            return node.wildcard_route
+        return None
+
+    segment = segments[i]
+    edge = node.edges.get(segment)
+    if edge is not None:
+        label, child = edge
+        end = i + 1 + len(label)
+        if not label or segments[i + 1:end] == label:
+            found = _match(child, segments, end, params)
+            if found is not None:
+                return found
+
+    if node.param_child is not None and segment:
+        value = node.param_convert(segment)
+        if value is not None:
+            params[node.param_name] = value
+            found = _match(node.param_child, segments, i + 1, params)
+            if found is not None:
+                return found
+            del params[node.param_name]
+
+    if node.wildcard_route is not None:
+        params[node.wildcard_name] = "/".join(segments[i:])
+        return node.wildcard_route
+    return None
@@ -2,40 +2,120 @@
 Backend Router Module
 Single responsibility: Route requests to appropriate handlers.
 
-This module manages handler registration and routing.
+This module manages handler registration and routing. Endpoints are
+route patterns matched by a radix tree, so they can hold path
+parameters (``/products/{product_id:int}``) and wildcards
+(``/mounted/{path:path}``); matched parameters are merged into the
+request data.
 """
 
-from typing import Dict, Any
-from .handlers import BaseHandler, ProductSearchHandler, HealthHandler
+from typing import Dict, Any, Iterator, Optional, Tuple
+from .catalog import ProductCatalog
+from .deadline import Deadline
+from .handlers import BaseHandler, ProductSearchHandler, ProductDetailHandler, HealthHandler
+from .route_tree import RouteMatch, RouteTree
 
 
 class BackendRouter:
-    """Routes backend requests to appropriate handlers."""
+    """
+    Routes backend requests to appropriate handlers.
 
-    def __init__(self):
-        self.handlers: Dict[str, BaseHandler] = {
-            "/products/search": ProductSearchHandler(),
-            "/health": HealthHandler(),
-        }
+    Args:
+        catalog: Catalog for product search; defaults to the built-in one
+    """
 
-    def handle_request(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    def __init__(self, catalog: Optional[ProductCatalog] = None):
+        self.routes = RouteTree()
+        self.handlers: Dict[str, BaseHandler] = {}
+
+        search = ProductSearchHandler(catalog)
+        self.register_handler("/products/search", search)
+        self.register_handler("/products/{product_id:int}", ProductDetailHandler(search))
+        self.register_handler("/health", HealthHandler())
+        self.routes.compile()
+
+    def match(self, endpoint: str) -> Optional[RouteMatch]:
+        """
+        Find the route for an endpoint path.
+
+        Returns:
+            RouteMatch with the handler, path parameters and route
+            metadata, or None if nothing matches
+        """
+        return self.routes.match(endpoint)
+
+    def handle_request(
+        self,
+        endpoint: str,
+        data: Dict[str, Any],
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
         """
         Route and handle a backend request.
 
         Args:
             endpoint: The endpoint path
             data: Request data
+            deadline: Remaining latency budget for the request
 
         Returns:
             Response from handler or error
         """
-        handler = self.handlers.get(endpoint)
+        handler, data = self._resolve(endpoint, data)
 
         if handler is None:
             return {"error": f"Endpoint {endpoint} not found"}
 
-        return handler.handle(data)
+        return handler.handle(data, deadline=deadline)
+
+    def stream_request(
+        self,
+        endpoint: str,
+        data: Dict[str, Any],
+        deadline: Optional[Deadline] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Route a backend request whose response is streamed record by record.
+
+        Args:
+            endpoint: The endpoint path
+            data: Request data
+            deadline: Remaining latency budget for the request
 
-    def register_handler(self, endpoint: str, handler: BaseHandler) -> None:
-        """Register a custom handler for an endpoint."""
+        Returns:
+            Iterator of response records
+        """
+        handler, data = self._resolve(endpoint, data)
+
+        if handler is None:
+            return iter([{"error": f"Endpoint {endpoint} not found"}])
+
+        return handler.stream(data, deadline=deadline)
+
+    def register_handler(self, endpoint: str, handler: BaseHandler, **metadata: Any) -> None:
+        """
+        Register a custom handler for an endpoint.
+
+        A handler registered for an existing endpoint replaces the old one.
+
+        Args:
+            endpoint: Route pattern
+            handler: Handler for matching requests
+            **metadata: Per-route settings, e.g. rate limit policy,
+                cache_ttl or upstream pool; returned by match()
+        """
+        self.routes.add(endpoint, handler, replace=True, **metadata)
         self.handlers[endpoint] = handler
+
+    def _resolve(
+        self,
+        endpoint: str,
+        data: Dict[str, Any]
+    ) -> Tuple[Optional[BaseHandler], Dict[str, Any]]:
+        """Handler for an endpoint, and the data with path parameters merged in."""
+        match = self.routes.match(endpoint)
+        if match is None:
+            return None, data
+        if match.params:
+            data = {**data, **match.params}
+        return match.handler, data
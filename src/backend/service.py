@@ -5,7 +5,10 @@ Single responsibility: Provide unified interface to backend operations.
 This module uses router to handle requests.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, Optional
+from .catalog import ProductCatalog
+from .deadline import Deadline
+from .route_tree import RouteMatch
 from .router import BackendRouter
 
 
@@ -14,24 +17,59 @@ class BackendService:
     Unified interface to backend service.
 
     Delegates to BackendRouter for request handling.
+
+    Args:
+        catalog: Catalog for product search; defaults to the built-in one
     """
 
-    def __init__(self):
-        self.router = BackendRouter()
+    def __init__(self, catalog: Optional[ProductCatalog] = None):
+        self.router = BackendRouter(catalog)
 
-    def handle_request(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    def handle_request(
+        self,
+        endpoint: str,
+        data: Dict[str, Any],
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
         """
         Handle a backend request.
 
         Args:
             endpoint: The endpoint path
             data: Request data
+            deadline: Remaining latency budget for the request
 
         Returns:
             Response from backend
+
+        Raises:
+            DeadlineExceeded: If the handler gives up because the budget ran out
+        """
+        return self.router.handle_request(endpoint, data, deadline)
+
+    def stream_request(
+        self,
+        endpoint: str,
+        data: Dict[str, Any],
+        deadline: Optional[Deadline] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Handle a backend request as a lazy stream of records.
+
+        Args:
+            endpoint: The endpoint path
+            data: Request data
+            deadline: Remaining latency budget for the request
+
+        Returns:
+            Iterator of response records; work happens as it is consumed
         """
-        return self.router.handle_request(endpoint, data)
+        return self.router.stream_request(endpoint, data, deadline)
+
+    def register_handler(self, endpoint: str, handler, **metadata: Any) -> None:
+        """Register a custom handler; endpoint may be a route pattern."""
+        self.router.register_handler(endpoint, handler, **metadata)
 
-    def register_handler(self, endpoint: str, handler) -> None:
-        """Register a custom handler."""
-        self.router.register_handler(endpoint, handler)
+    def match_route(self, endpoint: str) -> Optional[RouteMatch]:
+        """Find the route, path parameters and route metadata for an endpoint."""
+        return self.router.match(endpoint)
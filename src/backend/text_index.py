@@ -0,0 +1,354 @@
+"""
+Text Index Module
+Single responsibility: Find catalog rows whose name matches a text query.
+
+This module:
+- Keeps an inverted index from name tokens to the rows containing them
+- Stores each posting list as varint-encoded gaps between row numbers,
+  with a skip entry every POSTING_BLOCK postings
+- Intersects posting lists smallest first, decoding only the blocks of
+  long lists that can hold a candidate
+- Indexes new rows incrementally; lists are append-only, so readers of
+  an older, shorter catalog simply ignore rows past its end
+"""
+
+import bisect
+import re
+import threading
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+# Tokens plus the newlines separating names in a bulk scan
+SCAN_PATTERN = re.compile(r"[a-z0-9]+|\n")
+# Postings per skip entry
+POSTING_BLOCK = 128
+# Shortest final token expanded as a prefix; a shorter one only
+# matches itself, since a single letter would expand to a large part
+# of the vocabulary
+MIN_PREFIX_LENGTH = 2
+# A list this many times longer than the candidates is probed by block
+SKIP_RATIO = 8
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case alphanumeric tokens of a text."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def encode_varints(values: np.ndarray) -> np.ndarray:
+    """
+    LEB128-encode non-negative integers, 7 bits per byte.
+
+    Returns:
+        uint8 array; every byte but the last of a value has its high bit set
+    """
+    values = values.astype(np.uint64)
+    lengths = np.ones(len(values), dtype=np.int64)
+    top = int(values.max(initial=0))
+    bits = 7
+    while top >> bits:
+        lengths += values >= np.uint64(1 << bits)
+        bits += 7
+
+    out = np.empty(int(lengths.sum()), dtype=np.uint8)
+    starts = np.cumsum(lengths) - lengths
+    for k in range(bits // 7):
+        has_byte = lengths > k
+        chunk = (values[has_byte] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        more = (lengths[has_byte] > k + 1).astype(np.uint64) << np.uint64(7)
+        out[starts[has_byte] + k] = (chunk | more).astype(np.uint8)
+    return out
+
+
+def decode_varints(data: np.ndarray) -> np.ndarray:
+    """Decode a uint8 array of LEB128 integers into int64 values."""
+    ends = np.flatnonzero(data < 0x80)
+    if len(ends) == 0:
+        return np.zeros(0, dtype=np.int64)
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    position = np.arange(len(data)) - np.repeat(starts, ends - starts + 1)
+    parts = (data.astype(np.int64) & 0x7F) << (7 * position)
+    return np.add.reduceat(parts, starts)
+
+
+class PostingList:
+    """
+    Sorted row numbers of one term, gap-encoded.
+
+    Gaps are taken from the previous row (from -1 for the first), so the
+    whole list decodes with one cumulative sum. Each block of
+    POSTING_BLOCK postings records its byte offset and the row before
+    it, so a block also decodes on its own.
+    """
+
+    __slots__ = ("data", "block_offsets", "block_bases", "count", "last")
+
+    def __init__(self):
+        self.data = bytearray()
+        self.block_offsets = array("q")
+        self.block_bases = array("q")
+        self.count = 0
+        self.last = -1
+
+    @classmethod
+    def from_rows(cls, rows: np.ndarray) -> "PostingList":
+        """Build a list from sorted, distinct row numbers."""
+        if len(rows) == 0:
+            return cls()
+        return build_postings(rows, np.array([0, len(rows)]))[0]
+
+    def append(self, row: int) -> None:
+        """Add a row greater than every row already in the list."""
+        if self.count % POSTING_BLOCK == 0:
+            self.block_offsets.append(len(self.data))
+            self.block_bases.append(self.last)
+        self.data += encode_varints(np.array([row - self.last])).tobytes()
+        self.count += 1
+        self.last = row
+
+    def rows(self) -> np.ndarray:
+        """Decode the whole list."""
+        return np.cumsum(decode_varints(np.frombuffer(bytes(self.data), dtype=np.uint8))) - 1
+
+    def rows_near(self, candidates: np.ndarray) -> np.ndarray:
+        """Decode only the blocks that could contain any of the candidates."""
+        bases = np.array(self.block_bases, dtype=np.int64)
+        offsets = np.array(self.block_offsets, dtype=np.int64)
+        # Snapshot the bytes covered by the blocks seen above; a concurrent
+        # append may add bytes but never changes these
+        data = bytes(self.data)
+        ends = np.append(offsets[1:], len(data)) if len(offsets) else offsets
+
+        blocks = np.unique(np.searchsorted(bases, candidates, side="left") - 1)
+        blocks = blocks[blocks >= 0]
+        decoded = [
+            bases[block] + np.cumsum(decode_varints(
+                np.frombuffer(data, dtype=np.uint8, count=ends[block] - offsets[block], offset=offsets[block])
+            ))
+            for block in blocks.tolist()
+        ]
+        return np.concatenate(decoded) if decoded else np.zeros(0, dtype=np.int64)
+
+
+def build_postings(rows: np.ndarray, bounds: np.ndarray) -> List[PostingList]:
+    """
+    Build many posting lists with one vectorized encoding pass.
+
+    Args:
+        rows: Row numbers of all lists back to back, each list sorted
+        bounds: Start of each list in ``rows``, plus the total length;
+            every list must be non-empty
+
+    Returns:
+        One PostingList per list
+    """
+    rows = rows.astype(np.int64)
+    starts, counts = bounds[:-1], np.diff(bounds)
+    previous = np.empty_like(rows)
+    previous[0] = -1
+    previous[1:] = rows[:-1]
+    previous[starts] = -1
+
+    encoded = encode_varints(rows - previous)
+    byte_starts = np.zeros(len(rows) + 1, dtype=np.int64)
+    byte_starts[1:] = np.flatnonzero(encoded < 0x80) + 1
+
+    position = np.arange(len(rows)) - np.repeat(starts, counts)
+    block_firsts = np.flatnonzero(position % POSTING_BLOCK == 0)
+    block_bounds = np.searchsorted(block_firsts, bounds).tolist()
+
+    blob = encoded.tobytes()
+    byte_starts_list = byte_starts.tolist()
+    block_offsets = byte_starts[block_firsts].tolist()
+    block_bases = previous[block_firsts].tolist()
+    lasts = rows[bounds[1:] - 1].tolist()
+    bounds_list = bounds.tolist()
+
+    postings = []
+    for i in range(len(counts)):
+        first_byte = byte_starts_list[bounds_list[i]]
+        posting = PostingList()
+        posting.data = bytearray(blob[first_byte:byte_starts_list[bounds_list[i + 1]]])
+        posting.block_offsets = array("q", [
+            offset - first_byte for offset in block_offsets[block_bounds[i]:block_bounds[i + 1]]
+        ])
+        posting.block_bases = array("q", block_bases[block_bounds[i]:block_bounds[i + 1]])
+        posting.count = bounds_list[i + 1] - bounds_list[i]
+        posting.last = lasts[i]
+        postings.append(posting)
+    return postings
+
+
+def intersect(candidates: np.ndarray, sorted_rows: np.ndarray) -> np.ndarray:
+    """Candidates that also occur in sorted_rows, by binary search per candidate."""
+    if len(sorted_rows) == 0:
+        return sorted_rows
+    positions = np.minimum(np.searchsorted(sorted_rows, candidates), len(sorted_rows) - 1)
+    return candidates[sorted_rows[positions] == candidates]
+
+
+class TextIndex:
+    """
+    Inverted index over product names.
+
+    A query matches a row when every query token is a token of the row's
+    name; the last query token, if at least MIN_PREFIX_LENGTH long, also
+    matches every longer token it is a prefix of, for search-as-you-type.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, PostingList] = {}
+        self.terms: List[str] = []
+        self.rows_indexed = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, names: Sequence[str], name_codes: np.ndarray) -> "TextIndex":
+        """
+        Index every row of a catalog in one pass.
+
+        All names are tokenized by one regex scan over their
+        concatenation; rows are then grouped per term with array
+        operations.
+
+        Args:
+            names: Interned names
+            name_codes: Index into ``names`` for each row
+        """
+        index = cls()
+        index.rows_indexed = len(name_codes)
+        if len(name_codes) == 0:
+            return index
+
+        # Newlines separate the names and become a token of their own, id 0
+        text = "\n".join(name.replace("\n", " ") for name in names).lower()
+        term_ids: Dict[str, int] = {"\n": 0}
+        token_ids = np.array(
+            [term_ids.setdefault(token, len(term_ids)) for token in SCAN_PATTERN.findall(text)],
+            dtype=np.int64
+        )
+        separators = token_ids == 0
+        pair_codes = np.cumsum(separators)[~separators]
+        pair_terms = token_ids[~separators]
+
+        # Rows grouped by name code, in row order within a code
+        by_code = np.argsort(name_codes, kind="stable")
+        sorted_codes = name_codes[by_code]
+        code_starts = np.searchsorted(sorted_codes, pair_codes, side="left")
+        code_counts = np.searchsorted(sorted_codes, pair_codes, side="right") - code_starts
+
+        pair_of_row = np.repeat(np.arange(len(pair_codes)), code_counts)
+        offset_in_code = np.arange(len(pair_of_row)) - np.repeat(np.cumsum(code_counts) - code_counts, code_counts)
+        rows = by_code[code_starts[pair_of_row] + offset_in_code].astype(np.int64)
+        terms = pair_terms[pair_of_row]
+
+        order = np.lexsort((rows, terms))
+        rows, terms = rows[order], terms[order]
+        # A word repeated within one name is one posting
+        distinct = np.ones(len(rows), dtype=np.bool_)
+        distinct[1:] = (rows[1:] != rows[:-1]) | (terms[1:] != terms[:-1])
+        rows, terms = rows[distinct], terms[distinct]
+
+        del term_ids["\n"]
+        # Term ids run from 1 in insertion order; skip terms of unused names
+        bounds = np.searchsorted(terms, np.arange(1, len(term_ids) + 2))
+        used = (np.diff(bounds) > 0).tolist()
+        lists = build_postings(rows, np.append(bounds[:-1][used], len(rows))) if len(rows) else []
+        index.postings = dict(zip((term for term, keep in zip(term_ids, used) if keep), lists))
+        index.terms = sorted(index.postings)
+        return index
+
+    def add(self, row: int, name: str) -> None:
+        """
+        Index one new row.
+
+        Args:
+            row: Row number, greater than every row indexed so far
+            name: The row's product name
+        """
+        with self._lock:
+            for term in set(tokenize(name)):
+                posting = self.postings.get(term)
+                if posting is None:
+                    posting = self.postings[term] = PostingList()
+                    bisect.insort(self.terms, term)
+                posting.append(row)
+            self.rows_indexed = max(self.rows_indexed, row + 1)
+
+    def extend(self, first_row: int, names: Iterable[str]) -> None:
+        """Index consecutive new rows starting at first_row."""
+        for row, name in enumerate(names, start=first_row):
+            self.add(row, name)
+
+    def search(self, query: str, row_limit: Optional[int] = None) -> np.ndarray:
+        """
+        Rows whose names match a query.
+
+        Args:
+            query: Free text
+            row_limit: Ignore rows at or past this number
+
+        Returns:
+            Sorted row numbers
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return np.zeros(0, dtype=np.int64)
+
+        exact = []
+        for token in set(tokens[:-1]):
+            posting = self.postings.get(token)
+            if posting is None:
+                return np.zeros(0, dtype=np.int64)
+            exact.append(posting)
+
+        last = tokens[-1]
+        if len(last) >= MIN_PREFIX_LENGTH:
+            prefixed = self._expand(last)
+        else:
+            prefixed = [self.postings[last]] if last in self.postings else []
+        if not prefixed:
+            return np.zeros(0, dtype=np.int64)
+
+        # Intersect shortest first; the prefix union counts as one list
+        sources = [(posting.count, posting) for posting in exact]
+        sources.append((sum(posting.count for posting in prefixed), prefixed))
+        sources.sort(key=lambda source: source[0])
+
+        candidates = self._decode(sources[0][1])
+        for _, source in sources[1:]:
+            if len(candidates) == 0:
+                break
+            if isinstance(source, PostingList) and source.count > SKIP_RATIO * len(candidates):
+                candidates = intersect(candidates, source.rows_near(candidates))
+            else:
+                candidates = intersect(candidates, self._decode(source))
+
+        if row_limit is not None:
+            candidates = candidates[:np.searchsorted(candidates, row_limit)]
+        return candidates
+
+    def _expand(self, prefix: str) -> List[PostingList]:
+        """Posting lists of all the terms starting with a prefix."""
+        start = bisect.bisect_left(self.terms, prefix)
+        # Strings starting with the prefix sort before the prefix with its
+        # last character incremented
+        end = bisect.bisect_left(self.terms, prefix[:-1] + chr(ord(prefix[-1]) + 1), start)
+        return [self.postings[term] for term in self.terms[start:end]]
+
+    @staticmethod
+    def _decode(source: Union[PostingList, List[PostingList]]) -> np.ndarray:
+        """Rows of one posting list, or of the union of several."""
+        if isinstance(source, PostingList):
+            return source.rows()
+        if len(source) == 1:
+            return source[0].rows()
+        rows = np.sort(np.concatenate([posting.rows() for posting in source]))
+        # A name can hold two terms with the same prefix
+        return rows[np.append(True, rows[1:] != rows[:-1])]
@@ -0,0 +1,14 @@
+"""
+Detection package - identifies clients that behave like crawlers.
+
+Modules:
+- suspicion: Scores clients by how aggressively they consume their budget
+- challenge: Proof-of-work puzzles for suspected crawlers
+- enumeration: Spots clients paginating through the catalogue in parallel
+"""
+
+from .suspicion import SuspicionTracker
+from .challenge import ProofOfWorkChallenge
+from .enumeration import EnumerationDetector
+
+__all__ = ["SuspicionTracker", "ProofOfWorkChallenge", "EnumerationDetector"]
@@ -0,0 +1,172 @@
+"""
+Proof-of-Work Challenge Module
+Single responsibility: Issue and verify hashcash-style puzzles.
+
+This module:
+- Issues puzzles whose difficulty grows with a client's suspicion score
+- Signs puzzles with HMAC so the server keeps no per-client state
+- Verifies a solution with one HMAC and one SHA-256
+- Accepts each solution once, remembering spent puzzles until they expire
+"""
+
+import hashlib
+import heapq
+import hmac
+import os
+import secrets
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class ProofOfWorkChallenge:
+    """
+    Hashcash-style challenge with stateless, signed puzzles.
+
+    A challenge token is ``"<expires>.<difficulty>.<nonce>.<mac>"`` where
+    the MAC covers the other fields and the client IP, so a token cannot
+    be forged, made easier, or solved once and shared across a proxy
+    pool. A solution is any string ``s`` for which
+    ``sha256(f"{token}:{s}")`` starts with ``difficulty`` zero bits.
+    Finding one takes about ``2 ** difficulty`` hashes; checking it takes one.
+
+    A solution buys a single request: a verified puzzle is remembered as
+    spent until it expires, so replaying it fails. Spent puzzles are kept
+    per process; with several workers a solution is accepted at most
+    once by each of them.
+
+    Args:
+        secret: HMAC key; must be shared by every worker that verifies
+        min_difficulty: Leading zero bits asked of barely suspicious clients
+        max_difficulty: Leading zero bits asked of the most suspicious clients
+        threshold: Suspicion score from which clients are challenged
+        ttl: Seconds a challenge, and its solution, stay valid
+    """
+
+    def __init__(
+        self,
+        secret: Optional[bytes] = None,
+        min_difficulty: int = 12,
+        max_difficulty: int = 22,
+        threshold: float = 0.5,
+        ttl: int = 60
+    ):
+        self.secret = secret or os.urandom(32)
+        self.min_difficulty = min_difficulty
+        self.max_difficulty = max_difficulty
+        self.threshold = threshold
+        self.ttl = ttl
+        # Spent puzzle nonces, and the same ordered by expiry for pruning
+        self._spent: Dict[str, int] = {}
+        self._spent_expiry: List[Tuple[int, str]] = []
+
+    def requires_challenge(self, score: float) -> bool:
+        """Check whether a client with this suspicion score must solve a puzzle."""
+        return score >= self.threshold
+
+    def difficulty_for(self, score: float) -> int:
+        """
+        Map a suspicion score to a puzzle difficulty.
+
+        Args:
+            score: Suspicion score between threshold and 1.0
+
+        Returns:
+            Leading zero bits required, scaled linearly with the score
+        """
+        span = max(1e-9, 1.0 - self.threshold)
+        fraction = min(1.0, max(0.0, (score - self.threshold) / span))
+        return self.min_difficulty + round(fraction * (self.max_difficulty - self.min_difficulty))
+
+    def issue(self, client_id: str, score: float) -> Dict:
+        """
+        Issue a puzzle for a client.
+
+        Args:
+            client_id: Client the puzzle is bound to
+            score: Client's suspicion score
+
+        Returns:
+            Dict with the challenge token, difficulty and expiry time
+        """
+        difficulty = self.difficulty_for(score)
+        expires_at = int(time.time()) + self.ttl
+        payload = f"{expires_at}.{difficulty}.{secrets.token_hex(8)}"
+        token = f"{payload}.{self._sign(client_id, payload)}"
+        return {"challenge": token, "difficulty": difficulty, "expires_at": expires_at}
+
+    def verify(self, client_id: str, token: str, solution: str) -> bool:
+        """
+        Check a solved puzzle.
+
+        Args:
+            client_id: Client presenting the solution
+            token: Challenge token as issued
+            solution: Client's solution string
+
+        Returns:
+            True if the token is authentic, unexpired, bound to this client,
+            not spent before and the solution meets its difficulty; the
+            token is then spent
+        """
+        try:
+            expires_at, difficulty, nonce, mac = token.split(".")
+            expires_at = int(expires_at)
+            difficulty = int(difficulty)
+        except ValueError:
+            return False
+
+        now = time.time()
+        if expires_at < now or not 0 < difficulty <= 256:
+            return False
+
+        payload = f"{expires_at}.{difficulty}.{nonce}"
+        if not hmac.compare_digest(mac, self._sign(client_id, payload)):
+            return False
+
+        self._prune_spent(now)
+        if nonce in self._spent:
+            return False
+        if not has_leading_zero_bits(_digest(token, solution), difficulty):
+            return False
+        self._spent[nonce] = expires_at
+        heapq.heappush(self._spent_expiry, (expires_at, nonce))
+        return True
+
+    def _prune_spent(self, now: float) -> None:
+        """Forget spent puzzles that have expired and would fail anyway."""
+        expiry = self._spent_expiry
+        while expiry and expiry[0][0] < now:
+            _, nonce = heapq.heappop(expiry)
+            del self._spent[nonce]
+
+    def _sign(self, client_id: str, payload: str) -> str:
+        message = f"{client_id}|{payload}".encode()
+        return hmac.new(self.secret, message, hashlib.sha256).hexdigest()[:32]
+
+
+def _digest(token: str, solution: str) -> bytes:
+    return hashlib.sha256(f"{token}:{solution}".encode()).digest()
+
+
+def has_leading_zero_bits(digest: bytes, bits: int) -> bool:
+    """Check whether a digest starts with at least ``bits`` zero bits."""
+    return int.from_bytes(digest, "big") >> (len(digest) * 8 - bits) == 0
+
+
+def solve(token: str, difficulty: int) -> str:
+    """
+    Brute-force a puzzle, as a client would.
+
+    Args:
+        token: Challenge token
+        difficulty: Leading zero bits required
+
+    Returns:
+        A solution string
+    """
+    counter = 0
+    while True:
+        candidate = str(counter)
+        if has_leading_zero_bits(_digest(token, candidate), difficulty):
+            return candidate
+        counter += 1
@@ -0,0 +1,190 @@
+"""
+Enumeration Detector Module
+Single responsibility: Spot clients walking the catalogue in parallel.
+
+This module:
+- Follows cursor chains, the sequence of pages one pagination walk visits
+- Counts the chains each client keeps going at the same time
+- Counts forks, where one chain is advanced from two places in turn
+- Tells returning to an earlier page apart from walking a chain twice
+"""
+
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+
+# Observations between sweeps of clients that stopped paginating
+SWEEP_EVERY = 1024
+
+# Positions a chain may be walked from before the least recent is dropped
+MAX_HEADS = 16
+
+# Reasons observe() gives for a client looking like an enumerator
+TOO_MANY_CHAINS = "chains"
+FORKED_CHAIN = "forks"
+
+
+class _Chain:
+    """
+    One pagination walk.
+
+    ``heads`` maps each position the chain is being walked from to when
+    that position was reached by a new cursor, either by advancing a page
+    or by going back to an earlier one.
+    """
+
+    __slots__ = ("heads", "newest")
+
+    def __init__(self, sequence: int, issued_at: float, now: float):
+        self.heads: Dict[int, float] = {sequence: now}
+        self.newest = issued_at
+
+
+class _ClientChains:
+    """Chains one client has continued recently."""
+
+    __slots__ = ("chains", "forks")
+
+    def __init__(self):
+        self.chains: Dict[str, _Chain] = {}
+        # Times of recent forks, oldest first
+        self.forks: Deque[float] = deque()
+
+
+class EnumerationDetector:
+    """
+    Flags clients that paginate like a parallel crawler.
+
+    A shopper follows one or two result lists at a time, one page after
+    the next. A crawler splitting the catalogue across workers keeps many
+    chains going at once, or replays a cursor to walk one chain from two
+    places. Every cursor carries its chain, its position in the chain
+    and its issue time, so both patterns show up without storing any
+    cursors.
+
+    Going back to an earlier cursor is navigation: it starts walking the
+    chain from there, and the position left behind goes quiet. A fork is
+    counted only when a position is advanced while another position of
+    the same chain was advanced more recently, i.e. two positions move in
+    turn. Forks count for ``window`` seconds, like chains.
+
+    Args:
+        max_chains: Chains a client may keep active at once
+        max_forks: Forks within the window tolerated before a client is flagged
+        window: Seconds a chain, or a fork, stays counted
+        flag_for: Seconds a client caught keeping too many chains stays
+            flagged as a scraper
+    """
+
+    def __init__(
+        self,
+        max_chains: int = 8,
+        max_forks: int = 2,
+        window: float = 60.0,
+        flag_for: float = 600.0
+    ):
+        self.max_chains = max_chains
+        self.max_forks = max_forks
+        self.window = window
+        self.flag_for = flag_for
+        self.clients: Dict[str, _ClientChains] = {}
+        self.observed = 0
+        self.detected = 0
+
+    def observe(
+        self,
+        client_id: str,
+        chain: str,
+        sequence: int,
+        issued_at: float,
+        now: Optional[float] = None
+    ) -> Optional[str]:
+        """
+        Record that a client presented a cursor.
+
+        Args:
+            client_id: Unique client identifier
+            chain: Chain the cursor belongs to
+            sequence: Position of the cursor within its chain
+            issued_at: Time the cursor was issued
+            now: Current time, for testing
+
+        Returns:
+            None, or why the client now looks like a parallel enumerator:
+            TOO_MANY_CHAINS or FORKED_CHAIN
+        """
+        now = time.time() if now is None else now
+        state = self.clients.get(client_id)
+        if state is None:
+            state = self.clients[client_id] = _ClientChains()
+        self.observed += 1
+        if self.observed % SWEEP_EVERY == 0:
+            self.sweep(now)
+
+        # Chains whose newest cursor, and forks, older than the window have ended
+        horizon = now - self.window
+        for stale in [c for c, seen in state.chains.items() if seen.newest < horizon]:
+            del state.chains[stale]
+        forks = state.forks
+        while forks and forks[0] < horizon:
+            forks.popleft()
+
+        seen = state.chains.get(chain)
+        if seen is None:
+            state.chains[chain] = _Chain(sequence, issued_at, now)
+        else:
+            seen.newest = max(seen.newest, issued_at)
+            if self._walk(seen, sequence, now, horizon):
+                forks.append(now)
+
+        if len(state.chains) > self.max_chains:
+            self.detected += 1
+            return TOO_MANY_CHAINS
+        if len(forks) > self.max_forks:
+            self.detected += 1
+            return FORKED_CHAIN
+        return None
+
+    def _walk(self, seen: _Chain, sequence: int, now: float, horizon: float) -> bool:
+        """Move a chain's heads for a presented cursor; True if it forked."""
+        heads = seen.heads
+        reached = heads.get(sequence - 1)
+        if reached is not None:
+            # Advancing from sequence - 1: a fork if another position of
+            # the chain moved since this one did
+            forked = any(
+                other > reached and other >= horizon
+                for position, other in heads.items() if position != sequence - 1
+            )
+            del heads[sequence - 1]
+            heads[sequence] = now
+            return forked
+        if sequence not in heads:
+            # Back (or forward) to a page walked before: a new place to walk from
+            heads[sequence] = now
+            if len(heads) > MAX_HEADS:
+                del heads[min(heads, key=heads.get)]
+        # A retry re-sends a cursor already presented and changes nothing
+        return False
+
+    def forget(self, client_id: str) -> None:
+        """Drop all state for a client."""
+        self.clients.pop(client_id, None)
+
+    def sweep(self, now: Optional[float] = None) -> None:
+        """Drop clients with no active chains."""
+        horizon = (time.time() if now is None else now) - self.window
+        for client_id in [
+            client_id for client_id, state in self.clients.items()
+            if all(seen.newest < horizon for seen in state.chains.values())
+        ]:
+            del self.clients[client_id]
+
+    def get_stats(self) -> Dict:
+        """Get enumeration detection statistics."""
+        return {
+            "tracked_clients": len(self.clients),
+            "cursors_observed": self.observed,
+            "enumerations_detected": self.detected,
+        }
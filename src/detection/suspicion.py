@@ -0,0 +1,113 @@
+"""
+Suspicion Tracker Module
+Single responsibility: Score how crawler-like a client looks.
+
+This module:
+- Derives a 0-1 suspicion score from rate limiter state
+- Keeps the clients positively flagged as scrapers, each until its
+  flag expires or is cleared
+- Lets other components ask "is this client a suspected crawler?"
+"""
+
+import heapq
+import math
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.rate_limiting import RateLimiter
+
+
+class SuspicionTracker:
+    """
+    Scores clients by how much of their rate limit budget they have burned.
+
+    A real shopper rarely drains their bucket, while a crawler walking
+    pages keeps it close to empty, so bucket depletion is a cheap signal
+    that needs no extra per-client state.
+
+    Flags set automatically should carry a ttl: a client behind a shared
+    address, such as an office NAT, must not stay blocked for good
+    because of one burst. Expired flags are dropped as new ones are set.
+
+    Args:
+        rate_limiter: Rate limiter whose buckets are inspected
+        suspect_threshold: Score at or above which a client is suspected
+        clock: Time source for flag expiry
+    """
+
+    def __init__(
+        self,
+        rate_limiter: RateLimiter,
+        suspect_threshold: float = 0.8,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.rate_limiter = rate_limiter
+        self.suspect_threshold = suspect_threshold
+        self.clock = clock
+        # Flagged client to when its flag expires (inf: until unflagged)
+        self.flagged: Dict[str, float] = {}
+        self._expiry: List[Tuple[float, str]] = []
+
+    def score(self, client_id: str) -> float:
+        """
+        Get the suspicion score for a client.
+
+        Args:
+            client_id: Unique client identifier
+
+        Returns:
+            0.0 for an untouched bucket up to 1.0 for an empty one;
+            always 1.0 for flagged clients
+        """
+        if self.is_flagged(client_id):
+            return 1.0
+
+        bucket = self.rate_limiter.clients.get(client_id)
+        if bucket is None or bucket.capacity <= 0:
+            return 0.0
+
+        remaining = bucket.get_remaining_tokens()
+        return max(0.0, min(1.0, 1.0 - remaining / bucket.capacity))
+
+    def is_suspect(self, client_id: str) -> bool:
+        """Check whether a client crosses the suspicion threshold."""
+        return self.score(client_id) >= self.suspect_threshold
+
+    def flag(self, client_id: str, ttl: Optional[float] = None) -> None:
+        """
+        Mark a client as a confirmed scraper.
+
+        Args:
+            client_id: Unique client identifier
+            ttl: Seconds the flag lasts; until unflagged if omitted. An
+                existing flag is only ever extended
+        """
+        now = self.clock()
+        self._prune(now)
+        expires = math.inf if ttl is None else now + ttl
+        if expires > self.flagged.get(client_id, -math.inf):
+            self.flagged[client_id] = expires
+            if expires != math.inf:
+                heapq.heappush(self._expiry, (expires, client_id))
+
+    def unflag(self, client_id: str) -> None:
+        """Clear a client's scraper flag."""
+        self.flagged.pop(client_id, None)
+
+    def is_flagged(self, client_id: str) -> bool:
+        """Check whether a client is a confirmed scraper."""
+        expires = self.flagged.get(client_id)
+        return expires is not None and expires > self.clock()
+
+    def get_flagged(self) -> List[str]:
+        """List all confirmed scrapers."""
+        self._prune(self.clock())
+        return sorted(self.flagged)
+
+    def _prune(self, now: float) -> None:
+        """Forget flags that have expired."""
+        while self._expiry and self._expiry[0][0] <= now:
+            expires, client_id = heapq.heappop(self._expiry)
+            # Skip entries for flags since extended or cleared
+            if self.flagged.get(client_id) == expires:
+                del self.flagged[client_id]
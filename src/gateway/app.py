@@ -5,18 +5,59 @@ Single responsibility: Create and configure FastAPI application.
 This module sets up the app, middleware, and routes.
 """
 
+from typing import Dict, Iterable, Optional
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from src.rate_limiting import RateLimiter
-from src.metrics import MetricsManager
-from src.backend import BackendService
+from src.rate_limiting import (
+    GossipNode, GossipRateLimiter, PolicyReloader, PolicyTable, RateLimiter, ThrottleQueue
+)
+from src.rate_limiting.gossip import parse_address
+from src.metrics import AccessLog, MetricsManager
+from src.backend import BackendService, load_catalog
+from src.admission import AdmissionQueue, PriorityClassifier
+from src.detection import EnumerationDetector, ProofOfWorkChallenge, SuspicionTracker
+from .hedging import HedgedBackend
+from .tarpit import Tarpit, TarpitMiddleware
+from .request_timing import RequestTimingMiddleware
+from .pagination import CursorCodec
 from .routes import create_routes
 
 
 def create_app(
     capacity: int = 100,
-    refill_rate: float = 10.0
+    refill_rate: float = 10.0,
+    limit_share: float = 1.0,
+    max_concurrency: int = 64,
+    max_queue_size: int = 256,
+    allowlist: Optional[Iterable[str]] = None,
+    api_keys: Optional[Iterable[str]] = None,
+    backend_replicas: int = 1,
+    hedging: bool = False,
+    route_budgets: Optional[Dict[str, float]] = None,
+    throttled_routes: Optional[Iterable[str]] = None,
+    max_throttle_delay: float = 1.0,
+    tarpit: bool = False,
+    max_tarpit_connections: int = 10000,
+    challenged_routes: Optional[Iterable[str]] = None,
+    challenge_secret: Optional[bytes] = None,
+    cursor_secret: Optional[bytes] = None,
+    max_cursor_chains: int = 8,
+    enumeration_detection: bool = True,
+    catalog_path: Optional[str] = None,
+    request_timing: bool = True,
+    server_timing: bool = False,
+    metrics_file: Optional[str] = None,
+    access_log_path: Optional[str] = None,
+    access_log_format: str = "binary",
+    admin_token: Optional[str] = None,
+    policy_file: Optional[str] = None,
+    gossip_bind: Optional[str] = None,
+    gossip_peers: Optional[Iterable[str]] = None,
+    gossip_interval: float = 0.25,
+    gossip_error: float = 0.1,
+    gossip_secret: Optional[bytes] = None
 ) -> FastAPI:
     """
     Create and configure the FastAPI application.
@@ -24,6 +65,60 @@ def create_app(
     Args:
         capacity: Rate limit capacity per client
         refill_rate: Token refill rate per second
+        limit_share: Fraction of every client's limit this process
+            enforces; 1/N for each of N workers that keep their own
+            buckets (ignored in cluster mode, where usage is gossiped)
+        max_concurrency: Max requests in flight to the backend
+        max_queue_size: Max requests waiting for admission
+        allowlist: Client IPs admitted ahead of everyone else
+        api_keys: API keys that mark a client as authenticated
+        backend_replicas: Number of backend replicas to spread calls over
+        hedging: Send a backup request when a call is slower than p95
+        route_budgets: Latency budget in seconds per endpoint
+        throttled_routes: Endpoints that delay over-limit requests instead of
+            rejecting them
+        max_throttle_delay: Longest an over-limit request may be delayed
+        tarpit: Answer flagged scrapers very slowly instead of with a fast 429
+        max_tarpit_connections: Max concurrently tarpitted connections
+        challenged_routes: Endpoints where suspected crawlers must solve a
+            proof-of-work puzzle
+        challenge_secret: HMAC key for puzzles; must be the same on every
+            worker, a random per-process key is used if omitted
+        cursor_secret: HMAC key for pagination cursors; same rules as
+            challenge_secret
+        max_cursor_chains: Cursor chains a client may walk at once before
+            it is flagged as a parallel enumerator
+        enumeration_detection: Watch cursor chains for parallel
+            enumeration; off, clients may page through as many result
+            lists at once as they like
+        catalog_path: Catalog file built with ``python -m src.backend.catalog_build``;
+            memory-mapped, so workers share it. The built-in sample catalog
+            is served if omitted
+        request_timing: Time the pipeline stages of every request and
+            report them per stage in /metrics
+        server_timing: Also send each request's stage timings back in a
+            Server-Timing header; implies request_timing
+        metrics_file: File through which worker processes share request
+            counts, so /metrics reports all workers whichever answers.
+            Every worker must be given the same path
+        access_log_path: Append every request to this file; off if omitted.
+            Give each worker process its own path
+        access_log_format: "binary" (64 bytes per request) or "jsonl"
+        admin_token: Serve the /admin crawler flagging and /admin/debug
+            profiling and memory endpoints to requests sending this in an
+            X-Admin-Token header; the endpoints do not exist if omitted
+        policy_file: JSON file of rate limit policies (see
+            src.rate_limiting.policy); overrides capacity and refill_rate
+            and is reloaded whenever it changes, keeping client state
+        gossip_bind: "host:port" to gossip client usage from; enables
+            cluster mode, where limits approximate one global bucket per
+            client across the nodes in gossip_peers
+        gossip_peers: "host:port" gossip addresses of the other nodes
+        gossip_interval: Seconds between usage broadcasts
+        gossip_error: Over-admission the cluster may allow a client
+            between syncs, as a fraction of its capacity
+        gossip_secret: HMAC key signing gossip datagrams; must be the
+            same on every node, a random per-process key is used if omitted
 
     Returns:
         Configured FastAPI app
@@ -44,17 +139,108 @@ def create_app(
     )
 
     # Initialize components
-    rate_limiter = RateLimiter(capacity=capacity, refill_rate=refill_rate)
-    metrics_manager = MetricsManager()
-    backend_service = BackendService()
+    gossip_node = None
+    if gossip_bind:
+        rate_limiter = GossipRateLimiter(
+            capacity=capacity, refill_rate=refill_rate, error_bound=gossip_error
+        )
+        gossip_node = GossipNode(
+            rate_limiter,
+            parse_address(gossip_bind),
+            [parse_address(peer) for peer in gossip_peers or ()],
+            interval=gossip_interval,
+            secret=gossip_secret
+        )
+        app.add_event_handler("startup", gossip_node.start)
+        app.add_event_handler("shutdown", gossip_node.stop)
+    else:
+        rate_limiter = RateLimiter(capacity=capacity, refill_rate=refill_rate, share=limit_share)
+    policy_reloader = None
+    if policy_file:
+        rate_limiter.policies = PolicyTable.load(policy_file)
+        policy_reloader = PolicyReloader(policy_file, rate_limiter)
+        app.add_event_handler("startup", policy_reloader.start)
+        app.add_event_handler("shutdown", policy_reloader.stop)
+    metrics_manager = MetricsManager(metrics_file)
+    access_log = None
+    if access_log_path:
+        access_log = AccessLog(access_log_path, format=access_log_format)
+        app.add_event_handler("shutdown", access_log.close)
+    catalog = load_catalog(catalog_path) if catalog_path else None
+    backend_service = BackendService(catalog)
+    replicas = [backend_service] + [BackendService(catalog) for _ in range(backend_replicas - 1)]
+    hedged_backend = HedgedBackend(replicas, hedging=hedging)
+    throttle_queue = None
+    if throttled_routes:
+        throttle_queue = ThrottleQueue(rate_limiter, max_delay=max_throttle_delay)
+    challenge = None
+    if challenged_routes:
+        challenge = ProofOfWorkChallenge(secret=challenge_secret)
+    tarpit_responder = Tarpit(max_connections=max_tarpit_connections) if tarpit else None
+    suspicion_tracker = SuspicionTracker(rate_limiter)
+    cursor_codec = CursorCodec(secret=cursor_secret)
+    enumeration_detector = None
+    if enumeration_detection:
+        enumeration_detector = EnumerationDetector(max_chains=max_cursor_chains)
+    classifier = PriorityClassifier(suspicion_tracker, allowlist, api_keys)
+    admission_queue = AdmissionQueue(
+        max_concurrency=max_concurrency,
+        max_queue_size=max_queue_size
+    )
 
     # Include routes
-    routes = create_routes(rate_limiter, metrics_manager, backend_service)
+    routes = create_routes(
+        rate_limiter,
+        metrics_manager,
+        backend_service,
+        admission_queue,
+        classifier,
+        hedged_backend,
+        route_budgets,
+        throttle_queue,
+        throttled_routes,
+        suspicion_tracker,
+        tarpit_responder,
+        challenge,
+        challenged_routes,
+        cursor_codec,
+        enumeration_detector,
+        access_log,
+        admin_token,
+        gossip_node
+    )
     app.include_router(routes)
 
+    # Added before the tarpit so tarpitted connections are not timed
+    if request_timing or server_timing:
+        app.add_middleware(
+            RequestTimingMiddleware,
+            metrics_manager=metrics_manager,
+            header=server_timing
+        )
+
+    if tarpit_responder is not None:
+        app.add_middleware(
+            TarpitMiddleware,
+            tarpit=tarpit_responder,
+            suspicion_tracker=suspicion_tracker,
+            metrics_manager=metrics_manager,
+            access_log=access_log
+        )
+
     # Store in app state for access if needed
     app.state.rate_limiter = rate_limiter
+    app.state.policy_reloader = policy_reloader
+    app.state.gossip = gossip_node
     app.state.metrics_manager = metrics_manager
     app.state.backend_service = backend_service
+    app.state.suspicion_tracker = suspicion_tracker
+    app.state.admission_queue = admission_queue
+    app.state.hedged_backend = hedged_backend
+    app.state.throttle_queue = throttle_queue
+    app.state.tarpit = tarpit_responder
+    app.state.challenge = challenge
+    app.state.enumeration_detector = enumeration_detector
+    app.state.access_log = access_log
 
     return app
@@ -0,0 +1,169 @@
+"""
+Hedging Module
+Single responsibility: Call backend replicas within a deadline, hedging slow calls.
+
+This module:
+- Runs blocking backend calls off the event loop
+- Abandons calls once the request deadline expires
+- Sends a backup request to another replica when the first one is slower
+  than the recent p95, returning whichever answers first
+"""
+
+import asyncio
+import itertools
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence
+
+from src.backend import BackendService, Deadline, DeadlineExceeded
+
+
+class LatencyTracker:
+    """
+    Keeps a sliding sample of recent backend latencies.
+
+    Args:
+        window: Number of recent samples kept
+        refresh_every: Recompute the percentile after this many new samples
+    """
+
+    def __init__(self, window: int = 1000, refresh_every: int = 50):
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.refresh_every = refresh_every
+        self._since_refresh = 0
+        self._p95: Optional[float] = None
+
+    def record(self, latency: float) -> None:
+        """Record a call's latency in seconds, whether it succeeded or not."""
+        self.samples.append(latency)
+        self._since_refresh += 1
+        if self._since_refresh >= self.refresh_every:
+            self._p95 = None
+
+    def p95(self) -> Optional[float]:
+        """95th percentile of the sample, or None if empty."""
+        if self._p95 is None and self.samples:
+            ordered = sorted(self.samples)
+            self._p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+            self._since_refresh = 0
+        return self._p95
+
+
+class HedgedBackend:
+    """
+    Deadline-aware caller for a pool of backend replicas.
+
+    With hedging on, a call that has not answered within the recent p95
+    latency is duplicated to the next replica and the first response
+    wins. Only about 5% of calls are hedged, so the extra load is small
+    while the slow tail is cut off.
+
+    Args:
+        replicas: Interchangeable backend services
+        hedging: Whether to send backup requests at all
+        min_samples: Latencies needed before hedging starts
+        tracker: Latency tracker used to pick the hedge delay
+    """
+
+    def __init__(
+        self,
+        replicas: Sequence[BackendService],
+        hedging: bool = False,
+        min_samples: int = 20,
+        tracker: Optional[LatencyTracker] = None
+    ):
+        if not replicas:
+            raise ValueError("At least one backend replica is required")
+        self.replicas: List[BackendService] = list(replicas)
+        self.hedging = hedging
+        self.min_samples = min_samples
+        self.tracker = tracker or LatencyTracker()
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self._next_replica = itertools.cycle(range(len(self.replicas)))
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None if hedging is off."""
+        if not self.hedging or len(self.tracker.samples) < self.min_samples:
+            return None
+        return self.tracker.p95()
+
+    async def call(self, endpoint: str, data: Dict[str, Any], deadline: Deadline) -> Dict[str, Any]:
+        """
+        Call the backend, hedging if the primary is slow.
+
+        Args:
+            endpoint: Backend endpoint
+            data: Request data
+            deadline: Request deadline, passed down to the replicas
+
+        Returns:
+            Response from the first replica to answer
+
+        Raises:
+            DeadlineExceeded: If no replica answered within the deadline
+        """
+        first = next(self._next_replica)
+        primary = self._start(first, endpoint, data, deadline)
+        pending = {primary}
+
+        delay = self.hedge_delay()
+        if delay is not None:
+            await asyncio.wait(pending, timeout=min(delay, deadline.remaining()))
+            if not primary.done() and not deadline.expired:
+                second = (first + 1) % len(self.replicas)
+                pending.add(self._start(second, endpoint, data, deadline))
+                self.hedges_sent += 1
+
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done = {task for task in pending if task.done()}
+                if not done:
+                    done, _ = await asyncio.wait(
+                        pending,
+                        timeout=deadline.remaining(),
+                        return_when=asyncio.FIRST_COMPLETED
+                    )
+                    if not done:
+                        raise DeadlineExceeded("Request deadline exceeded")
+                pending -= done
+
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedges_won += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # Threads cannot be interrupted; the replicas see the same
+            # deadline and give up on their own.
+            for task in pending:
+                task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hedging statistics."""
+        p95 = self.tracker.p95()
+        return {
+            "replicas": len(self.replicas),
+            "hedging": self.hedging,
+            "hedges_sent": self.hedges_sent,
+            "hedges_won": self.hedges_won,
+            "p95_latency_ms": round(p95 * 1000, 3) if p95 is not None else None,
+        }
+
+    def _start(self, index: int, endpoint: str, data: Dict[str, Any], deadline: Deadline) -> asyncio.Future:
+        """Start a timed backend call on one replica in a worker thread."""
+        replica = self.replicas[index]
+
+        def timed_call() -> Dict[str, Any]:
+            start = time.perf_counter()
+            try:
+                return replica.handle_request(endpoint, data, deadline)
+            finally:
+                # Failed and timed-out calls count too: leaving them out
+                # would bias the p95 low exactly when replicas are slow
+                self.tracker.record(time.perf_counter() - start)
+
+        return asyncio.ensure_future(asyncio.to_thread(timed_call))
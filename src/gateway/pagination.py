@@ -0,0 +1,164 @@
+"""
+Pagination Module
+Single responsibility: Turn backend keyset positions into signed cursors.
+
+This module:
+- Seals the backend's next-page position into an opaque, signed cursor
+- Opens a cursor back into a position, refusing forged, expired,
+  foreign or mismatched ones
+- Carries a chain id, sequence number and issue time in every cursor so
+  parallel enumeration can be spotted
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+from typing import Any, Dict, Optional, Tuple
+
+
+# Request fields a cursor is tied to; a cursor only continues the same query
+QUERY_FIELDS = ("category", "q", "sort_by", "in_stock", "min_price", "max_price")
+
+
+class InvalidCursor(Exception):
+    """Raised when a cursor cannot be used for a request."""
+
+
+class CursorCodec:
+    """
+    Signs and verifies pagination cursors without server-side state.
+
+    A cursor is ``"<payload>.<mac>"`` where the payload is base64 JSON
+    holding the query, the backend position to resume after, the chain
+    id, the page's sequence number in the chain and the issue time. The
+    MAC also covers the client IP, so a cursor cannot be forged, edited
+    to skip ahead, or handed to another machine of a proxy pool.
+
+    Args:
+        secret: HMAC key; must be shared by every worker that verifies
+        ttl: Seconds a cursor stays valid after it was issued
+    """
+
+    def __init__(self, secret: Optional[bytes] = None, ttl: int = 3600):
+        self.secret = secret or os.urandom(32)
+        self.ttl = ttl
+
+    def seal(
+        self,
+        client_id: str,
+        data: Dict[str, Any],
+        after: Any,
+        chain: Optional[str] = None,
+        sequence: int = 0
+    ) -> str:
+        """
+        Issue a cursor for the page after ``after``.
+
+        Args:
+            client_id: Client the cursor is bound to
+            data: Request data of the page just served
+            after: Backend position of that page's last row
+            chain: Chain being continued; a new one is started if None
+            sequence: Sequence number of the page just served
+
+        Returns:
+            Cursor token
+        """
+        payload = {
+            "q": [data.get(field) for field in QUERY_FIELDS],
+            "a": after,
+            "c": chain or secrets.token_hex(8),
+            "n": sequence + 1,
+            # Truncated, never rounded up into the future
+            "t": int(time.time() * 1000) / 1000,
+        }
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(",", ":")).encode()
+        ).decode().rstrip("=")
+        return f"{encoded}.{self._sign(client_id, encoded)}"
+
+    def open(self, client_id: str, data: Dict[str, Any], cursor: str) -> Dict[str, Any]:
+        """
+        Verify a cursor for a request.
+
+        Args:
+            client_id: Client presenting the cursor
+            data: Request data the cursor is sent with
+            cursor: Cursor token as issued
+
+        Returns:
+            Dict with the position to resume ``after``, its ``chain``,
+            ``sequence`` and ``issued_at``
+
+        Raises:
+            InvalidCursor: If the cursor is malformed, forged, bound to
+                another client, expired or issued for another query
+        """
+        try:
+            encoded, mac = cursor.split(".")
+        except ValueError:
+            raise InvalidCursor("Malformed cursor")
+
+        if not hmac.compare_digest(mac, self._sign(client_id, encoded)):
+            raise InvalidCursor("Cursor signature does not match")
+
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded))
+            query, after, chain = payload["q"], payload["a"], payload["c"]
+            sequence, issued_at = int(payload["n"]), float(payload["t"])
+        except (ValueError, KeyError, TypeError):
+            raise InvalidCursor("Malformed cursor")
+
+        if issued_at + self.ttl < time.time():
+            raise InvalidCursor("Cursor has expired")
+        if query != [data.get(field) for field in QUERY_FIELDS]:
+            raise InvalidCursor("Cursor was issued for a different query")
+
+        return {"after": after, "chain": chain, "sequence": sequence, "issued_at": issued_at}
+
+    def _sign(self, client_id: str, payload: str) -> str:
+        message = f"{client_id}|{payload}".encode()
+        return hmac.new(self.secret, message, hashlib.sha256).hexdigest()[:32]
+
+
+def seal_page(
+    codec: CursorCodec,
+    client_id: str,
+    data: Dict[str, Any],
+    page_info: Dict[str, Any],
+    opened: Optional[Dict[str, Any]] = None
+) -> None:
+    """
+    Replace a page's raw ``next_after`` position with a signed cursor.
+
+    Args:
+        codec: Codec to sign with
+        client_id: Client the page is served to
+        data: Request data of the page
+        page_info: Backend pagination info, updated in place
+        opened: The opened cursor the page was requested with, if any
+    """
+    if "next_after" not in page_info:
+        return
+    after = page_info.pop("next_after")
+    if after is None:
+        page_info["next_cursor"] = None
+        return
+
+    chain, sequence = None, 0
+    if opened is not None:
+        chain, sequence = opened["chain"], opened["sequence"]
+    page_info["next_cursor"] = codec.seal(client_id, data, after, chain, sequence)
+
+
+def split_cursor(data: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[str]]:
+    """Separate the cursor from the rest of the request data."""
+    if data.get("cursor") is None:
+        return data, None
+    data = dict(data)
+    return data, data.pop("cursor")
@@ -3,26 +3,111 @@ Request Handler Module
 Single responsibility: Process incoming requests through the gateway.
 
 This module:
-- Checks rate limits
-- Forwards to backend
+- Checks rate limits, holding requests at a gossip cap for the next
+  sync and delaying over-limit requests on throttled routes
+- Challenges suspected crawlers with a proof-of-work puzzle
+- Resolves signed pagination cursors and spots parallel enumeration
+- Admits requests through the load-shedding queue
+- Forwards to backend within the route's latency budget
+- Fans batched requests out to the backend concurrently
+- Streams large responses record by record
+- Times each pipeline stage of the current request span
 - Handles errors
 """
 
-import time
-from typing import Tuple, Dict, Any
-from src.rate_limiting import RateLimiter
-from src.backend import BackendService
-from src.models import APIResponse, RateLimitResponse
+import asyncio
+import math
+from typing import Tuple, Dict, Any, AsyncIterator, Iterable, List, Optional, Union
+
+from src.rate_limiting import RateLimiter, ThrottleQueue
+from src.backend import BackendService, Deadline, DeadlineExceeded
+from src.admission import AdmissionQueue, AdmissionRejected, Priority, PriorityClassifier
+from src.detection import EnumerationDetector, ProofOfWorkChallenge, SuspicionTracker
+from src.detection.enumeration import TOO_MANY_CHAINS
+from src.metrics import stage
+from src.models import (
+    APIResponse,
+    RateLimitResponse,
+    ServiceUnavailableResponse,
+    GatewayTimeoutResponse,
+    ChallengeResponse,
+)
+from .hedging import HedgedBackend
+from .pagination import CursorCodec, InvalidCursor, seal_page, split_cursor
+from .streaming import RecordStream, take
+
+
+DEFAULT_ROUTE_BUDGET = 2.0
+# Page size that costs one rate limit token; larger pages cost more
+COST_PAGE_SIZE = 20
+
+
+def item_cost(data: Dict[str, Any]) -> int:
+    """Rate limit tokens charged for one backend call."""
+    return max(1, math.ceil(data.get("limit", COST_PAGE_SIZE) / COST_PAGE_SIZE))
 
 
 class GatewayRequestHandler:
-    """Handles requests through the gateway pipeline."""
+    """
+    Handles requests through the gateway pipeline.
 
-    def __init__(self, rate_limiter: RateLimiter, backend: BackendService):
+    Args:
+        rate_limiter: Per-client rate limiter
+        backend: Backend service to forward to
+        admission_queue: Optional load-shedding queue in front of the backend
+        classifier: Assigns admission priority; required with admission_queue
+        hedged_backend: Deadline-aware caller; defaults to one unhedged replica
+        route_budgets: Latency budget in seconds per endpoint
+        throttle_queue: Queue that delays over-limit requests
+        throttled_routes: Endpoints that delay instead of rejecting
+        challenge: Proof-of-work puzzle issuer and verifier
+        challenged_routes: Endpoints where suspected crawlers must solve a puzzle
+        suspicion_tracker: Scores clients for the challenge; required with challenge.
+            Clients caught enumerating are flagged here, for a limited time
+        cursor_codec: Signs next-page cursors; without it pages carry the
+            backend's raw position
+        enumeration_detector: Watches cursor chains; requires cursor_codec
+    """
+
+    def __init__(
+        self,
+        rate_limiter: RateLimiter,
+        backend: BackendService,
+        admission_queue: Optional[AdmissionQueue] = None,
+        classifier: Optional[PriorityClassifier] = None,
+        hedged_backend: Optional[HedgedBackend] = None,
+        route_budgets: Optional[Dict[str, float]] = None,
+        throttle_queue: Optional[ThrottleQueue] = None,
+        throttled_routes: Optional[Iterable[str]] = None,
+        challenge: Optional[ProofOfWorkChallenge] = None,
+        challenged_routes: Optional[Iterable[str]] = None,
+        suspicion_tracker: Optional[SuspicionTracker] = None,
+        cursor_codec: Optional[CursorCodec] = None,
+        enumeration_detector: Optional[EnumerationDetector] = None
+    ):
         self.rate_limiter = rate_limiter
         self.backend = backend
+        self.admission_queue = admission_queue
+        self.classifier = classifier
+        self.hedged_backend = hedged_backend or HedgedBackend([backend])
+        self.route_budgets = route_budgets or {}
+        self.throttle_queue = throttle_queue
+        self.throttled_routes = frozenset(throttled_routes or ())
+        self.challenge = challenge
+        self.challenged_routes = frozenset(challenged_routes or ())
+        self.suspicion_tracker = suspicion_tracker
+        self.cursor_codec = cursor_codec
+        self.enumeration_detector = enumeration_detector
 
-    def handle(self, client_ip: str, endpoint: str, data: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+    async def handle(
+        self,
+        client_ip: str,
+        endpoint: str,
+        data: Dict[str, Any],
+        api_key: Optional[str] = None,
+        challenge_token: Optional[str] = None,
+        challenge_solution: Optional[str] = None
+    ) -> Tuple[int, Dict[str, Any]]:
         """
         Process a gateway request.
 
@@ -30,20 +115,322 @@ class GatewayRequestHandler:
             client_ip: Client IP address
             endpoint: Backend endpoint
             data: Request data
+            api_key: API key sent by the client, if any
+            challenge_token: Proof-of-work challenge the client is answering
+            challenge_solution: Client's solution to that challenge
 
         Returns:
             Tuple of (status_code, response_dict)
         """
-        start_time = time.time()
+        # The budget covers queueing too, so the clock starts now
+        deadline = Deadline(self.route_budgets.get(endpoint, DEFAULT_ROUTE_BUDGET))
+
+        rejection = await self._check_access(
+            client_ip, endpoint, 1, deadline, challenge_token, challenge_solution
+        )
+        if rejection is not None:
+            return rejection
+
+        priority = self._classify(client_ip, api_key)
+        return await self._forward_admitted(client_ip, endpoint, data, deadline, priority)
+
+    async def handle_batch(
+        self,
+        client_ip: str,
+        endpoint: str,
+        items: List[Dict[str, Any]],
+        api_key: Optional[str] = None,
+        challenge_token: Optional[str] = None,
+        challenge_solution: Optional[str] = None
+    ) -> Tuple[int, Union[Dict[str, Any], AsyncIterator[Dict[str, Any]]]]:
+        """
+        Process several backend calls as one gateway request.
+
+        The rate limiter is charged once with the summed item cost, then
+        the items are sent to the backend concurrently.
+
+        Args:
+            client_ip: Client IP address
+            endpoint: Backend endpoint every item is sent to
+            items: Request data per item
+            api_key: API key sent by the client, if any
+            challenge_token: Proof-of-work challenge the client is answering
+            challenge_solution: Client's solution to that challenge
+
+        Returns:
+            (status_code, response_dict) if the batch is refused, otherwise
+            (200, parts) where parts yields ``{"index", "status_code",
+            "response"}`` dicts in completion order
+        """
+        deadline = Deadline(self.route_budgets.get(endpoint, DEFAULT_ROUTE_BUDGET))
+        cost = sum(item_cost(item) for item in items)
+
+        rejection = await self._check_access(
+            client_ip, endpoint, cost, deadline, challenge_token, challenge_solution
+        )
+        if rejection is not None:
+            return rejection
+
+        priority = self._classify(client_ip, api_key)
+        return (200, self._fan_out(client_ip, endpoint, items, deadline, priority))
+
+    async def handle_stream(
+        self,
+        client_ip: str,
+        endpoint: str,
+        data: Dict[str, Any],
+        api_key: Optional[str] = None,
+        challenge_token: Optional[str] = None,
+        challenge_solution: Optional[str] = None
+    ) -> Tuple[int, Union[Dict[str, Any], RecordStream]]:
+        """
+        Process a gateway request whose response is streamed.
+
+        The first chunk of records is fetched within the deadline so the
+        status code is known before anything is sent. The admission slot
+        is held until the stream is closed.
+
+        Args:
+            client_ip: Client IP address
+            endpoint: Backend endpoint
+            data: Request data
+            api_key: API key sent by the client, if any
+            challenge_token: Proof-of-work challenge the client is answering
+            challenge_solution: Client's solution to that challenge
+
+        Returns:
+            (status_code, response_dict) on failure, otherwise
+            (200, RecordStream) of backend records
+        """
+        deadline = Deadline(self.route_budgets.get(endpoint, DEFAULT_ROUTE_BUDGET))
+
+        rejection = await self._check_access(
+            client_ip, endpoint, 1, deadline, challenge_token, challenge_solution
+        )
+        if rejection is not None:
+            return rejection
+
+        data, opened, rejection = self._resolve_cursor(client_ip, data)
+        if rejection is not None:
+            return rejection
+
+        release = None
+        if self.admission_queue is not None:
+            try:
+                with stage("queue"):
+                    await self.admission_queue.acquire(
+                        self._classify(client_ip, api_key), deadline.remaining()
+                    )
+            except AdmissionRejected as e:
+                return (503, ServiceUnavailableResponse(reason=e.reason).model_dump())
+            release = self.admission_queue.release
+
+        records = self.backend.stream_request(endpoint, data, deadline)
+        try:
+            with stage("backend"):
+                first_chunk = await asyncio.wait_for(
+                    asyncio.to_thread(take, records), timeout=deadline.remaining()
+                )
+        except (asyncio.TimeoutError, DeadlineExceeded):
+            failure = (504, GatewayTimeoutResponse().model_dump())
+        except Exception as e:
+            failure = (500, APIResponse(
+                success=False,
+                message="Error processing request",
+                error=str(e)
+            ).model_dump())
+        else:
+            if first_chunk and self.cursor_codec is not None:
+                seal_page(self.cursor_codec, client_ip, data, first_chunk[0], opened)
+            return (200, RecordStream(records, first_chunk, on_close=release))
+
+        if release is not None:
+            release()
+        return failure
+
+    async def _fan_out(
+        self,
+        client_ip: str,
+        endpoint: str,
+        items: List[Dict[str, Any]],
+        deadline: Deadline,
+        priority: Priority
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Run batch items concurrently, yielding each one as it completes."""
+        tasks = {
+            asyncio.ensure_future(
+                self._forward_admitted(client_ip, endpoint, item, deadline, priority)
+            ): index
+            for index, item in enumerate(items)
+        }
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    status_code, response = task.result()
+                    yield {"index": tasks[task], "status_code": status_code, "response": response}
+        finally:
+            # The client went away mid-stream
+            for task in pending:
+                task.cancel()
+
+    async def _check_access(
+        self,
+        client_ip: str,
+        endpoint: str,
+        cost: float,
+        deadline: Deadline,
+        challenge_token: Optional[str],
+        challenge_solution: Optional[str]
+    ) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """Apply rate limiting and challenges; return a rejection or None."""
+        # Check rate limit; a held or throttled wait counts towards the stage
+        with stage("limit"):
+            if not self.rate_limiter.is_allowed(client_ip, cost):
+                if not (
+                    await self.rate_limiter.hold(client_ip, cost, deadline.remaining())
+                    or await self._wait_for_token(client_ip, endpoint, deadline, cost)
+                ):
+                    return (429, RateLimitResponse().model_dump())
+
+        # Challenged requests still spend a token, so a crawler's bucket
+        # stays drained and it keeps paying for every request
+        with stage("challenge"):
+            issued = self._challenge(client_ip, endpoint, challenge_token, challenge_solution)
+        if issued is not None:
+            return (403, ChallengeResponse(**issued).model_dump())
+
+        return None
+
+    def _classify(self, client_ip: str, api_key: Optional[str]) -> Priority:
+        """Admission priority of a request."""
+        if self.classifier is None:
+            return Priority.NORMAL
+        return self.classifier.classify(client_ip, api_key)
+
+    async def _forward_admitted(
+        self,
+        client_ip: str,
+        endpoint: str,
+        data: Dict[str, Any],
+        deadline: Deadline,
+        priority: Priority
+    ) -> Tuple[int, Dict[str, Any]]:
+        """Resolve the cursor, wait for admission, then forward to the backend."""
+        data, opened, rejection = self._resolve_cursor(client_ip, data)
+        if rejection is not None:
+            return rejection
+
+        if self.admission_queue is None:
+            return await self._forward(client_ip, endpoint, data, deadline, opened)
+
+        try:
+            with stage("queue"):
+                await self.admission_queue.acquire(priority, deadline.remaining())
+        except AdmissionRejected as e:
+            return (503, ServiceUnavailableResponse(reason=e.reason).model_dump())
+
+        try:
+            return await self._forward(client_ip, endpoint, data, deadline, opened)
+        finally:
+            self.admission_queue.release()
+
+    def _resolve_cursor(
+        self,
+        client_ip: str,
+        data: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]], Optional[Tuple[int, Dict[str, Any]]]]:
+        """
+        Turn a request's cursor into the backend position it resumes after.
+
+        Returns:
+            Tuple of (backend request data, opened cursor or None,
+            rejection or None)
+        """
+        data, cursor = split_cursor(data)
+        if cursor is None or self.cursor_codec is None:
+            return data, None, None
+
+        with stage("cursor"):
+            return self._open_cursor(client_ip, data, cursor)
+
+    def _open_cursor(
+        self,
+        client_ip: str,
+        data: Dict[str, Any],
+        cursor: str
+    ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]], Optional[Tuple[int, Dict[str, Any]]]]:
+        """Verify a cursor and check its chain for parallel enumeration."""
+
+        try:
+            opened = self.cursor_codec.open(client_ip, data, cursor)
+        except InvalidCursor as e:
+            return data, None, (400, APIResponse(
+                success=False,
+                message="Invalid cursor",
+                error=str(e)
+            ).model_dump())
+
+        if self.enumeration_detector is not None:
+            reason = self.enumeration_detector.observe(
+                client_ip, opened["chain"], opened["sequence"], opened["issued_at"]
+            )
+            if reason is not None:
+                # Forks are refused only while they last; a client keeping
+                # too many chains going is marked as a scraper for a while
+                if reason == TOO_MANY_CHAINS and self.suspicion_tracker is not None:
+                    self.suspicion_tracker.flag(client_ip, ttl=self.enumeration_detector.flag_for)
+                return data, None, (429, RateLimitResponse().model_dump())
+
+        return {**data, "after": opened["after"]}, opened, None
+
+    def _challenge(
+        self,
+        client_ip: str,
+        endpoint: str,
+        token: Optional[str],
+        solution: Optional[str]
+    ) -> Optional[Dict[str, Any]]:
+        """Issue a puzzle to a suspected crawler without a valid solution."""
+        if self.challenge is None or endpoint not in self.challenged_routes:
+            return None
 
-        # Check rate limit
-        if not self.rate_limiter.is_allowed(client_ip):
-            return (429, RateLimitResponse().model_dump())
+        score = self.suspicion_tracker.score(client_ip)
+        if not self.challenge.requires_challenge(score):
+            return None
+        if token and solution and self.challenge.verify(client_ip, token, solution):
+            return None
+        return self.challenge.issue(client_ip, score)
 
-        # Forward to backend
+    async def _wait_for_token(
+        self,
+        client_ip: str,
+        endpoint: str,
+        deadline: Deadline,
+        cost: float
+    ) -> bool:
+        """Delay an over-limit request on a throttled route, if allowed."""
+        if self.throttle_queue is None or endpoint not in self.throttled_routes:
+            return False
+        return await self.throttle_queue.wait(client_ip, cost, max_delay=deadline.remaining())
+
+    async def _forward(
+        self,
+        client_ip: str,
+        endpoint: str,
+        data: Dict[str, Any],
+        deadline: Deadline,
+        opened: Optional[Dict[str, Any]] = None
+    ) -> Tuple[int, Dict[str, Any]]:
+        """Call the backend off the event loop and wrap its response."""
         try:
-            backend_response = self.backend.handle_request(endpoint, data)
-            response_time = time.time() - start_time
+            with stage("backend"):
+                backend_response = await self.hedged_backend.call(endpoint, data, deadline)
+
+            page_info = backend_response.get("data")
+            if self.cursor_codec is not None and isinstance(page_info, dict):
+                seal_page(self.cursor_codec, client_ip, data, page_info, opened)
 
             return (200, {
                 "success": True,
@@ -52,9 +439,10 @@ class GatewayRequestHandler:
                 "received_from_ip": client_ip
             })
 
-        except Exception as e:
-            response_time = time.time() - start_time
+        except DeadlineExceeded:
+            return (504, GatewayTimeoutResponse().model_dump())
 
+        except Exception as e:
             return (500, APIResponse(
                 success=False,
                 message="Error processing request",
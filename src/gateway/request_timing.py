@@ -0,0 +1,62 @@
+"""
+Request Timing Module
+Single responsibility: Time every request handled by the gateway.
+
+This module:
+- Opens a timing span around each HTTP request
+- Records the span's stage timings once the response starts, for
+  requests that went through at least one timed stage
+- Optionally reports them to the client in a Server-Timing header
+"""
+
+from src.metrics import MetricsManager, begin_span, current_span, end_span, server_timing
+
+
+class RequestTimingMiddleware:
+    """
+    ASGI middleware timing the stages of each request.
+
+    Stages are timed where they run (see ``src.metrics.timing.stage``);
+    this middleware only opens the span and collects it. Timings are
+    taken when the response headers go out, so a streamed body is not
+    included in "total". Requests that enter no stage, such as health
+    checks or metrics scrapes, are not recorded, so they do not dilute
+    the gateway's "total" latency.
+
+    Args:
+        app: Downstream ASGI app
+        metrics_manager: Receives the stage timings
+        header: Add a Server-Timing header to responses
+    """
+
+    def __init__(self, app, metrics_manager: MetricsManager, header: bool = False):
+        self.app = app
+        self.metrics_manager = metrics_manager
+        self.header = header
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = begin_span()
+        span = current_span()
+
+        async def send_timed(message) -> None:
+            if message["type"] == "http.response.start" and span.stages:
+                total_ns = span.elapsed_ns()
+                self.metrics_manager.record_stages(span, total_ns)
+                if self.header:
+                    message = {
+                        **message,
+                        "headers": [
+                            *message.get("headers", ()),
+                            (b"server-timing", server_timing(span, total_ns).encode()),
+                        ],
+                    }
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            end_span(token)
@@ -5,6 +5,7 @@ Single responsibility: Format responses consistently.
 This module ensures all API responses follow a consistent format.
 """
 
+import json
 from typing import Dict, Any
 from src.models import APIResponse
 
@@ -33,6 +34,11 @@ class ResponseFormatter:
             error=error
         ).model_dump()
 
+    @staticmethod
+    def ndjson_line(data: Dict[str, Any]) -> bytes:
+        """Format one record of a newline-delimited JSON stream."""
+        return json.dumps(data, separators=(",", ":")).encode() + b"\n"
+
     @staticmethod
     def gateway_info() -> Dict[str, Any]:
         """Format gateway info response."""
@@ -42,6 +48,7 @@ class ResponseFormatter:
             "documentation": "/docs",
             "available_endpoints": {
                 "POST /forward": "Forward request to backend service",
+                "POST /products/search/batch": "Run several product searches at once",
                 "GET /metrics": "View gateway metrics",
                 "GET /health": "Health check"
             }
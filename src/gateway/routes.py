@@ -5,21 +5,66 @@ Single responsibility: Define API routes/endpoints.
 This module registers all endpoints without containing business logic.
 """
 
-from fastapi import APIRouter, Request, Query
-from fastapi.responses import JSONResponse
+import asyncio
+import hmac
+import tracemalloc
+from time import perf_counter
+from typing import Dict, Iterable, Optional
 
-from src.rate_limiting import RateLimiter
-from src.metrics import MetricsManager
+from fastapi import APIRouter, Depends, HTTPException, Request, Query, Header
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+
+from src.rate_limiting import GossipNode, RateLimiter, ThrottleQueue
+from src.metrics import AccessLog, BLOCKED_DECISIONS, MetricsManager, stage
+from src.metrics import profiling
 from src.backend import BackendService
-from src.models import ProductSearchRequest, RateLimitResponse
+from src.admission import AdmissionQueue, PriorityClassifier
+from src.detection import EnumerationDetector, ProofOfWorkChallenge, SuspicionTracker
+from src.models import ProductSearchRequest, BatchSearchRequest, RateLimitResponse
+from .hedging import HedgedBackend
+from .tarpit import Tarpit
+from .pagination import CursorCodec
+from .streaming import RecordStreamResponse
 from .request_handler import GatewayRequestHandler
 from .response_formatter import ResponseFormatter
 
 
+SEARCH_ROUTE = "/products/search"
+BATCH_ROUTE = "/products/search/batch"
+# Prometheus text format content type
+EXPOSITION_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Upper bound on how long a debug endpoint may profile or trace
+MAX_DEBUG_SECONDS = 60.0
+
+
+def decision_of(status_code: int) -> str:
+    """Gateway decision behind a response status, for the request metrics."""
+    if status_code == 429:
+        return "rejected"
+    if status_code == 403:
+        return "challenged"
+    return "allowed"
+
+
 def create_routes(
     rate_limiter: RateLimiter,
     metrics_manager: MetricsManager,
-    backend_service: BackendService
+    backend_service: BackendService,
+    admission_queue: Optional[AdmissionQueue] = None,
+    classifier: Optional[PriorityClassifier] = None,
+    hedged_backend: Optional[HedgedBackend] = None,
+    route_budgets: Optional[Dict[str, float]] = None,
+    throttle_queue: Optional[ThrottleQueue] = None,
+    throttled_routes: Optional[Iterable[str]] = None,
+    suspicion_tracker: Optional[SuspicionTracker] = None,
+    tarpit: Optional[Tarpit] = None,
+    challenge: Optional[ProofOfWorkChallenge] = None,
+    challenged_routes: Optional[Iterable[str]] = None,
+    cursor_codec: Optional[CursorCodec] = None,
+    enumeration_detector: Optional[EnumerationDetector] = None,
+    access_log: Optional[AccessLog] = None,
+    admin_token: Optional[str] = None,
+    gossip: Optional[GossipNode] = None
 ) -> APIRouter:
     """
     Create and configure API routes.
@@ -28,14 +73,58 @@ def create_routes(
         rate_limiter: Rate limiter instance
         metrics_manager: Metrics manager instance
         backend_service: Backend service instance
+        admission_queue: Optional load-shedding queue in front of the backend
+        classifier: Assigns admission priority to requests
+        hedged_backend: Deadline-aware, optionally hedging backend caller
+        route_budgets: Latency budget in seconds per endpoint
+        throttle_queue: Queue that delays over-limit requests
+        throttled_routes: Endpoints that delay instead of rejecting
+        suspicion_tracker: Tracks clients flagged as scrapers
+        tarpit: Slow responder for flagged scrapers, reported in /metrics
+        challenge: Proof-of-work puzzle issuer and verifier
+        challenged_routes: Endpoints where suspected crawlers must solve a puzzle
+        cursor_codec: Signs and verifies pagination cursors
+        enumeration_detector: Spots clients paginating in parallel
+        access_log: Log that every request is appended to
+        admin_token: Enables the /admin crawler and debug endpoints for
+            requests that send it in an X-Admin-Token header
+        gossip: Cluster gossip node, reported in /metrics
 
     Returns:
         Configured APIRouter
     """
     router = APIRouter()
-    request_handler = GatewayRequestHandler(rate_limiter, backend_service)
+    request_handler = GatewayRequestHandler(
+        rate_limiter,
+        backend_service,
+        admission_queue,
+        classifier,
+        hedged_backend,
+        route_budgets,
+        throttle_queue,
+        throttled_routes,
+        challenge,
+        challenged_routes,
+        suspicion_tracker,
+        cursor_codec,
+        enumeration_detector
+    )
     formatter = ResponseFormatter()
 
+    def record(
+        client_ip: str,
+        route: str,
+        status_code: int,
+        decision: str,
+        response_time: float = 0.0
+    ) -> None:
+        """Count a finished request in the metrics and the access log."""
+        metrics_manager.record_request(
+            decision in BLOCKED_DECISIONS, response_time, route, status_code, decision
+        )
+        if access_log is not None:
+            access_log.append(client_ip, route, decision, status_code, response_time)
+
     @router.get("/")
     async def root():
         """Gateway info endpoint."""
@@ -46,42 +135,187 @@ def create_routes(
         """Health check endpoint."""
         return {"status": "healthy", "service": "api-gateway"}
 
-    @router.get("/products/search")
+    @router.get(SEARCH_ROUTE)
     async def search_products(
         request: Request,
         category: str = Query(..., description="Product category"),
+        q: Optional[str] = Query(
+            None,
+            min_length=1,
+            max_length=100,
+            description="Words the product name must contain; the last, if two or more characters, may be a prefix"
+        ),
         page: int = Query(1, ge=1, description="Page number"),
-        limit: int = Query(20, ge=1, le=50, description="Results per page")
+        limit: int = Query(20, ge=1, le=50, description="Results per page"),
+        cursor: Optional[str] = Query(
+            None,
+            max_length=512,
+            description="next_cursor of the previous page; takes precedence over page"
+        ),
+        sort_by: str = Query(
+            "relevance",
+            pattern="^(relevance|price_asc|price_desc)$",
+            description="Sort order"
+        ),
+        in_stock: Optional[bool] = Query(None, description="Only products with this stock status"),
+        min_price: Optional[float] = Query(None, ge=0, description="Minimum price"),
+        max_price: Optional[float] = Query(None, ge=0, description="Maximum price"),
+        accept: Optional[str] = Header(None),
+        x_api_key: Optional[str] = Header(None, description="API key of an authenticated client"),
+        x_pow_challenge: Optional[str] = Header(None, description="Proof-of-work challenge being answered"),
+        x_pow_solution: Optional[str] = Header(None, description="Solution to the proof-of-work challenge")
     ):
         """
         Search for products by category.
 
         This endpoint demonstrates rate limiting to protect against web crawlers.
         Crawlers trying to scrape all products get rate limited after ~100 requests.
+        With challenges enabled, suspected crawlers get a 403 with a proof-of-work
+        puzzle and must send its solution in the X-PoW-* headers.
+
+        With ``Accept: application/x-ndjson`` the page is streamed instead:
+        the first line holds the pagination info, then one line per product.
+
+        Every page carries a ``next_cursor``. Sending it back fetches the
+        next page by seeking in the sorted index, however deep the page.
+        Cursors are signed, bound to the client and to the query, and
+        clients walking many cursor chains at once are flagged for a while.
 
         Args:
             category: Product category (electronics, clothing, books, home)
+            q: Text to match against product names, e.g. "usb ca"
             page: Page number for pagination (default: 1)
             limit: Results per page (default: 20, max: 50)
+            cursor: Cursor of the next page, from a previous response
+            sort_by: relevance, price_asc or price_desc
+            in_stock: Only in-stock (true) or out-of-stock (false) products
+            min_price: Minimum price
+            max_price: Maximum price
+        """
+        started = perf_counter()
+        client_ip = request.client.host
+
+        # Flagged scrapers are tarpitted by middleware when enabled and
+        # not full; otherwise they get a fast 429 without backend work
+        if suspicion_tracker is not None and suspicion_tracker.is_flagged(client_ip):
+            record(client_ip, SEARCH_ROUTE, 429, "flagged")
+            return JSONResponse(status_code=429, content=RateLimitResponse().model_dump())
+
+        handle = request_handler.handle
+        streaming = accept is not None and "application/x-ndjson" in accept
+        if streaming:
+            handle = request_handler.handle_stream
+
+        status_code, response_data = await handle(
+            client_ip=client_ip,
+            endpoint="/products/search",
+            data={
+                "category": category,
+                "q": q,
+                "page": page,
+                "limit": limit,
+                "cursor": cursor,
+                "sort_by": sort_by,
+                "in_stock": in_stock,
+                "min_price": min_price,
+                "max_price": max_price
+            },
+            api_key=x_api_key,
+            challenge_token=x_pow_challenge,
+            challenge_solution=x_pow_solution
+        )
+
+        if streaming and status_code == 200:
+            # Records are serialized as they are sent, after the headers
+            record(client_ip, SEARCH_ROUTE, 200, "allowed", perf_counter() - started)
+            return RecordStreamResponse(response_data, formatter.ndjson_line)
+
+        with stage("serialize"):
+            response = JSONResponse(status_code=status_code, content=response_data)
+        record(client_ip, SEARCH_ROUTE, status_code, decision_of(status_code), perf_counter() - started)
+        return response
+
+    @router.post(BATCH_ROUTE)
+    async def search_products_batch(
+        request: Request,
+        batch: BatchSearchRequest,
+        accept: Optional[str] = Header(None),
+        x_api_key: Optional[str] = Header(None, description="API key of an authenticated client"),
+        x_pow_challenge: Optional[str] = Header(None, description="Proof-of-work challenge being answered"),
+        x_pow_solution: Optional[str] = Header(None, description="Solution to the proof-of-work challenge")
+    ):
+        """
+        Run several product searches in one round trip.
+
+        The rate limiter is charged once for the whole batch (one token per
+        item, more for pages above 20 results) and the searches run
+        concurrently. Results come back in request order as JSON, or, with
+        ``Accept: application/x-ndjson``, streamed one line per search as
+        each completes, tagged with its index.
         """
+        started = perf_counter()
         client_ip = request.client.host
 
-        status_code, response_data = request_handler.handle(
+        if suspicion_tracker is not None and suspicion_tracker.is_flagged(client_ip):
+            record(client_ip, BATCH_ROUTE, 429, "flagged")
+            return JSONResponse(status_code=429, content=RateLimitResponse().model_dump())
+
+        status_code, result = await request_handler.handle_batch(
             client_ip=client_ip,
             endpoint="/products/search",
-            data={"category": category, "page": page, "limit": limit}
+            items=[query.model_dump() for query in batch.queries],
+            api_key=x_api_key,
+            challenge_token=x_pow_challenge,
+            challenge_solution=x_pow_solution
         )
+        if status_code != 200:
+            record(client_ip, BATCH_ROUTE, status_code, decision_of(status_code), perf_counter() - started)
+            return JSONResponse(status_code=status_code, content=result)
 
-        # Record metrics
-        was_blocked = status_code == 429
-        metrics_manager.record_request(was_blocked, 0.0)  # Time recorded in handler
+        if accept and "application/x-ndjson" in accept:
+            # Searches complete while the body streams; only the start is timed
+            record(client_ip, BATCH_ROUTE, 200, "allowed", perf_counter() - started)
+            return StreamingResponse(
+                (formatter.ndjson_line(part) async for part in result),
+                media_type="application/x-ndjson"
+            )
 
-        return JSONResponse(status_code=status_code, content=response_data)
+        parts = [None] * len(batch.queries)
+        async for part in result:
+            parts[part["index"]] = part
+        with stage("serialize"):
+            response = JSONResponse(content=formatter.success(
+                f"Batch of {len(parts)} searches", {"results": parts}, client_ip
+            ))
+        record(client_ip, BATCH_ROUTE, 200, "allowed", perf_counter() - started)
+        return response
 
     @router.get("/metrics")
     async def get_metrics():
         """Get gateway metrics."""
-        return metrics_manager.get_metrics()
+        metrics = metrics_manager.get_metrics()
+        if admission_queue is not None:
+            metrics["admission"] = admission_queue.get_stats()
+        metrics["backend"] = request_handler.hedged_backend.get_stats()
+        if throttle_queue is not None:
+            metrics["throttle"] = throttle_queue.get_stats()
+        if tarpit is not None:
+            metrics["tarpit"] = tarpit.get_stats()
+        if enumeration_detector is not None:
+            metrics["enumeration"] = enumeration_detector.get_stats()
+        if access_log is not None:
+            metrics["access_log"] = access_log.get_stats()
+        if gossip is not None:
+            metrics["gossip"] = gossip.get_stats()
+        return metrics
+
+    @router.get("/metrics/prometheus", response_class=PlainTextResponse)
+    async def get_prometheus_metrics():
+        """Request counters and duration histograms in Prometheus text format."""
+        return PlainTextResponse(
+            metrics_manager.render_prometheus(),
+            media_type=EXPOSITION_TYPE
+        )
 
     @router.post("/reset-metrics")
     async def reset_metrics():
@@ -98,4 +332,111 @@ def create_routes(
             "rate_limit_status": stats
         }
 
+    if admin_token is not None:
+        def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+            """Reject admin requests without the admin token."""
+            if x_admin_token is None or not hmac.compare_digest(x_admin_token, admin_token):
+                raise HTTPException(status_code=403, detail="Admin token required")
+
+        if suspicion_tracker is not None:
+            @router.get("/admin/crawlers", dependencies=[Depends(require_admin)])
+            async def list_crawlers():
+                """List clients flagged as scrapers."""
+                return {"flagged": suspicion_tracker.get_flagged()}
+
+            @router.post("/admin/crawlers/{client_ip}", dependencies=[Depends(require_admin)])
+            async def flag_crawler(client_ip: str):
+                """Flag a client as a confirmed scraper."""
+                suspicion_tracker.flag(client_ip)
+                return {"client_ip": client_ip, "flagged": True}
+
+            @router.delete("/admin/crawlers/{client_ip}", dependencies=[Depends(require_admin)])
+            async def unflag_crawler(client_ip: str):
+                """Clear a client's scraper flag."""
+                suspicion_tracker.unflag(client_ip)
+                return {"client_ip": client_ip, "flagged": False}
+
+        profiler = profiling.SamplingProfiler()
+
+        def metrics_entries() -> Dict[str, int]:
+            # Counted from this process's own tables; nothing is merged
+            collector, windows = metrics_manager.collector, metrics_manager.windows
+            return {
+                "request_series": collector.requests.series_count(),
+                "duration_series": collector.durations.series_count(),
+                "stage_histograms": len(metrics_manager.stages.histograms),
+                "histogram_buckets": len(windows.layout.counts),
+                "window_seconds": windows.horizon,
+            }
+
+        # Memory accounting: (subsystem, object graph, entry count)
+        subsystems = [
+            ("rate_limiter", rate_limiter.clients, lambda: len(rate_limiter.clients)),
+            ("metrics", metrics_manager, metrics_entries),
+            ("backend", backend_service, lambda: None),
+            ("hedging", request_handler.hedged_backend, lambda: len(request_handler.hedged_backend.tracker.samples)),
+        ]
+        if suspicion_tracker is not None:
+            subsystems.append(("suspicion", suspicion_tracker, lambda: len(suspicion_tracker.flagged)))
+        if enumeration_detector is not None:
+            subsystems.append(("enumeration", enumeration_detector, lambda: len(enumeration_detector.clients)))
+        if admission_queue is not None:
+            subsystems.append(("admission_queue", admission_queue, lambda: admission_queue.get_stats()["queue_depth"]))
+        if throttle_queue is not None:
+            subsystems.append(("throttle_queue", throttle_queue, lambda: throttle_queue.get_stats()["waiting"]))
+        if tarpit is not None:
+            subsystems.append(("tarpit", tarpit, lambda: tarpit.active))
+        if access_log is not None:
+            subsystems.append(("access_log", access_log, lambda: access_log.get_stats()["buffered"]))
+
+        @router.get("/admin/debug/profile", dependencies=[Depends(require_admin)])
+        async def profile_cpu(
+            seconds: float = Query(5.0, gt=0, le=MAX_DEBUG_SECONDS, description="How long to sample"),
+            interval_ms: float = Query(5.0, ge=1, le=1000, description="Milliseconds between samples"),
+            format: str = Query("collapsed", pattern="^(collapsed|json)$", description="collapsed or json")
+        ):
+            """
+            Sample this worker's threads and return where they spent time.
+
+            The sampler runs in its own thread only for the length of the
+            request; the event loop keeps serving traffic meanwhile, and is
+            profiled along with it. ``collapsed`` returns one
+            "frame;frame;frame count" line per stack for flamegraph.pl or
+            speedscope, ``json`` a d3-flame-graph tree.
+            """
+            try:
+                stacks = await asyncio.to_thread(profiler.profile, seconds, interval_ms / 1000)
+            except profiling.ProfilerBusy as e:
+                raise HTTPException(status_code=409, detail=str(e))
+            if format == "json":
+                return {"samples": sum(stacks.values()), "tree": profiling.flame_tree(stacks)}
+            return PlainTextResponse(profiling.collapsed(stacks))
+
+        @router.get("/admin/debug/memory", dependencies=[Depends(require_admin)])
+        async def memory_footprint(
+            trace_seconds: float = Query(
+                0.0, ge=0, le=MAX_DEBUG_SECONDS,
+                description="Trace allocations for this long; 0 skips tracing unless already on"
+            ),
+            top: int = Query(20, ge=1, le=200, description="Allocation sites reported")
+        ):
+            """
+            Estimate memory held per subsystem, with optional allocation tracing.
+
+            Sizes follow each subsystem's object graph, sampling large
+            tables; objects shared between subsystems are counted once,
+            under the first. Memory-mapped files are not counted.
+            """
+            seen = set()
+            footprint = {}
+            for name, graph, entries in subsystems:
+                footprint[name] = {
+                    "entries": entries(),
+                    "estimated_bytes": profiling.estimate_size(graph, seen=seen),
+                }
+            report = {"subsystems": footprint, "tracemalloc": None}
+            if trace_seconds > 0 or tracemalloc.is_tracing():
+                report["tracemalloc"] = await profiling.trace_allocations(trace_seconds, top)
+            return report
+
     return router
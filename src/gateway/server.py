@@ -0,0 +1,510 @@
+"""
+Server Module
+Single responsibility: Run the gateway as a multi-worker server process.
+
+This module:
+- Reads settings from GATEWAY_* environment variables and the command line
+- Builds the app through a factory, so any ASGI server can load it
+- Prepares state the workers share (metrics file, signing secrets) once,
+  in the parent, before forking
+- Pre-forks worker processes that each bind the port with SO_REUSEPORT,
+  letting the kernel spread connections over them
+- Splits every rate limit evenly over the workers, which keep their
+  own buckets
+- Uses uvloop and httptools when installed
+- Drains on SIGTERM: workers stop accepting, finish in-flight requests
+  and exit; stragglers are killed after a timeout
+- Reloads the rate limit policy file on SIGHUP, in every worker
+- Joins workers and nodes into one gossip cluster in cluster mode
+
+Usage:
+    python -m src.gateway.server --workers 4 --port 8000
+    GATEWAY_WORKERS=4 python main.py
+    uvicorn --factory src.gateway.server:app_from_env   # one process only
+"""
+
+import argparse
+import importlib.util
+import logging
+import os
+import random
+import secrets
+import signal
+import socket
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import uvicorn
+from fastapi import FastAPI
+
+from src.metrics import MetricsFile
+from .app import create_app
+
+
+logger = logging.getLogger("gateway.server")
+
+ENV_PREFIX = "GATEWAY_"
+
+
+def _flag(value: str) -> bool:
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _list(value: str) -> List[str]:
+    """Comma-separated values, e.g. "/products/search,/products/search/batch"."""
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _budgets(value: str) -> Dict[str, float]:
+    """Comma-separated route=seconds pairs, e.g. "/products/search=0.5"."""
+    budgets = {}
+    for item in _list(value):
+        route, sep, seconds = item.rpartition("=")
+        if not sep or not route:
+            raise ValueError(f"Route budget {item!r} is not route=seconds")
+        budgets[route.strip()] = float(seconds)
+    return budgets
+
+
+# Setting name, type, default and help; each is also read from GATEWAY_<NAME>
+SETTINGS = (
+    ("host", str, "0.0.0.0", "Address to listen on"),
+    ("port", int, 8000, "Port to listen on"),
+    ("workers", int, 1, "Worker processes"),
+    ("capacity", int, 100, "Rate limit capacity per client"),
+    ("refill_rate", float, 0.167, "Tokens refilled per second per client"),
+    ("policy_file", str, None, "Rate limit policy file, reloaded on change or SIGHUP"),
+    ("max_concurrency", int, 64, "Max requests in flight to the backend per worker"),
+    ("max_queue_size", int, 256, "Max requests waiting for admission per worker"),
+    ("allowlist", _list, None, "Comma-separated client IPs admitted ahead of everyone else"),
+    ("api_keys", _list, None, "Comma-separated API keys marking a client as authenticated"),
+    ("backend_replicas", int, 1, "Backend replicas to spread calls over"),
+    ("hedging", _flag, False, "Send a backup backend request when a call is slower than p95"),
+    ("route_budgets", _budgets, None, "Comma-separated endpoint=seconds latency budgets"),
+    ("throttled_routes", _list, None, "Comma-separated endpoints that delay over-limit requests instead of a 429"),
+    ("max_throttle_delay", float, 1.0, "Longest an over-limit request may be delayed, in seconds"),
+    ("challenged_routes", _list, None, "Comma-separated endpoints where suspected crawlers solve a puzzle"),
+    ("max_cursor_chains", int, 8, "Cursor chains a client may walk at once before it is flagged"),
+    ("enumeration_detection", _flag, True, "Watch cursor chains for parallel enumeration"),
+    ("request_timing", _flag, True, "Time the pipeline stages of every request"),
+    ("server_timing", _flag, False, "Send stage timings back in a Server-Timing header"),
+    ("catalog", str, None, "Catalog file from src.backend.catalog_build"),
+    ("metrics_file", str, None, "Metrics file shared by the workers; a temporary one if omitted"),
+    ("access_log", str, None, "Access log path; each worker appends .<worker> to it"),
+    ("access_log_format", str, "binary", "binary or jsonl"),
+    ("tarpit", _flag, False, "Tarpit flagged scrapers"),
+    ("admin_token", str, None, "Token enabling the /admin/debug endpoints"),
+    ("challenge_secret", str, None, "Puzzle signing key (hex); generated once for all workers if omitted"),
+    ("cursor_secret", str, None, "Cursor signing key (hex); generated once for all workers if omitted"),
+    ("gossip_bind", str, None, "This node's gossip host:port as peers reach it; enables cluster mode"),
+    ("gossip_peers", str, None, "Comma-separated host:port gossip addresses of the other nodes"),
+    ("gossip_interval", float, 0.25, "Seconds between usage broadcasts"),
+    ("gossip_error", float, 0.1, "Cluster over-admission allowed between syncs, as a fraction of capacity"),
+    ("gossip_secret", str, None, "Gossip signing key (hex), the same on every node; required with gossip peers"),
+    ("drain_timeout", float, 30.0, "Seconds workers get to finish requests after SIGTERM"),
+    ("log_level", str, "info", "Log level"),
+)
+
+
+def load_settings(argv: Optional[Sequence[str]] = None, environ: Optional[Dict[str, str]] = None) -> argparse.Namespace:
+    """
+    Read settings from the command line, falling back to the environment.
+
+    Args:
+        argv: Command line arguments; sys.argv[1:] if omitted
+        environ: Environment; os.environ if omitted
+
+    Returns:
+        Namespace with one attribute per entry of SETTINGS
+    """
+    environ = os.environ if environ is None else environ
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    for name, kind, default, help_text in SETTINGS:
+        env_name = ENV_PREFIX + name.upper()
+        if env_name in environ:
+            default = kind(environ[env_name])
+        option = "--" + name.replace("_", "-")
+        if kind is _flag:
+            parser.add_argument(
+                option, action=argparse.BooleanOptionalAction, default=default, help=f"{help_text} [{env_name}]"
+            )
+        else:
+            parser.add_argument(option, type=kind, default=default, help=f"{help_text} [{env_name}]")
+    return parser.parse_args(argv)
+
+
+def build_app(settings: argparse.Namespace, worker: Optional[int] = None) -> FastAPI:
+    """
+    App factory: a gateway app configured from settings.
+
+    Args:
+        settings: From load_settings
+        worker: Worker number, used to give each worker its own access log
+
+    Returns:
+        Configured FastAPI app
+    """
+    access_log_path = settings.access_log
+    if access_log_path and worker is not None:
+        access_log_path = f"{access_log_path}.{worker}"
+    gossip_bind, gossip_peers = gossip_addresses(settings, worker)
+    return create_app(
+        capacity=settings.capacity,
+        refill_rate=settings.refill_rate,
+        limit_share=limit_share(settings, worker),
+        max_concurrency=settings.max_concurrency,
+        max_queue_size=settings.max_queue_size,
+        allowlist=settings.allowlist,
+        api_keys=settings.api_keys,
+        backend_replicas=settings.backend_replicas,
+        hedging=settings.hedging,
+        route_budgets=settings.route_budgets,
+        throttled_routes=settings.throttled_routes,
+        max_throttle_delay=settings.max_throttle_delay,
+        challenged_routes=settings.challenged_routes,
+        max_cursor_chains=settings.max_cursor_chains,
+        enumeration_detection=settings.enumeration_detection,
+        request_timing=settings.request_timing,
+        server_timing=settings.server_timing,
+        catalog_path=settings.catalog,
+        metrics_file=settings.metrics_file,
+        access_log_path=access_log_path,
+        access_log_format=settings.access_log_format,
+        tarpit=settings.tarpit,
+        admin_token=settings.admin_token,
+        policy_file=settings.policy_file,
+        gossip_bind=gossip_bind,
+        gossip_peers=gossip_peers,
+        gossip_interval=settings.gossip_interval,
+        gossip_error=settings.gossip_error,
+        gossip_secret=_secret(settings.gossip_secret),
+        challenge_secret=_secret(settings.challenge_secret),
+        cursor_secret=_secret(settings.cursor_secret),
+    )
+
+
+def limit_share(settings: argparse.Namespace, worker: Optional[int] = None) -> float:
+    """
+    Fraction of each client's rate limit a worker enforces.
+
+    Workers keep their own buckets, and the kernel spreads a client's
+    connections over them, so each gets 1/workers of every limit and
+    together they never admit more than one bucket would. The price: a
+    client whose connections all land on one worker gets only that
+    worker's share. In cluster mode workers gossip their usage instead
+    and enforce the whole limit.
+
+    Args:
+        settings: From load_settings
+        worker: Worker number; None when it is the only process
+    """
+    if worker is None or settings.gossip_bind:
+        return 1.0
+    return 1.0 / settings.workers
+
+
+def gossip_addresses(settings: argparse.Namespace, worker: Optional[int] = None) -> Tuple[Optional[str], List[str]]:
+    """
+    A worker's gossip address and its peers'.
+
+    Every worker limits on its own, so each is a gossip node: worker N
+    binds the gossip port plus N. Every node is assumed to run the same
+    number of workers, so a peer node's workers are found the same way.
+
+    Args:
+        settings: From load_settings
+        worker: Worker number; None when it is the only process
+
+    Returns:
+        The address to bind ("host:port", None outside cluster mode) and
+        the addresses of every other worker in the cluster
+    """
+    if not settings.gossip_bind:
+        return None, []
+    workers = settings.workers if worker is not None else 1
+    worker = worker or 0
+    host, _, port = settings.gossip_bind.rpartition(":")
+    nodes = [(host, int(port))]
+    for peer in (settings.gossip_peers or "").split(","):
+        if peer.strip():
+            peer_host, _, peer_port = peer.strip().rpartition(":")
+            nodes.append((peer_host, int(peer_port)))
+    addresses = [f"{h}:{p + n}" for h, p in nodes for n in range(workers)]
+    bind = addresses.pop(worker)
+    return bind, addresses
+
+
+def app_from_env() -> FastAPI:
+    """
+    App factory for ASGI servers: settings come from GATEWAY_* variables only.
+
+    The app is a single process. Nothing is shared with other processes
+    the ASGI server may start (``uvicorn --workers``): each would get its
+    own signing keys and the full rate limit. Run several workers with
+    ``python main.py --workers N`` instead.
+
+    Raises:
+        ValueError: If GATEWAY_WORKERS asks for more than one worker, or
+            the settings are invalid (see prepare_shared_state)
+    """
+    settings = load_settings([])
+    if settings.workers > 1:
+        raise ValueError(
+            f"GATEWAY_WORKERS={settings.workers} needs the built-in launcher: python main.py --workers N"
+        )
+    prepare_shared_state(settings)
+    return build_app(settings)
+
+
+def _secret(value: Optional[str]) -> Optional[bytes]:
+    return bytes.fromhex(value) if value else None
+
+
+def prepare_shared_state(settings: argparse.Namespace) -> List[str]:
+    """
+    Set up what every worker must share, before any worker exists.
+
+    Workers started from the same settings then agree on:
+    - the metrics file, created and zeroed once so workers only attach
+    - the puzzle and cursor signing keys, so a cursor or challenge
+      issued by one worker verifies on whichever worker gets the next
+      request
+    - the gossip signing key, so the workers accept each other's usage
+
+    Args:
+        settings: Updated in place with the shared values
+
+    Returns:
+        Files created here, to remove on exit
+
+    Raises:
+        ValueError: If gossip peers are set without a gossip key; a key
+            made up here would be unknown to the other nodes
+    """
+    if settings.gossip_bind and not settings.gossip_secret:
+        if settings.gossip_peers:
+            raise ValueError(
+                "--gossip-secret (GATEWAY_GOSSIP_SECRET) must be set, the same on every node, to gossip with peers"
+            )
+        settings.gossip_secret = secrets.token_hex(32)
+    created = []
+    if settings.workers > 1 and not settings.metrics_file:
+        # A fresh, private file: a predictable name could be planted first
+        fd, settings.metrics_file = tempfile.mkstemp(prefix="gateway-metrics-")
+        os.close(fd)
+        created.append(settings.metrics_file)
+    if settings.metrics_file:
+        metrics_file = MetricsFile(settings.metrics_file)
+        metrics_file.reset()
+        metrics_file.close()
+    if settings.workers > 1:
+        settings.challenge_secret = settings.challenge_secret or secrets.token_hex(32)
+        settings.cursor_secret = settings.cursor_secret or secrets.token_hex(32)
+    return created
+
+
+def event_loop() -> str:
+    """uvloop if installed, else asyncio."""
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def http_protocol() -> str:
+    """httptools if installed, else h11."""
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def listen_socket(host: str, port: int, reuse_port: bool = True) -> socket.socket:
+    """
+    A listening TCP socket.
+
+    Args:
+        host: Address to bind
+        port: Port to bind
+        reuse_port: Set SO_REUSEPORT, so several processes can each
+            bind the port and the kernel balances connections over them
+
+    Returns:
+        Bound, listening socket
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+class Supervisor:
+    """
+    Pre-forks workers and keeps them running until told to stop.
+
+    Each worker binds its own SO_REUSEPORT socket. Where the platform
+    lacks SO_REUSEPORT, the parent binds one socket and every worker
+    accepts from it instead. Workers that die unexpectedly are replaced.
+    On SIGTERM or SIGINT every worker is sent SIGTERM, which uvicorn
+    answers by closing its listener and finishing in-flight requests;
+    workers still running after ``drain_timeout`` are killed. SIGHUP is
+    passed on to every worker.
+
+    Args:
+        settings: From load_settings, after prepare_shared_state
+    """
+
+    def __init__(self, settings: argparse.Namespace):
+        self.settings = settings
+        self.reuse_port = hasattr(socket, "SO_REUSEPORT")
+        self.workers: Dict[int, int] = {}
+        self.stopping = False
+        self._shared_socket: Optional[socket.socket] = None
+
+    def run(self) -> int:
+        """Start the workers and supervise them; returns an exit status."""
+        if not self.reuse_port:
+            self._shared_socket = listen_socket(self.settings.host, self.settings.port, reuse_port=False)
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        signal.signal(signal.SIGHUP, self._forward)
+
+        for worker in range(self.settings.workers):
+            self._spawn(worker)
+        logger.info(
+            "Started %d workers on %s:%d (%s, %s)", len(self.workers), self.settings.host,
+            self.settings.port, event_loop(), http_protocol()
+        )
+
+        while self.workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            worker = self.workers.pop(pid, None)
+            if worker is not None and not self.stopping:
+                logger.warning(
+                    "Worker %d (pid %d) exited with %d; restarting",
+                    worker, pid, os.waitstatus_to_exitcode(status)
+                )
+                time.sleep(0.1)
+                self._spawn(worker)
+        return 0
+
+    def _spawn(self, worker: int) -> None:
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = worker
+            return
+        status = 1
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            # Until its app is built, a SIGHUP forwarded for a policy
+            # reload must not kill the worker; reload_on_hangup takes over
+            signal.signal(signal.SIGHUP, signal.SIG_IGN)
+            serve_worker(self.settings, worker, self._shared_socket)
+            status = 0
+        except Exception:
+            logger.exception("Worker %d failed", worker)
+        finally:
+            os._exit(status)
+
+    def _stop(self, signum: int, frame) -> None:
+        if self.stopping:
+            return
+        self.stopping = True
+        logger.info("Draining %d workers", len(self.workers))
+        for pid in self.workers:
+            _kill(pid, signal.SIGTERM)
+        # Past the drain timeout, whatever is still running is killed
+        signal.signal(signal.SIGALRM, self._kill_stragglers)
+        signal.setitimer(signal.ITIMER_REAL, self.settings.drain_timeout + 1)
+
+    def _forward(self, signum: int, frame) -> None:
+        for pid in self.workers:
+            _kill(pid, signum)
+
+    def _kill_stragglers(self, signum: int, frame) -> None:
+        for pid in self.workers:
+            logger.warning("Killing worker pid %d after the drain timeout", pid)
+            _kill(pid, signal.SIGKILL)
+
+
+def _kill(pid: int, signum: int) -> None:
+    try:
+        os.kill(pid, signum)
+    except ProcessLookupError:
+        pass
+
+
+def reload_on_hangup(reloader) -> None:
+    """
+    Make SIGHUP reload the policy file, or ignore it if there is none.
+
+    The supervisor passes SIGHUP on to every worker; one started without
+    a policy file would otherwise be killed by it.
+
+    Args:
+        reloader: The app's PolicyReloader, or None
+    """
+    if reloader is None:
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    else:
+        signal.signal(signal.SIGHUP, lambda signum, frame: reloader.reload())
+
+
+def serve_worker(
+    settings: argparse.Namespace,
+    worker: Optional[int] = None,
+    shared_socket: Optional[socket.socket] = None
+) -> None:
+    """
+    Run one worker: build its app and serve until SIGTERM.
+
+    Args:
+        settings: From load_settings
+        worker: Worker number; None when it is the only process
+        shared_socket: Socket to accept from; a SO_REUSEPORT socket of
+            this worker's own is bound if omitted
+    """
+    # Forked workers would otherwise share the parent's random state
+    random.seed()
+    app = build_app(settings, worker)
+    reload_on_hangup(app.state.policy_reloader)
+    sock = shared_socket or listen_socket(settings.host, settings.port)
+    config = uvicorn.Config(
+        app,
+        loop=event_loop(),
+        http=http_protocol(),
+        log_level=settings.log_level,
+        timeout_graceful_shutdown=int(settings.drain_timeout),
+    )
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    settings = load_settings(argv)
+    logging.basicConfig(level=settings.log_level.upper(), format="%(levelname)s: %(message)s")
+    try:
+        created = prepare_shared_state(settings)
+    except ValueError as exc:
+        sys.exit(f"gateway: {exc}")
+    try:
+        if settings.workers <= 1:
+            serve_worker(settings)
+            status = 0
+        else:
+            status = Supervisor(settings).run()
+    finally:
+        for path in created:
+            if os.path.exists(path):
+                os.remove(path)
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Streaming Module
+Single responsibility: Stream backend records to the client incrementally.
+
+This module:
+- Pulls records from a blocking backend iterator in chunks, off the event loop
+- Only pulls the next chunk once the previous one was sent (backpressure)
+- Frees the request's resources when the response ends, however it ends
+"""
+
+import asyncio
+from itertools import islice
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from fastapi.responses import StreamingResponse
+
+
+STREAM_CHUNK_SIZE = 256
+
+
+def take(records: Iterator[Dict[str, Any]], count: int = STREAM_CHUNK_SIZE) -> List[Dict[str, Any]]:
+    """Pull up to ``count`` records from a blocking iterator."""
+    return list(islice(records, count))
+
+
+class RecordStream:
+    """
+    Async iterator of record chunks over a blocking backend iterator.
+
+    At most one chunk is in memory at a time: the next chunk is only
+    pulled when the consumer asks for it, i.e. once the previous one has
+    been handed to the server.
+
+    Args:
+        records: Backend record iterator, partially consumed
+        first_chunk: Records already pulled to decide the status code
+        on_close: Called exactly once when the stream is finished
+    """
+
+    def __init__(
+        self,
+        records: Iterator[Dict[str, Any]],
+        first_chunk: List[Dict[str, Any]],
+        on_close: Optional[Callable[[], None]] = None
+    ):
+        self.records = records
+        self.first_chunk = first_chunk
+        self.on_close = on_close
+        self.closed = False
+
+    def __aiter__(self) -> AsyncIterator[List[Dict[str, Any]]]:
+        return self._chunks()
+
+    async def _chunks(self) -> AsyncIterator[List[Dict[str, Any]]]:
+        chunk = self.first_chunk
+        self.first_chunk = []
+        while chunk:
+            yield chunk
+            if len(chunk) < STREAM_CHUNK_SIZE:
+                return
+            try:
+                chunk = await asyncio.to_thread(take, self.records)
+            except Exception as e:
+                # Headers are already sent; report the failure in-band
+                yield [{"status": "error", "error": str(e) or type(e).__name__}]
+                return
+
+    def close(self) -> None:
+        """Stop the backend iterator and release the request's resources."""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.records.close()
+        except (AttributeError, ValueError):
+            # Not a generator, or still running in a worker thread after a
+            # disconnect; it is closed when garbage collected instead
+            pass
+        if self.on_close is not None:
+            self.on_close()
+
+
+class RecordStreamResponse(StreamingResponse):
+    """
+    Streaming response that always closes its RecordStream.
+
+    Args:
+        stream: Record stream to send
+        encode: Turns one record into bytes
+        media_type: Response content type
+    """
+
+    def __init__(
+        self,
+        stream: RecordStream,
+        encode: Callable[[Dict[str, Any]], bytes],
+        media_type: str = "application/x-ndjson"
+    ):
+        super().__init__(self._encode(stream, encode), media_type=media_type)
+        self.stream = stream
+
+    @staticmethod
+    async def _encode(stream: RecordStream, encode: Callable[[Dict[str, Any]], bytes]) -> AsyncIterator[bytes]:
+        async for chunk in stream:
+            yield b"".join(encode(record) for record in chunk)
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.stream.close()
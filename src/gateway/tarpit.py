@@ -0,0 +1,170 @@
+"""
+Tarpit Module
+Single responsibility: Hold confirmed scrapers' connections open cheaply.
+
+A fast 429 tells a scraper to rotate to its next IP straight away. A
+tarpit instead answers very slowly, tying up the scraper's connection
+while costing the gateway almost nothing:
+- No backend work and no threads, only a timer on the event loop per tick
+- A hard cap on concurrent tarpitted connections
+- Intercepted as raw ASGI ahead of routing, so a held connection is a
+  couple of small coroutines; the final body is shared
+"""
+
+import asyncio
+import json
+import random
+from typing import Iterable, Optional
+
+from fastapi.responses import Response
+
+from src.detection import SuspicionTracker
+from src.metrics import AccessLog, MetricsManager
+from src.models import RateLimitResponse
+
+
+class TarpitResponse(Response):
+    """
+    Response that drips a 429 body out one byte per interval.
+
+    The body is valid JSON (leading whitespace followed by the usual
+    rate limit error), so well-behaved clients still parse it.
+    """
+
+    def __init__(self, tarpit: "Tarpit"):
+        super().__init__(status_code=429, media_type="application/json")
+        # The length is not known up front; drop the "content-length: 0"
+        # the base class adds for an empty body
+        self.raw_headers = [
+            (name, value) for name, value in self.raw_headers if name != b"content-length"
+        ]
+        self.tarpit = tarpit
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await send({
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            })
+            disconnected = asyncio.ensure_future(_wait_for_disconnect(receive))
+            try:
+                for _ in range(self.tarpit.drips):
+                    # Jitter keeps thousands of connections from ticking in lockstep
+                    timeout = self.tarpit.interval * random.uniform(0.5, 1.5)
+                    done, _ = await asyncio.wait((disconnected,), timeout=timeout)
+                    if done:
+                        return
+                    await send({"type": "http.response.body", "body": b" ", "more_body": True})
+                await send({"type": "http.response.body", "body": self.tarpit.final_body})
+            finally:
+                disconnected.cancel()
+        finally:
+            self.tarpit.release()
+
+
+async def _wait_for_disconnect(receive) -> None:
+    """Return once the client goes away."""
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+class Tarpit:
+    """
+    Hands out slow responses for confirmed scrapers, up to a hard cap.
+
+    Args:
+        max_connections: Max concurrently tarpitted connections
+        interval: Seconds between dripped bytes
+        drips: Bytes dripped before the final body is sent
+    """
+
+    def __init__(self, max_connections: int = 10000, interval: float = 1.0, drips: int = 30):
+        self.max_connections = max_connections
+        self.interval = interval
+        self.drips = drips
+        self.final_body = json.dumps(RateLimitResponse().model_dump()).encode()
+        self.active = 0
+        self.total = 0
+        self.rejected = 0
+
+    def open(self) -> Optional[TarpitResponse]:
+        """
+        Start tarpitting a connection.
+
+        Returns:
+            A slow response, or None if the tarpit is full
+        """
+        if self.active >= self.max_connections:
+            self.rejected += 1
+            return None
+        self.active += 1
+        self.total += 1
+        return TarpitResponse(self)
+
+    def release(self) -> None:
+        """Free the slot of a finished or abandoned tarpitted connection."""
+        self.active -= 1
+
+    def get_stats(self) -> dict:
+        """Get tarpit statistics."""
+        return {
+            "active": self.active,
+            "max_connections": self.max_connections,
+            "total": self.total,
+            "rejected_when_full": self.rejected,
+        }
+
+
+class TarpitMiddleware:
+    """
+    ASGI middleware that diverts flagged scrapers into the tarpit.
+
+    Runs before routing, so a tarpitted connection never allocates a
+    Request, resolves dependencies or touches the rate limiter. When the
+    tarpit is full the request continues to the route, which refuses
+    flagged clients with a fast 429.
+
+    Args:
+        app: Downstream ASGI app
+        tarpit: Tarpit handing out slow responses
+        suspicion_tracker: Tracker holding the flagged clients
+        metrics_manager: Records tarpitted requests as blocked
+        paths: Paths on which flagged clients are tarpitted
+        access_log: Log that tarpitted requests are appended to
+    """
+
+    def __init__(
+        self,
+        app,
+        tarpit: Tarpit,
+        suspicion_tracker: SuspicionTracker,
+        metrics_manager: MetricsManager,
+        paths: Iterable[str] = ("/products/search",),
+        access_log: Optional[AccessLog] = None
+    ):
+        self.app = app
+        self.tarpit = tarpit
+        self.suspicion_tracker = suspicion_tracker
+        self.metrics_manager = metrics_manager
+        self.paths = frozenset(paths)
+        self.access_log = access_log
+
+    async def __call__(self, scope, receive, send) -> None:
+        if (
+            scope["type"] == "http"
+            and scope["path"] in self.paths
+            and scope.get("client")
+            and self.suspicion_tracker.is_flagged(scope["client"][0])
+        ):
+            response = self.tarpit.open()
+            if response is not None:
+                self.metrics_manager.record_request(True, 0.0, scope["path"], 429, "tarpitted")
+                if self.access_log is not None:
+                    self.access_log.append(scope["client"][0], scope["path"], "tarpitted", 429, 0.0)
+                await response(scope, receive, send)
+                return
+
+        await self.app(scope, receive, send)
@@ -4,8 +4,41 @@ Metrics package - handles all metrics collection and reporting.
 Modules:
 - collector: Collects raw metrics data
 - calculator: Calculates derived metrics
+- histogram: Constant-memory latency histogram
+- timing: Per-request stage timing
+- windows: Sliding-window rates over recent seconds
+- prometheus: Sharded labeled counters and text exposition
+- multiprocess: Metrics shared by worker processes through a mapped file
+- access_log: Ring-buffered access log with a background writer
+- profiling: On-demand CPU sampling and memory accounting
 """
 
+from .access_log import AccessLog, load_access_log, read_access_log
+from .collector import BLOCKED_DECISIONS, DECISIONS
+from .histogram import LatencyHistogram
 from .metrics_manager import MetricsManager
+from .windows import RollingWindows
+from .prometheus import ShardedCounter, ShardedHistogram
+from .multiprocess import MetricsFile
+from .timing import RequestSpan, StageTimings, begin_span, current_span, end_span, server_timing, stage
 
-__all__ = ["MetricsManager"]
+__all__ = [
+    "MetricsManager",
+    "LatencyHistogram",
+    "RollingWindows",
+    "ShardedCounter",
+    "ShardedHistogram",
+    "MetricsFile",
+    "AccessLog",
+    "load_access_log",
+    "read_access_log",
+    "DECISIONS",
+    "BLOCKED_DECISIONS",
+    "RequestSpan",
+    "StageTimings",
+    "begin_span",
+    "end_span",
+    "current_span",
+    "server_timing",
+    "stage",
+]
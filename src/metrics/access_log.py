@@ -0,0 +1,331 @@
+"""
+Access Log Module
+Single responsibility: Log every request without blocking the event loop.
+
+This module:
+- Packs each request into a fixed-size 64-byte record in a ring buffer
+- Flushes the ring to disk from a background thread in large writes
+- Rotates log files by size, in a compact binary format or JSONL
+- Drops and counts records when the ring is full instead of waiting
+- Reads log files back, for tools that replay or analyse traffic
+"""
+
+import json
+import os
+import socket
+import struct
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
+
+import numpy as np
+
+from .collector import DECISIONS
+
+
+MAGIC = b"GWACC001"
+# timestamp, latency (us), status, decision, client family, client, route
+RECORD = struct.Struct("<dIHBB16s32s")
+# The same layout as a numpy record, for reading whole files at once
+RECORD_DTYPE = np.dtype([
+    ("time", "<f8"),
+    ("latency_us", "<u4"),
+    ("status", "<u2"),
+    ("decision", "u1"),
+    ("family", "u1"),
+    ("client", "S16"),
+    ("route", "S32"),
+])
+FORMATS = ("binary", "jsonl")
+
+_DECISION_IDS = {decision: index for index, decision in enumerate(DECISIONS)}
+_TEXT, _IPV4, _IPV6 = 0, 4, 6
+
+
+def _pack_client(client: str) -> tuple:
+    """Client address as (family, 16 bytes); non-IP names are kept as text."""
+    try:
+        if ":" in client:
+            return _IPV6, socket.inet_pton(socket.AF_INET6, client)
+        return _IPV4, socket.inet_pton(socket.AF_INET, client)
+    except OSError:
+        return _TEXT, client.encode()[:16]
+
+
+def _unpack_client(family: int, packed: bytes) -> str:
+    if family == _IPV4:
+        return socket.inet_ntop(socket.AF_INET, packed[:4])
+    if family == _IPV6:
+        return socket.inet_ntop(socket.AF_INET6, packed)
+    return packed.rstrip(b"\0").decode(errors="replace")
+
+
+def decode_record(record: bytes) -> Dict[str, Any]:
+    """
+    Decode one binary record.
+
+    Args:
+        record: RECORD.size bytes
+
+    Returns:
+        Dict with time, client, route, decision, status and latency_ms
+    """
+    timestamp, latency_us, status, decision, family, client, route = RECORD.unpack(record)
+    return {
+        "time": timestamp,
+        "client": _unpack_client(family, client),
+        "route": route.rstrip(b"\0").decode(errors="replace"),
+        "decision": DECISIONS[decision] if decision < len(DECISIONS) else "unknown",
+        "status": status,
+        "latency_ms": latency_us / 1000,
+    }
+
+
+class AccessLog:
+    """
+    Ring-buffered access log with a background writer.
+
+    ``append`` runs on the event loop: it packs a record into the next
+    free slot of a preallocated ring and returns, never touching the
+    disk or taking a lock. A writer thread wakes every ``flush_interval``
+    (sooner once the ring is half full), takes everything appended since
+    its last pass and writes it with one ``write`` call. If the writer
+    falls a whole ring behind, new records are dropped and counted.
+
+    The ring has one producer, the event loop, and one consumer, the
+    writer; each only advances its own position.
+
+    Args:
+        path: Log file; rotated files get ``.1``, ``.2``, ... suffixes
+        format: "binary" (64 bytes per record after an 8-byte magic) or
+            "jsonl" (one JSON object per line)
+        capacity: Records the ring holds
+        flush_interval: Seconds between writer passes
+        max_bytes: Rotate once the file reaches this size
+        backups: Rotated files kept
+    """
+
+    def __init__(
+        self,
+        path: str,
+        format: str = "binary",
+        capacity: int = 65536,
+        flush_interval: float = 0.5,
+        max_bytes: int = 64 * 2 ** 20,
+        backups: int = 5
+    ):
+        if format not in FORMATS:
+            raise ValueError(f"Unknown access log format {format!r}, expected one of {FORMATS}")
+        self.path = path
+        self.format = format
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+
+        self._ring = bytearray(capacity * RECORD.size)
+        self._head = 0
+        self._tail = 0
+        self._wake = threading.Event()
+        self._closing = False
+        self._writer: Optional[threading.Thread] = None
+        self._file = None
+
+        self.appended = 0
+        self.dropped = 0
+        self.written = 0
+        self.rotations = 0
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def append(
+        self,
+        client: str,
+        route: str,
+        decision: str,
+        status: int,
+        latency: float,
+        timestamp: Optional[float] = None
+    ) -> bool:
+        """
+        Log a request.
+
+        Args:
+            client: Client address
+            route: Route pattern the request matched
+            decision: Gateway decision, one of collector.DECISIONS
+            status: Response status
+            latency: Seconds taken to respond
+            timestamp: Unix time of the request, now if omitted
+
+        Returns:
+            False if the record was dropped because the ring was full
+        """
+        if self._writer is None:
+            self._start()
+
+        head = self._head
+        pending = head - self._tail
+        if pending >= self.capacity:
+            self.dropped += 1
+            return False
+
+        family, packed_client = _pack_client(client)
+        RECORD.pack_into(
+            self._ring,
+            (head % self.capacity) * RECORD.size,
+            time.time() if timestamp is None else timestamp,
+            min(int(latency * 1e6), 0xFFFFFFFF),
+            status,
+            _DECISION_IDS.get(decision, 255),
+            family,
+            packed_client,
+            route.encode()[:32]
+        )
+        # Publish only once the record is complete
+        self._head = head + 1
+        self.appended += 1
+        if pending + 1 == self.capacity // 2:
+            self._wake.set()
+        return True
+
+    def flush(self) -> None:
+        """Write everything appended so far; called by the writer thread."""
+        head = self._head
+        tail = self._tail
+        if head == tail:
+            return
+
+        start = (tail % self.capacity) * RECORD.size
+        end = (head % self.capacity) * RECORD.size
+        if end > start:
+            chunk = bytes(self._ring[start:end])
+        else:
+            chunk = bytes(self._ring[start:]) + bytes(self._ring[:end])
+        # The slots are free again once copied out
+        self._tail = head
+
+        self._write(chunk)
+        self.written += head - tail
+
+    def close(self) -> None:
+        """Flush what is left, stop the writer and close the file."""
+        self._closing = True
+        self._wake.set()
+        if self._writer is not None and self._writer.is_alive():
+            self._writer.join()
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get access log statistics."""
+        return {
+            "path": self.path,
+            "format": self.format,
+            "buffered": self._head - self._tail,
+            "capacity": self.capacity,
+            "appended": self.appended,
+            "written": self.written,
+            "dropped": self.dropped,
+            "rotations": self.rotations,
+        }
+
+    def _start(self) -> None:
+        self._writer = threading.Thread(target=self._run, name="access-log-writer", daemon=True)
+        self._writer.start()
+
+    def _run(self) -> None:
+        while not self._closing:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def _after_fork(self) -> None:
+        """The writer thread does not survive a fork; start a new one on demand."""
+        self._writer = None
+        self._wake = threading.Event()
+        self._file = None
+
+    def _write(self, chunk: bytes) -> None:
+        if self.format == "jsonl":
+            chunk = "".join(
+                json.dumps(decode_record(record)) + "\n"
+                for record in _records(chunk)
+            ).encode()
+
+        if self._file is None:
+            self._open()
+        elif self._file.tell() + len(chunk) > self.max_bytes:
+            self._rotate()
+        self._file.write(chunk)
+        self._file.flush()
+
+    def _open(self) -> None:
+        self._file = open(self.path, "ab")
+        if self.format == "binary" and self._file.tell() == 0:
+            self._file.write(MAGIC)
+
+    def _rotate(self) -> None:
+        self._file.close()
+        for index in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self.rotations += 1
+        self._open()
+
+
+def _records(chunk: bytes) -> Iterator[bytes]:
+    for offset in range(0, len(chunk), RECORD.size):
+        yield chunk[offset:offset + RECORD.size]
+
+
+def read_access_log(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Read an access log file in either format.
+
+    Args:
+        path: Log file written by AccessLog
+
+    Yields:
+        Decoded records, oldest first
+    """
+    with open(path, "rb") as f:
+        magic = f.read(len(MAGIC))
+        if magic == MAGIC:
+            while True:
+                record = f.read(RECORD.size)
+                if len(record) < RECORD.size:
+                    return
+                yield decode_record(record)
+        f.seek(0)
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def load_access_log(path: str) -> np.ndarray:
+    """
+    Load a binary access log file as a record array, without decoding.
+
+    Args:
+        path: Binary log file written by AccessLog
+
+    Returns:
+        Array of RECORD_DTYPE records; fields hold the packed values
+        (decision ids, packed client addresses)
+
+    Raises:
+        ValueError: If the file is not a binary access log
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a binary access log")
+    records = np.memmap(path, dtype=np.uint8, mode="r", offset=len(MAGIC))
+    usable = len(records) - len(records) % RECORD.size
+    return records[:usable].view(RECORD_DTYPE)
@@ -8,26 +8,53 @@ This module:
 - Derives insights from raw data
 """
 
-from typing import List
+from typing import Dict, Optional
 
 
 class MetricsCalculator:
     """Calculates derived metrics from raw data."""
 
     @staticmethod
-    def calculate_average_response_time(response_times: List[float]) -> float:
+    def calculate_average_response_time(total_time: float, count: int) -> float:
         """
         Calculate average response time.
 
         Args:
-            response_times: List of response times
+            total_time: Sum of response times in seconds
+            count: Number of response times summed
 
         Returns:
             Average in seconds, or 0 if empty
         """
-        if not response_times:
+        if count == 0:
             return 0.0
-        return sum(response_times) / len(response_times)
+        return total_time / count
+
+    @staticmethod
+    def format_latency_summary(
+        minimum: Optional[float],
+        maximum: Optional[float],
+        percentiles: Dict[float, Optional[float]]
+    ) -> Dict[str, Optional[float]]:
+        """
+        Format a latency distribution for display.
+
+        Args:
+            minimum: Smallest latency in seconds, None if empty
+            maximum: Largest latency in seconds, None if empty
+            percentiles: Latency in seconds by percentile
+
+        Returns:
+            Milliseconds keyed "min", "p50", "p99", "p999", ..., "max"
+        """
+        def ms(value: Optional[float]) -> Optional[float]:
+            return None if value is None else round(value * 1000, 3)
+
+        summary = {"min": ms(minimum)}
+        for percentile, value in percentiles.items():
+            summary["p" + f"{percentile:g}".replace(".", "")] = ms(value)
+        summary["max"] = ms(maximum)
+        return summary
 
     @staticmethod
     def calculate_success_rate(total: int, successful: int) -> float:
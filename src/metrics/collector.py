@@ -4,50 +4,121 @@ Single responsibility: Collect and store raw metrics data.
 
 This module:
 - Records individual requests
-- Stores response times
-- Tracks request counts
+- Counts requests by route, status class and limiter decision
+- Summarises response times in fixed-size histograms
 """
 
-from typing import List
+from typing import Optional
+
+from .histogram import LatencyHistogram
+from .multiprocess import FileCounter, FileHistogram, FileLatencyHistogram, MetricsFile
+from .prometheus import ShardedCounter, ShardedHistogram, status_class
+
+
+# Percentiles reported for response times
+PERCENTILES = (50, 90, 99, 99.9)
+
+# What the gateway decided about a request, before the backend
+DECISIONS = ("allowed", "rejected", "challenged", "flagged", "tarpitted")
+# Decisions that count as a blocked request
+BLOCKED_DECISIONS = ("rejected", "flagged", "tarpitted")
 
 
 class MetricsCollector:
-    """Collects raw metrics data from requests."""
+    """
+    Collects raw metrics data from requests.
+
+    Request counts live in a labeled, sharded counter that is also
+    exposed to Prometheus; the totals are sums over it. Response times
+    go into histograms rather than a list, so memory and the cost of
+    reading the metrics stay constant however many requests were served.
 
-    def __init__(self):
-        self.total_requests = 0
-        self.successful_requests = 0
-        self.blocked_requests = 0
-        self.response_times: List[float] = []
+    Args:
+        metrics_file: Shared file to count into instead of process memory,
+            so that every worker process reports the totals of all workers
+    """
 
-    def record_request(self, was_blocked: bool, response_time: float) -> None:
+    def __init__(self, metrics_file: Optional[MetricsFile] = None):
+        requests = ("gateway_requests_total", "Requests handled by the gateway.", ("route", "status", "decision"))
+        durations = (
+            "gateway_request_duration_seconds",
+            "Time to handle requests that were not blocked.",
+            ("route", "status")
+        )
+        if metrics_file is None:
+            self.requests = ShardedCounter(*requests)
+            self.durations = ShardedHistogram(*durations)
+            self.response_times = LatencyHistogram()
+        else:
+            self.requests = FileCounter(metrics_file, *requests)
+            self.durations = FileHistogram(metrics_file, *durations)
+            self.response_times = FileLatencyHistogram(metrics_file)
+        self.metrics_file = metrics_file
+
+    def record_request(
+        self,
+        was_blocked: bool,
+        response_time: float,
+        route: str = "other",
+        status_code: Optional[int] = None,
+        decision: Optional[str] = None
+    ) -> None:
         """
         Record a request.
 
         Args:
             was_blocked: True if rate limited
             response_time: Time in seconds to process
+            route: Route pattern the request matched
+            status_code: Response status; 429 or 200 if omitted
+            decision: One of DECISIONS; "rejected" or "allowed" if omitted
         """
-        self.total_requests += 1
+        if status_code is None:
+            status_code = 429 if was_blocked else 200
+        if decision is None:
+            decision = "rejected" if was_blocked else "allowed"
+        status = status_class(status_code)
 
-        if was_blocked:
-            self.blocked_requests += 1
-        else:
-            self.successful_requests += 1
-            self.response_times.append(response_time)
+        self.requests.inc((route, status, decision))
+        if not was_blocked:
+            self.durations.observe((route, status), response_time)
+            self.response_times.record(response_time)
+
+    @property
+    def total_requests(self) -> int:
+        """Requests recorded."""
+        return self.requests.total()
+
+    @property
+    def blocked_requests(self) -> int:
+        """Requests the gateway refused."""
+        return self.requests.total(decision=BLOCKED_DECISIONS)
+
+    @property
+    def successful_requests(self) -> int:
+        """Requests the gateway let through."""
+        return self.total_requests - self.blocked_requests
 
     def reset(self) -> None:
         """Clear all collected metrics."""
-        self.total_requests = 0
-        self.successful_requests = 0
-        self.blocked_requests = 0
-        self.response_times = []
+        self.requests.reset()
+        self.durations.reset()
+        self.response_times.reset()
 
     def get_raw_data(self) -> dict:
         """Get all raw collected data."""
+        total = self.total_requests
+        blocked = self.blocked_requests
+        response_times = self.response_times
+        if isinstance(response_times, FileLatencyHistogram):
+            response_times = response_times.merged()
         return {
-            "total_requests": self.total_requests,
-            "successful_requests": self.successful_requests,
-            "blocked_requests": self.blocked_requests,
-            "response_times": self.response_times.copy()
+            "total_requests": total,
+            "successful_requests": total - blocked,
+            "blocked_requests": blocked,
+            "response_time_count": response_times.count,
+            "response_time_total": response_times.total,
+            "response_time_min": response_times.min,
+            "response_time_max": response_times.max,
+            "response_time_percentiles": response_times.percentiles(PERCENTILES)
         }
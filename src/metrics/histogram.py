@@ -0,0 +1,198 @@
+"""
+Histogram Module
+Single responsibility: Summarise a latency distribution in constant memory.
+
+This module:
+- Counts latencies into log-linear (HDR-style) buckets
+- Keeps exact count, sum, min and max alongside the buckets
+- Answers percentile queries with one pass over the buckets
+- Merges histograms, so per-worker or per-window data can be combined
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence
+
+
+class LatencyHistogram:
+    """
+    Log-linear histogram of latencies, in the style of HdrHistogram.
+
+    Latencies are counted in whole units of ``resolution`` seconds. Values
+    below ``2 ** precision_bits`` units get a bucket each; above that each
+    power of two is split into ``2 ** (precision_bits - 1)`` equal buckets,
+    so any recorded value is off by less than ``2 ** (1 - precision_bits)``
+    of itself (under 1.6% with the default 7 bits). Memory is fixed by the
+    trackable range, not by how many values were recorded: about 1,700
+    buckets for 1us to an hour.
+
+    Args:
+        resolution: Smallest distinguishable latency, in seconds
+        max_value: Largest tracked latency in seconds; larger values land
+            in the top bucket (max still reports them exactly)
+        precision_bits: Sub-bucket bits, trading memory for accuracy
+    """
+
+    def __init__(self, resolution: float = 1e-6, max_value: float = 3600.0, precision_bits: int = 7):
+        self.resolution = resolution
+        self.max_value = max_value
+        self.precision_bits = precision_bits
+        self._sub_buckets = 1 << precision_bits
+        self._half = self._sub_buckets >> 1
+        self._max_units = max(self._sub_buckets, int(max_value / resolution))
+        self.counts: List[int] = [0] * (self._index(self._max_units) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def record(self, value: float) -> None:
+        """
+        Record one latency.
+
+        Args:
+            value: Latency in seconds
+        """
+        self.counts[self.bucket(value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def bucket(self, value: float) -> int:
+        """
+        Index of the bucket counting a latency.
+
+        Args:
+            value: Latency in seconds
+
+        Returns:
+            Bucket index, below ``len(counts)``
+        """
+        units = int(value / self.resolution)
+        if units < 0:
+            units = 0
+        elif units > self._max_units:
+            units = self._max_units
+        return self._index(units)
+
+    def mean(self) -> float:
+        """Mean latency in seconds, or 0 if empty."""
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """
+        Latency at a percentile.
+
+        Args:
+            percentile: Percentile between 0 and 100
+
+        Returns:
+            Latency in seconds (the midpoint of its bucket, clamped to the
+            recorded min and max), or None if empty
+        """
+        return self.percentiles((percentile,))[percentile]
+
+    def percentiles(self, percentiles: Iterable[float]) -> Dict[float, Optional[float]]:
+        """
+        Several percentiles from a single pass over the buckets.
+
+        Args:
+            percentiles: Percentiles between 0 and 100
+
+        Returns:
+            Latency in seconds for each percentile, None if empty
+        """
+        return self.percentiles_of(self.counts, percentiles, self.min, self.max)
+
+    def percentiles_of(
+        self,
+        counts: Sequence[int],
+        percentiles: Iterable[float],
+        minimum: Optional[float] = None,
+        maximum: Optional[float] = None
+    ) -> Dict[float, Optional[float]]:
+        """
+        Percentiles of bucket counts laid out like this histogram's.
+
+        Lets callers that keep their own counts (e.g. per time slot) reuse
+        the bucket layout without building a histogram per query.
+
+        Args:
+            counts: Count per bucket, as indexed by ``bucket``
+            percentiles: Percentiles between 0 and 100
+            minimum: Clamp results to at least this many seconds
+            maximum: Clamp results to at most this many seconds
+
+        Returns:
+            Latency in seconds for each percentile, None if empty
+        """
+        wanted = sorted(set(percentiles))
+        result: Dict[float, Optional[float]] = {p: None for p in wanted}
+        total = int(sum(counts))
+        if not total:
+            return result
+
+        # Rank of the value at each percentile, nearest-rank style
+        ranks = [(p, max(1, -(-total * p // 100))) for p in wanted]
+        seen = 0
+        position = 0
+        for index, bucket_count in enumerate(counts):
+            if not bucket_count:
+                continue
+            seen += bucket_count
+            while position < len(ranks) and ranks[position][1] <= seen:
+                low, high = self._bounds(index)
+                value = (low + high) / 2 * self.resolution
+                if minimum is not None:
+                    value = max(value, minimum)
+                if maximum is not None:
+                    value = min(value, maximum)
+                result[ranks[position][0]] = value
+                position += 1
+            if position == len(ranks):
+                break
+        return result
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """
+        Add another histogram's counts into this one.
+
+        Args:
+            other: Histogram with the same resolution, range and precision
+        """
+        if len(other.counts) != len(self.counts) or other.resolution != self.resolution:
+            raise ValueError("Histograms have different bucket layouts")
+        for index, bucket_count in enumerate(other.counts):
+            if bucket_count:
+                self.counts[index] += bucket_count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+
+    def reset(self) -> None:
+        """Forget all recorded values."""
+        self.counts = [0] * len(self.counts)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def _index(self, units: int) -> int:
+        """Bucket holding a value of ``units``."""
+        if units < self._sub_buckets:
+            return units
+        shift = units.bit_length() - self.precision_bits
+        return self._sub_buckets + (shift - 1) * self._half + (units >> shift) - self._half
+
+    def _bounds(self, index: int) -> tuple:
+        """Lowest and highest unit value counted in a bucket."""
+        if index < self._sub_buckets:
+            return index, index
+        shift, offset = divmod(index - self._sub_buckets, self._half)
+        shift += 1
+        low = (offset + self._half) << shift
+        return low, low + (1 << shift) - 1
@@ -6,9 +6,17 @@ This module brings together collector and calculator to provide
 the main metrics interface.
 """
 
-from typing import Dict
-from .collector import MetricsCollector
+from typing import Dict, Optional
+from . import prometheus
+from .collector import MetricsCollector, PERCENTILES
+from .multiprocess import MetricsFile
 from .calculator import MetricsCalculator
+from .timing import RequestSpan, StageTimings
+from .windows import RollingWindows
+
+
+# Gateway request stages, reported even before they were first timed
+STAGES = ("limit", "challenge", "cursor", "queue", "backend", "serialize", "total")
 
 
 class MetricsManager:
@@ -18,15 +26,48 @@ class MetricsManager:
     Uses:
     - MetricsCollector for raw data
     - MetricsCalculator for derived metrics
+    - StageTimings for per-stage latency of timed requests
+    - RollingWindows for rates over the last second and minutes
+
+    Args:
+        metrics_file: Path of a metrics file shared by all worker
+            processes. Request counts and response time histograms are
+            then totals over every worker; stage timings and rolling
+            windows stay per worker
     """
 
-    def __init__(self):
-        self.collector = MetricsCollector()
+    def __init__(self, metrics_file: Optional[str] = None):
+        self.metrics_file = MetricsFile(metrics_file) if metrics_file else None
+        self.collector = MetricsCollector(self.metrics_file)
         self.calculator = MetricsCalculator()
+        self.stages = StageTimings(STAGES)
+        self.windows = RollingWindows()
+
+    def record_request(
+        self,
+        was_blocked: bool,
+        response_time: float,
+        route: str = "other",
+        status_code: Optional[int] = None,
+        decision: Optional[str] = None
+    ) -> None:
+        """
+        Record a request.
+
+        Args:
+            was_blocked: True if rate limited
+            response_time: Time in seconds to process
+            route: Route pattern the request matched
+            status_code: Response status; 429 or 200 if omitted
+            decision: Gateway decision, see collector.DECISIONS
+        """
+        self.collector.record_request(was_blocked, response_time, route, status_code, decision)
+        failed = status_code is not None and status_code >= 500
+        self.windows.record(was_blocked, response_time, failed)
 
-    def record_request(self, was_blocked: bool, response_time: float) -> None:
-        """Record a request."""
-        self.collector.record_request(was_blocked, response_time)
+    def record_stages(self, span: RequestSpan, total_ns: Optional[int] = None) -> None:
+        """Record the stage timings of a finished request."""
+        self.stages.record(span, total_ns)
 
     def get_metrics(self) -> Dict:
         """
@@ -38,7 +79,8 @@ class MetricsManager:
         raw_data = self.collector.get_raw_data()
 
         avg_response_time = self.calculator.calculate_average_response_time(
-            raw_data["response_times"]
+            raw_data["response_time_total"],
+            raw_data["response_time_count"]
         )
         success_rate = self.calculator.calculate_success_rate(
             raw_data["total_requests"],
@@ -49,15 +91,49 @@ class MetricsManager:
             raw_data["blocked_requests"]
         )
 
-        return {
+        metrics = {
             "total_requests": raw_data["total_requests"],
             "successful_requests": raw_data["successful_requests"],
             "blocked_requests": raw_data["blocked_requests"],
             "average_response_time_seconds": round(avg_response_time, 4),
+            "response_time_ms": self.calculator.format_latency_summary(
+                raw_data["response_time_min"],
+                raw_data["response_time_max"],
+                raw_data["response_time_percentiles"]
+            ),
             "success_rate_percent": round(success_rate, 2),
-            "block_rate_percent": round(block_rate, 2)
+            "block_rate_percent": round(block_rate, 2),
+            "stages_ms": self._stage_summaries(),
+            "windows": self.windows.get_stats()
         }
+        if self.metrics_file is not None:
+            metrics["workers"] = len(self.metrics_file.live_pids())
+        return metrics
+
+    def render_prometheus(self) -> str:
+        """
+        Render the request counters and histograms for Prometheus.
+
+        Returns:
+            Text exposition format, the same data ``get_metrics`` sums
+        """
+        return prometheus.render((self.collector.requests, self.collector.durations))
+
+    def _stage_summaries(self) -> Dict[str, Dict]:
+        """Latency summary of every timed stage."""
+        summaries = {}
+        for name, histogram in self.stages.histograms.items():
+            summary = self.calculator.format_latency_summary(
+                histogram.min, histogram.max, histogram.percentiles(PERCENTILES)
+            )
+            summaries[name] = {"count": histogram.count, **summary}
+        return summaries
 
     def reset(self) -> None:
-        """Reset all metrics."""
+        """
+        Reset all cumulative metrics.
+
+        Rolling windows are left alone; old seconds age out of them.
+        """
         self.collector.reset()
+        self.stages.reset()
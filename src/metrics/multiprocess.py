@@ -0,0 +1,459 @@
+"""
+Multiprocess Metrics Module
+Single responsibility: Share request metrics between worker processes.
+
+This module:
+- Lays out a memory-mapped file with one fixed-size slot per worker
+- Lets each worker claim a slot and count into it without locking
+- Merges every slot when any worker is scraped
+- Folds the slots of dead workers into a retired slot and frees them,
+  so counters stay monotonic across worker restarts
+"""
+
+import fcntl
+import mmap
+import os
+import time
+import weakref
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .histogram import LatencyHistogram
+from .prometheus import DURATION_BUCKETS, Labels, ShardedCounter, ShardedHistogram
+
+
+MAGIC = b"GWMET001"
+# Label values are joined with this into a series key
+KEY_SEPARATOR = "\x1f"
+KEY_BYTES = 120
+# Series per slot, per kind; label cardinality here is a few dozen
+MAX_SERIES = 256
+# pid of the slot holding the counts of workers that have exited
+RETIRED = -1
+
+_HEADER = np.dtype([("magic", "S8"), ("slots", "<u4"), ("slot_size", "<u4"), ("buckets", "<u4")])
+_HEADER_SIZE = 64
+_COUNT, _TOTAL, _MIN, _MAX = range(4)
+
+
+def _slot_dtype(buckets: int, latency_buckets: int) -> np.dtype:
+    return np.dtype([
+        ("pid", "<i8"),
+        ("claimed_at", "<f8"),
+        ("counter_keys", f"S{KEY_BYTES}", (MAX_SERIES,)),
+        ("counter_values", "<f8", (MAX_SERIES,)),
+        ("histogram_keys", f"S{KEY_BYTES}", (MAX_SERIES,)),
+        ("histogram_values", "<f8", (MAX_SERIES, buckets + 2)),
+        ("latency_counts", "<u8", (latency_buckets,)),
+        ("latency_stats", "<f8", (4,)),
+    ], align=True)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+
+# Files open in this process; held weakly, so a file nobody uses can
+# still be collected
+_open_files: "weakref.WeakSet[MetricsFile]" = weakref.WeakSet()
+
+
+def _forget_slots_after_fork() -> None:
+    for metrics_file in list(_open_files):
+        metrics_file._forget_slot()
+
+
+os.register_at_fork(after_in_child=_forget_slots_after_fork)
+
+class MetricsFile:
+    """
+    Memory-mapped file of per-worker metric slots.
+
+    Each worker process claims a slot the first time it records
+    something (again after a fork) and from then on is the only writer
+    of that slot, so writes need no lock. Every series is a fixed-width
+    key plus its values; a worker adds new series to its own slot's
+    tables. Claiming, retiring dead workers and resetting take an
+    exclusive ``flock`` on the file; nothing on the write path does.
+
+    Within a worker, a slot is written from the event loop thread; the
+    increments are plain read-modify-writes, not atomic across threads.
+
+    Args:
+        path: File to create or open; every worker must use the same path
+        slots: Max workers alive at once, plus one retired slot
+        buckets: Duration histogram bucket bounds
+    """
+
+    def __init__(self, path: str, slots: int = 64, buckets: Sequence[float] = DURATION_BUCKETS):
+        self.path = path
+        self.buckets = tuple(buckets)
+        self.layout = LatencyHistogram()
+        self.dtype = _slot_dtype(len(self.buckets), len(self.layout.counts))
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        with self._locked():
+            if os.fstat(self._fd).st_size == 0:
+                self._create(slots)
+            header = np.frombuffer(os.pread(self._fd, _HEADER.itemsize, 0), dtype=_HEADER)[0]
+            if header["magic"] != MAGIC or header["slot_size"] != self.dtype.itemsize:
+                raise ValueError(f"{path} is not a metrics file with this layout")
+            self.slots = int(header["slots"])
+        self._mmap = mmap.mmap(self._fd, _HEADER_SIZE + self.slots * self.dtype.itemsize)
+        self.table = np.ndarray(
+            (self.slots,), dtype=self.dtype, buffer=self._mmap, offset=_HEADER_SIZE
+        )
+
+        self._slot: Optional[int] = None
+        self._views: Dict[str, np.ndarray] = {}
+        self._series: Dict[Tuple[str, str], int] = {}
+        _open_files.add(self)
+
+    def _create(self, slots: int) -> None:
+        header = np.zeros(1, dtype=_HEADER)
+        header[0] = (MAGIC, slots, self.dtype.itemsize, len(self.buckets))
+        size = _HEADER_SIZE + slots * self.dtype.itemsize
+        os.ftruncate(self._fd, size)
+        os.pwrite(self._fd, header.tobytes(), 0)
+        # Slot 0 keeps what exited workers counted
+        pid_offset = _HEADER_SIZE + self.dtype.fields["pid"][1]
+        os.pwrite(self._fd, np.int64(RETIRED).tobytes(), pid_offset)
+
+    def close(self) -> None:
+        """Unmap the file; the slot stays claimed until the process exits."""
+        _open_files.discard(self)
+        del self.table
+        self._mmap.close()
+        os.close(self._fd)
+
+    # Write path
+
+    def slot(self) -> int:
+        """This process's slot, claimed on first use."""
+        if self._slot is None:
+            self._claim()
+        return self._slot
+
+    def view(self, field: str) -> np.ndarray:
+        """
+        One field of this process's slot, for writing.
+
+        Args:
+            field: "counter_values", "histogram_values", "latency_counts"
+                or "latency_stats"
+        """
+        if self._slot is None:
+            self._claim()
+        return self._views[field]
+
+    def series_count(self, kind: str, name: str) -> int:
+        """Series of one metric in this process's slot, from its own index."""
+        prefix = name + KEY_SEPARATOR
+        return sum(1 for series_kind, key in self._series if series_kind == kind and key.startswith(prefix))
+
+    def series(self, kind: str, key: str) -> Optional[int]:
+        """
+        Index of a series in this process's slot, added if new.
+
+        Args:
+            kind: "counter" or "histogram"
+            key: Metric name and label values, see ``series_key``
+
+        Returns:
+            Row index, or None if the slot's table is full (the update is
+            then dropped)
+        """
+        index = self._series.get((kind, key))
+        if index is not None:
+            return index
+
+        keys = self.table[f"{kind}_keys"][self.slot()]
+        encoded = key.encode()[:KEY_BYTES]
+        free = np.flatnonzero(keys == b"")
+        if not len(free):
+            return None
+        index = int(free[0])
+        keys[index] = encoded
+        self._series[(kind, key)] = index
+        return index
+
+    # Read path
+
+    def merged(self, kind: str) -> Dict[str, np.ndarray]:
+        """
+        Values of every series of a kind, summed over all slots.
+
+        Args:
+            kind: "counter" or "histogram"
+
+        Returns:
+            Series key to its summed values
+        """
+        self.retire_dead()
+        keys = self.table[f"{kind}_keys"]
+        values = self.table[f"{kind}_values"]
+        merged: Dict[str, np.ndarray] = {}
+        for slot in self._used_slots():
+            for index in np.flatnonzero(keys[slot] != b""):
+                key = keys[slot][index].decode(errors="ignore")
+                if key in merged:
+                    merged[key] = merged[key] + values[slot][index]
+                else:
+                    merged[key] = values[slot][index].copy()
+        return merged
+
+    def merged_latency(self) -> LatencyHistogram:
+        """Response time histogram summed over all slots."""
+        self.retire_dead()
+        slots = self._used_slots()
+        histogram = LatencyHistogram()
+        counts = self.table["latency_counts"][slots].sum(axis=0)
+        stats = self.table["latency_stats"][slots]
+        histogram.counts = [int(n) for n in counts]
+        histogram.count = int(stats[:, _COUNT].sum())
+        histogram.total = float(stats[:, _TOTAL].sum())
+        recorded = stats[stats[:, _COUNT] > 0]
+        if len(recorded):
+            histogram.min = float(recorded[:, _MIN].min())
+            histogram.max = float(recorded[:, _MAX].max())
+        return histogram
+
+    def retire_dead(self) -> None:
+        """Fold the slots of exited workers into the retired slot and free them."""
+        pids = self.table["pid"]
+        if not any(pid > 0 and not _pid_alive(int(pid)) for pid in pids):
+            return
+        with self._locked():
+            for slot in range(self.slots):
+                pid = int(pids[slot])
+                if pid > 0 and not _pid_alive(pid):
+                    self._fold(slot, 0)
+                    self.table[slot] = np.zeros((), dtype=self.dtype)
+
+    def reset(self) -> None:
+        """Zero every value in every slot, keeping the series."""
+        with self._locked():
+            self.table["counter_values"] = 0
+            self.table["histogram_values"] = 0
+            self.table["latency_counts"] = 0
+            self.table["latency_stats"] = 0
+
+    def live_pids(self) -> List[int]:
+        """Processes currently holding a slot."""
+        return [int(pid) for pid in self.table["pid"] if pid > 0]
+
+    # Internals
+
+    def _claim(self) -> None:
+        pid = os.getpid()
+        self.retire_dead()
+        with self._locked():
+            pids = self.table["pid"]
+            mine = np.flatnonzero(pids == pid)
+            free = np.flatnonzero(pids == 0)
+            if len(mine):
+                slot = int(mine[0])
+            elif len(free):
+                slot = int(free[0])
+                self.table["pid"][slot] = pid
+                self.table["claimed_at"][slot] = time.time()
+            else:
+                raise RuntimeError(f"All {self.slots} metrics slots in {self.path} are taken")
+        self._slot = slot
+        self._views = {
+            field: self.table[field][slot]
+            for field in ("counter_values", "histogram_values", "latency_counts", "latency_stats")
+        }
+        # Series this pid wrote before are already in its slot
+        self._series = {}
+        for kind in ("counter", "histogram"):
+            keys = self.table[f"{kind}_keys"][slot]
+            for index in np.flatnonzero(keys != b""):
+                self._series[(kind, keys[index].decode(errors="ignore"))] = int(index)
+
+    def _forget_slot(self) -> None:
+        """After a fork the child must claim its own slot."""
+        self._slot = None
+        self._views = {}
+        self._series = {}
+
+    def _fold(self, source: int, target: int) -> None:
+        """Add one slot's values into another, matching series by key."""
+        for kind in ("counter", "histogram"):
+            keys = self.table[f"{kind}_keys"]
+            values = self.table[f"{kind}_values"]
+            for index in np.flatnonzero(keys[source] != b""):
+                key = keys[source][index]
+                existing = np.flatnonzero(keys[target] == key)
+                if len(existing):
+                    row = int(existing[0])
+                else:
+                    free = np.flatnonzero(keys[target] == b"")
+                    if not len(free):
+                        continue
+                    row = int(free[0])
+                    keys[target][row] = key
+                values[target][row] += values[source][index]
+
+        self.table["latency_counts"][target] += self.table["latency_counts"][source]
+        source_stats = self.table["latency_stats"][source]
+        target_stats = self.table["latency_stats"][target]
+        if source_stats[_COUNT]:
+            if target_stats[_COUNT]:
+                target_stats[_MIN] = min(target_stats[_MIN], source_stats[_MIN])
+                target_stats[_MAX] = max(target_stats[_MAX], source_stats[_MAX])
+            else:
+                target_stats[_MIN] = source_stats[_MIN]
+                target_stats[_MAX] = source_stats[_MAX]
+            target_stats[_COUNT] += source_stats[_COUNT]
+            target_stats[_TOTAL] += source_stats[_TOTAL]
+
+    def _used_slots(self) -> np.ndarray:
+        return np.flatnonzero(self.table["pid"] != 0)
+
+    def _locked(self):
+        return _FileLock(self._fd)
+
+
+class _FileLock:
+    """Exclusive flock held for a ``with`` block."""
+
+    def __init__(self, fd: int):
+        self.fd = fd
+
+    def __enter__(self) -> None:
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+
+    def __exit__(self, *exc_info) -> None:
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+
+def series_key(name: str, labels: Labels) -> str:
+    """Key of a series in the metrics file."""
+    return KEY_SEPARATOR.join((name,) + tuple(labels))
+
+
+def _split_keys(name: str, merged: Dict[str, np.ndarray]) -> Iterable[Tuple[Labels, np.ndarray]]:
+    prefix = name + KEY_SEPARATOR
+    for key, values in merged.items():
+        if key.startswith(prefix):
+            yield tuple(key[len(prefix):].split(KEY_SEPARATOR)), values
+
+
+class FileCounter(ShardedCounter):
+    """
+    Labeled counter kept in a metrics file, summed over all workers.
+
+    Args:
+        metrics_file: Shared metrics file
+        name: Metric name
+        documentation: HELP text
+        labelnames: Label names, in the order label values are given
+    """
+
+    def __init__(self, metrics_file: MetricsFile, name: str, documentation: str, labelnames: Sequence[str]):
+        super().__init__(name, documentation, labelnames)
+        self.metrics_file = metrics_file
+
+    def inc(self, labels: Labels, amount: int = 1) -> None:
+        """Add to the series of a label combination in this worker's slot."""
+        index = self.metrics_file.series("counter", series_key(self.name, labels))
+        if index is not None:
+            self.metrics_file.view("counter_values")[index] += amount
+
+    def series_count(self) -> int:
+        """Series this worker has written, without reading other slots."""
+        return self.metrics_file.series_count("counter", self.name)
+
+    def values(self) -> Dict[Labels, int]:
+        """Value of every series, summed over all workers."""
+        merged = self.metrics_file.merged("counter")
+        return {labels: int(values) for labels, values in _split_keys(self.name, merged)}
+
+    def reset(self) -> None:
+        """Zero every series in every worker."""
+        self.metrics_file.reset()
+
+
+class FileHistogram(ShardedHistogram):
+    """
+    Labeled histogram kept in a metrics file, summed over all workers.
+
+    Args:
+        metrics_file: Shared metrics file; its buckets are used
+        name: Metric name
+        documentation: HELP text
+        labelnames: Label names, in the order label values are given
+    """
+
+    def __init__(self, metrics_file: MetricsFile, name: str, documentation: str, labelnames: Sequence[str]):
+        super().__init__(name, documentation, labelnames, metrics_file.buckets)
+        self.metrics_file = metrics_file
+
+    def observe(self, labels: Labels, value: float) -> None:
+        """Count a value in this worker's slot."""
+        index = self.metrics_file.series("histogram", series_key(self.name, labels))
+        if index is not None:
+            row = self.metrics_file.view("histogram_values")[index]
+            row[bisect_left(self.buckets, value)] += 1
+            row[-1] += value
+
+    def series_count(self) -> int:
+        """Series this worker has written, without reading other slots."""
+        return self.metrics_file.series_count("histogram", self.name)
+
+    def values(self) -> Dict[Labels, List[float]]:
+        """Per series, bucket counts (+Inf last) then the sum, over all workers."""
+        merged = self.metrics_file.merged("histogram")
+        return {
+            labels: [int(n) for n in values[:-1]] + [float(values[-1])]
+            for labels, values in _split_keys(self.name, merged)
+        }
+
+    def reset(self) -> None:
+        """Zero every series in every worker."""
+        self.metrics_file.reset()
+
+
+class FileLatencyHistogram:
+    """
+    Response time histogram kept in a metrics file.
+
+    Records into this worker's slot; reads merge every slot into a
+    LatencyHistogram, so it answers the same questions.
+
+    Args:
+        metrics_file: Shared metrics file
+    """
+
+    def __init__(self, metrics_file: MetricsFile):
+        self.metrics_file = metrics_file
+
+    def record(self, value: float) -> None:
+        """Record one latency in seconds."""
+        metrics_file = self.metrics_file
+        metrics_file.view("latency_counts")[metrics_file.layout.bucket(value)] += 1
+        stats = metrics_file.view("latency_stats")
+        if stats[_COUNT] == 0 or value < stats[_MIN]:
+            stats[_MIN] = value
+        if stats[_COUNT] == 0 or value > stats[_MAX]:
+            stats[_MAX] = value
+        stats[_COUNT] += 1
+        stats[_TOTAL] += value
+
+    def merged(self) -> LatencyHistogram:
+        """All workers' latencies in one histogram."""
+        return self.metrics_file.merged_latency()
+
+    def reset(self) -> None:
+        """Forget all recorded values in every worker."""
+        self.metrics_file.reset()
@@ -0,0 +1,250 @@
+"""
+Profiling Module
+Single responsibility: Inspect a running worker's CPU and memory on demand.
+
+This module:
+- Samples every thread's Python stack for a bounded time and folds the
+  samples into collapsed stacks or a flame graph tree
+- Estimates the memory held by an object graph, sampling large containers
+- Traces allocations with tracemalloc for a bounded time
+
+Nothing here runs until asked: there is no profiler hook or tracing
+between requests, so the cost outside a profile is zero.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import types
+from collections import deque
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+
+
+class ProfilerBusy(Exception):
+    """Raised when a profile is requested while another is running."""
+
+
+class SamplingProfiler:
+    """
+    Statistical CPU profiler that samples thread stacks from a thread.
+
+    For the length of a profile a sampler thread wakes every ``interval``
+    and reads the current frame of every other thread. Each stack is
+    counted under its "thread;outer;...;inner" path, the collapsed
+    format flamegraph.pl and speedscope read. Threads blocked in I/O or
+    waiting on a lock show up in their waiting frame, so idle time is
+    visible as well as busy time. Only one profile runs at a time.
+
+    Args:
+        interval: Seconds between samples
+        max_depth: Innermost frames kept per stack
+    """
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self._lock = threading.Lock()
+        self._labels: Dict[types.CodeType, str] = {}
+
+    def profile(self, seconds: float, interval: Optional[float] = None) -> Dict[str, int]:
+        """
+        Sample all other threads for some seconds; blocks the caller.
+
+        Args:
+            seconds: How long to sample
+            interval: Seconds between samples, the profiler's default if omitted
+
+        Returns:
+            Sample count per collapsed stack
+
+        Raises:
+            ProfilerBusy: If another profile is running
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A profile is already running")
+        try:
+            return self._sample(seconds, self.interval if interval is None else interval)
+        finally:
+            self._lock.release()
+            self._labels.clear()
+
+    def _sample(self, seconds: float, interval: float) -> Dict[str, int]:
+        me = threading.get_ident()
+        stacks: Dict[str, int] = {}
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                labels = []
+                while frame is not None and len(labels) < self.max_depth:
+                    labels.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                labels.append(names.get(ident, f"thread-{ident}"))
+                key = ";".join(reversed(labels))
+                stacks[key] = stacks.get(key, 0) + 1
+            time.sleep(interval)
+        return stacks
+
+    def _label(self, code: types.CodeType) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            name = getattr(code, "co_qualname", code.co_name)
+            label = self._labels[code] = (
+                f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            ).replace(";", ":")
+        return label
+
+
+def collapsed(stacks: Dict[str, int]) -> str:
+    """Collapsed stack text, one "frame;frame;frame count" line per stack."""
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+
+
+def flame_tree(stacks: Dict[str, int]) -> Dict[str, Any]:
+    """
+    Nest collapsed stacks into a flame graph tree.
+
+    Returns:
+        {"name", "value", "children"} nodes, the layout d3-flame-graph
+        reads; a node's value counts the samples in it and below it
+    """
+    root: Dict[str, Any] = {"name": "all", "value": 0, "children": {}}
+    for stack, count in stacks.items():
+        node = root
+        node["value"] += count
+        for frame in stack.split(";"):
+            child = node["children"].get(frame)
+            if child is None:
+                child = node["children"][frame] = {"name": frame, "value": 0, "children": {}}
+            child["value"] += count
+            node = child
+    return _listed(root)
+
+
+def _listed(node: Dict[str, Any]) -> Dict[str, Any]:
+    children = sorted(node["children"].values(), key=lambda child: -child["value"])
+    return {"name": node["name"], "value": node["value"], "children": [_listed(c) for c in children]}
+
+
+# Objects shared with the rest of the process rather than owned
+_OPAQUE = (
+    type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+    types.MethodType, types.CodeType, types.FrameType, threading.Thread,
+    asyncio.AbstractEventLoop, asyncio.Future,
+)
+_LEAVES = (str, bytes, bytearray, int, float, complex, bool, type(None))
+
+
+def estimate_size(obj: Any, sample: int = 1000, seen: Optional[Set[int]] = None, depth: int = 8) -> int:
+    """
+    Estimate the bytes held by an object and everything it references.
+
+    Containers with more than ``sample`` entries are measured on their
+    first ``sample`` entries and scaled up, so the cost is bounded however
+    many clients a table holds. numpy arrays count their buffer unless
+    it belongs to another array or a mapped file.
+
+    Args:
+        obj: Object to measure
+        sample: Entries measured per container
+        seen: Ids already counted; pass the same set across calls so
+            objects shared between subsystems are counted once
+        depth: Levels of references followed
+
+    Returns:
+        Estimated bytes
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen or isinstance(obj, _OPAQUE):
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, np.ndarray):
+        return sys.getsizeof(obj) if obj.base is not None else obj.nbytes + sys.getsizeof(obj)
+    size = sys.getsizeof(obj, 0)
+    if isinstance(obj, _LEAVES) or depth == 0:
+        return size
+
+    if isinstance(obj, dict):
+        children = (item for pair in obj.items() for item in pair)
+        entries = len(obj) * 2
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        children = iter(obj)
+        entries = len(obj)
+    else:
+        attributes = getattr(obj, "__dict__", None)
+        children = iter(list(attributes.values()) if attributes is not None else [])
+        entries = len(attributes) if attributes is not None else 0
+        if attributes is not None:
+            size += sys.getsizeof(attributes)
+        for name in getattr(type(obj), "__slots__", ()):
+            if hasattr(obj, name):
+                size += estimate_size(getattr(obj, name), sample, seen, depth - 1)
+
+    measured = 0
+    counted = 0
+    for child in children:
+        if counted == sample * 2:
+            break
+        measured += estimate_size(child, sample, seen, depth - 1)
+        counted += 1
+    if counted and entries > counted:
+        measured = measured * entries // counted
+    return size + measured
+
+
+async def trace_allocations(seconds: float, limit: int = 20, frames: int = 1) -> Dict[str, Any]:
+    """
+    Top allocation sites by bytes still held.
+
+    If tracemalloc is already tracing (e.g. PYTHONTRACEMALLOC is set),
+    the snapshot is taken at once and covers everything traced so far.
+    Otherwise tracing is switched on for ``seconds`` and off again, so it
+    covers what was allocated in that window and is still alive.
+
+    Args:
+        seconds: How long to trace when not already tracing
+        limit: Allocation sites reported
+        frames: Stack frames recorded per allocation
+
+    Returns:
+        Traced totals and the top sites with their size and block count
+    """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start(frames)
+        try:
+            await asyncio.sleep(seconds)
+            snapshot = tracemalloc.take_snapshot()
+            traced, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    else:
+        snapshot = tracemalloc.take_snapshot()
+        traced, peak = tracemalloc.get_traced_memory()
+
+    key = "traceback" if frames > 1 else "lineno"
+    stats = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+    )).statistics(key)
+    top: List[Dict[str, Any]] = []
+    for stat in stats[:limit]:
+        top.append({
+            "location": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+            "size_bytes": stat.size,
+            "blocks": stat.count,
+        })
+    return {
+        "window_seconds": seconds if started else None,
+        "traced_bytes": traced,
+        "peak_bytes": peak,
+        "top": top,
+    }
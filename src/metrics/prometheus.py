@@ -0,0 +1,227 @@
+"""
+Prometheus Module
+Single responsibility: Keep labeled counters and histograms for scraping.
+
+This module:
+- Counts into per-thread shards, so increments take no lock
+- Merges the shards when read, at a cost bounded by the number of label
+  combinations rather than the number of increments
+- Renders metrics in the Prometheus text exposition format
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+
+Labels = Tuple[str, ...]
+
+# Upper bounds in seconds of the request duration buckets
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class _Sharded:
+    """
+    Base for metrics whose values live in one dict per thread.
+
+    Each thread only ever writes to its own shard, so there is nothing to
+    lock. Readers copy every shard (a single atomic dict copy under the
+    GIL) and merge. Event loop code all lands in the loop thread's shard;
+    worker threads get theirs.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        """The calling thread's shard, created on its first write."""
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            # Only taken once per thread, never on the hot path
+            with self._shards_lock:
+                self._shards.append(shard)
+            return shard
+
+    def _snapshots(self) -> List[dict]:
+        with self._shards_lock:
+            shards = list(self._shards)
+        return [shard.copy() for shard in shards]
+
+    def series_count(self) -> int:
+        """Series held in this process, counted per shard without merging."""
+        with self._shards_lock:
+            return sum(len(shard) for shard in self._shards)
+
+    def reset(self) -> None:
+        """Zero every series."""
+        with self._shards_lock:
+            for shard in self._shards:
+                shard.clear()
+
+
+class ShardedCounter(_Sharded):
+    """
+    Monotonic counter with labels.
+
+    Args:
+        name: Metric name, e.g. "gateway_requests_total"
+        documentation: HELP text
+        labelnames: Label names, in the order label values are given
+    """
+
+    def inc(self, labels: Labels, amount: int = 1) -> None:
+        """
+        Add to the series of a label combination.
+
+        Args:
+            labels: Label values, one per label name
+            amount: Amount to add
+        """
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def values(self) -> Dict[Labels, int]:
+        """Value of every series, merged over all shards."""
+        merged: Dict[Labels, int] = {}
+        for snapshot in self._snapshots():
+            for labels, value in snapshot.items():
+                merged[labels] = merged.get(labels, 0) + value
+        return merged
+
+    def total(self, **match: Iterable[str]) -> int:
+        """
+        Sum over series, optionally only those with some label values.
+
+        Usage:
+            counter.total(decision=("rejected", "flagged"))
+
+        Args:
+            match: Label name to the values a series may have
+        """
+        filters = [
+            (self.labelnames.index(name), frozenset(allowed)) for name, allowed in match.items()
+        ]
+        return sum(
+            value for labels, value in self.values().items()
+            if all(labels[index] in allowed for index, allowed in filters)
+        )
+
+    def render(self) -> List[str]:
+        """Exposition lines of this counter."""
+        lines = _header(self, "counter")
+        for labels, value in sorted(self.values().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class ShardedHistogram(_Sharded):
+    """
+    Prometheus histogram with labels and fixed buckets.
+
+    Args:
+        name: Metric name, e.g. "gateway_request_duration_seconds"
+        documentation: HELP text
+        labelnames: Label names, in the order label values are given
+        buckets: Increasing bucket upper bounds; +Inf is implied
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        buckets: Sequence[float] = DURATION_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, labels: Labels, value: float) -> None:
+        """
+        Count a value in the series of a label combination.
+
+        Args:
+            labels: Label values, one per label name
+            value: Observed value
+        """
+        shard = self._shard()
+        series = shard.get(labels)
+        if series is None:
+            # Non-cumulative count per bucket (last one is +Inf), then the sum
+            series = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def values(self) -> Dict[Labels, List[float]]:
+        """Per series, bucket counts (+Inf last) followed by the sum."""
+        merged: Dict[Labels, List[float]] = {}
+        for snapshot in self._snapshots():
+            for labels, series in snapshot.items():
+                series = list(series)
+                existing = merged.get(labels)
+                if existing is None:
+                    merged[labels] = series
+                else:
+                    merged[labels] = [a + b for a, b in zip(existing, series)]
+        return merged
+
+    def render(self) -> List[str]:
+        """Exposition lines of this histogram."""
+        lines = _header(self, "histogram")
+        bounds = [_format_value(bound) for bound in self.buckets] + ["+Inf"]
+        for labels, series in sorted(self.values().items()):
+            cumulative = 0
+            for bound, count in zip(bounds, series):
+                cumulative += count
+                bucket_labels = _format_labels(self.labelnames + ("le",), labels + (bound,))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+def render(metrics: Iterable[_Sharded]) -> str:
+    """
+    Render metrics in the Prometheus text format (version 0.0.4).
+
+    Args:
+        metrics: Counters and histograms to expose
+
+    Returns:
+        Exposition text, newline terminated
+    """
+    lines: List[str] = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def status_class(status_code: int) -> str:
+    """Status class label of an HTTP status, e.g. "2xx"."""
+    return f"{status_code // 100}xx"
+
+
+def _header(metric: _Sharded, kind: str) -> List[str]:
+    return [f"# HELP {metric.name} {metric.documentation}", f"# TYPE {metric.name} {kind}"]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value))
@@ -0,0 +1,167 @@
+"""
+Timing Module
+Single responsibility: Time the stages of a request.
+
+This module:
+- Carries a per-request span in a context variable, so stages deep in
+  the call stack can be timed without threading a timer through every call
+- Times stages with the monotonic nanosecond clock
+- Keeps a latency histogram per stage across requests
+- Formats a span as a Server-Timing header
+
+With no span active, timing a stage costs one context variable lookup.
+"""
+
+from contextvars import ContextVar, Token
+from time import perf_counter_ns
+from typing import Dict, Iterable, Optional
+
+from .histogram import LatencyHistogram
+
+
+class RequestSpan:
+    """
+    Stage timings of one request.
+
+    Time spent in a stage entered more than once is summed. Context
+    variables are copied into tasks and worker threads, so concurrent
+    work started by the request (e.g. a batch) adds to the same span.
+    """
+
+    __slots__ = ("started_ns", "stages")
+
+    def __init__(self):
+        self.started_ns = perf_counter_ns()
+        self.stages: Dict[str, int] = {}
+
+    def add(self, name: str, elapsed_ns: int) -> None:
+        """Add time to a stage."""
+        self.stages[name] = self.stages.get(name, 0) + elapsed_ns
+
+    def elapsed_ns(self) -> int:
+        """Nanoseconds since the span started."""
+        return perf_counter_ns() - self.started_ns
+
+
+_current: ContextVar[Optional[RequestSpan]] = ContextVar("request_span", default=None)
+
+
+def begin_span() -> Token:
+    """
+    Start timing the current request.
+
+    Returns:
+        Token to hand to ``end_span``
+    """
+    return _current.set(RequestSpan())
+
+
+def end_span(token: Token) -> None:
+    """Stop timing the request started with ``begin_span``."""
+    _current.reset(token)
+
+
+def current_span() -> Optional[RequestSpan]:
+    """The span of the request being handled, or None if not timed."""
+    return _current.get()
+
+
+class _Stage:
+    """Context manager adding its duration to a span."""
+
+    __slots__ = ("span", "name", "started_ns")
+
+    def __init__(self, span: RequestSpan, name: str):
+        self.span = span
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.started_ns = perf_counter_ns()
+
+    def __exit__(self, *exc_info) -> None:
+        self.span.add(self.name, perf_counter_ns() - self.started_ns)
+
+
+class _NoStage:
+    """Context manager doing nothing, used when no span is active."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(name: str):
+    """
+    Time a block as a stage of the current request.
+
+    Usage:
+        with stage("backend"):
+            ...
+
+    Args:
+        name: Stage name, e.g. "limit" or "backend"
+    """
+    span = _current.get()
+    if span is None:
+        return _NO_STAGE
+    return _Stage(span, name)
+
+
+def server_timing(span: RequestSpan, total_ns: Optional[int] = None) -> str:
+    """
+    Format a span as a Server-Timing header value.
+
+    Args:
+        span: Timed request
+        total_ns: Whole request duration, appended as "total" if given
+
+    Returns:
+        e.g. ``limit;dur=0.012, backend;dur=3.402, total;dur=3.6``
+    """
+    entries = [f"{name};dur={elapsed / 1e6:.3f}" for name, elapsed in span.stages.items()]
+    if total_ns is not None:
+        entries.append(f"total;dur={total_ns / 1e6:.3f}")
+    return ", ".join(entries)
+
+
+class StageTimings:
+    """
+    Latency histogram per request stage.
+
+    Args:
+        stages: Stage names reported even before they were first timed
+    """
+
+    def __init__(self, stages: Iterable[str] = ()):
+        self.histograms: Dict[str, LatencyHistogram] = {name: LatencyHistogram() for name in stages}
+
+    def record(self, span: RequestSpan, total_ns: Optional[int] = None) -> None:
+        """
+        Add a finished request's stage timings.
+
+        Args:
+            span: Timed request
+            total_ns: Whole request duration, recorded as stage "total"
+        """
+        for name, elapsed in span.stages.items():
+            self._histogram(name).record(elapsed / 1e9)
+        if total_ns is not None:
+            self._histogram("total").record(total_ns / 1e9)
+
+    def reset(self) -> None:
+        """Forget all timings."""
+        for histogram in self.histograms.values():
+            histogram.reset()
+
+    def _histogram(self, name: str) -> LatencyHistogram:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = LatencyHistogram()
+        return histogram
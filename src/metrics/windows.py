@@ -0,0 +1,148 @@
+"""
+Windows Module
+Single responsibility: Report recent traffic over sliding time windows.
+
+This module:
+- Counts requests, blocks, errors and latencies per second in a ring buffer
+- Reuses the ring's slots as time passes, so it never needs resetting
+- Merges the slots of a window on demand into rates and percentiles
+"""
+
+import time
+from typing import Callable, Dict, Iterable, Tuple
+
+import numpy as np
+
+from .histogram import LatencyHistogram
+
+
+# Window name and length in seconds
+WINDOWS: Tuple[Tuple[str, int], ...] = (("1s", 1), ("1m", 60), ("5m", 300))
+
+
+class RollingWindows:
+    """
+    Per-second traffic counters over the last few minutes.
+
+    A ring buffer holds one slot per second: request, block and error
+    counts, the summed latency and a coarse latency histogram. The
+    current second is counted in plain attributes and written into its
+    slot once the second is over, overwriting whatever second had aged
+    out of that slot. Nothing is allocated per request. A window is the
+    sum of its slots, O(window) to merge.
+
+    Windows cover completed seconds only, so the 1s window is the last
+    full second rather than a partial one.
+
+    Args:
+        windows: (name, seconds) pairs to report
+        percentiles: Latency percentiles reported per window
+        clock: Seconds clock, replaceable in tests
+        precision_bits: Latency histogram precision per slot; the default
+            5 bits keeps values within ~6% in 464 buckets per second
+    """
+
+    def __init__(
+        self,
+        windows: Iterable[Tuple[str, int]] = WINDOWS,
+        percentiles: Iterable[float] = (50, 90, 99, 99.9),
+        clock: Callable[[], float] = time.monotonic,
+        precision_bits: int = 5
+    ):
+        self.windows = tuple(windows)
+        self.percentiles = tuple(percentiles)
+        self.clock = clock
+        self.horizon = max(seconds for _, seconds in self.windows) + 1
+        self.layout = LatencyHistogram(precision_bits=precision_bits)
+
+        self._seconds = np.full(self.horizon, -1, dtype=np.int64)
+        self._counts = np.zeros((self.horizon, 3), dtype=np.int64)
+        self._latency_total = np.zeros(self.horizon, dtype=np.float64)
+        self._latency = np.zeros((self.horizon, len(self.layout.counts)), dtype=np.uint32)
+        self._started = int(clock())
+
+        # Counters of the second being recorded
+        self._second = self._started
+        self._requests = 0
+        self._blocked = 0
+        self._errors = 0
+        self._total = 0.0
+        self._buckets = [0] * len(self.layout.counts)
+
+    def record(self, was_blocked: bool, response_time: float, failed: bool = False) -> None:
+        """
+        Count a request in the current second.
+
+        Args:
+            was_blocked: True if rate limited
+            response_time: Time in seconds to process; only counted for
+                requests that were not blocked
+            failed: True if the request ended in a server error
+        """
+        second = int(self.clock())
+        if second != self._second:
+            self._advance(second)
+        self._requests += 1
+        if was_blocked:
+            self._blocked += 1
+            return
+        if failed:
+            self._errors += 1
+        self._buckets[self.layout.bucket(response_time)] += 1
+        self._total += response_time
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """
+        Rates and latency percentiles per window.
+
+        Returns:
+            Per window name: requests, qps, block and error rates and
+            response time percentiles in milliseconds
+        """
+        now = int(self.clock())
+        if now != self._second:
+            self._advance(now)
+        stats = {}
+        for name, seconds in self.windows:
+            stats[name] = self._window(now, seconds)
+        return stats
+
+    def _window(self, now: int, seconds: int) -> Dict:
+        """Merge the completed seconds of one window."""
+        live = (self._seconds >= now - seconds) & (self._seconds < now)
+        requests, blocked, errors = (int(n) for n in self._counts[live].sum(axis=0))
+        served = requests - blocked
+        # Right after start the window is not full yet; rate over what exists
+        covered = max(1, min(seconds, now - self._started))
+
+        latency = self.layout.percentiles_of(
+            self._latency[live].sum(axis=0), self.percentiles
+        )
+        response_time_ms = {
+            "p" + f"{p:g}".replace(".", ""): None if value is None else round(value * 1000, 3)
+            for p, value in latency.items()
+        }
+        mean = float(self._latency_total[live].sum()) / served if served else 0.0
+
+        return {
+            "requests": requests,
+            "qps": round(requests / covered, 2),
+            "block_rate_percent": round(blocked / requests * 100, 2) if requests else 0.0,
+            "error_rate_percent": round(errors / served * 100, 2) if served else 0.0,
+            "average_response_time_seconds": round(mean, 4),
+            "response_time_ms": response_time_ms,
+        }
+
+    def _advance(self, second: int) -> None:
+        """Store the finished second in its ring slot and start counting a new one."""
+        slot = self._second % self.horizon
+        self._seconds[slot] = self._second
+        self._counts[slot] = (self._requests, self._blocked, self._errors)
+        self._latency_total[slot] = self._total
+        self._latency[slot] = self._buckets
+
+        self._second = second
+        if self._requests:
+            self._requests = self._blocked = self._errors = 0
+            self._total = 0.0
+            self._buckets = [0] * len(self._buckets)
@@ -6,7 +6,21 @@ Modules:
 - response_models: Response schemas
 """
 
-from .request_models import ProductSearchRequest
-from .response_models import APIResponse, RateLimitResponse
+from .request_models import ProductSearchRequest, BatchSearchRequest
+from .response_models import (
+    APIResponse,
+    RateLimitResponse,
+    ServiceUnavailableResponse,
+    GatewayTimeoutResponse,
+    ChallengeResponse,
+)
 
-__all__ = ["ProductSearchRequest", "APIResponse", "RateLimitResponse"]
+__all__ = [
+    "ProductSearchRequest",
+    "BatchSearchRequest",
+    "APIResponse",
+    "RateLimitResponse",
+    "ServiceUnavailableResponse",
+    "GatewayTimeoutResponse",
+    "ChallengeResponse",
+]
@@ -4,10 +4,11 @@ Single responsibility: Define request data structures.
 
 Models:
 - ProductSearchRequest: Product search with crawler protection
+- BatchSearchRequest: Several product searches in one round trip
 """
 
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 
 
 class ProductSearchRequest(BaseModel):
@@ -29,10 +30,35 @@ class ProductSearchRequest(BaseModel):
         le=50,
         description="Results per page (max 50 to prevent crawler abuse)"
     )
+    q: Optional[str] = Field(
+        default=None,
+        min_length=1,
+        max_length=100,
+        description="Words the product name must contain; the last may be a prefix"
+    )
+    cursor: Optional[str] = Field(
+        default=None,
+        max_length=512,
+        description="next_cursor of the previous page; takes precedence over page"
+    )
     sort_by: Optional[str] = Field(
         default="relevance",
         description="Sort order (relevance, price_asc, price_desc)"
     )
+    in_stock: Optional[bool] = Field(
+        default=None,
+        description="Only products with this stock status"
+    )
+    min_price: Optional[float] = Field(
+        default=None,
+        ge=0,
+        description="Only products at or above this price"
+    )
+    max_price: Optional[float] = Field(
+        default=None,
+        ge=0,
+        description="Only products at or below this price"
+    )
 
     class Config:
         json_schema_extra = {
@@ -42,3 +68,24 @@ class ProductSearchRequest(BaseModel):
                 "limit": 20
             }
         }
+
+
+class BatchSearchRequest(BaseModel):
+    """Schema for running several product searches in one request."""
+
+    queries: List[ProductSearchRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=10,
+        description="Searches to run (max 10); results keep this order"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "queries": [
+                    {"category": "electronics", "page": 1, "limit": 20},
+                    {"category": "books", "page": 1, "limit": 10, "sort_by": "price_asc"}
+                ]
+            }
+        }
@@ -5,6 +5,9 @@ Single responsibility: Define response data structures.
 Models:
 - APIResponse: Standard success response
 - RateLimitResponse: Rate limit error response
+- ServiceUnavailableResponse: Load shedding error response
+- GatewayTimeoutResponse: Deadline exceeded error response
+- ChallengeResponse: Proof-of-work challenge for suspected crawlers
 """
 
 from pydantic import BaseModel
@@ -27,3 +30,38 @@ class RateLimitResponse(BaseModel):
     message: str = "Rate limit exceeded"
     error: str = "Too many requests"
     retry_after_seconds: int = 1
+
+
+class ServiceUnavailableResponse(BaseModel):
+    """Response when a request is shed because the backend is saturated."""
+
+    success: bool = False
+    message: str = "Service temporarily overloaded"
+    error: str = "Request shed"
+    reason: str = "overloaded"
+    retry_after_seconds: int = 1
+
+
+class GatewayTimeoutResponse(BaseModel):
+    """Response when the backend does not answer within the route's budget."""
+
+    success: bool = False
+    message: str = "Backend did not respond in time"
+    error: str = "Deadline exceeded"
+
+
+class ChallengeResponse(BaseModel):
+    """Response asking a suspected crawler to solve a proof-of-work puzzle."""
+
+    success: bool = False
+    message: str = "Proof of work required"
+    error: str = "Challenge required"
+    challenge: str
+    difficulty: int
+    expires_at: int
+    algorithm: str = "sha256"
+    instructions: str = (
+        "Find a string S such that sha256('<challenge>:S') starts with "
+        "<difficulty> zero bits, then retry with the X-PoW-Challenge and "
+        "X-PoW-Solution headers"
+    )
@@ -4,8 +4,23 @@ Rate limiting package - handles all rate limiting logic.
 Modules:
 - token_bucket: Token bucket algorithm implementation
 - rate_limiter: Manages rate limiting for multiple clients
+- throttle_queue: Delays over-limit requests instead of rejecting them
+- policy: Immutable policy tables, reloaded live from a file
+- gossip: Approximate cluster-wide limits by gossiping usage over UDP
+- replay: Replays recorded or synthetic traffic through policies offline
 """
 
+from .gossip import GossipNode, GossipRateLimiter
+from .policy import LimitPolicy, PolicyReloader, PolicyTable
 from .rate_limiter import RateLimiter
+from .throttle_queue import ThrottleQueue
 
-__all__ = ["RateLimiter"]
+__all__ = [
+    "GossipNode",
+    "GossipRateLimiter",
+    "LimitPolicy",
+    "PolicyReloader",
+    "PolicyTable",
+    "RateLimiter",
+    "ThrottleQueue",
+]
@@ -0,0 +1,483 @@
+"""
+Gossip Module
+Single responsibility: Approximate cluster-wide rate limits by gossiping usage.
+
+This module:
+- Enforces limits locally, with no shared store on the request path
+- Broadcasts each node's recent per-client usage (top talkers only) to
+  its peers over UDP every few hundred milliseconds
+- Charges usage heard from peers to the local buckets, so every node's
+  bucket for a client tracks the client's usage across the cluster
+- Bounds how far the cluster can over-admit a client between syncs
+- Signs every datagram with a key shared by the cluster and drops any
+  datagram that does not verify
+
+Every node refills a client's bucket at the policy's rate and takes
+from it whatever the client spent on any node, so each node holds an
+approximation of one global bucket. It lags by the usage not yet heard:
+tokens other nodes admitted since their last broadcast. Each node caps
+that unsynced usage per client at ``error_bound * capacity / nodes``, so
+while gossip arrives the cluster admits at most about ``error_bound *
+capacity`` more than the policy allows. A request that reaches the cap
+on a node is held there until the node's next broadcast, which the cap
+brings forward, and then weighed again; a tighter bound syncs more often
+and holds more requests, for longer.
+
+Lost datagrams are not resent: the usage they carried is never charged
+elsewhere, which widens the error by that amount.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import heapq
+import logging
+import math
+import secrets
+import socket
+import struct
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .policy import PolicyTable
+from .rate_limiter import RateLimiter
+from .token_bucket import TokenBucket
+
+
+logger = logging.getLogger("gateway.gossip")
+
+Address = Tuple[str, int]
+
+MAGIC = b"GL"
+VERSION = 2
+# Magic, version, sender node id, entry count
+HEADER = struct.Struct("!2sBIH")
+# Per entry: key length, then the key, then tokens spent
+KEY_LENGTH = struct.Struct("!B")
+TOKENS = struct.Struct("!f")
+# Truncated HMAC-SHA256 of everything before it, at the end of a datagram
+TAG_SIZE = 16
+MAX_DATAGRAM = 1400
+
+
+def parse_address(text: str) -> Address:
+    """
+    Parse "host:port", resolving the host to an IP address.
+
+    Raises:
+        ValueError: If the address is malformed or does not resolve
+    """
+    host, sep, port = text.strip().rpartition(":")
+    if not sep or not host or not port.isdigit():
+        raise ValueError(f"Gossip address {text!r} is not host:port")
+    host = host.strip("[]")
+    try:
+        info = socket.getaddrinfo(host, int(port), type=socket.SOCK_DGRAM)
+    except socket.gaierror as exc:
+        raise ValueError(f"Gossip address {text!r} does not resolve: {exc}") from None
+    return info[0][4][0], int(port)
+
+
+def _tag(secret: bytes, message: bytes) -> bytes:
+    return hmac.new(secret, message, hashlib.sha256).digest()[:TAG_SIZE]
+
+
+def encode_usage(
+    node_id: int,
+    entries: Iterable[Tuple[str, float]],
+    secret: bytes,
+    max_datagram: int = MAX_DATAGRAM
+) -> List[bytes]:
+    """
+    Pack (client, tokens) entries into as few signed datagrams as fit.
+
+    Args:
+        node_id: Sender's node id
+        entries: Tokens each client spent since the last broadcast
+        secret: Cluster key the datagrams are signed with
+        max_datagram: Largest datagram to build, in bytes
+
+    Returns:
+        Datagrams; keys too long to encode are skipped
+    """
+    datagrams = []
+    body = bytearray()
+    count = 0
+
+    def seal() -> bytes:
+        message = HEADER.pack(MAGIC, VERSION, node_id, count) + body
+        return message + _tag(secret, message)
+
+    for client_id, tokens in entries:
+        key = client_id.encode()
+        if len(key) > 255:
+            continue
+        entry = KEY_LENGTH.pack(len(key)) + key + TOKENS.pack(tokens)
+        if count and HEADER.size + len(body) + len(entry) + TAG_SIZE > max_datagram:
+            datagrams.append(seal())
+            body = bytearray()
+            count = 0
+        body += entry
+        count += 1
+    if count:
+        datagrams.append(seal())
+    return datagrams
+
+
+def decode_usage(data: bytes, secret: bytes) -> Tuple[int, List[Tuple[str, float]]]:
+    """
+    Verify and unpack a datagram built by encode_usage.
+
+    Returns:
+        Sender's node id and its (client, tokens) entries
+
+    Raises:
+        ValueError: If the datagram is not signed with the secret, is
+            malformed, or charges a negative or non-finite amount
+    """
+    data, tag = data[:-TAG_SIZE], data[-TAG_SIZE:]
+    if len(data) < HEADER.size or not hmac.compare_digest(tag, _tag(secret, data)):
+        raise ValueError("Gossip datagram is not signed with the cluster key")
+    try:
+        magic, version, node_id, count = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a gossip datagram")
+        entries = []
+        offset = HEADER.size
+        for _ in range(count):
+            (length,) = KEY_LENGTH.unpack_from(data, offset)
+            offset += KEY_LENGTH.size
+            key = data[offset:offset + length].decode()
+            offset += length
+            (tokens,) = TOKENS.unpack_from(data, offset)
+            offset += TOKENS.size
+            if not math.isfinite(tokens) or tokens < 0:
+                raise ValueError(f"Malformed gossip datagram: {tokens} tokens for {key!r}")
+            entries.append((key, tokens))
+    except (struct.error, UnicodeDecodeError) as exc:
+        raise ValueError(f"Malformed gossip datagram: {exc}") from None
+    if offset != len(data):
+        raise ValueError("Malformed gossip datagram: trailing bytes")
+    return node_id, entries
+
+
+class GossipRateLimiter(RateLimiter):
+    """
+    Rate limiter that records local usage for gossip and takes peers' usage.
+
+    Args:
+        capacity: Max tokens per client
+        refill_rate: Tokens per second per client
+        clock: Time source handed to every bucket
+        policies: Policy table to start with; overrides capacity and
+            refill_rate
+        error_bound: Over-admission the cluster may allow a client between
+            syncs, as a fraction of the client's capacity
+        nodes: Nodes in the cluster, this one included
+        max_held_per_client: Max requests of one client held at the cap
+            at once; more are refused
+    """
+
+    def __init__(
+        self,
+        capacity: int = 100,
+        refill_rate: float = 10.0,
+        clock: Callable[[], float] = time.time,
+        policies: Optional[PolicyTable] = None,
+        error_bound: float = 0.1,
+        nodes: int = 1,
+        max_held_per_client: int = 8
+    ):
+        super().__init__(capacity, refill_rate, clock, policies)
+        if error_bound <= 0:
+            raise ValueError(f"error_bound must be positive, got {error_bound}")
+        self.error_bound = error_bound
+        self.nodes = nodes
+        self.unsynced: Dict[str, float] = {}
+        self.max_held_per_client = max_held_per_client
+        self.on_saturated: Optional[Callable[[], None]] = None
+        self.capped = 0
+        self.held = 0
+        self._holding: Dict[str, int] = {}
+        # Set, and replaced, whenever unsynced usage is taken for a broadcast
+        self._synced: Optional[asyncio.Event] = None
+
+    def is_allowed(self, client_id: str, cost: float = 1) -> bool:
+        """
+        Check if client can make a request.
+
+        Besides the client's bucket, the tokens it spent here since the
+        last broadcast must stay within this node's share of the error
+        bound; a client's first request after a sync is always weighed
+        by its bucket alone. A request refused at that cap can be held
+        for the next broadcast with ``hold``.
+
+        Args:
+            client_id: Unique client identifier (e.g., IP address)
+            cost: Tokens the request consumes
+
+        Returns:
+            True if allowed, False if rate limited
+        """
+        bucket = self.get_bucket(client_id)
+        if self._capped(client_id, bucket, cost):
+            self.capped += 1
+            if self.on_saturated is not None:
+                self.on_saturated()
+            return False
+        if not bucket.allow_request(cost):
+            return False
+        self.unsynced[client_id] = self.unsynced.get(client_id, 0.0) + cost
+        return True
+
+    async def hold(self, client_id: str, cost: float, timeout: float) -> bool:
+        """
+        Hold a request refused at the cap until the next broadcast.
+
+        The broadcast, which the cap brought forward, clears the client's
+        unsynced usage; the request is then weighed again, and held again
+        if other held requests took the room first. Requests refused by
+        the bucket itself are not held.
+
+        Args:
+            client_id: Unique client identifier
+            cost: Tokens the request consumes
+            timeout: Longest to wait, in seconds
+
+        Returns:
+            True once the request was admitted, False if it stays refused
+        """
+        holding = self._holding.get(client_id, 0)
+        if (
+            timeout <= 0
+            or holding >= self.max_held_per_client
+            or not self._capped(client_id, self.get_bucket(client_id), cost)
+        ):
+            return False
+        loop = asyncio.get_running_loop()
+        until = loop.time() + timeout
+        self._holding[client_id] = holding + 1
+        self.held += 1
+        try:
+            while True:
+                if self._synced is None:
+                    self._synced = asyncio.Event()
+                try:
+                    await asyncio.wait_for(self._synced.wait(), until - loop.time())
+                except asyncio.TimeoutError:
+                    return False
+                if self.is_allowed(client_id, cost):
+                    return True
+                if not self._capped(client_id, self.get_bucket(client_id), cost):
+                    return False
+        finally:
+            holding = self._holding.pop(client_id) - 1
+            if holding:
+                self._holding[client_id] = holding
+
+    def _capped(self, client_id: str, bucket: TokenBucket, cost: float) -> bool:
+        """Whether a request would take the client past its unsynced cap."""
+        unsynced = self.unsynced.get(client_id, 0.0)
+        return bool(unsynced) and unsynced + cost > self.error_bound * bucket.capacity / self.nodes
+
+    def note_usage(self, client_id: str, cost: float) -> None:
+        """Count tokens taken outside is_allowed towards the next broadcast."""
+        self.unsynced[client_id] = self.unsynced.get(client_id, 0.0) + cost
+
+    def take_unsynced(self, limit: int) -> List[Tuple[str, float]]:
+        """
+        Remove and return the clients with the most unsynced usage.
+
+        Clients past ``limit`` keep their usage for a later broadcast.
+        Requests held at the cap are woken to be weighed again.
+        """
+        if self._synced is not None:
+            self._synced.set()
+            self._synced = None
+        if len(self.unsynced) <= limit:
+            entries = list(self.unsynced.items())
+            self.unsynced.clear()
+            return entries
+        entries = heapq.nlargest(limit, self.unsynced.items(), key=lambda item: item[1])
+        for client_id, _ in entries:
+            del self.unsynced[client_id]
+        return entries
+
+    def charge_remote(self, client_id: str, tokens: float) -> None:
+        """
+        Take tokens a peer admitted from the local bucket.
+
+        The bucket may go into debt, down to minus its capacity, so usage
+        heard late still delays the client's next requests here.
+        """
+        bucket = self.get_bucket(client_id)
+        bucket.allow_request(0)
+        bucket.tokens = max(bucket.tokens - tokens, -bucket.capacity)
+
+
+class _GossipProtocol(asyncio.DatagramProtocol):
+    def __init__(self, node: "GossipNode"):
+        self.node = node
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        self.node.receive(data, (addr[0], addr[1]))
+
+    def error_received(self, exc: Exception) -> None:
+        self.node.send_errors += 1
+
+
+class GossipNode:
+    """
+    Exchanges client usage with peer nodes over UDP.
+
+    Runs on the event loop that serves requests, so usage is recorded
+    and charged without locks. Datagrams are only accepted from the
+    configured peers' addresses, and only if signed with the cluster key.
+
+    Args:
+        rate_limiter: Limiter whose usage is gossiped
+        bind: Address to listen and send from
+        peers: Peer nodes' gossip addresses
+        interval: Seconds between broadcasts
+        top_talkers: Most clients sent per broadcast
+        max_datagram: Largest datagram sent, in bytes
+        secret: Key signing the datagrams; every node of the cluster
+            must use the same one. A random key, good for no peers, is
+            used if omitted
+    """
+
+    def __init__(
+        self,
+        rate_limiter: GossipRateLimiter,
+        bind: Address,
+        peers: Sequence[Address] = (),
+        interval: float = 0.25,
+        top_talkers: int = 256,
+        max_datagram: int = MAX_DATAGRAM,
+        secret: Optional[bytes] = None
+    ):
+        self.rate_limiter = rate_limiter
+        self.bind = bind
+        self.peers: Set[Address] = set()
+        self.interval = interval
+        self.top_talkers = top_talkers
+        self.max_datagram = max_datagram
+        self.node_id = secrets.randbits(32)
+        self.secret = secret or secrets.token_bytes(32)
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        for peer in peers:
+            self.add_peer(peer)
+
+        self.broadcasts = 0
+        self.datagrams_sent = 0
+        self.entries_sent = 0
+        self.datagrams_received = 0
+        self.entries_received = 0
+        self.rejected = 0
+        self.send_errors = 0
+
+    @property
+    def address(self) -> Address:
+        """Address actually bound, once started."""
+        if self._transport is None:
+            return self.bind
+        host, port = self._transport.get_extra_info("sockname")[:2]
+        return host, port
+
+    def add_peer(self, peer: Address) -> None:
+        """Gossip with another node."""
+        self.peers.add(peer)
+        self.rate_limiter.nodes = len(self.peers) + 1
+
+    async def start(self) -> None:
+        """Bind the socket and start broadcasting."""
+        loop = asyncio.get_running_loop()
+        self._transport, _ = await loop.create_datagram_endpoint(
+            lambda: _GossipProtocol(self), local_addr=self.bind
+        )
+        self._wake = asyncio.Event()
+        self.rate_limiter.on_saturated = self._wake.set
+        self._task = loop.create_task(self._run())
+        logger.info("Gossiping on %s:%d with %d peers", *self.address, len(self.peers))
+
+    async def stop(self) -> None:
+        """Send what is left, stop broadcasting and close the socket."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._transport is not None:
+            self.broadcast()
+            self._transport.close()
+            self._transport = None
+        self.rate_limiter.on_saturated = None
+
+    def broadcast(self) -> None:
+        """Send the top talkers' unsynced usage to every peer."""
+        entries = self.rate_limiter.take_unsynced(self.top_talkers)
+        if not entries or self._transport is None:
+            return
+        datagrams = encode_usage(self.node_id, entries, self.secret, self.max_datagram)
+        for peer in self.peers:
+            for datagram in datagrams:
+                self._transport.sendto(datagram, peer)
+        self.broadcasts += 1
+        self.datagrams_sent += len(datagrams) * len(self.peers)
+        self.entries_sent += len(entries)
+
+    def receive(self, data: bytes, addr: Address) -> None:
+        """Charge usage from a peer's datagram to the local buckets."""
+        if addr not in self.peers:
+            self.rejected += 1
+            return
+        try:
+            node_id, entries = decode_usage(data, self.secret)
+        except ValueError:
+            self.rejected += 1
+            return
+        if node_id == self.node_id:
+            return
+        for client_id, tokens in entries:
+            self.rate_limiter.charge_remote(client_id, tokens)
+        self.datagrams_received += 1
+        self.entries_received += len(entries)
+
+    def get_stats(self) -> Dict:
+        """Get gossip statistics."""
+        host, port = self.address
+        return {
+            "address": f"{host}:{port}",
+            "peers": len(self.peers),
+            "interval_seconds": self.interval,
+            "error_bound": self.rate_limiter.error_bound,
+            "unsynced_clients": len(self.rate_limiter.unsynced),
+            "capped": self.rate_limiter.capped,
+            "held": self.rate_limiter.held,
+            "broadcasts": self.broadcasts,
+            "datagrams_sent": self.datagrams_sent,
+            "entries_sent": self.entries_sent,
+            "datagrams_received": self.datagrams_received,
+            "entries_received": self.entries_received,
+            "rejected": self.rejected,
+            "send_errors": self.send_errors,
+        }
+
+    async def _run(self) -> None:
+        # A client at its cap brings the broadcast forward, but never to
+        # less than a tenth of the interval after the previous one
+        min_gap = self.interval / 10
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+                woken = True
+            except asyncio.TimeoutError:
+                woken = False
+            self._wake.clear()
+            self.broadcast()
+            if woken:
+                await asyncio.sleep(min_gap)
@@ -0,0 +1,231 @@
+"""
+Policy Module
+Single responsibility: Hold the rate limit policies and reload them live.
+
+This module:
+- Defines an immutable policy table: a default policy plus per-client
+  overrides, stamped with a version
+- Loads the table from a JSON file
+- Reloads the file when it changes or on demand (e.g. on SIGHUP) and
+  swaps the new table into a RateLimiter in one assignment
+
+Readers never lock: a table is never modified once built, so a request
+holding the old table while a reload swaps in a new one still sees a
+consistent policy. Buckets are moved to a new table lazily, by the
+limiter, the next time their client makes a request.
+
+Policy file format:
+    {
+        "default": {"capacity": 100, "refill_rate": 0.167},
+        "clients": {"10.0.0.7": {"capacity": 1000, "refill_rate": 50}}
+    }
+"""
+
+import itertools
+import json
+import logging
+import os
+import threading
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
+
+
+logger = logging.getLogger("gateway.policy")
+
+# Versions only grow, across every table in the process, so a bucket
+# never mistakes a new table for the one it was last scaled to
+_versions = itertools.count(1)
+
+
+class LimitPolicy:
+    """
+    Token bucket parameters for a client.
+
+    Args:
+        capacity: Max tokens
+        refill_rate: Tokens per second
+    """
+
+    __slots__ = ("capacity", "refill_rate")
+
+    def __init__(self, capacity: float, refill_rate: float):
+        if capacity <= 0 or refill_rate < 0:
+            raise ValueError(
+                f"Invalid policy: capacity {capacity} must be positive and "
+                f"refill_rate {refill_rate} not negative"
+            )
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, LimitPolicy):
+            return NotImplemented
+        return (self.capacity, self.refill_rate) == (other.capacity, other.refill_rate)
+
+    def __repr__(self) -> str:
+        return f"LimitPolicy(capacity={self.capacity}, refill_rate={self.refill_rate})"
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "LimitPolicy":
+        """Policy from a {"capacity", "refill_rate"} mapping."""
+        try:
+            capacity, refill_rate = data["capacity"], data["refill_rate"]
+        except (KeyError, TypeError):
+            raise ValueError(f"Policy {data!r} needs a capacity and a refill_rate") from None
+        for value in (capacity, refill_rate):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"Policy {data!r} has a non-numeric value {value!r}")
+        return cls(capacity, refill_rate)
+
+    def to_dict(self) -> Dict[str, float]:
+        return {"capacity": self.capacity, "refill_rate": self.refill_rate}
+
+
+class PolicyTable:
+    """
+    Immutable set of policies: a default and per-client overrides.
+
+    Each table gets a new version when built. Tables are replaced, never
+    changed, so one can be shared with any number of readers.
+
+    Args:
+        default: Policy for clients without an override
+        clients: Client identifier to its own policy
+    """
+
+    __slots__ = ("default", "clients", "version")
+
+    def __init__(self, default: LimitPolicy, clients: Optional[Mapping[str, LimitPolicy]] = None):
+        self.default = default
+        self.clients = MappingProxyType(dict(clients or {}))
+        self.version = next(_versions)
+
+    def lookup(self, client_id: str) -> LimitPolicy:
+        """The policy that applies to a client."""
+        return self.clients.get(client_id, self.default)
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "PolicyTable":
+        """
+        Table from the parsed policy file.
+
+        Raises:
+            ValueError: If the default is missing or a policy is invalid
+        """
+        if not isinstance(data, Mapping) or "default" not in data:
+            raise ValueError("Policy file needs a \"default\" policy")
+        clients = data.get("clients") or {}
+        return cls(
+            LimitPolicy.from_dict(data["default"]),
+            {client_id: LimitPolicy.from_dict(policy) for client_id, policy in clients.items()}
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "PolicyTable":
+        """
+        Table from a JSON policy file.
+
+        Raises:
+            OSError: If the file cannot be read
+            ValueError: If it is not a valid policy file
+        """
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": self.version,
+            "default": self.default.to_dict(),
+            "clients": {client_id: policy.to_dict() for client_id, policy in self.clients.items()},
+        }
+
+
+class PolicyReloader:
+    """
+    Keeps a rate limiter's policies in step with a policy file.
+
+    ``reload`` reads the file and, if it parses, swaps the new table into
+    the limiter; a broken file is logged and the running table kept. A
+    watcher thread calls it whenever the file's modification time or
+    size changes; call it directly to reload on a signal.
+
+    Args:
+        path: Policy file
+        rate_limiter: Limiter whose ``policies`` are replaced
+        poll_interval: Seconds between checks of the file
+    """
+
+    def __init__(self, path: str, rate_limiter, poll_interval: float = 1.0):
+        self.path = path
+        self.rate_limiter = rate_limiter
+        self.poll_interval = poll_interval
+        self.reloads = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self._seen = self._stat()
+        self._stopping = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    def reload(self) -> bool:
+        """
+        Load the policy file and swap it in.
+
+        Returns:
+            True if the new table is in use, False if the file was invalid
+        """
+        self._seen = self._stat()
+        try:
+            table = PolicyTable.load(self.path)
+        except (OSError, ValueError) as exc:
+            self.failures += 1
+            self.last_error = str(exc)
+            logger.error("Keeping rate limit policies %d: cannot load %s: %s",
+                         self.rate_limiter.policies.version, self.path, exc)
+            return False
+        self.rate_limiter.policies = table
+        self.reloads += 1
+        self.last_error = None
+        logger.info("Loaded rate limit policies %d from %s", table.version, self.path)
+        return True
+
+    def check(self) -> bool:
+        """Reload if the file changed since it was last read; True if reloaded."""
+        if self._stat() == self._seen:
+            return False
+        return self.reload()
+
+    def start(self) -> None:
+        """Start watching the file in a background thread."""
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stopping.clear()
+        self._watcher = threading.Thread(target=self._run, name="policy-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self) -> None:
+        """Stop the watcher thread."""
+        self._stopping.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def get_stats(self) -> Dict:
+        """Get reload statistics and the policies in use."""
+        return {
+            "path": self.path,
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "policies": self.rate_limiter.policies.to_dict(),
+        }
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.poll_interval):
+            self.check()
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
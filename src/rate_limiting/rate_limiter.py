@@ -6,9 +6,12 @@ This module handles:
 - Creating token buckets for new clients
 - Checking rate limits per client
 - Getting per-client statistics
+- Moving buckets to a new policy table lazily, on their next request
 """
 
-from typing import Dict
+import time
+from typing import Callable, Dict, Optional, Tuple
+from .policy import LimitPolicy, PolicyTable
 from .token_bucket import TokenBucket
 
 
@@ -17,33 +20,123 @@ class RateLimiter:
     Manages rate limiting for multiple clients.
     Each client gets their own token bucket.
 
+    Bucket parameters come from ``policies``, a PolicyTable that can be
+    replaced at any time by assigning a new one (see PolicyReloader).
+    Nothing is locked and no pass is made over the clients: each bucket
+    remembers the table version it was sized for and is rescaled the
+    next time its client is checked.
+
     Args:
         capacity: Max tokens per client
         refill_rate: Tokens per second per client
+        clock: Time source handed to every bucket
+        policies: Policy table to start with; overrides capacity and
+            refill_rate
+        share: Fraction of each policy this limiter enforces. One of N
+            processes limiting the same clients without sharing buckets
+            takes 1/N, so together they admit no more than the policy;
+            a bucket keeps at least one token of capacity
     """
 
-    def __init__(self, capacity: int = 100, refill_rate: float = 10.0):
-        self.capacity = capacity
-        self.refill_rate = refill_rate
+    def __init__(
+        self,
+        capacity: int = 100,
+        refill_rate: float = 10.0,
+        clock: Callable[[], float] = time.time,
+        policies: Optional[PolicyTable] = None,
+        share: float = 1.0
+    ):
+        if not 0 < share <= 1:
+            raise ValueError(f"share must be in (0, 1], got {share}")
+        self.policies = policies or PolicyTable(LimitPolicy(capacity, refill_rate))
+        self.clock = clock
+        self.share = share
         self.clients: Dict[str, TokenBucket] = {}
 
-    def is_allowed(self, client_id: str) -> bool:
+    @property
+    def capacity(self) -> int:
+        """Default max tokens per client, from the current policies."""
+        return self.policies.default.capacity
+
+    @property
+    def refill_rate(self) -> float:
+        """Default tokens per second per client, from the current policies."""
+        return self.policies.default.refill_rate
+
+    def is_allowed(self, client_id: str, cost: float = 1) -> bool:
         """
         Check if client can make a request.
 
         Args:
             client_id: Unique client identifier (e.g., IP address)
+            cost: Tokens the request consumes
 
         Returns:
             True if allowed, False if rate limited
         """
-        if client_id not in self.clients:
-            self.clients[client_id] = TokenBucket(
-                capacity=self.capacity,
-                refill_rate=self.refill_rate
+        return self.get_bucket(client_id).allow_request(cost)
+
+    def get_bucket(self, client_id: str) -> TokenBucket:
+        """
+        Get a client's token bucket, creating a full one for new clients.
+
+        Args:
+            client_id: Unique client identifier
+
+        Returns:
+            The client's TokenBucket
+        """
+        policies = self.policies
+        bucket = self.clients.get(client_id)
+        if bucket is None:
+            capacity, refill_rate = self._limits(client_id, policies)
+            bucket = TokenBucket(
+                capacity=capacity,
+                refill_rate=refill_rate,
+                clock=self.clock,
+                policy_version=policies.version
             )
+            self.clients[client_id] = bucket
+        elif bucket.policy_version != policies.version:
+            capacity, refill_rate = self._limits(client_id, policies)
+            bucket.rescale(capacity, refill_rate, policies.version)
+        return bucket
+
+    def _limits(self, client_id: str, policies: PolicyTable) -> Tuple[float, float]:
+        """This limiter's share of a client's capacity and refill rate."""
+        policy = policies.lookup(client_id)
+        if self.share == 1:
+            return policy.capacity, policy.refill_rate
+        return max(policy.capacity * self.share, 1), policy.refill_rate * self.share
+
+    def note_usage(self, client_id: str, cost: float) -> None:
+        """
+        Record tokens taken from a client's bucket outside is_allowed.
+
+        Callers that spend from a bucket directly (the throttle queue)
+        report it here; a plain limiter has nothing to do with it.
+
+        Args:
+            client_id: Unique client identifier
+            cost: Tokens taken
+        """
+
+    async def hold(self, client_id: str, cost: float, timeout: float) -> bool:
+        """
+        Wait out a refusal that is not down to the client's own bucket.
+
+        Called after is_allowed refused a request. A plain limiter only
+        refuses when the bucket is empty, so it never holds.
 
-        return self.clients[client_id].allow_request()
+        Args:
+            client_id: Unique client identifier
+            cost: Tokens the request consumes
+            timeout: Longest to wait, in seconds
+
+        Returns:
+            True once the request was admitted, False if it stays refused
+        """
+        return False
 
     def get_client_stats(self, client_id: str) -> Dict:
         """
@@ -56,13 +149,14 @@ class RateLimiter:
             Dict with tokens_remaining, capacity, refill_rate
         """
         if client_id not in self.clients:
+            capacity, refill_rate = self._limits(client_id, self.policies)
             return {
-                "tokens_remaining": self.capacity,
-                "capacity": self.capacity,
-                "refill_rate": self.refill_rate
+                "tokens_remaining": capacity,
+                "capacity": capacity,
+                "refill_rate": refill_rate
             }
 
-        bucket = self.clients[client_id]
+        bucket = self.get_bucket(client_id)
 
         return {
             "tokens_remaining": bucket.get_remaining_tokens(),
@@ -0,0 +1,507 @@
+"""
+Replay Module
+Single responsibility: Replay traffic through rate limit policies offline.
+
+This module:
+- Evaluates token bucket policies on recorded or synthetic traffic, using
+  the request timestamps as the clock instead of time.time()
+- Replays many clients and policies at once with batched numpy updates
+- Streams traffic in chunks, so a day of logs need not fit in memory
+- Reports what each policy would have blocked, per client class
+
+Usage:
+    python -m src.rate_limiting.replay access.log [access.log.1 ...]
+    python -m src.rate_limiting.replay --synthetic 3600 --policy 100:0.167 --policy 100:10
+"""
+
+import argparse
+import sys
+import time
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..metrics.access_log import MAGIC, load_access_log, read_access_log
+from ..metrics.collector import DECISIONS
+
+
+Policy = Tuple[float, float]
+
+# capacity:refill_rate of main.py and of create_app's defaults
+DEFAULT_POLICIES = ("100:0.167", "100:10")
+
+# Below this many (lane, policy) pairs per step, a Python loop over the
+# remaining events beats numpy's per-call overhead
+SCALAR_TAIL = 32
+
+# Recorded decisions that mark a client as a suspected crawler
+_FLAGGED_IDS = (DECISIONS.index("flagged"), DECISIONS.index("tarpitted"))
+
+
+def parse_policy(text: str) -> Policy:
+    """
+    Parse a "capacity:refill_rate" policy.
+
+    Args:
+        text: e.g. "100:0.167"
+
+    Returns:
+        (capacity, refill_rate)
+
+    Raises:
+        ValueError: If the text is not two positive numbers
+    """
+    try:
+        capacity, refill_rate = (float(part) for part in text.split(":"))
+    except ValueError:
+        raise ValueError(f"Policy {text!r} is not capacity:refill_rate") from None
+    if capacity <= 0 or refill_rate < 0:
+        raise ValueError(f"Policy {text!r} needs a positive capacity and refill rate")
+    return capacity, refill_rate
+
+
+class PolicyReplay:
+    """
+    Token buckets of every client under several policies, replayed offline.
+
+    Follows TokenBucket exactly: a client's bucket is created full at its
+    first request, refills by elapsed time times the refill rate up to
+    capacity, and a request is allowed if the bucket holds its cost. Time
+    comes from the request timestamps.
+
+    Each chunk is sorted by (client, time). The k-th request of every
+    client is then evaluated in one numpy step for all clients and
+    policies at once: buckets only interact with their own client's
+    earlier requests, so requests of different clients can run in
+    lockstep. Clients are ordered busiest first, so the clients still
+    active at step k are a prefix of the state arrays. When only a few
+    busy clients are left, their remaining requests are finished in a
+    plain loop.
+
+    Chunks must arrive in time order (rotated files oldest first); state
+    carries over between them.
+
+    Args:
+        policies: (capacity, refill_rate) pairs to evaluate side by side
+    """
+
+    def __init__(self, policies: Sequence[Policy]):
+        if not policies:
+            raise ValueError("At least one policy is needed")
+        self.policies = [(float(capacity), float(rate)) for capacity, rate in policies]
+        self._capacity = np.array([c for c, _ in self.policies])[:, None]
+        self._rate = np.array([r for _, r in self.policies])[:, None]
+
+        self.clients: Dict[Hashable, int] = {}
+        self._tokens = np.empty((len(self.policies), 0))
+        self._last = np.empty(0)
+        self.requests = np.zeros(0, dtype=np.int64)
+        self.blocked = np.zeros((len(self.policies), 0), dtype=np.int64)
+        self.events = 0
+
+    def client_codes(self, keys: np.ndarray) -> np.ndarray:
+        """
+        Map client keys to dense client numbers, registering new clients.
+
+        Args:
+            keys: One client key per request (any hashable numpy dtype)
+
+        Returns:
+            Client number per request
+        """
+        unique, inverse = np.unique(keys, return_inverse=True)
+        codes = np.empty(len(unique), dtype=np.int64)
+        for index, key in enumerate(unique.tolist()):
+            code = self.clients.get(key)
+            if code is None:
+                code = self.clients[key] = len(self.clients)
+            codes[index] = code
+        return codes[inverse.reshape(-1)]
+
+    def feed(
+        self,
+        times: np.ndarray,
+        clients: np.ndarray,
+        costs: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Replay a chunk of requests.
+
+        Args:
+            times: Request timestamps in seconds
+            clients: Client number per request, from ``client_codes``
+            costs: Tokens per request, 1 if omitted
+
+        Returns:
+            Boolean array (policies x requests), True where the policy
+            would have blocked the request
+        """
+        times = np.asarray(times, dtype=np.float64)
+        clients = np.asarray(clients, dtype=np.int64)
+        costs = np.ones(len(times)) if costs is None else np.asarray(costs, dtype=np.float64)
+        blocked = np.zeros((len(self.policies), len(times)), dtype=bool)
+        if not len(times):
+            return blocked
+        self._grow(int(clients.max()) + 1)
+
+        order = np.lexsort((times, clients))
+        sorted_clients = clients[order]
+        sorted_times = times[order]
+        sorted_costs = costs[order]
+
+        # One lane per client in this chunk, busiest first
+        lane_clients, starts, counts = np.unique(
+            sorted_clients, return_index=True, return_counts=True
+        )
+        busiest = np.argsort(-counts, kind="stable")
+        lane_clients, starts, counts = lane_clients[busiest], starts[busiest], counts[busiest]
+
+        new = np.isnan(self._last[lane_clients])
+        self._last[lane_clients[new]] = sorted_times[starts[new]]
+
+        tokens = self._tokens[:, lane_clients]
+        last = self._last[lane_clients]
+        decisions = np.zeros((len(self.policies), len(times)), dtype=bool)
+
+        # Lanes still active at step k are those with more than k requests.
+        # Lay the requests out step by step, so each step reads a slice.
+        active_at = np.searchsorted(-counts, -np.arange(int(counts[0])), side="left")
+        offsets = np.concatenate([[0], np.cumsum(active_at)])
+        steps = np.repeat(np.arange(len(active_at)), active_at)
+        lanes = np.arange(len(steps)) - np.repeat(offsets[:-1], active_at)
+        positions = starts[lanes] + steps
+        step_times = sorted_times[positions]
+        step_costs = sorted_costs[positions]
+        refused = np.zeros((len(self.policies), len(positions)), dtype=bool)
+
+        step = 0
+        for step, active in enumerate(active_at.tolist()):
+            if active * len(self.policies) < SCALAR_TAIL:
+                self._scalar_tail(
+                    step, active, starts, counts, sorted_times, sorted_costs, tokens, last, decisions
+                )
+                break
+            now = step_times[offsets[step]:offsets[step + 1]]
+            cost = step_costs[offsets[step]:offsets[step + 1]]
+            level = np.minimum(
+                self._capacity, tokens[:, :active] + (now - last[:active]) * self._rate
+            )
+            allowed = level >= cost
+            tokens[:, :active] = level - cost * allowed
+            last[:active] = now
+            np.logical_not(allowed, out=refused[:, offsets[step]:offsets[step + 1]])
+        else:
+            step = len(active_at)
+        done = offsets[step]
+        decisions[:, positions[:done]] = refused[:, :done]
+
+        self._tokens[:, lane_clients] = tokens
+        self._last[lane_clients] = last
+        blocked[:, order] = decisions
+
+        self.events += len(times)
+        self.requests += np.bincount(clients, minlength=len(self.requests))
+        for policy in range(len(self.policies)):
+            self.blocked[policy] += np.bincount(
+                clients, weights=blocked[policy], minlength=len(self.requests)
+            ).astype(np.int64)
+        return blocked
+
+    def _scalar_tail(
+        self,
+        step: int,
+        active: int,
+        starts: np.ndarray,
+        counts: np.ndarray,
+        times: np.ndarray,
+        costs: np.ndarray,
+        tokens: np.ndarray,
+        last: np.ndarray,
+        decisions: np.ndarray
+    ) -> None:
+        """Finish the remaining requests of the few lanes still active."""
+        for lane in range(active):
+            start, end = int(starts[lane]) + step, int(starts[lane] + counts[lane])
+            lane_times = times[start:end].tolist()
+            lane_costs = costs[start:end].tolist()
+            for policy, (capacity, rate) in enumerate(self.policies):
+                level = float(tokens[policy, lane])
+                previous = float(last[lane])
+                refused = []
+                for now, cost in zip(lane_times, lane_costs):
+                    level = min(capacity, level + (now - previous) * rate)
+                    previous = now
+                    if level >= cost:
+                        level -= cost
+                        refused.append(False)
+                    else:
+                        refused.append(True)
+                tokens[policy, lane] = level
+                decisions[policy, start:end] = refused
+            last[lane] = lane_times[-1]
+
+    def _grow(self, clients: int) -> None:
+        """Make room for client numbers below ``clients``; new buckets start full."""
+        known = len(self._last)
+        if clients <= known:
+            return
+        extra = clients - known
+        self._tokens = np.hstack(
+            [self._tokens, np.repeat(self._capacity, extra, axis=1)]
+        )
+        self._last = np.concatenate([self._last, np.full(extra, np.nan)])
+        self.requests = np.concatenate([self.requests, np.zeros(extra, dtype=np.int64)])
+        self.blocked = np.hstack(
+            [self.blocked, np.zeros((len(self.policies), extra), dtype=np.int64)]
+        )
+
+    def report(self, client_classes: np.ndarray, class_names: Sequence[str]) -> List[Dict]:
+        """
+        Summarise what each policy blocked, per client class.
+
+        Args:
+            client_classes: Class index per client number
+            class_names: Name per class index
+
+        Returns:
+            One row per policy and class: clients, requests, blocked,
+            blocked_percent and clients_affected (clients with at least
+            one blocked request)
+        """
+        client_classes = np.asarray(client_classes)[:len(self.requests)]
+        seen = self.requests > 0
+        rows = []
+        for policy, (capacity, rate) in enumerate(self.policies):
+            for index, name in enumerate(class_names):
+                members = seen & (client_classes == index)
+                requests = int(self.requests[members].sum())
+                blocked = int(self.blocked[policy][members].sum())
+                rows.append({
+                    "policy": f"{capacity:g}:{rate:g}",
+                    "class": name,
+                    "clients": int(members.sum()),
+                    "requests": requests,
+                    "blocked": blocked,
+                    "blocked_percent": round(blocked / requests * 100, 2) if requests else 0.0,
+                    "clients_affected": int((self.blocked[policy][members] > 0).sum()),
+                })
+        return rows
+
+
+# Synthetic client classes: (name, mean requests per second, burst size)
+SYNTHETIC_CLASSES = (
+    ("shopper", 0.05, 1),
+    ("crawler", 5.0, 1),
+    ("burst", 1 / 300, 60),
+)
+
+
+class SyntheticTrace:
+    """
+    Random traffic from a mix of client classes.
+
+    Shoppers browse slowly, crawlers request steadily several times a
+    second, and burst clients are idle most of the time but fire a burst
+    of requests within a couple of seconds every few minutes. Arrivals
+    are Poisson per client. Traffic is generated a slice of time at a
+    time, so long traces never sit in memory whole.
+
+    Args:
+        duration: Seconds of traffic
+        clients: Number of clients per class name
+        seed: Random seed
+        burst_seconds: Length of a burst
+    """
+
+    def __init__(
+        self,
+        duration: float,
+        clients: Optional[Dict[str, int]] = None,
+        seed: int = 0,
+        burst_seconds: float = 2.0
+    ):
+        self.duration = duration
+        self.seed = seed
+        self.burst_seconds = burst_seconds
+        clients = clients or {"shopper": 2000, "crawler": 20, "burst": 200}
+        self.class_names = [name for name, _, _ in SYNTHETIC_CLASSES]
+        # Client numbers are handed out class by class
+        self.client_classes = np.repeat(
+            np.arange(len(SYNTHETIC_CLASSES)),
+            [clients.get(name, 0) for name, _, _ in SYNTHETIC_CLASSES]
+        )
+
+    def chunks(self, slice_seconds: float = 600.0) -> Iterable[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Yield (times, clients) chunks in time order.
+
+        Args:
+            slice_seconds: Seconds of traffic per chunk
+        """
+        rng = np.random.default_rng(self.seed)
+        carried_times = np.empty(0)
+        carried_clients = np.empty(0, dtype=np.int64)
+        start = 0.0
+        while start < self.duration:
+            end = min(start + slice_seconds, self.duration)
+            times, clients = [carried_times], [carried_clients]
+            for index, (_, rate, burst) in enumerate(SYNTHETIC_CLASSES):
+                members = np.flatnonzero(self.client_classes == index)
+                if not len(members):
+                    continue
+                # Arrivals (single requests or burst starts) per client
+                arrivals = rng.poisson(rate * (end - start), size=len(members))
+                owner = np.repeat(members, arrivals)
+                arrival = rng.uniform(start, end, size=len(owner))
+                if burst > 1:
+                    owner = np.repeat(owner, burst)
+                    arrival = np.repeat(arrival, burst)
+                    arrival += rng.uniform(0, self.burst_seconds, size=len(owner))
+                times.append(arrival)
+                clients.append(owner)
+
+            times, clients = np.concatenate(times), np.concatenate(clients)
+            order = np.argsort(times, kind="stable")
+            times, clients = times[order], clients[order]
+            # Bursts running past the slice end are yielded with the next slice
+            cut = np.searchsorted(times, end) if end < self.duration else len(times)
+            carried_times, carried_clients = times[cut:], clients[cut:]
+            yield times[:cut], clients[:cut]
+            start = end
+
+
+# Client classes of recorded traffic
+LOG_CLASSES = ("regular", "flagged")
+
+
+def replay_logs(
+    paths: Sequence[str],
+    policies: Sequence[Policy],
+    chunk_size: int = 1 << 22
+) -> Tuple[PolicyReplay, np.ndarray]:
+    """
+    Replay access log files through policies.
+
+    Binary logs are read in place, ``chunk_size`` records at a time;
+    JSONL logs are decoded line by line. Clients that the gateway ever
+    flagged or tarpitted form the "flagged" class, the rest "regular".
+
+    Args:
+        paths: Access log files, oldest first
+        policies: (capacity, refill_rate) pairs
+        chunk_size: Requests replayed per batch
+
+    Returns:
+        The finished replay, and the class index (into LOG_CLASSES) per
+        client number
+    """
+    replay = PolicyReplay(policies)
+    flagged = np.zeros(0, dtype=bool)
+    for path in paths:
+        for times, keys, decisions in _log_chunks(path, chunk_size):
+            codes = replay.client_codes(keys)
+            replay.feed(times, codes)
+            if len(replay.clients) > len(flagged):
+                flagged = np.concatenate(
+                    [flagged, np.zeros(len(replay.clients) - len(flagged), dtype=bool)]
+                )
+            flagged[codes[np.isin(decisions, _FLAGGED_IDS)]] = True
+    return replay, flagged.astype(np.int64)
+
+
+def _log_chunks(path: str, chunk_size: int) -> Iterable[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """(times, client keys, decision ids) chunks of one log file."""
+    with open(path, "rb") as f:
+        binary = f.read(len(MAGIC)) == MAGIC
+    if binary:
+        records = load_access_log(path)
+        for offset in range(0, len(records), chunk_size):
+            chunk = records[offset:offset + chunk_size]
+            # Family and address bytes together identify a client
+            keys = np.empty(len(chunk), dtype=[("family", "u1"), ("client", "S16")])
+            keys["family"] = chunk["family"]
+            keys["client"] = chunk["client"]
+            yield chunk["time"], keys.view("V17"), chunk["decision"]
+        return
+
+    decision_ids = {decision: index for index, decision in enumerate(DECISIONS)}
+    batch: List[Tuple[float, str, int]] = []
+    for record in read_access_log(path):
+        batch.append((record["time"], record["client"], decision_ids.get(record["decision"], 255)))
+        if len(batch) == chunk_size:
+            yield _columns(batch)
+            batch = []
+    if batch:
+        yield _columns(batch)
+
+
+def _columns(batch: List[Tuple[float, str, int]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    times, clients, decisions = zip(*batch)
+    return np.array(times), np.array(clients), np.array(decisions, dtype=np.uint8)
+
+
+def format_report(rows: Sequence[Dict]) -> str:
+    """Render report rows as an aligned text table."""
+    columns = ("policy", "class", "clients", "requests", "blocked", "blocked_percent", "clients_affected")
+    headers = ("policy", "class", "clients", "requests", "blocked", "blocked %", "clients hit")
+    cells = [headers] + [tuple(str(row[column]) for column in columns) for row in rows]
+    widths = [max(len(line[i]) for line in cells) for i in range(len(columns))]
+    return "\n".join(
+        "  ".join(
+            cell.ljust(width) if i < 2 else cell.rjust(width)
+            for i, (cell, width) in enumerate(zip(line, widths))
+        )
+        for line in cells
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("logs", nargs="*", help="Access log files, oldest first")
+    parser.add_argument(
+        "--policy", action="append", dest="policies",
+        help=f"capacity:refill_rate, repeatable (default {' '.join(DEFAULT_POLICIES)})"
+    )
+    parser.add_argument(
+        "--synthetic", type=float, metavar="SECONDS",
+        help="Replay this many seconds of synthetic traffic instead of logs"
+    )
+    parser.add_argument(
+        "--clients", type=int, nargs=3, default=(2000, 20, 200),
+        metavar=("SHOPPERS", "CRAWLERS", "BURSTS"), help="Synthetic clients per class"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic trace seed")
+    parser.add_argument("--chunk", type=int, default=1 << 22, help="Log records replayed per batch")
+    args = parser.parse_args()
+
+    try:
+        policies = [parse_policy(text) for text in args.policies or DEFAULT_POLICIES]
+        if args.synthetic is None and not args.logs:
+            raise ValueError("give access log files or --synthetic SECONDS")
+
+        start = time.perf_counter()
+        if args.synthetic is not None:
+            trace = SyntheticTrace(
+                args.synthetic, dict(zip(("shopper", "crawler", "burst"), args.clients)), args.seed
+            )
+            replay = PolicyReplay(policies)
+            for times, clients in trace.chunks():
+                replay.feed(times, clients)
+            rows = replay.report(trace.client_classes, trace.class_names)
+        else:
+            replay, client_classes = replay_logs(args.logs, policies, args.chunk)
+            rows = replay.report(client_classes, LOG_CLASSES)
+    except (OSError, ValueError) as e:
+        sys.exit(f"replay: {e}")
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"Replayed {replay.events} requests from {int((replay.requests > 0).sum())} "
+        f"clients through {len(policies)} policies in {elapsed:.2f}s "
+        f"({replay.events / max(elapsed, 1e-9):,.0f} requests/s)\n"
+    )
+    print(format_report(rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Throttle Queue Module
+Single responsibility: Delay over-limit requests instead of rejecting them.
+
+This module:
+- Parks over-limit requests on the event loop until their client's next token
+- Shares a drain budget between waiting clients with deficit round-robin
+- Bounds waiters overall and per client, overflowing to a plain rejection
+- Gives up on a request once it would wait longer than the maximum delay
+"""
+
+import asyncio
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from .rate_limiter import RateLimiter
+from .token_bucket import TokenBucket
+
+
+class _Waiter:
+    """A delayed request waiting for its token."""
+
+    __slots__ = ("future", "cost")
+
+    def __init__(self, future: asyncio.Future, cost: float):
+        self.future = future
+        self.cost = cost
+
+
+class ThrottleQueue:
+    """
+    Delays over-limit requests until a token arrives.
+
+    Waiting costs no thread: each waiter is a future on the event loop and
+    a single timer callback wakes up when the next waiter could be served.
+    Released requests also draw from a shared drain bucket, the extra
+    load the backend is willing to take from delayed traffic. Clients get
+    that drain in deficit round-robin order, so a client with many
+    waiters is served no faster than one with a single waiter.
+
+    Args:
+        rate_limiter: Limiter whose client buckets are waited on
+        max_delay: Longest a request may wait, in seconds
+        max_waiters: Max waiting requests overall
+        max_waiters_per_client: Max waiting requests per client
+        drain_rate: Delayed requests released per second, across all clients
+        quantum: Cost each client may release per round-robin turn
+    """
+
+    def __init__(
+        self,
+        rate_limiter: RateLimiter,
+        max_delay: float = 1.0,
+        max_waiters: int = 1024,
+        max_waiters_per_client: int = 8,
+        drain_rate: float = 50.0,
+        quantum: float = 1.0
+    ):
+        self.rate_limiter = rate_limiter
+        self.max_delay = max_delay
+        self.max_waiters = max_waiters
+        self.max_waiters_per_client = max_waiters_per_client
+        self.quantum = quantum
+        self.drain = TokenBucket(capacity=max(1, int(drain_rate)), refill_rate=drain_rate)
+
+        self._queues: Dict[str, Deque[_Waiter]] = {}
+        self._queued_cost: Dict[str, float] = {}
+        self._deficit: Dict[str, float] = {}
+        self._ring: Deque[str] = deque()
+        self._waiting = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_at = 0.0
+
+        self.delayed = 0
+        self.released = 0
+        self.timed_out = 0
+        self.overflowed = 0
+
+    async def wait(self, client_id: str, cost: float = 1, max_delay: Optional[float] = None) -> bool:
+        """
+        Wait for a client's token instead of rejecting the request.
+
+        Args:
+            client_id: Unique client identifier
+            cost: Tokens the request consumes
+            max_delay: Override for the maximum wait, e.g. the request's
+                remaining deadline
+
+        Returns:
+            True once the token was consumed, False if the request should
+            be rejected (queue full or token too far away)
+        """
+        limit = self.max_delay if max_delay is None else min(max_delay, self.max_delay)
+        queue = self._queues.get(client_id)
+
+        if self._waiting >= self.max_waiters or (
+            queue is not None and len(queue) >= self.max_waiters_per_client
+        ):
+            self.overflowed += 1
+            return False
+
+        # Reject up front if the token cannot arrive in time anyway
+        bucket = self.rate_limiter.get_bucket(client_id)
+        queued_cost = self._queued_cost.get(client_id, 0.0)
+        if bucket.time_until_available(queued_cost + cost) > limit:
+            self.timed_out += 1
+            return False
+
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(loop.create_future(), cost)
+        if queue is None:
+            queue = self._queues[client_id] = deque()
+            self._deficit[client_id] = 0.0
+            self._ring.append(client_id)
+        queue.append(waiter)
+        self._queued_cost[client_id] = queued_cost + cost
+        self._waiting += 1
+        self.delayed += 1
+        self._wake_at(loop, loop.time())
+
+        try:
+            return await asyncio.wait_for(waiter.future, timeout=limit)
+        except asyncio.TimeoutError:
+            self._discard(client_id, waiter)
+            self.timed_out += 1
+            return False
+        except asyncio.CancelledError:
+            self._discard(client_id, waiter)
+            raise
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests currently waiting."""
+        return self._waiting
+
+    def get_stats(self) -> Dict:
+        """Get throttling statistics."""
+        return {
+            "waiting": self._waiting,
+            "waiting_clients": len(self._ring),
+            "delayed": self.delayed,
+            "released": self.released,
+            "timed_out": self.timed_out,
+            "overflowed": self.overflowed,
+        }
+
+    def _dispatch(self) -> None:
+        """Release eligible waiters in deficit round-robin order."""
+        self._timer = None
+        loop = asyncio.get_running_loop()
+        next_wait = float("inf")
+
+        # Start each round one client further along the ring, so a drain
+        # budget that runs out mid-round does not always favour the same clients
+        clients = list(self._ring)
+        self._ring.rotate(-1)
+
+        for client_id in clients:
+            queue = self._queues[client_id]
+
+            while queue and queue[0].future.done():
+                self._pop(client_id)
+
+            if queue:
+                self._deficit[client_id] += self.quantum
+                bucket = self.rate_limiter.get_bucket(client_id)
+
+                while queue:
+                    head = queue[0]
+                    if head.future.done():
+                        self._pop(client_id)
+                        continue
+                    if self._deficit[client_id] < head.cost:
+                        next_wait = 0.0
+                        break
+                    wait = max(
+                        bucket.time_until_available(head.cost),
+                        self.drain.time_until_available(head.cost)
+                    )
+                    if wait > 0:
+                        # Deficit only accrues while the client can be served
+                        self._deficit[client_id] = 0.0
+                        next_wait = min(next_wait, wait)
+                        break
+                    bucket.allow_request(head.cost)
+                    self.rate_limiter.note_usage(client_id, head.cost)
+                    self.drain.allow_request(head.cost)
+                    self._deficit[client_id] -= head.cost
+                    self._pop(client_id)
+                    self.released += 1
+                    head.future.set_result(True)
+
+            if not queue:
+                self._forget(client_id)
+
+        if self._ring and next_wait != float("inf"):
+            self._wake_at(loop, loop.time() + next_wait)
+
+    def _wake_at(self, loop: asyncio.AbstractEventLoop, when: float) -> None:
+        """Make sure the dispatcher runs no later than ``when``."""
+        if self._timer is not None:
+            if self._timer_at <= when:
+                return
+            self._timer.cancel()
+        self._timer_at = when
+        self._timer = loop.call_at(when, self._dispatch)
+
+    def _pop(self, client_id: str) -> _Waiter:
+        """Remove the head waiter of a client."""
+        waiter = self._queues[client_id].popleft()
+        self._queued_cost[client_id] -= waiter.cost
+        self._waiting -= 1
+        return waiter
+
+    def _discard(self, client_id: str, waiter: _Waiter) -> None:
+        """Remove a waiter that gave up before its token arrived."""
+        queue = self._queues.get(client_id)
+        if queue is None:
+            return
+        try:
+            queue.remove(waiter)
+        except ValueError:
+            return
+        self._queued_cost[client_id] -= waiter.cost
+        self._waiting -= 1
+        if not queue:
+            self._forget(client_id)
+
+    def _forget(self, client_id: str) -> None:
+        """Drop all bookkeeping for a client with no waiters."""
+        if self._queues.pop(client_id, None) is None:
+            return
+        del self._queued_cost[client_id]
+        del self._deficit[client_id]
+        self._ring.remove(client_id)
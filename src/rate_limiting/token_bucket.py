@@ -9,6 +9,7 @@ This module implements the core token bucket algorithm:
 """
 
 import time
+from typing import Callable
 
 
 class TokenBucket:
@@ -18,32 +19,87 @@ class TokenBucket:
     Args:
         capacity: Maximum tokens this bucket can hold
         refill_rate: Tokens added per second
+        clock: Source of the current time in seconds; a simulated clock
+            lets recorded traffic be replayed faster than real time
+        policy_version: Version of the policy table the parameters came
+            from, so a limiter can tell when the bucket needs rescaling
     """
 
-    def __init__(self, capacity: int, refill_rate: float):
+    def __init__(
+        self,
+        capacity: int,
+        refill_rate: float,
+        clock: Callable[[], float] = time.time,
+        policy_version: int = 0
+    ):
         self.capacity = capacity
         self.refill_rate = refill_rate
+        self.clock = clock
+        self.policy_version = policy_version
         self.tokens = capacity  # Start with full bucket
-        self.last_refill_time = time.time()
+        self.last_refill_time = clock()
 
-    def allow_request(self) -> bool:
+    def allow_request(self, cost: float = 1) -> bool:
         """
         Check if a request should be allowed.
 
+        Args:
+            cost: Tokens the request consumes
+
         Returns:
             True if token available, False otherwise
         """
         self._refill_tokens()
 
-        if self.tokens >= 1:
-            self.tokens -= 1
+        if self.tokens >= cost:
+            self.tokens -= cost
             return True
 
         return False
 
+    def time_until_available(self, cost: float = 1) -> float:
+        """
+        Seconds until ``cost`` tokens will be available.
+
+        Args:
+            cost: Tokens the request needs
+
+        Returns:
+            0 if available now, inf if the bucket can never hold ``cost``
+        """
+        self._refill_tokens()
+
+        if self.tokens >= cost:
+            return 0.0
+        if cost > self.capacity or self.refill_rate <= 0:
+            return float("inf")
+        return (cost - self.tokens) / self.refill_rate
+
+    def rescale(self, capacity: int, refill_rate: float, policy_version: int = 0) -> None:
+        """
+        Move the bucket to new parameters, keeping how full it is.
+
+        Tokens earned so far are refilled at the old rate first, then the
+        balance is scaled by the change in capacity: a client with half
+        its tokens left still has half of the new capacity.
+
+        Args:
+            capacity: New maximum tokens
+            refill_rate: New tokens added per second
+            policy_version: Version of the policy table they came from
+        """
+        self._refill_tokens()
+        if self.capacity > 0:
+            self.tokens = self.tokens * capacity / self.capacity
+        else:
+            self.tokens = capacity
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.policy_version = policy_version
+
     def _refill_tokens(self) -> None:
         """Add tokens based on elapsed time since last refill."""
-        now = time.time()
+        now = self.clock()
         time_elapsed = now - self.last_refill_time
         tokens_to_add = time_elapsed * self.refill_rate
 
@@ -48,6 +48,66 @@ class TestAPIEndpoints:
         assert data["success"] is True
         assert len(data["data"]["data"]["results"]) <= 2
 
+    def test_products_search_sorted_by_price(self, client):
+        """Product search sorts and filters by price."""
+        response = client.get(
+            "/products/search?category=electronics&sort_by=price_asc&in_stock=true"
+        )
+        assert response.status_code == 200
+        results = response.json()["data"]["data"]["results"]
+        prices = [product["price"] for product in results]
+        assert prices == sorted(prices)
+        assert all(product["in_stock"] for product in results)
+
+    def test_products_search_rejects_unknown_sort(self, client):
+        """Unknown sort orders are rejected by validation."""
+        response = client.get("/products/search?category=electronics&sort_by=name")
+        assert response.status_code == 422
+
+    def test_products_search_text_query(self, client):
+        """Product search matches names with q=."""
+        response = client.get("/products/search?category=electronics&q=key")
+        assert response.status_code == 200
+        results = response.json()["data"]["data"]["results"]
+        assert [product["name"] for product in results] == ["Keyboard"]
+
+    def test_products_search_cursor_pagination(self, client):
+        """Following next_cursor visits every product exactly once."""
+        params = {"category": "electronics", "limit": 2, "sort_by": "price_desc"}
+        page = client.get("/products/search", params=params).json()["data"]["data"]
+        ids = [product["id"] for product in page["results"]]
+
+        while page["next_cursor"] is not None:
+            response = client.get("/products/search", params={**params, "cursor": page["next_cursor"]})
+            assert response.status_code == 200
+            page = response.json()["data"]["data"]
+            ids.extend(product["id"] for product in page["results"])
+
+        assert sorted(ids) == [1, 2, 3, 4, 5]
+        assert len(ids) == 5
+
+    def test_products_search_rejects_foreign_cursor(self, client):
+        """A cursor issued for one query cannot be used for another."""
+        cursor = client.get(
+            "/products/search?category=electronics&limit=1"
+        ).json()["data"]["data"]["next_cursor"]
+        response = client.get("/products/search", params={"category": "books", "cursor": cursor})
+        assert response.status_code == 400
+
+    def test_products_search_from_catalog_file(self, tmp_path):
+        """The gateway can serve a memory-mapped catalog file."""
+        from src.backend import ProductCatalog, write_catalog
+        from src.gateway import create_app
+
+        path = tmp_path / "catalog.pcat"
+        write_catalog(ProductCatalog.from_dict({
+            "garden": [{"id": 1, "name": "Rake", "price": 15.0, "in_stock": True}]
+        }), path)
+        client = TestClient(create_app(catalog_path=str(path)))
+
+        results = client.get("/products/search?category=garden").json()["data"]["data"]["results"]
+        assert results == [{"id": 1, "name": "Rake", "price": 15.0, "in_stock": True}]
+
     def test_metrics_endpoint(self, client):
         """Metrics endpoint returns metrics."""
         response = client.get("/metrics")
@@ -55,6 +115,116 @@ class TestAPIEndpoints:
         data = response.json()
         assert "total_requests" in data
         assert "success_rate_percent" in data
+        assert set(data["response_time_ms"]) == {"min", "p50", "p90", "p99", "p999", "max"}
+
+    def test_metrics_report_real_latency(self, client):
+        """Response times and stage timings are measured, not zero."""
+        client.get("/products/search?category=books")
+        data = client.get("/metrics").json()
+
+        assert data["response_time_ms"]["max"] > 0
+        assert data["stages_ms"]["backend"]["count"] == 1
+        assert data["stages_ms"]["serialize"]["count"] == 1
+        assert data["stages_ms"]["total"]["count"] >= 1
+        assert set(data["windows"]) == {"1s", "1m", "5m"}
+
+    def test_untimed_requests_not_recorded(self, client):
+        """Health checks and metrics scrapes stay out of the stage timings."""
+        client.get("/health")
+        client.get("/metrics")
+        client.get("/products/search?category=books")
+        stages = client.get("/metrics").json()["stages_ms"]
+        assert stages["total"]["count"] == 1
+
+    def test_server_timing_header(self):
+        """Stage timings are sent back when asked for."""
+        response = TestClient(create_app(server_timing=True)).get("/products/search?category=books")
+        entries = [entry.split(";")[0] for entry in response.headers["server-timing"].split(", ")]
+        assert entries[-1] == "total"
+        assert {"limit", "backend", "serialize"} <= set(entries)
+
+    def test_prometheus_endpoint(self, client):
+        """Prometheus exposition counts the same requests as the JSON view."""
+        client.get("/products/search?category=books")
+        client.get("/products/search?category=books&cursor=forged")
+
+        response = client.get("/metrics/prometheus")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        text = response.text
+        assert 'gateway_requests_total{route="/products/search",status="2xx",decision="allowed"} 1' in text
+        assert 'gateway_requests_total{route="/products/search",status="4xx",decision="allowed"} 1' in text
+        assert 'gateway_request_duration_seconds_count{route="/products/search",status="2xx"} 1' in text
+        assert client.get("/metrics").json()["total_requests"] == 2
+
+    def test_metrics_shared_between_workers(self, tmp_path):
+        """Apps sharing a metrics file report each other's requests."""
+        path = str(tmp_path / "metrics.bin")
+        first = TestClient(create_app(metrics_file=path))
+        second = TestClient(create_app(metrics_file=path))
+
+        first.get("/products/search?category=books")
+        data = second.get("/metrics").json()
+        assert data["total_requests"] == 1
+        assert data["workers"] == 1
+
+    def test_access_log(self, tmp_path):
+        """Requests are written to the access log by shutdown."""
+        from src.metrics import read_access_log
+
+        path = str(tmp_path / "access.log")
+        with TestClient(create_app(access_log_path=path)) as client:
+            client.get("/products/search?category=books")
+            assert client.get("/metrics").json()["access_log"]["appended"] == 1
+
+        (record,) = read_access_log(path)
+        assert record["route"] == "/products/search"
+        assert record["status"] == 200
+        assert record["decision"] == "allowed"
+        assert record["latency_ms"] > 0
+
+    def test_debug_endpoints_need_admin_token(self, client):
+        """Debug endpoints are absent without a token and guarded with one."""
+        assert client.get("/admin/debug/memory").status_code == 404
+        guarded = TestClient(create_app(admin_token="s3cret"))
+        assert guarded.get("/admin/debug/memory").status_code == 403
+        response = guarded.get("/admin/debug/memory", headers={"X-Admin-Token": "wrong"})
+        assert response.status_code == 403
+
+    def test_debug_memory(self):
+        """Memory is reported per subsystem, with allocations when traced."""
+        client = TestClient(create_app(admin_token="s3cret"))
+        client.get("/products/search?category=books")
+        headers = {"X-Admin-Token": "s3cret"}
+
+        data = client.get("/admin/debug/memory", headers=headers).json()
+        assert data["subsystems"]["rate_limiter"]["entries"] == 1
+        assert data["subsystems"]["metrics"]["estimated_bytes"] > 0
+        entries = data["subsystems"]["metrics"]["entries"]
+        assert entries["request_series"] == 1
+        assert entries["duration_series"] == 1
+        assert entries["histogram_buckets"] > 0 and entries["window_seconds"] > 0
+        assert data["tracemalloc"] is None
+
+        data = client.get("/admin/debug/memory?trace_seconds=0.05", headers=headers).json()
+        assert data["tracemalloc"]["window_seconds"] == 0.05
+
+    def test_debug_profile(self):
+        """A time-boxed profile returns collapsed stacks or a tree."""
+        client = TestClient(create_app(admin_token="s3cret"))
+        headers = {"X-Admin-Token": "s3cret"}
+
+        response = client.get("/admin/debug/profile?seconds=0.05&interval_ms=1", headers=headers)
+        assert response.status_code == 200
+        line = response.text.splitlines()[0]
+        assert int(line.rsplit(" ", 1)[1]) > 0
+
+        tree = client.get("/admin/debug/profile?seconds=0.05&format=json", headers=headers).json()
+        assert tree["tree"]["value"] == tree["samples"] > 0
+
+    def test_server_timing_off_by_default(self, client):
+        """No Server-Timing header unless enabled."""
+        assert "server-timing" not in client.get("/health").headers
 
     def test_reset_metrics_endpoint(self, client):
         """Reset metrics endpoint works."""
@@ -67,3 +237,29 @@ class TestAPIEndpoints:
         assert response.status_code == 200
         data = response.json()
         assert "rate_limit_status" in data
+
+    def test_metrics_include_admission_queue(self, client):
+        """Metrics export admission queue depth and sojourn time."""
+        client.get("/products/search?category=books")
+        data = client.get("/metrics").json()
+        assert data["admission"]["queue_depth"] == 0
+        assert data["admission"]["classes"]["normal"]["admitted"] >= 1
+
+    def test_products_search_ndjson_stream(self, client):
+        """Product search streams NDJSON when asked to."""
+        import json
+
+        response = client.get(
+            "/products/search?category=electronics&limit=3",
+            headers={"Accept": "application/x-ndjson"}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines[0]["status"] == "success"
+        assert lines[0]["total_results"] == 5
+        assert len(lines) == 4
+
+        admission = client.get("/metrics").json()["admission"]
+        assert admission["in_flight"] == 0
@@ -0,0 +1,72 @@
+"""
+Integration Tests for Batch Product Search
+"""
+
+import json
+import pytest
+from fastapi.testclient import TestClient
+from src.gateway import create_app
+
+
+QUERIES = [
+    {"category": "electronics", "page": 1, "limit": 2},
+    {"category": "books", "page": 1, "limit": 2},
+    {"category": "nope", "page": 1, "limit": 2},
+]
+
+
+@pytest.fixture
+def client():
+    """Create test client."""
+    return TestClient(create_app(capacity=10, refill_rate=0.001))
+
+
+class TestBatchSearch:
+    """Test the batch search endpoint."""
+
+    def test_results_in_request_order(self, client):
+        """JSON results line up with the queries."""
+        response = client.post("/products/search/batch", json={"queries": QUERIES})
+        assert response.status_code == 200
+        results = response.json()["data"]["results"]
+
+        assert [part["index"] for part in results] == [0, 1, 2]
+        assert results[0]["response"]["data"]["data"]["category"] == "electronics"
+        assert results[1]["response"]["data"]["data"]["category"] == "books"
+        assert results[2]["response"]["data"]["status"] == "error"
+
+    def test_charges_limiter_once_with_item_cost(self, client):
+        """A batch costs one token per default-sized item, in a single charge."""
+        client.post("/products/search/batch", json={"queries": QUERIES})
+        stats = client.get("/client-status/testclient").json()["rate_limit_status"]
+        assert stats["tokens_remaining"] == 7
+
+        big = [{"category": "books", "limit": 50}]
+        client.post("/products/search/batch", json={"queries": big})
+        stats = client.get("/client-status/testclient").json()["rate_limit_status"]
+        assert stats["tokens_remaining"] == 4
+
+    def test_rejected_when_over_budget(self, client):
+        """A batch costing more than the remaining budget gets 429."""
+        queries = [{"category": "books", "limit": 50}] * 4
+        response = client.post("/products/search/batch", json={"queries": queries})
+        assert response.status_code == 429
+
+    def test_ndjson_stream(self, client):
+        """NDJSON mode streams one line per query, each tagged with its index."""
+        response = client.post(
+            "/products/search/batch",
+            json={"queries": QUERIES},
+            headers={"Accept": "application/x-ndjson"}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+
+        parts = [json.loads(line) for line in response.text.splitlines()]
+        assert sorted(part["index"] for part in parts) == [0, 1, 2]
+        assert all(part["status_code"] == 200 for part in parts)
+
+    def test_batch_size_limit(self, client):
+        """More than 10 queries is a validation error."""
+        response = client.post("/products/search/batch", json={"queries": QUERIES * 4})
+        assert response.status_code == 422
@@ -0,0 +1,91 @@
+"""
+Integration Tests for Gossip Cluster Mode
+"""
+
+import asyncio
+import itertools
+
+import pytest
+from fastapi.testclient import TestClient
+from src.gateway import create_app
+from src.rate_limiting import GossipNode, GossipRateLimiter, RateLimiter
+
+
+CAPACITY = 60
+NODES = 4
+SECRET = b"cluster key"
+
+
+async def run_cluster(error_bound, requests=2000):
+    """
+    Send one client's requests round-robin to loopback gossip nodes.
+
+    A request refused at a node's unsynced cap is held for the next
+    broadcast, as the gateway does.
+
+    Returns:
+        Requests admitted across the cluster
+    """
+    nodes = [
+        GossipNode(
+            GossipRateLimiter(capacity=CAPACITY, refill_rate=0, error_bound=error_bound),
+            ("127.0.0.1", 0),
+            interval=0.02,
+            secret=SECRET
+        )
+        for _ in range(NODES)
+    ]
+    for node in nodes:
+        await node.start()
+    for node, other in itertools.permutations(nodes, 2):
+        node.add_peer(other.address)
+
+    admitted = 0
+    for n in range(requests):
+        limiter = nodes[n % NODES].rate_limiter
+        admitted += limiter.is_allowed("10.0.0.1") or await limiter.hold("10.0.0.1", 1, timeout=0.5)
+        if n % NODES == NODES - 1:
+            # Let the event loop deliver gossip, as it would between requests
+            await asyncio.sleep(0.001)
+    for node in nodes:
+        await node.stop()
+    return admitted
+
+
+class TestGossipCluster:
+    """Test cluster-wide over-admission with gossip on loopback UDP."""
+
+    def test_without_gossip_each_node_admits_full_budget(self):
+        """Independent nodes admit the capacity once per node."""
+        limiters = [RateLimiter(capacity=CAPACITY, refill_rate=0) for _ in range(NODES)]
+        admitted = sum(limiters[n % NODES].is_allowed("10.0.0.1") for n in range(2000))
+        assert admitted == CAPACITY * NODES
+
+    @pytest.mark.parametrize("error_bound", [0.1, 0.5])
+    def test_over_admission_within_error_bound(self, error_bound):
+        """Gossiping nodes admit about one budget, within the error bound."""
+        admitted = asyncio.run(run_cluster(error_bound))
+        assert admitted >= CAPACITY * 0.9
+        assert admitted <= CAPACITY * (1 + error_bound) + 1
+
+    def test_app_reports_gossip_in_metrics(self):
+        """An app in cluster mode gossips from startup and reports it."""
+        app = create_app(gossip_bind="127.0.0.1:0", gossip_peers=["127.0.0.1:9"])
+        with TestClient(app) as client:
+            assert client.get("/products/search?category=books").status_code == 200
+            gossip = client.get("/metrics").json()["gossip"]
+        assert gossip["peers"] == 1
+        assert gossip["error_bound"] == 0.1
+
+    def test_capped_requests_are_held_not_refused(self):
+        """Requests past a cap below one token wait for a sync instead of a 429."""
+        peers = [f"127.0.0.1:{port}" for port in range(9, 24)]
+        app = create_app(
+            capacity=100, gossip_bind="127.0.0.1:0", gossip_peers=peers,
+            gossip_interval=1.0, gossip_secret=SECRET
+        )
+        with TestClient(app) as client:
+            statuses = [client.get("/products/search?category=books").status_code for _ in range(3)]
+            gossip = client.get("/metrics").json()["gossip"]
+        assert statuses == [200, 200, 200]
+        assert gossip["held"] == 2
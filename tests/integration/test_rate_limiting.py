@@ -42,3 +42,163 @@ class TestRateLimitingIntegration:
             data = last_response.json()
             assert "error" in data
             assert "retry_after_seconds" in data
+
+    def test_policy_file_reload_keeps_client_state(self, tmp_path):
+        """Raising the limit in the policy file takes effect without a restart."""
+        path = tmp_path / "policies.json"
+        path.write_text('{"default": {"capacity": 2, "refill_rate": 0}}')
+        app = create_app(policy_file=str(path))
+        client = TestClient(app)
+
+        for _ in range(2):
+            assert client.get("/products/search?category=books").status_code == 200
+        assert client.get("/products/search?category=books").status_code == 429
+
+        path.write_text('{"default": {"capacity": 4, "refill_rate": 0}}')
+        assert app.state.policy_reloader.reload() is True
+        # The bucket was empty and stays empty at the new size
+        assert client.get("/products/search?category=books").status_code == 429
+        status = client.get("/client-status/testclient").json()["rate_limit_status"]
+        assert status["capacity"] == 4
+
+
+class TestThrottledRoutes:
+    """Test delay-instead-of-reject mode through the full API."""
+
+    def test_over_limit_request_is_delayed_not_rejected(self):
+        """A throttled route waits for the next token instead of returning 429."""
+        app = create_app(capacity=1, refill_rate=4.0, throttled_routes=["/products/search"])
+        client = TestClient(app)
+
+        statuses = [client.get("/products/search?category=books").status_code for _ in range(3)]
+        assert statuses == [200, 200, 200]
+
+        throttle = client.get("/metrics").json()["throttle"]
+        assert throttle["released"] >= 1
+        assert throttle["waiting"] == 0
+
+    def test_unthrottled_app_still_rejects(self):
+        """Without throttled routes over-limit requests get 429 immediately."""
+        client = TestClient(create_app(capacity=1, refill_rate=0.001))
+        client.get("/products/search?category=books")
+        assert client.get("/products/search?category=books").status_code == 429
+
+
+class TestFlaggedCrawlers:
+    """Test handling of clients flagged as scrapers."""
+
+    def test_flagged_client_gets_429(self):
+        """Flagged clients are refused without reaching the backend."""
+        client = TestClient(create_app(admin_token="secret"))
+        admin = {"X-Admin-Token": "secret"}
+        assert client.post("/admin/crawlers/testclient", headers=admin).status_code == 200
+        assert client.get("/admin/crawlers", headers=admin).json()["flagged"] == ["testclient"]
+
+        assert client.get("/products/search?category=books").status_code == 429
+
+        client.delete("/admin/crawlers/testclient", headers=admin)
+        assert client.get("/products/search?category=books").status_code == 200
+
+    def test_crawler_endpoints_need_admin_token(self):
+        """Clients cannot flag others or clear their own flag."""
+        client = TestClient(create_app(admin_token="secret"))
+        assert client.post("/admin/crawlers/10.0.0.1").status_code == 403
+        assert client.delete("/admin/crawlers/testclient", headers={"X-Admin-Token": "wrong"}).status_code == 403
+        assert client.get("/admin/crawlers").status_code == 403
+
+        unprotected = TestClient(create_app())
+        assert unprotected.post("/admin/crawlers/10.0.0.1").status_code in (404, 405)
+
+    def test_flagged_client_is_tarpitted(self):
+        """With the tarpit on, flagged clients get a slow 429."""
+        app = create_app(tarpit=True)
+        app.state.tarpit.interval = 0.01
+        app.state.tarpit.drips = 3
+        client = TestClient(app)
+        app.state.suspicion_tracker.flag("testclient")
+
+        response = client.get("/products/search?category=books")
+        assert response.status_code == 429
+        assert response.content.startswith(b"   ")
+        assert response.json()["retry_after_seconds"] == 1
+        assert client.get("/metrics").json()["tarpit"]["total"] == 1
+
+
+class TestProofOfWorkChallenge:
+    """Test the proof-of-work challenge mode through the full API."""
+
+    def test_suspected_crawler_must_solve_puzzle(self):
+        """A client that drained half its bucket gets a puzzle, then passes with it."""
+        from src.detection.challenge import solve
+
+        app = create_app(capacity=4, refill_rate=0.001, challenged_routes=["/products/search"])
+        app.state.challenge.min_difficulty = 4
+        app.state.challenge.max_difficulty = 8
+        client = TestClient(app)
+
+        assert client.get("/products/search?category=books").status_code == 200
+
+        challenged = client.get("/products/search?category=books")
+        assert challenged.status_code == 403
+        puzzle = challenged.json()
+        assert puzzle["difficulty"] >= 4
+
+        solution = solve(puzzle["challenge"], puzzle["difficulty"])
+        response = client.get(
+            "/products/search?category=books",
+            headers={"X-PoW-Challenge": puzzle["challenge"], "X-PoW-Solution": solution}
+        )
+        assert response.status_code == 200
+
+        replayed = client.get(
+            "/products/search?category=books",
+            headers={"X-PoW-Challenge": puzzle["challenge"], "X-PoW-Solution": solution}
+        )
+        assert replayed.status_code == 403
+
+
+class TestCursorEnumeration:
+    """Test spotting parallel enumeration through the full API."""
+
+    def test_parallel_cursor_chains_get_flagged(self):
+        """A client walking more cursor chains at once than allowed is flagged."""
+        app = create_app(max_cursor_chains=2)
+        client = TestClient(app)
+
+        cursors = [
+            client.get("/products/search?category=electronics&limit=1").json()["data"]["data"]["next_cursor"]
+            for _ in range(3)
+        ]
+        statuses = [
+            client.get(
+                "/products/search",
+                params={"category": "electronics", "limit": 1, "cursor": cursor}
+            ).status_code
+            for cursor in cursors
+        ]
+
+        assert statuses == [200, 200, 429]
+        assert app.state.suspicion_tracker.is_flagged("testclient")
+        assert app.state.suspicion_tracker.flagged["testclient"] < float("inf")
+        assert client.get("/metrics").json()["enumeration"]["enumerations_detected"] == 1
+
+    def test_detection_can_be_turned_off(self):
+        """Without the detector, parallel chains are served and nobody is flagged."""
+        app = create_app(max_cursor_chains=2, enumeration_detection=False)
+        client = TestClient(app)
+
+        cursors = [
+            client.get("/products/search?category=electronics&limit=1").json()["data"]["data"]["next_cursor"]
+            for _ in range(3)
+        ]
+        statuses = [
+            client.get(
+                "/products/search",
+                params={"category": "electronics", "limit": 1, "cursor": cursor}
+            ).status_code
+            for cursor in cursors
+        ]
+
+        assert statuses == [200, 200, 200]
+        assert app.state.suspicion_tracker.get_flagged() == []
+        assert "enumeration" not in client.get("/metrics").json()
@@ -0,0 +1,21 @@
+"""
+Shared fixtures for unit tests
+"""
+
+import pytest
+
+
+class FakeClock:
+    """Clock advanced by hand."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """A FakeClock starting at 1000.0 seconds."""
+    return FakeClock()
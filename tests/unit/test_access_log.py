@@ -0,0 +1,135 @@
+"""
+Tests for Access Log Module
+"""
+
+import json
+import time
+
+import pytest
+from src.metrics.access_log import MAGIC, RECORD, AccessLog, load_access_log, read_access_log
+
+
+@pytest.fixture
+def manual(monkeypatch):
+    """Access logs without a writer thread; flushed by hand."""
+    monkeypatch.setattr(AccessLog, "_start", lambda self: None)
+
+
+def _append(log, count, client="10.0.0.1"):
+    for n in range(count):
+        log.append(client, "/products/search", "allowed", 200, 0.0125, timestamp=1000.0 + n)
+
+
+class TestAccessLog:
+    """Test logging requests."""
+
+    def test_binary_round_trip(self, tmp_path):
+        """Records written in binary read back unchanged."""
+        path = str(tmp_path / "access.log")
+        log = AccessLog(path)
+        log.append("10.0.0.1", "/products/search", "allowed", 200, 0.0125, timestamp=1000.5)
+        log.append("2001:db8::1", "/products/search/batch", "flagged", 429, 0.0)
+        log.append("testclient", "/x", "tarpitted", 429, 0.0)
+        log.close()
+
+        with open(path, "rb") as f:
+            assert f.read(len(MAGIC)) == MAGIC
+        records = list(read_access_log(path))
+        assert records[0] == {
+            "time": 1000.5,
+            "client": "10.0.0.1",
+            "route": "/products/search",
+            "decision": "allowed",
+            "status": 200,
+            "latency_ms": 12.5,
+        }
+        assert records[1]["client"] == "2001:db8::1"
+        assert records[1]["decision"] == "flagged"
+        assert records[2]["client"] == "testclient"
+
+    def test_jsonl(self, tmp_path):
+        """JSONL logs hold one object per line."""
+        path = str(tmp_path / "access.jsonl")
+        log = AccessLog(path, format="jsonl")
+        _append(log, 3)
+        log.close()
+
+        lines = open(path).read().splitlines()
+        assert len(lines) == 3
+        assert json.loads(lines[2])["time"] == 1002.0
+        assert [r["status"] for r in read_access_log(path)] == [200, 200, 200]
+
+    def test_unknown_format(self, tmp_path):
+        """Only known formats are accepted."""
+        with pytest.raises(ValueError):
+            AccessLog(str(tmp_path / "a.log"), format="xml")
+
+    def test_drops_when_full(self, tmp_path, manual):
+        """A full ring drops new records instead of waiting."""
+        log = AccessLog(str(tmp_path / "access.log"), capacity=4)
+        _append(log, 6)
+
+        assert log.dropped == 2
+        assert log.get_stats()["buffered"] == 4
+
+        log.flush()
+        assert log.append("10.0.0.1", "/", "allowed", 200, 0.0)
+        log.close()
+        assert len(list(read_access_log(log.path))) == 5
+
+    def test_ring_wraps(self, tmp_path, manual):
+        """Records keep their order across the end of the ring."""
+        log = AccessLog(str(tmp_path / "access.log"), capacity=4)
+        _append(log, 3)
+        log.flush()
+        for n in range(3):
+            log.append("10.0.0.1", "/", "allowed", 200 + n, 0.0)
+        log.close()
+
+        assert [r["status"] for r in read_access_log(log.path)] == [200] * 3 + [200, 201, 202]
+
+    def test_rotation(self, tmp_path, manual):
+        """Files are rotated by size, keeping a fixed number of backups."""
+        path = str(tmp_path / "access.log")
+        log = AccessLog(path, max_bytes=len(MAGIC) + 2 * RECORD.size, backups=2)
+        for _ in range(4):
+            _append(log, 2)
+            log.flush()
+        log.close()
+
+        assert log.rotations == 3
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["access.log", "access.log.1", "access.log.2"]
+        assert len(list(read_access_log(path + ".2"))) == 2
+
+    def test_background_writer(self, tmp_path):
+        """The writer thread flushes without being asked."""
+        log = AccessLog(str(tmp_path / "access.log"), flush_interval=0.01)
+        _append(log, 10)
+        for _ in range(500):
+            if log.written == 10:
+                break
+            time.sleep(0.01)
+        assert log.written == 10
+        log.close()
+
+    def test_load_binary(self, tmp_path):
+        """Binary logs load whole as a record array."""
+        path = str(tmp_path / "access.log")
+        log = AccessLog(path)
+        _append(log, 4)
+        log.close()
+
+        records = load_access_log(path)
+        assert len(records) == 4
+        assert records["time"].tolist() == [1000.0, 1001.0, 1002.0, 1003.0]
+        assert records["status"][0] == 200
+        assert records["route"][0] == b"/products/search"
+
+    def test_load_rejects_jsonl(self, tmp_path):
+        """Only binary logs can be loaded as an array."""
+        path = str(tmp_path / "access.jsonl")
+        log = AccessLog(path, format="jsonl")
+        _append(log, 1)
+        log.close()
+        with pytest.raises(ValueError):
+            load_access_log(path)
@@ -0,0 +1,200 @@
+"""
+Tests for AdmissionQueue Module
+"""
+
+import asyncio
+import time
+import pytest
+from src.admission import AdmissionQueue, AdmissionRejected, Priority
+
+
+async def _hold(queue, priority, seconds, order=None, tag=None):
+    """Acquire a slot, hold it, release it."""
+    async with queue.admit(priority):
+        if order is not None:
+            order.append(tag)
+        await asyncio.sleep(seconds)
+
+
+class TestAdmissionQueue:
+    """Test priority-aware admission and load shedding."""
+
+    def test_admits_immediately_under_capacity(self):
+        """Requests below max_concurrency never wait."""
+        async def scenario():
+            queue = AdmissionQueue(max_concurrency=2)
+            await queue.acquire(Priority.NORMAL)
+            await queue.acquire(Priority.NORMAL)
+            assert queue.in_flight == 2
+            assert queue.queue_depth == 0
+            queue.release()
+            queue.release()
+            assert queue.in_flight == 0
+
+        asyncio.run(scenario())
+
+    def test_higher_priority_served_first(self):
+        """Trusted waiters are admitted before normal and suspect ones."""
+        async def scenario():
+            queue = AdmissionQueue(max_concurrency=1, target_delay=10.0)
+            order = []
+            blocker = asyncio.create_task(_hold(queue, Priority.NORMAL, 0.05))
+            await asyncio.sleep(0)
+            waiters = [
+                asyncio.create_task(_hold(queue, Priority.SUSPECT, 0, order, "suspect")),
+                asyncio.create_task(_hold(queue, Priority.NORMAL, 0, order, "normal")),
+                asyncio.create_task(_hold(queue, Priority.TRUSTED, 0, order, "trusted")),
+            ]
+            await asyncio.gather(blocker, *waiters)
+            return order
+
+        assert asyncio.run(scenario()) == ["trusted", "normal", "suspect"]
+
+    def test_queue_full_rejects_same_priority(self):
+        """A full queue sheds new arrivals that cannot evict anyone."""
+        async def scenario():
+            queue = AdmissionQueue(max_concurrency=1, max_queue_size=1)
+            await queue.acquire(Priority.NORMAL)
+            waiter = asyncio.create_task(queue.acquire(Priority.NORMAL))
+            await asyncio.sleep(0)
+            with pytest.raises(AdmissionRejected) as exc:
+                await queue.acquire(Priority.NORMAL)
+            assert exc.value.reason == "queue_full"
+            queue.release()
+            await waiter
+            queue.release()
+
+        asyncio.run(scenario())
+
+    def test_queue_full_evicts_lower_priority(self):
+        """A trusted arrival evicts a queued suspect when the queue is full."""
+        async def scenario():
+            queue = AdmissionQueue(max_concurrency=1, max_queue_size=1)
+            await queue.acquire(Priority.NORMAL)
+            suspect = asyncio.create_task(queue.acquire(Priority.SUSPECT))
+            await asyncio.sleep(0)
+            trusted = asyncio.create_task(queue.acquire(Priority.TRUSTED))
+            await asyncio.sleep(0)
+            with pytest.raises(AdmissionRejected) as exc:
+                await suspect
+            assert exc.value.reason == "evicted"
+            queue.release()
+            await trusted
+            queue.release()
+
+        asyncio.run(scenario())
+
+    def test_class_deadline_sheds_waiter(self):
+        """A waiter that outlives its class deadline is shed."""
+        async def scenario():
+            queue = AdmissionQueue(
+                max_concurrency=1, class_deadlines={Priority.SUSPECT: 0.01}
+            )
+            await queue.acquire(Priority.NORMAL)
+            with pytest.raises(AdmissionRejected) as exc:
+                await queue.acquire(Priority.SUSPECT)
+            assert exc.value.reason == "deadline"
+            assert queue.queue_depth == 0
+            queue.release()
+            return queue.get_stats()
+
+        stats = asyncio.run(scenario())
+        assert stats["classes"]["suspect"]["shed"] == {"deadline": 1}
+
+    def test_request_deadline_shortens_wait(self):
+        """A request waits no longer than its own deadline allows."""
+        async def scenario():
+            queue = AdmissionQueue(max_concurrency=1)
+            await queue.acquire(Priority.TRUSTED)
+            start = time.perf_counter()
+            with pytest.raises(AdmissionRejected) as exc:
+                await queue.acquire(Priority.TRUSTED, timeout=0.02)
+            elapsed = time.perf_counter() - start
+            with pytest.raises(AdmissionRejected):
+                await queue.acquire(Priority.TRUSTED, timeout=0)
+            return exc.value.reason, elapsed
+
+        reason, elapsed = asyncio.run(scenario())
+        assert reason == "deadline"
+        assert elapsed < 0.5
+
+    def test_slot_admitted_at_timeout_is_returned(self, monkeypatch):
+        """A waiter admitted just as its deadline fires gives the slot back."""
+        async def admitted_then_timed_out(future, timeout):
+            queue.release()
+            assert future.done()
+            raise asyncio.TimeoutError
+
+        async def scenario():
+            await queue.acquire(Priority.NORMAL)
+            monkeypatch.setattr(asyncio, "wait_for", admitted_then_timed_out)
+            with pytest.raises(AdmissionRejected):
+                await queue.acquire(Priority.NORMAL)
+            monkeypatch.undo()
+            return queue.in_flight, queue.queue_depth
+
+        queue = AdmissionQueue(max_concurrency=1)
+        assert asyncio.run(scenario()) == (0, 0)
+
+    def test_codel_sheds_lowest_class_first(self):
+        """Standing delay above target drops suspects, not shoppers."""
+        async def scenario():
+            queue = AdmissionQueue(max_concurrency=1, target_delay=0.001, interval=0.01)
+            await queue.acquire(Priority.NORMAL)
+            normal = [asyncio.create_task(queue.acquire(Priority.NORMAL)) for _ in range(3)]
+            suspect = [asyncio.create_task(queue.acquire(Priority.SUSPECT)) for _ in range(3)]
+            await asyncio.sleep(0.03)
+
+            for _ in range(6):
+                queue.release()
+                await asyncio.sleep(0.015)
+
+            results = await asyncio.gather(*normal, *suspect, return_exceptions=True)
+            return results[:3], results[3:]
+
+        normal, suspect = asyncio.run(scenario())
+        assert all(result is None for result in normal)
+        assert any(isinstance(result, AdmissionRejected) for result in suspect)
+
+    def test_dropping_state_ends_when_queue_drains(self):
+        """Suspects are not shed on stale CoDel state once the queue is empty."""
+        async def scenario():
+            queue = AdmissionQueue(max_concurrency=1, target_delay=0.001, interval=0.01)
+            await queue.acquire(Priority.NORMAL)
+            waiters = [asyncio.create_task(queue.acquire(Priority.NORMAL)) for _ in range(4)]
+            await asyncio.sleep(0.03)
+            for _ in range(5):
+                queue.release()
+                await asyncio.sleep(0.015)
+            await asyncio.gather(*waiters, return_exceptions=True)
+
+            # Queue empty, slot busy: a suspect waits its turn instead
+            await queue.acquire(Priority.NORMAL)
+            suspect = asyncio.create_task(queue.acquire(Priority.SUSPECT))
+            await asyncio.sleep(0)
+            queue.release()
+            await suspect
+            queue.release()
+            return queue.get_stats()
+
+        stats = asyncio.run(scenario())
+        assert stats["dropping"] is False
+        assert "overloaded" not in stats["classes"]["suspect"]["shed"]
+
+    def test_stats_report_depth_and_sojourn(self):
+        """Stats expose queue depth and sojourn time per class."""
+        async def scenario():
+            queue = AdmissionQueue(max_concurrency=1, target_delay=10.0)
+            await queue.acquire(Priority.NORMAL)
+            waiter = asyncio.create_task(queue.acquire(Priority.NORMAL))
+            await asyncio.sleep(0.02)
+            depth = queue.get_stats()["queue_depth"]
+            queue.release()
+            await waiter
+            queue.release()
+            return depth, queue.get_stats()
+
+        depth, stats = asyncio.run(scenario())
+        assert depth == 1
+        assert stats["classes"]["normal"]["admitted"] == 2
+        assert stats["classes"]["normal"]["max_sojourn_ms"] >= 10
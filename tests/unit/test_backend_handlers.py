@@ -56,6 +56,54 @@ class TestProductSearchHandler:
         assert response["data"]["page"] == 1
         assert response["data"]["limit"] == 20
 
+    def test_stream_yields_header_then_products(self):
+        """Streaming yields pagination info first, then one record per product."""
+        handler = ProductSearchHandler()
+        records = list(handler.stream({"category": "electronics", "page": 1, "limit": 3}))
+
+        assert records[0]["status"] == "success"
+        assert records[0]["total_results"] == 5
+        assert len(records) == 4
+        assert all("price" in product for product in records[1:])
+
+    def test_stream_invalid_category(self):
+        """Streaming an unknown category yields a single error record."""
+        records = list(ProductSearchHandler().stream({"category": "invalid"}))
+        assert len(records) == 1
+        assert records[0]["status"] == "error"
+
+    def test_search_sort_and_filter(self):
+        """Sorting and price filters are applied before pagination."""
+        handler = ProductSearchHandler()
+        response = handler.handle({
+            "category": "electronics",
+            "sort_by": "price_desc",
+            "max_price": 100.0
+        })
+
+        prices = [product["price"] for product in response["data"]["results"]]
+        assert prices == sorted(prices, reverse=True)
+        assert all(price <= 100.0 for price in prices)
+        assert response["data"]["sort_by"] == "price_desc"
+
+    def test_search_by_text(self):
+        """Product names are matched by token and prefix."""
+        response = ProductSearchHandler().handle({"category": "electronics", "q": "usb ca"})
+        assert [product["name"] for product in response["data"]["results"]] == ["USB Cable"]
+
+    def test_add_products_are_searchable(self):
+        """Added products are found by category and text."""
+        handler = ProductSearchHandler()
+        handler.add_products([("electronics", {"id": 99, "name": "USB Hub", "price": 19.0, "in_stock": True})])
+        response = handler.handle({"category": "electronics", "q": "usb"})
+        assert [product["id"] for product in response["data"]["results"]] == [2, 99]
+
+    def test_search_unknown_sort_order(self):
+        """An unknown sort order yields an error record."""
+        records = list(ProductSearchHandler().stream({"category": "books", "sort_by": "name"}))
+        assert len(records) == 1
+        assert records[0]["status"] == "error"
+
 
 class TestHealthHandler:
     """Test health endpoint handler."""
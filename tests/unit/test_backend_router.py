@@ -40,3 +40,33 @@ class TestBackendRouter:
         response = router.handle_request("/unknown", {})
 
         assert "error" in response
+
+    def test_route_product_detail(self):
+        """Path parameters reach the handler."""
+        router = BackendRouter()
+        response = router.handle_request("/products/3", {})
+
+        assert response["status"] == "success"
+        assert response["data"]["name"] == "Monitor"
+        assert response["data"]["category"] == "electronics"
+
+    def test_product_detail_not_found(self):
+        """Unknown product ids are reported as errors."""
+        response = BackendRouter().handle_request("/products/9999", {})
+        assert response["status"] == "error"
+
+    def test_route_match(self):
+        """Path parameters are available through match()."""
+        match = BackendRouter().match("/products/3")
+        assert match.params == {"product_id": 3}
+        assert match.metadata == {}
+
+    def test_register_wildcard_route(self):
+        """Handlers can be mounted under a prefix."""
+        from src.backend.handlers import HealthHandler
+
+        router = BackendRouter()
+        router.register_handler("/mounted/{path:path}", HealthHandler(), upstream="pool-a")
+
+        assert router.handle_request("/mounted/a/b", {})["status"] == "healthy"
+        assert router.match("/mounted/a/b").metadata == {"upstream": "pool-a"}
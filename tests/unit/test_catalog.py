@@ -0,0 +1,193 @@
+"""
+Tests for Product Catalog Module
+"""
+
+import pytest
+from src.backend.catalog import ProductCatalog
+
+
+PRODUCTS = {
+    "tools": [
+        {"id": 1, "name": "Hammer", "price": 20.0, "in_stock": True},
+        {"id": 2, "name": "Saw", "price": 35.0, "in_stock": False},
+        {"id": 3, "name": "Drill", "price": 80.0, "in_stock": True},
+        {"id": 4, "name": "Pliers", "price": 12.5, "in_stock": True},
+        {"id": 5, "name": "Level", "price": 35.0, "in_stock": True},
+    ],
+    "garden": [
+        {"id": 6, "name": "Rake", "price": 15.0, "in_stock": True},
+        {"id": 7, "name": "Hose", "price": 25.0, "in_stock": False},
+    ],
+}
+
+
+@pytest.fixture
+def catalog():
+    """Create a small catalog."""
+    return ProductCatalog.from_dict(PRODUCTS)
+
+
+def _ids(catalog, rows):
+    return [catalog.record(row)["id"] for row in rows]
+
+
+class TestProductCatalog:
+    """Test columnar catalog search."""
+
+    def test_size_and_categories(self, catalog):
+        """The catalog knows its products and categories."""
+        assert len(catalog) == 7
+        assert catalog.has_category("tools")
+        assert not catalog.has_category("toys")
+
+    def test_record_decodes_row(self, catalog):
+        """A row decodes back into the original product dict."""
+        _, rows = catalog.search("garden")
+        assert catalog.record(rows[0]) == PRODUCTS["garden"][0]
+
+    def test_relevance_keeps_insertion_order(self, catalog):
+        """Relevance order is the order products were added in."""
+        total, rows = catalog.search("tools")
+        assert total == 5
+        assert _ids(catalog, rows) == [1, 2, 3, 4, 5]
+
+    def test_price_asc(self, catalog):
+        """Products sort by ascending price, ties by id."""
+        _, rows = catalog.search("tools", sort_by="price_asc")
+        assert _ids(catalog, rows) == [4, 1, 2, 5, 3]
+
+    def test_price_desc(self, catalog):
+        """Products sort by descending price, ties by id."""
+        _, rows = catalog.search("tools", sort_by="price_desc")
+        assert _ids(catalog, rows) == [3, 2, 5, 1, 4]
+
+    def test_in_stock_filter(self, catalog):
+        """Only products with the requested stock flag are returned."""
+        total, rows = catalog.search("tools", in_stock=False)
+        assert total == 1
+        assert _ids(catalog, rows) == [2]
+
+    @pytest.mark.parametrize("sort_by", ["relevance", "price_asc", "price_desc"])
+    def test_price_range_is_inclusive(self, catalog, sort_by):
+        """Price bounds are inclusive for every sort order."""
+        total, rows = catalog.search("tools", sort_by=sort_by, min_price=20.0, max_price=35.0)
+        assert total == 3
+        assert sorted(_ids(catalog, rows)) == [1, 2, 5]
+
+    @pytest.mark.parametrize("sort_by", ["price_asc", "price_desc"])
+    def test_open_ended_price_range(self, catalog, sort_by):
+        """A single price bound works on price-sorted orders."""
+        _, above = catalog.search("tools", sort_by=sort_by, min_price=35.0)
+        _, below = catalog.search("tools", sort_by=sort_by, max_price=20.0)
+        assert sorted(_ids(catalog, above)) == [2, 3, 5]
+        assert sorted(_ids(catalog, below)) == [1, 4]
+
+    def test_filters_combine(self, catalog):
+        """Stock and price filters apply together."""
+        total, rows = catalog.search("tools", sort_by="price_asc", in_stock=True, min_price=30.0)
+        assert total == 2
+        assert _ids(catalog, rows) == [5, 3]
+
+    def test_pagination(self, catalog):
+        """Pages are slices of the sorted, filtered rows."""
+        total, rows = catalog.search("tools", page=2, limit=2, sort_by="price_asc")
+        assert total == 5
+        assert _ids(catalog, rows) == [2, 5]
+
+    def test_page_past_end_is_empty(self, catalog):
+        """A page beyond the last result is empty but still reports the total."""
+        total, rows = catalog.search("garden", page=5, limit=2)
+        assert total == 2
+        assert len(rows) == 0
+
+    def test_categories_do_not_mix(self, catalog):
+        """A search only returns its own category's products."""
+        _, rows = catalog.search("garden", sort_by="price_desc")
+        assert _ids(catalog, rows) == [7, 6]
+
+
+class TestKeysetSearch:
+    """Test seeking past a keyset position."""
+
+    def _walk(self, catalog, limit, **filters):
+        """Collect every page by following positions."""
+        ids, after = [], None
+        while True:
+            rows, has_more = catalog.search_after("tools", after=after, limit=limit, **filters)
+            ids.extend(_ids(catalog, rows))
+            if not has_more:
+                return ids
+            after = catalog.position(rows[-1], filters.get("sort_by", "relevance"))
+
+    @pytest.mark.parametrize("sort_by", ["relevance", "price_asc", "price_desc"])
+    def test_walk_matches_offset_order(self, catalog, sort_by):
+        """Following positions visits the same rows as one big offset page."""
+        _, rows = catalog.search("tools", limit=100, sort_by=sort_by)
+        assert self._walk(catalog, 2, sort_by=sort_by) == _ids(catalog, rows)
+
+    def test_walk_with_filters(self, catalog):
+        """Filters are applied after the seek."""
+        ids = self._walk(catalog, 1, sort_by="price_asc", in_stock=True, max_price=40.0)
+        assert ids == [4, 1, 5]
+
+    def test_seek_past_equal_prices(self, catalog):
+        """Rows sharing a price are split by id, none skipped or repeated."""
+        rows, has_more = catalog.search_after("tools", after=[35.0, 2], limit=5, sort_by="price_asc")
+        assert _ids(catalog, rows) == [5, 3]
+        assert has_more is False
+
+    def test_position(self, catalog):
+        """Positions hold the sort key and the product id."""
+        _, rows = catalog.search("tools", sort_by="price_desc")
+        assert catalog.position(rows[0], "price_desc") == [80.0, 3]
+
+
+class TestTextSearch:
+    """Test text queries against the catalog."""
+
+    def test_query_within_category(self, catalog):
+        """Text matches are limited to the category."""
+        total, rows = catalog.search("tools", q="ha")
+        assert total == 1
+        assert _ids(catalog, rows) == [1]
+
+    def test_query_sorted_and_filtered(self, catalog):
+        """Text matches are filtered and sorted like any search."""
+        extended = catalog.extended([
+            ("tools", {"id": 8, "name": "Claw Hammer", "price": 28.0, "in_stock": True}),
+            ("tools", {"id": 9, "name": "Rubber Hammer", "price": 9.0, "in_stock": False}),
+        ])
+        _, rows = extended.search("tools", q="hammer", sort_by="price_desc", in_stock=True)
+        assert _ids(extended, rows) == [8, 1]
+
+    def test_query_keyset_pages(self, catalog):
+        """Keyset pages work on text matches."""
+        extended = catalog.extended([
+            ("tools", {"id": 8, "name": "Claw Hammer", "price": 28.0, "in_stock": True}),
+        ])
+        rows, has_more = extended.search_after("tools", limit=1, sort_by="price_asc", q="hammer")
+        assert _ids(extended, rows) == [1] and has_more
+        rows, has_more = extended.search_after(
+            "tools", after=extended.position(rows[0], "price_asc"), limit=1, sort_by="price_asc", q="hammer"
+        )
+        assert _ids(extended, rows) == [8] and not has_more
+
+
+class TestExtended:
+    """Test adding products to a catalog."""
+
+    def test_original_is_unchanged(self, catalog):
+        """Extending returns a new catalog and leaves the old one as it was."""
+        extended = catalog.extended([("toys", {"id": 10, "name": "Kite", "price": 5.0, "in_stock": True})])
+        assert len(catalog) == 7 and not catalog.has_category("toys")
+        assert len(extended) == 8 and extended.has_category("toys")
+
+    def test_text_index_is_extended_not_rebuilt(self, catalog):
+        """A built text index is shared and only the new rows are indexed."""
+        catalog.search("tools", q="saw")
+        extended = catalog.extended([("tools", {"id": 11, "name": "Hand Saw", "price": 25.0, "in_stock": True})])
+
+        assert extended.text_index is catalog.text_index
+        assert _ids(extended, extended.search("tools", q="saw")[1]) == [2, 11]
+        # The old generation never sees rows past its end
+        assert _ids(catalog, catalog.search("tools", q="saw")[1]) == [2]
@@ -0,0 +1,57 @@
+"""
+Tests for Catalog Build Module
+"""
+
+import json
+import pytest
+from src.backend.catalog_build import build
+from src.backend.catalog_file import load_catalog
+
+
+PRODUCTS = [
+    {"id": 1, "name": "Lamp", "price": 30.0, "in_stock": True, "category": "Home"},
+    {"id": 2, "name": "Novel", "price": 12.0, "in_stock": False, "category": "books"},
+    {"id": 3, "name": "Rug", "price": 80.0, "in_stock": True, "category": "home"},
+]
+
+
+class TestCatalogBuild:
+    """Test converting product data into catalog files."""
+
+    def test_json_array(self, tmp_path):
+        """A JSON array of products with categories is converted."""
+        source = tmp_path / "products.json"
+        source.write_text(json.dumps(PRODUCTS))
+        build(str(source), str(tmp_path / "out.pcat"))
+
+        catalog = load_catalog(tmp_path / "out.pcat")
+        total, rows = catalog.search("home", sort_by="price_desc")
+        assert total == 2
+        assert [catalog.record(r)["name"] for r in rows] == ["Rug", "Lamp"]
+
+    def test_json_object(self, tmp_path):
+        """The {category: [products]} shape is converted."""
+        source = tmp_path / "products.json"
+        source.write_text(json.dumps({"books": [{"id": 9, "name": "Atlas", "price": 45.0, "in_stock": True}]}))
+        catalog = build(str(source), str(tmp_path / "out.pcat"))
+        assert catalog.has_category("books")
+        assert len(catalog) == 1
+
+    def test_csv(self, tmp_path):
+        """CSV rows are parsed into typed products."""
+        source = tmp_path / "products.csv"
+        lines = ["id,name,price,in_stock,category"]
+        lines += [f'{p["id"]},{p["name"]},{p["price"]},{str(p["in_stock"]).lower()},{p["category"]}' for p in PRODUCTS]
+        source.write_text("\n".join(lines) + "\n")
+        build(str(source), str(tmp_path / "out.pcat"))
+
+        catalog = load_catalog(tmp_path / "out.pcat")
+        _, rows = catalog.search("books")
+        assert catalog.record(rows[0]) == {"id": 2, "name": "Novel", "price": 12.0, "in_stock": False}
+
+    def test_csv_missing_columns(self, tmp_path):
+        """CSV files without the required columns are refused."""
+        source = tmp_path / "products.csv"
+        source.write_text("id,name\n1,Lamp\n")
+        with pytest.raises(ValueError):
+            build(str(source), str(tmp_path / "out.pcat"))
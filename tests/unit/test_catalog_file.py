@@ -0,0 +1,91 @@
+"""
+Tests for Catalog File Module
+"""
+
+import pytest
+from src.backend.catalog import ProductCatalog, SORT_ORDERS
+from src.backend.catalog_file import CatalogFormatError, StringTable, load_catalog, write_catalog
+from src.backend.handlers import ProductSearchHandler
+
+
+@pytest.fixture
+def catalog():
+    """Catalog of the built-in sample products."""
+    return ProductCatalog.from_dict(ProductSearchHandler.PRODUCTS_DB)
+
+
+class TestStringTable:
+    """Test lazily decoded strings."""
+
+    def test_round_trip(self):
+        """Strings come back as they went in, unicode included."""
+        strings = ["Laptop", "", "Café crème", "USB Cable"]
+        table = StringTable.from_strings(strings)
+        assert len(table) == 4
+        assert [table[i] for i in range(4)] == strings
+
+
+class TestCatalogFile:
+    """Test writing and memory-mapping catalogs."""
+
+    def test_round_trip_answers_the_same(self, catalog, tmp_path):
+        """A loaded catalog answers every search like the original."""
+        path = tmp_path / "catalog.pcat"
+        write_catalog(catalog, path)
+        loaded = load_catalog(path)
+
+        assert loaded.categories == catalog.categories
+        for category in catalog.categories:
+            for sort_by in SORT_ORDERS:
+                expected_total, expected_rows = catalog.search(category, sort_by=sort_by, min_price=10.0)
+                total, rows = loaded.search(category, sort_by=sort_by, min_price=10.0)
+                assert total == expected_total
+                assert [loaded.record(r) for r in rows] == [catalog.record(r) for r in expected_rows]
+
+    def test_arrays_are_read_only_views(self, catalog, tmp_path):
+        """Columns are views of the file, not private copies."""
+        path = tmp_path / "catalog.pcat"
+        write_catalog(catalog, path)
+        loaded = load_catalog(path)
+
+        assert not loaded.prices.flags.writeable
+        assert not loaded.prices.flags.owndata
+        assert isinstance(loaded.names, StringTable)
+
+    def test_rewrite_of_loaded_catalog(self, catalog, tmp_path):
+        """A memory-mapped catalog can itself be saved again."""
+        first, second = tmp_path / "a.pcat", tmp_path / "b.pcat"
+        write_catalog(catalog, first)
+        write_catalog(load_catalog(first), second)
+        assert first.read_bytes() == second.read_bytes()
+
+    def test_keyset_search_on_loaded_catalog(self, catalog, tmp_path):
+        """Stored sort keys support keyset seeks."""
+        path = tmp_path / "catalog.pcat"
+        write_catalog(catalog, path)
+        loaded = load_catalog(path)
+
+        rows, _ = loaded.search_after("electronics", after=[299.99, 3], limit=10, sort_by="price_desc")
+        assert [loaded.record(r)["id"] for r in rows] == [4, 5, 2]
+
+    def test_not_a_catalog(self, tmp_path):
+        """Other files are refused with a clear error."""
+        path = tmp_path / "products.json"
+        path.write_text('{"books": []}' * 4)
+        with pytest.raises(CatalogFormatError):
+            load_catalog(path)
+
+    def test_truncated_file(self, tmp_path):
+        """Files too short to hold a header are refused."""
+        path = tmp_path / "empty.pcat"
+        path.write_bytes(b"PCAT")
+        with pytest.raises(CatalogFormatError):
+            load_catalog(path)
+
+    def test_alignment(self, catalog, tmp_path):
+        """Arrays start on aligned offsets."""
+        path = tmp_path / "catalog.pcat"
+        write_catalog(catalog, path)
+        loaded = load_catalog(path)
+        assert loaded.prices.ctypes.data % 8 == 0
+        assert path.stat().st_size % 64 == 0
@@ -0,0 +1,87 @@
+"""
+Tests for Proof-of-Work Challenge Module
+"""
+
+import time
+import pytest
+from src.detection import ProofOfWorkChallenge
+from src.detection.challenge import has_leading_zero_bits, solve
+
+
+class TestProofOfWorkChallenge:
+    """Test stateless hashcash-style challenges."""
+
+    def _challenge(self, **kwargs):
+        return ProofOfWorkChallenge(secret=b"k" * 32, min_difficulty=4, max_difficulty=8, **kwargs)
+
+    def test_solved_challenge_verifies(self):
+        """A correct solution for this client passes."""
+        pow_challenge = self._challenge()
+        issued = pow_challenge.issue("1.2.3.4", score=0.5)
+        solution = solve(issued["challenge"], issued["difficulty"])
+        assert pow_challenge.verify("1.2.3.4", issued["challenge"], solution) is True
+
+    def test_solution_buys_one_request(self):
+        """A solved puzzle cannot be replayed."""
+        pow_challenge = self._challenge()
+        issued = pow_challenge.issue("1.2.3.4", 1.0)
+        solution = solve(issued["challenge"], issued["difficulty"])
+        assert pow_challenge.verify("1.2.3.4", issued["challenge"], solution) is True
+        assert pow_challenge.verify("1.2.3.4", issued["challenge"], solution) is False
+
+    def test_expired_spent_puzzles_are_forgotten(self):
+        """Spent puzzles are only remembered until they expire."""
+        pow_challenge = self._challenge()
+        pow_challenge._spent["old"] = 0
+        pow_challenge._spent_expiry.append((0, "old"))
+        issued = pow_challenge.issue("ip", 1.0)
+        assert pow_challenge.verify("ip", issued["challenge"], solve(issued["challenge"], issued["difficulty"]))
+        assert "old" not in pow_challenge._spent
+
+    def test_wrong_solution_fails(self):
+        """A solution that misses the difficulty is rejected."""
+        pow_challenge = self._challenge()
+        token = pow_challenge.issue("1.2.3.4", score=1.0)["challenge"]
+        bad = next(
+            str(i) for i in range(1000)
+            if not pow_challenge.verify("1.2.3.4", token, str(i))
+        )
+        assert pow_challenge.verify("1.2.3.4", token, bad) is False
+
+    def test_bound_to_client(self):
+        """A solved challenge cannot be reused from another IP."""
+        pow_challenge = self._challenge()
+        issued = pow_challenge.issue("1.2.3.4", score=0.5)
+        solution = solve(issued["challenge"], issued["difficulty"])
+        assert pow_challenge.verify("5.6.7.8", issued["challenge"], solution) is False
+
+    def test_tampered_difficulty_fails(self):
+        """Lowering the difficulty in the token breaks its signature."""
+        pow_challenge = self._challenge()
+        expires, difficulty, nonce, mac = pow_challenge.issue("ip", score=1.0)["challenge"].split(".")
+        forged = f"{expires}.1.{nonce}.{mac}"
+        assert pow_challenge.verify("ip", forged, solve(forged, 1)) is False
+
+    def test_expired_challenge_fails(self):
+        """Solutions stop working after the TTL."""
+        pow_challenge = self._challenge(ttl=-1)
+        issued = pow_challenge.issue("ip", score=0.5)
+        solution = solve(issued["challenge"], issued["difficulty"])
+        assert pow_challenge.verify("ip", issued["challenge"], solution) is False
+
+    def test_malformed_token_fails(self):
+        """Garbage tokens are rejected without raising."""
+        assert self._challenge().verify("ip", "not-a-token", "0") is False
+
+    def test_difficulty_scales_with_score(self):
+        """More suspicious clients get harder puzzles."""
+        pow_challenge = self._challenge(threshold=0.5)
+        assert pow_challenge.requires_challenge(0.4) is False
+        assert pow_challenge.difficulty_for(0.5) == 4
+        assert pow_challenge.difficulty_for(0.75) == 6
+        assert pow_challenge.difficulty_for(1.0) == 8
+
+    def test_leading_zero_bits(self):
+        """Bit counting works across byte boundaries."""
+        assert has_leading_zero_bits(b"\x00\x0f" + b"\xff" * 30, 12) is True
+        assert has_leading_zero_bits(b"\x00\x1f" + b"\xff" * 30, 12) is False
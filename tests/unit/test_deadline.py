@@ -0,0 +1,39 @@
+"""
+Tests for Deadline Module
+"""
+
+import pytest
+import time
+from src.backend import Deadline, DeadlineExceeded
+from src.backend.handlers import ProductSearchHandler
+
+
+class TestDeadline:
+    """Test per-request latency budgets."""
+
+    def test_remaining_counts_down(self):
+        """Remaining budget shrinks and never goes negative."""
+        deadline = Deadline(0.05)
+        assert 0 < deadline.remaining() <= 0.05
+        time.sleep(0.06)
+        assert deadline.remaining() == 0.0
+        assert deadline.expired is True
+
+    def test_check_raises_when_expired(self):
+        """check() only raises once the budget is gone."""
+        Deadline(10).check()
+        with pytest.raises(DeadlineExceeded):
+            Deadline(0).check()
+
+    def test_handler_gives_up_at_deadline(self):
+        """A handler stops waiting when the deadline expires."""
+        handler = ProductSearchHandler()
+        start = time.perf_counter()
+        with pytest.raises(DeadlineExceeded):
+            handler.handle({"category": "books"}, deadline=Deadline(0.001))
+        assert time.perf_counter() - start < 0.05
+
+    def test_handler_completes_within_budget(self):
+        """A generous deadline does not change the response."""
+        response = ProductSearchHandler().handle({"category": "books"}, deadline=Deadline(5))
+        assert response["status"] == "success"
@@ -0,0 +1,79 @@
+"""
+Tests for Enumeration Detector Module
+"""
+
+from src.detection import EnumerationDetector
+from src.detection.enumeration import FORKED_CHAIN, TOO_MANY_CHAINS
+
+
+class TestEnumerationDetector:
+    """Test spotting parallel pagination."""
+
+    def test_sequential_walk_is_fine(self):
+        """One chain walked page after page is never flagged."""
+        detector = EnumerationDetector(max_chains=2)
+        assert not any(
+            detector.observe("shopper", "chain", sequence, 100.0 + sequence, now=100.0 + sequence)
+            for sequence in range(1, 50)
+        )
+
+    def test_retry_is_not_a_fork(self):
+        """Re-sending the newest cursor does not count as a fork."""
+        detector = EnumerationDetector(max_forks=0)
+        detector.observe("c", "chain", 3, 100.0, now=100.0)
+        assert not detector.observe("c", "chain", 3, 100.0, now=101.0)
+
+    def test_many_chains_flagged(self):
+        """Walking more chains at once than allowed is flagged."""
+        detector = EnumerationDetector(max_chains=3)
+        results = [detector.observe("crawler", f"chain-{i}", 1, 100.0, now=100.0) for i in range(4)]
+        assert results == [None, None, None, TOO_MANY_CHAINS]
+        assert detector.get_stats()["enumerations_detected"] == 1
+
+    def test_chains_expire(self):
+        """Chains stop counting once their newest cursor leaves the window."""
+        detector = EnumerationDetector(max_chains=1, window=10.0)
+        detector.observe("c", "old", 1, 100.0, now=100.0)
+        assert not detector.observe("c", "new", 1, 200.0, now=200.0)
+
+    def test_forks_flagged(self):
+        """Advancing a chain from two places in turn is flagged."""
+        detector = EnumerationDetector(max_forks=1)
+        for sequence in range(1, 6):
+            detector.observe("c", "chain", sequence, 100.0, now=100.0 + sequence)
+        # A second worker starts from a copied older cursor
+        assert detector.observe("c", "chain", 2, 100.0, now=110.0) is None
+        assert detector.observe("c", "chain", 3, 100.0, now=111.0) is None
+        assert detector.observe("c", "chain", 6, 100.0, now=112.0) is None
+        assert detector.observe("c", "chain", 4, 100.0, now=113.0) == FORKED_CHAIN
+
+    def test_going_back_is_navigation(self):
+        """Returning to earlier pages and walking on from there is not a fork."""
+        detector = EnumerationDetector(max_forks=0)
+        now = 100.0
+        for _ in range(5):
+            # Forward to page 6, then Back to page 2 and forward again
+            for sequence in (2, 3, 4, 5, 6, 2):
+                now += 1
+                assert detector.observe("shopper", "chain", sequence, now, now=now) is None
+
+    def test_forks_age_out(self):
+        """Forks stop counting once they leave the window."""
+        detector = EnumerationDetector(max_forks=1, window=10.0)
+        for sequence, now in ((5, 100.0), (2, 101.0), (3, 102.0), (6, 103.0), (4, 104.0)):
+            result = detector.observe("c", "chain", sequence, now, now=now)
+        assert result == FORKED_CHAIN
+        assert detector.observe("c", "chain", 7, 200.0, now=200.0) is None
+
+    def test_clients_are_separate(self):
+        """One client's chains do not count against another."""
+        detector = EnumerationDetector(max_chains=1)
+        detector.observe("a", "chain-a", 1, 100.0, now=100.0)
+        assert not detector.observe("b", "chain-b", 1, 100.0, now=100.0)
+
+    def test_sweep_drops_idle_clients(self):
+        """Clients with only expired chains are forgotten."""
+        detector = EnumerationDetector(window=10.0)
+        detector.observe("c", "chain", 1, 100.0, now=100.0)
+        detector.sweep(now=200.0)
+        assert detector.get_stats()["tracked_clients"] == 0
@@ -0,0 +1,235 @@
+"""
+Tests for Gossip Module
+"""
+
+import asyncio
+import hashlib
+import hmac
+
+import pytest
+from src.rate_limiting.gossip import TAG_SIZE, GossipNode, GossipRateLimiter, decode_usage, encode_usage
+
+
+KEY = b"k" * 32
+
+
+def _signed(message):
+    """A datagram body signed with KEY."""
+    return message + hmac.new(KEY, message, hashlib.sha256).digest()[:TAG_SIZE]
+
+
+class TestWireFormat:
+    """Test encoding usage into datagrams."""
+
+    def test_round_trip(self):
+        """Entries survive encoding and decoding."""
+        [datagram] = encode_usage(7, [("10.0.0.1", 3.0), ("2001:db8::1", 0.5)], KEY)
+        node_id, entries = decode_usage(datagram, KEY)
+        assert node_id == 7
+        assert entries == [("10.0.0.1", 3.0), ("2001:db8::1", 0.5)]
+
+    def test_splits_into_datagrams(self):
+        """Entries beyond one datagram's size go into further datagrams."""
+        entries = [(f"10.0.{n >> 8}.{n & 255}", 1.0) for n in range(500)]
+        datagrams = encode_usage(7, entries, KEY, max_datagram=512)
+        assert len(datagrams) > 1
+        assert all(len(datagram) <= 512 for datagram in datagrams)
+        decoded = [entry for datagram in datagrams for entry in decode_usage(datagram, KEY)[1]]
+        assert decoded == entries
+
+    @pytest.mark.parametrize("data", [b"", b"XX\x01\x00\x00\x00\x07\x00\x00", b"GL\x01\x00\x00\x00\x07\x00\x01\x05ab"])
+    def test_malformed_datagrams_rejected(self, data):
+        """Foreign or truncated datagrams raise ValueError, signed or not."""
+        with pytest.raises(ValueError):
+            decode_usage(data, KEY)
+        with pytest.raises(ValueError):
+            decode_usage(_signed(data), KEY)
+
+    def test_unsigned_datagrams_rejected(self):
+        """Datagrams signed with another key, or altered, raise ValueError."""
+        [datagram] = encode_usage(7, [("10.0.0.1", 3.0)], b"other key")
+        with pytest.raises(ValueError):
+            decode_usage(datagram, KEY)
+
+        [datagram] = encode_usage(7, [("10.0.0.1", 3.0)], KEY)
+        tampered = datagram[:-TAG_SIZE - 1] + b"\x7f" + datagram[-TAG_SIZE:]
+        with pytest.raises(ValueError):
+            decode_usage(tampered, KEY)
+
+    @pytest.mark.parametrize("tokens", [-1.0, float("nan"), float("inf"), float("-inf")])
+    def test_invalid_token_counts_rejected(self, tokens):
+        """Negative or non-finite usage would refill or poison a bucket."""
+        [datagram] = encode_usage(7, [("10.0.0.1", tokens)], KEY)
+        with pytest.raises(ValueError):
+            decode_usage(datagram, KEY)
+
+
+class TestGossipRateLimiter:
+    """Test local limiting with unsynced usage capped."""
+
+    def test_unsynced_usage_is_capped(self, clock):
+        """A node admits its share of the error bound between syncs."""
+        limiter = GossipRateLimiter(capacity=100, refill_rate=0, clock=clock, error_bound=0.2, nodes=4)
+        allowed = sum(limiter.is_allowed("client") for _ in range(10))
+        assert allowed == 5  # 0.2 * 100 / 4
+        assert limiter.capped == 5
+
+        assert limiter.take_unsynced(10) == [("client", 5.0)]
+        assert limiter.is_allowed("client") is True
+
+    def test_first_request_after_sync_always_weighed(self, clock):
+        """A cap below one request's cost still lets one through per sync."""
+        limiter = GossipRateLimiter(capacity=10, refill_rate=0, clock=clock, error_bound=0.1, nodes=3)
+        assert limiter.is_allowed("client") is True
+        assert limiter.is_allowed("client") is False
+
+    def test_saturation_callback(self, clock):
+        """Reaching the cap asks for an early broadcast."""
+        limiter = GossipRateLimiter(capacity=10, refill_rate=0, clock=clock, error_bound=0.1)
+        calls = []
+        limiter.on_saturated = lambda: calls.append(1)
+        limiter.is_allowed("client")
+        limiter.is_allowed("client")
+        assert calls == [1]
+
+    def test_capped_request_held_until_sync(self, clock):
+        """A request refused at the cap is admitted after the next broadcast."""
+        limiter = GossipRateLimiter(capacity=10, refill_rate=0, clock=clock, error_bound=0.1, nodes=3)
+
+        async def hold():
+            assert limiter.is_allowed("client") is True
+            assert limiter.is_allowed("client") is False
+            held = asyncio.ensure_future(limiter.hold("client", 1, timeout=1.0))
+            await asyncio.sleep(0.01)
+            assert not held.done()
+            limiter.take_unsynced(10)
+            return await held
+
+        assert asyncio.run(hold()) is True
+        assert limiter.held == 1
+        assert limiter.get_bucket("client").tokens == 8
+
+    def test_hold_gives_up_at_timeout(self, clock):
+        """Without a broadcast in time, the request stays refused."""
+        limiter = GossipRateLimiter(capacity=10, refill_rate=0, clock=clock, error_bound=0.1, nodes=3)
+        limiter.is_allowed("client")
+        assert asyncio.run(limiter.hold("client", 1, timeout=0.01)) is False
+        assert asyncio.run(limiter.hold("client", 1, timeout=0)) is False
+
+    def test_empty_bucket_not_held(self, clock):
+        """A request refused by the bucket itself is not held."""
+        limiter = GossipRateLimiter(capacity=1, refill_rate=0, clock=clock, error_bound=1.0)
+        assert limiter.is_allowed("client") is True
+        limiter.take_unsynced(10)
+        assert limiter.is_allowed("client") is False
+        assert asyncio.run(limiter.hold("client", 1, timeout=1.0)) is False
+        assert limiter.held == 0
+
+    def test_held_requests_bounded_per_client(self, clock):
+        """Past max_held_per_client, capped requests are refused at once."""
+        limiter = GossipRateLimiter(
+            capacity=10, refill_rate=0, clock=clock, error_bound=0.1, nodes=3, max_held_per_client=2
+        )
+
+        async def hold_three():
+            limiter.is_allowed("client")
+            held = [asyncio.ensure_future(limiter.hold("client", 1, timeout=1.0)) for _ in range(2)]
+            await asyncio.sleep(0)
+            refused = await limiter.hold("client", 1, timeout=1.0)
+            for task in held:
+                task.cancel()
+            await asyncio.gather(*held, return_exceptions=True)
+            return refused
+
+        assert asyncio.run(hold_three()) is False
+        assert limiter.held == 2
+
+    def test_take_unsynced_sends_top_talkers(self, clock):
+        """The heaviest clients go first; the rest wait for the next broadcast."""
+        limiter = GossipRateLimiter(clock=clock, error_bound=1.0)
+        for client_id, requests in (("a", 1), ("b", 5), ("c", 3)):
+            for _ in range(requests):
+                limiter.is_allowed(client_id)
+        assert limiter.take_unsynced(2) == [("b", 5.0), ("c", 3.0)]
+        assert limiter.unsynced == {"a": 1.0}
+
+    def test_remote_usage_can_put_bucket_in_debt(self, clock):
+        """Usage heard late is still owed, down to minus the capacity."""
+        limiter = GossipRateLimiter(capacity=10, refill_rate=1, clock=clock, error_bound=1.0)
+        limiter.charge_remote("client", 15)
+        assert limiter.get_bucket("client").tokens == -5
+        limiter.charge_remote("client", 100)
+        assert limiter.get_bucket("client").tokens == -10
+
+        clock.now += 10.5
+        assert limiter.is_allowed("client") is False
+        clock.now += 0.5
+        assert limiter.is_allowed("client") is True
+
+
+class TestGossipNode:
+    """Test exchanging usage between nodes."""
+
+    def test_usage_reaches_peer(self):
+        """A broadcast is charged to the peer's buckets."""
+        async def exchange():
+            first = GossipNode(
+                GossipRateLimiter(capacity=10, refill_rate=0, error_bound=1.0), ("127.0.0.1", 0), secret=KEY
+            )
+            second = GossipNode(
+                GossipRateLimiter(capacity=10, refill_rate=0, error_bound=1.0), ("127.0.0.1", 0), secret=KEY
+            )
+            await first.start()
+            await second.start()
+            first.add_peer(second.address)
+            second.add_peer(first.address)
+            for _ in range(4):
+                first.rate_limiter.is_allowed("client")
+            first.broadcast()
+            for _ in range(50):
+                if second.entries_received:
+                    break
+                await asyncio.sleep(0.01)
+            await first.stop()
+            await second.stop()
+            return second
+
+        second = asyncio.run(exchange())
+        assert second.entries_received == 1
+        assert second.rate_limiter.get_client_stats("client")["tokens_remaining"] == 6
+
+    def test_unknown_sender_rejected(self):
+        """Datagrams from addresses that are not peers are ignored."""
+        node = GossipNode(GossipRateLimiter(), ("127.0.0.1", 0), [("127.0.0.1", 9001)], secret=KEY)
+        [datagram] = encode_usage(7, [("client", 50.0)], KEY)
+        node.receive(datagram, ("127.0.0.1", 9002))
+        assert node.rejected == 1
+        assert "client" not in node.rate_limiter.clients
+
+        node.receive(datagram, ("127.0.0.1", 9001))
+        assert node.entries_received == 1
+
+    def test_unsigned_datagram_from_peer_rejected(self):
+        """A peer's address alone is not enough: datagrams must carry the key."""
+        node = GossipNode(GossipRateLimiter(), ("127.0.0.1", 0), [("127.0.0.1", 9001)], secret=KEY)
+        [datagram] = encode_usage(7, [("client", 50.0)], b"forged")
+        node.receive(datagram, ("127.0.0.1", 9001))
+        assert node.rejected == 1
+        assert "client" not in node.rate_limiter.clients
+
+    def test_cap_below_one_request_holds_instead_of_refusing(self):
+        """With a cap under one token, back-to-back requests wait for a sync."""
+        async def three_requests():
+            limiter = GossipRateLimiter(capacity=100, refill_rate=0, error_bound=0.1)
+            peers = [("127.0.0.1", port) for port in range(9, 24)]
+            node = GossipNode(limiter, ("127.0.0.1", 0), peers, interval=0.05, secret=KEY)
+            await node.start()
+            assert limiter.nodes == 16
+            admitted = [
+                limiter.is_allowed("client") or await limiter.hold("client", 1, timeout=1.0)
+                for _ in range(3)
+            ]
+            await node.stop()
+            return admitted
+
+        assert asyncio.run(three_requests()) == [True, True, True]
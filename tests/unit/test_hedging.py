@@ -0,0 +1,107 @@
+"""
+Tests for Hedging Module
+"""
+
+import asyncio
+import time
+import pytest
+from src.backend import BackendService, Deadline, DeadlineExceeded
+from src.backend.handlers import BaseHandler
+from src.gateway.hedging import HedgedBackend, LatencyTracker
+
+
+class SleepHandler(BaseHandler):
+    """Handler that sleeps for a scripted time per call."""
+
+    def __init__(self, delays):
+        self.delays = list(delays)
+
+    def handle(self, data, deadline=None):
+        delay = self.delays.pop(0) if self.delays else 0.0
+        time.sleep(min(delay, deadline.remaining()) if deadline else delay)
+        if deadline is not None:
+            deadline.check()
+        return {"status": "success", "slept": delay}
+
+
+def _replica(delays):
+    service = BackendService()
+    service.register_handler("/sleep", SleepHandler(delays))
+    return service
+
+
+class TestLatencyTracker:
+    """Test latency percentile tracking."""
+
+    def test_p95(self):
+        """p95 comes from the recent sample."""
+        tracker = LatencyTracker(refresh_every=1)
+        for i in range(100):
+            tracker.record(i / 1000)
+        assert tracker.p95() == pytest.approx(0.095)
+
+    def test_empty(self):
+        """No samples means no percentile."""
+        assert LatencyTracker().p95() is None
+
+
+class TestHedgedBackend:
+    """Test deadline propagation and hedged calls."""
+
+    def test_plain_call(self):
+        """A single replica answers normally."""
+        backend = HedgedBackend([_replica([0.0])])
+        response = asyncio.run(backend.call("/sleep", {}, Deadline(1)))
+        assert response["status"] == "success"
+
+    def test_deadline_expires(self):
+        """A slow call is abandoned when the deadline expires."""
+        backend = HedgedBackend([_replica([0.5])])
+        async def scenario():
+            start = time.perf_counter()
+            with pytest.raises(DeadlineExceeded):
+                await backend.call("/sleep", {}, Deadline(0.05))
+            return time.perf_counter() - start
+
+        assert asyncio.run(scenario()) < 0.3
+
+    def test_timed_out_calls_are_recorded(self):
+        """Calls that miss the deadline still count towards the p95."""
+        backend = HedgedBackend([_replica([0.5])])
+
+        async def scenario():
+            with pytest.raises(DeadlineExceeded):
+                await backend.call("/sleep", {}, Deadline(0.05))
+            # The replica thread gives up at the deadline and records then
+            for _ in range(50):
+                if backend.tracker.samples:
+                    break
+                await asyncio.sleep(0.01)
+
+        asyncio.run(scenario())
+        assert len(backend.tracker.samples) == 1
+        assert backend.tracker.samples[0] >= 0.04
+
+    def test_hedge_wins_over_slow_primary(self):
+        """A backup request to another replica returns first."""
+        slow = _replica([0.5])
+        fast = _replica([0.0])
+        backend = HedgedBackend([slow, fast], hedging=True, min_samples=1)
+        backend.tracker.record(0.01)
+
+        async def scenario():
+            start = time.perf_counter()
+            response = await backend.call("/sleep", {}, Deadline(2))
+            return response, time.perf_counter() - start
+
+        response, elapsed = asyncio.run(scenario())
+        assert response["slept"] == 0.0
+        assert elapsed < 0.3
+        assert backend.hedges_sent == 1
+        assert backend.hedges_won == 1
+
+    def test_no_hedge_without_samples(self):
+        """Hedging waits until there is a latency estimate."""
+        backend = HedgedBackend([_replica([0.02]), _replica([0.0])], hedging=True)
+        asyncio.run(backend.call("/sleep", {}, Deadline(1)))
+        assert backend.hedges_sent == 0
@@ -0,0 +1,100 @@
+"""
+Tests for Histogram Module
+"""
+
+import random
+
+import pytest
+from src.metrics.histogram import LatencyHistogram
+
+
+class TestLatencyHistogram:
+    """Test latency recording and percentiles."""
+
+    def test_empty(self):
+        """An empty histogram has no percentiles."""
+        histogram = LatencyHistogram()
+        assert histogram.percentile(50) is None
+        assert histogram.mean() == 0.0
+        assert histogram.min is None
+
+    def test_aggregates(self):
+        """Count, sum, min and max are exact."""
+        histogram = LatencyHistogram()
+        for value in (0.003, 0.001, 0.2):
+            histogram.record(value)
+
+        assert histogram.count == 3
+        assert histogram.total == pytest.approx(0.204)
+        assert histogram.min == 0.001
+        assert histogram.max == 0.2
+        assert histogram.mean() == pytest.approx(0.068)
+
+    def test_percentiles_within_precision(self):
+        """Percentiles match exact ones to within the bucket precision."""
+        rng = random.Random(3)
+        values = sorted(rng.lognormvariate(-5, 1.5) for _ in range(20000))
+        histogram = LatencyHistogram()
+        for value in values:
+            histogram.record(value)
+
+        result = histogram.percentiles((50, 90, 99, 99.9))
+        for percentile, estimate in result.items():
+            exact = values[int(len(values) * percentile / 100) - 1]
+            assert estimate == pytest.approx(exact, rel=0.02)
+
+    def test_single_value(self):
+        """Percentiles of one value are that value."""
+        histogram = LatencyHistogram()
+        histogram.record(0.0123)
+        assert histogram.percentile(0) == 0.0123
+        assert histogram.percentile(100) == 0.0123
+
+    def test_constant_memory(self):
+        """Recording more values does not grow the histogram."""
+        histogram = LatencyHistogram()
+        buckets = len(histogram.counts)
+        for value in range(10000):
+            histogram.record(value / 1000)
+        assert len(histogram.counts) == buckets
+
+    def test_out_of_range(self):
+        """Values past the range land in the top bucket, max stays exact."""
+        histogram = LatencyHistogram(max_value=1.0)
+        histogram.record(50.0)
+        histogram.record(-1.0)
+        assert histogram.max == 50.0
+        assert histogram.percentile(100) <= 50.0
+        assert histogram.counts[0] == 1
+
+    def test_bucket_bounds_cover_range(self):
+        """Every unit value falls inside its own bucket's bounds."""
+        histogram = LatencyHistogram(max_value=0.1)
+        for units in (0, 1, 127, 128, 129, 255, 256, 1000, 65535, 100000):
+            low, high = histogram._bounds(histogram._index(units))
+            assert low <= units <= high
+
+    def test_merge(self):
+        """Merged histograms answer as if all values were recorded once."""
+        left, right, both = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+        for value in range(1, 1001):
+            (left if value % 2 else right).record(value / 10000)
+            both.record(value / 10000)
+
+        left.merge(right)
+        assert left.counts == both.counts
+        assert left.min == both.min and left.max == both.max
+        assert left.percentile(99) == both.percentile(99)
+
+    def test_merge_rejects_other_layout(self):
+        """Histograms with different buckets cannot be merged."""
+        with pytest.raises(ValueError):
+            LatencyHistogram().merge(LatencyHistogram(precision_bits=5))
+
+    def test_reset(self):
+        """Reset forgets everything."""
+        histogram = LatencyHistogram()
+        histogram.record(0.5)
+        histogram.reset()
+        assert histogram.count == 0
+        assert sum(histogram.counts) == 0
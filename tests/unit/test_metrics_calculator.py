@@ -12,16 +12,20 @@ class TestMetricsCalculator:
     def test_average_response_time(self):
         """Calculates average correctly."""
         calc = MetricsCalculator()
-        times = [0.1, 0.2, 0.3]
-        avg = calc.calculate_average_response_time(times)
+        avg = calc.calculate_average_response_time(0.6, 3)
         assert abs(avg - 0.2) < 0.01
 
     def test_average_empty_list(self):
-        """Returns 0 for empty list."""
+        """Returns 0 when nothing was timed."""
         calc = MetricsCalculator()
-        avg = calc.calculate_average_response_time([])
+        avg = calc.calculate_average_response_time(0.0, 0)
         assert avg == 0.0
 
+    def test_latency_summary(self):
+        """Latency summaries are in milliseconds with percentile keys."""
+        summary = MetricsCalculator.format_latency_summary(0.001, 0.25, {50: 0.01, 99.9: 0.2})
+        assert summary == {"min": 1.0, "p50": 10.0, "p999": 200.0, "max": 250.0}
+
     def test_success_rate(self):
         """Calculates success rate correctly."""
         calc = MetricsCalculator()
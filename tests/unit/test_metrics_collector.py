@@ -40,8 +40,8 @@ class TestMetricsCollector:
         collector.record_request(was_blocked=False, response_time=0.1)
         collector.record_request(was_blocked=True, response_time=0.01)
 
-        assert len(collector.response_times) == 1
-        assert collector.response_times[0] == 0.1
+        assert collector.response_times.count == 1
+        assert collector.response_times.max == 0.1
 
     def test_reset(self):
         """Resets all metrics."""
@@ -50,4 +50,34 @@ class TestMetricsCollector:
         collector.reset()
 
         assert collector.total_requests == 0
-        assert len(collector.response_times) == 0
+        assert collector.response_times.count == 0
+        assert collector.get_raw_data()["response_time_percentiles"][50] is None
+
+    def test_raw_data_summarises_response_times(self):
+        """Raw data carries aggregates, not every response time."""
+        collector = MetricsCollector()
+        for ms in range(1, 101):
+            collector.record_request(was_blocked=False, response_time=ms / 1000)
+
+        raw = collector.get_raw_data()
+        assert raw["response_time_count"] == 100
+        assert raw["response_time_total"] == pytest.approx(5.05)
+        assert raw["response_time_min"] == 0.001
+        assert raw["response_time_max"] == 0.1
+        assert raw["response_time_percentiles"][99] == pytest.approx(0.099, rel=0.02)
+
+    def test_labeled_counts(self):
+        """Requests are counted by route, status class and decision."""
+        collector = MetricsCollector()
+        collector.record_request(False, 0.01, "/products/search", 200)
+        collector.record_request(True, 0.0, "/products/search", 429, "flagged")
+        collector.record_request(False, 0.01, "/products/search", 403, "challenged")
+
+        assert collector.requests.values() == {
+            ("/products/search", "2xx", "allowed"): 1,
+            ("/products/search", "4xx", "flagged"): 1,
+            ("/products/search", "4xx", "challenged"): 1,
+        }
+        assert collector.blocked_requests == 1
+        assert collector.successful_requests == 2
+        assert collector.durations.values()[("/products/search", "2xx")][-1] == 0.01
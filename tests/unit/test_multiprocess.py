@@ -0,0 +1,169 @@
+"""
+Tests for Multiprocess Metrics Module
+"""
+
+import gc
+import multiprocessing
+import os
+import weakref
+
+import pytest
+from src.metrics.collector import MetricsCollector
+from src.metrics.multiprocess import (
+    MAX_SERIES,
+    FileCounter,
+    FileHistogram,
+    FileLatencyHistogram,
+    MetricsFile,
+)
+
+
+fork = multiprocessing.get_context("fork")
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "metrics.bin")
+
+
+def _count_in_child(path: str, amount: int) -> None:
+    """Worker process counting into its own slot, then exiting."""
+    collector = MetricsCollector(MetricsFile(path))
+    for _ in range(amount):
+        collector.record_request(False, 0.002, "/a", 200)
+    collector.record_request(True, 0.0, "/a", 429)
+
+
+def _run_children(path: str, amounts) -> None:
+    children = [fork.Process(target=_count_in_child, args=(path, n)) for n in amounts]
+    for child in children:
+        child.start()
+    for child in children:
+        child.join()
+        assert child.exitcode == 0
+
+
+class TestMetricsFile:
+    """Test slots in the shared file."""
+
+    def test_claims_one_slot_per_process(self, path):
+        """Opening the file twice in one process uses the same slot."""
+        first, second = MetricsFile(path), MetricsFile(path)
+        assert first.slot() == second.slot() != 0
+        assert first.live_pids() == [os.getpid()]
+
+    def test_rejects_other_files(self, tmp_path):
+        """A file with another layout is refused."""
+        other = tmp_path / "other.bin"
+        other.write_bytes(b"x" * 4096)
+        with pytest.raises(ValueError):
+            MetricsFile(str(other))
+
+    def test_counts_from_all_workers(self, path):
+        """Every worker's counts are merged, including exited ones."""
+        _run_children(path, (3, 5))
+        collector = MetricsCollector(MetricsFile(path))
+        collector.record_request(False, 0.004, "/a", 200)
+
+        assert collector.total_requests == 11
+        assert collector.blocked_requests == 2
+        assert collector.requests.values()[("/a", "2xx", "allowed")] == 9
+        assert collector.durations.values()[("/a", "2xx")][-1] == pytest.approx(0.02)
+
+        latency = collector.get_raw_data()
+        assert latency["response_time_count"] == 9
+        assert latency["response_time_min"] == 0.002
+        assert latency["response_time_max"] == 0.004
+
+    def test_dead_workers_slots_are_freed(self, path):
+        """Exited workers' slots are folded into the retired slot and reused."""
+        _run_children(path, (1, 1, 1))
+        metrics_file = MetricsFile(path)
+        metrics_file.retire_dead()
+
+        assert metrics_file.live_pids() == []
+        assert metrics_file.merged("counter")["gateway_requests_total\x1f/a\x1f2xx\x1fallowed"] == 3
+
+        _run_children(path, (2,))
+        counter = FileCounter(metrics_file, "gateway_requests_total", "", ("route", "status", "decision"))
+        assert counter.total() == 3 + 1 + 3 + 2
+
+    def test_forked_child_claims_own_slot(self, path):
+        """A worker forked after the file was opened gets a slot of its own."""
+        metrics_file = MetricsFile(path)
+        parent_slot = metrics_file.slot()
+        queue = fork.Queue()
+
+        child = fork.Process(target=lambda: queue.put(metrics_file.slot()))
+        child.start()
+        child_slot = queue.get(timeout=10)
+        child.join()
+
+        assert child_slot != parent_slot
+
+    def test_unused_file_is_collected(self, path):
+        """The fork hook does not keep a file, or its mapping, alive."""
+        metrics_file = MetricsFile(path)
+        metrics_file.slot()
+        ref = weakref.ref(metrics_file)
+        del metrics_file
+        gc.collect()
+        assert ref() is None
+
+    def test_reset(self, path):
+        """Reset zeroes every worker's values."""
+        _run_children(path, (4,))
+        metrics_file = MetricsFile(path)
+        counter = FileCounter(metrics_file, "gateway_requests_total", "", ("route", "status", "decision"))
+        metrics_file.reset()
+
+        assert counter.total() == 0
+        assert metrics_file.merged_latency().count == 0
+
+    def test_series_count_from_own_slot(self, path):
+        """Series are counted from this worker's index, per metric."""
+        _run_children(path, (3,))
+        metrics_file = MetricsFile(path)
+        counter = FileCounter(metrics_file, "c", "", ("n",))
+        histogram = FileHistogram(metrics_file, "h", "", ("n",))
+        counter.inc(("1",))
+        counter.inc(("2",))
+        histogram.observe(("1",), 0.1)
+        assert counter.series_count() == 2
+        assert histogram.series_count() == 1
+
+    def test_full_series_table_drops_updates(self, path):
+        """New series beyond the table size are dropped, not raised."""
+        counter = FileCounter(MetricsFile(path), "c", "", ("n",))
+        for n in range(MAX_SERIES + 5):
+            counter.inc((str(n),))
+        assert counter.total() == MAX_SERIES
+
+
+class TestFileMetrics:
+    """Test the file-backed metric types."""
+
+    def test_histogram_render(self, path):
+        """File histograms render like in-memory ones."""
+        histogram = FileHistogram(MetricsFile(path, buckets=(0.1, 1.0)), "d", "Duration.", ("route",))
+        histogram.observe(("/a",), 0.05)
+        histogram.observe(("/a",), 2.0)
+
+        assert histogram.render()[2:] == [
+            'd_bucket{route="/a",le="0.1"} 1',
+            'd_bucket{route="/a",le="1.0"} 1',
+            'd_bucket{route="/a",le="+Inf"} 2',
+            'd_sum{route="/a"} 2.05',
+            'd_count{route="/a"} 2',
+        ]
+
+    def test_latency_histogram(self, path):
+        """File latency histograms merge into a LatencyHistogram."""
+        latency = FileLatencyHistogram(MetricsFile(path))
+        for ms in range(1, 101):
+            latency.record(ms / 1000)
+
+        merged = latency.merged()
+        assert merged.count == 100
+        assert merged.min == 0.001 and merged.max == 0.1
+        assert merged.percentile(50) == pytest.approx(0.05, rel=0.02)
@@ -0,0 +1,96 @@
+"""
+Tests for Pagination Module
+"""
+
+import time
+import pytest
+from src.gateway.pagination import CursorCodec, InvalidCursor, seal_page, split_cursor
+
+
+QUERY = {"category": "books", "sort_by": "price_asc", "in_stock": None, "min_price": None, "max_price": None}
+
+
+class TestCursorCodec:
+    """Test signed cursor round trips."""
+
+    def test_round_trip(self):
+        """An issued cursor opens to the same position."""
+        codec = CursorCodec()
+        cursor = codec.seal("10.0.0.1", QUERY, [12.5, 7])
+        opened = codec.open("10.0.0.1", QUERY, cursor)
+
+        assert opened["after"] == [12.5, 7]
+        assert opened["sequence"] == 1
+        assert opened["issued_at"] <= time.time()
+
+    def test_chain_continues(self):
+        """Sealing from an opened cursor keeps the chain and advances the sequence."""
+        codec = CursorCodec()
+        first = codec.open("c", QUERY, codec.seal("c", QUERY, [1, 1]))
+        second = codec.open("c", QUERY, codec.seal("c", QUERY, [2, 2], first["chain"], first["sequence"]))
+
+        assert second["chain"] == first["chain"]
+        assert second["sequence"] == 2
+
+    def test_bound_to_client(self):
+        """Another client cannot use the cursor."""
+        codec = CursorCodec()
+        cursor = codec.seal("10.0.0.1", QUERY, [1, 1])
+        with pytest.raises(InvalidCursor):
+            codec.open("10.0.0.2", QUERY, cursor)
+
+    def test_tampered_cursor_rejected(self):
+        """Editing the payload breaks the signature."""
+        codec = CursorCodec()
+        payload, mac = codec.seal("c", QUERY, [1, 1]).split(".")
+        with pytest.raises(InvalidCursor):
+            codec.open("c", QUERY, f"{payload[:-2]}AA.{mac}")
+
+    def test_other_secret_rejected(self):
+        """Cursors from a codec with another key are rejected."""
+        cursor = CursorCodec(secret=b"a" * 32).seal("c", QUERY, [1, 1])
+        with pytest.raises(InvalidCursor):
+            CursorCodec(secret=b"b" * 32).open("c", QUERY, cursor)
+
+    def test_query_mismatch_rejected(self):
+        """A cursor only continues the query it was issued for."""
+        codec = CursorCodec()
+        cursor = codec.seal("c", QUERY, [1, 1])
+        with pytest.raises(InvalidCursor):
+            codec.open("c", {**QUERY, "sort_by": "price_desc"}, cursor)
+
+    def test_expired_cursor_rejected(self):
+        """Cursors stop working after their TTL."""
+        codec = CursorCodec(ttl=-1)
+        with pytest.raises(InvalidCursor):
+            codec.open("c", QUERY, codec.seal("c", QUERY, [1, 1]))
+
+    def test_malformed_cursor_rejected(self):
+        """Garbage is rejected, not crashed on."""
+        with pytest.raises(InvalidCursor):
+            CursorCodec().open("c", QUERY, "not-a-cursor")
+
+
+class TestSealPage:
+    """Test replacing backend positions with cursors."""
+
+    def test_replaces_next_after(self):
+        """The raw position is swapped for a cursor."""
+        codec = CursorCodec()
+        page_info = {"limit": 2, "next_after": [5, 5]}
+        seal_page(codec, "c", QUERY, page_info)
+
+        assert "next_after" not in page_info
+        assert codec.open("c", QUERY, page_info["next_cursor"])["after"] == [5, 5]
+
+    def test_last_page_has_no_cursor(self):
+        """No position means no next page."""
+        page_info = {"next_after": None}
+        seal_page(CursorCodec(), "c", QUERY, page_info)
+        assert page_info["next_cursor"] is None
+
+    def test_split_cursor(self):
+        """The cursor is taken out of the request data."""
+        data, cursor = split_cursor({**QUERY, "cursor": "abc"})
+        assert cursor == "abc"
+        assert "cursor" not in data
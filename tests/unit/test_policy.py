@@ -0,0 +1,147 @@
+"""
+Tests for Policy Module
+"""
+
+import json
+import os
+
+import pytest
+from src.rate_limiting import LimitPolicy, PolicyReloader, PolicyTable, RateLimiter
+
+
+def write_policies(path, default, clients=None):
+    """Write a policy file and bump its mtime so a change is always seen."""
+    data = {"default": {"capacity": default[0], "refill_rate": default[1]}}
+    if clients:
+        data["clients"] = {
+            client_id: {"capacity": capacity, "refill_rate": rate}
+            for client_id, (capacity, rate) in clients.items()
+        }
+    path.write_text(json.dumps(data))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+class TestPolicyTable:
+    """Test the immutable policy table."""
+
+    def test_lookup_falls_back_to_default(self):
+        """Clients without an override get the default policy."""
+        table = PolicyTable(LimitPolicy(100, 1), {"vip": LimitPolicy(1000, 10)})
+        assert table.lookup("vip") == LimitPolicy(1000, 10)
+        assert table.lookup("anyone") == LimitPolicy(100, 1)
+
+    def test_table_cannot_be_modified(self):
+        """Overrides are read-only once the table is built."""
+        table = PolicyTable(LimitPolicy(100, 1))
+        with pytest.raises(TypeError):
+            table.clients["vip"] = LimitPolicy(1000, 10)
+
+    def test_every_table_has_a_new_version(self):
+        """Versions grow with each table built."""
+        first = PolicyTable(LimitPolicy(100, 1))
+        second = PolicyTable(LimitPolicy(100, 1))
+        assert second.version > first.version
+
+    def test_load(self, tmp_path):
+        """Tables load from a JSON policy file."""
+        path = tmp_path / "policies.json"
+        write_policies(path, (50, 0.5), {"10.0.0.7": (500, 5)})
+        table = PolicyTable.load(str(path))
+        assert table.default == LimitPolicy(50, 0.5)
+        assert table.lookup("10.0.0.7") == LimitPolicy(500, 5)
+
+    @pytest.mark.parametrize("data", [
+        {},
+        {"default": {"capacity": 10}},
+        {"default": {"capacity": "10", "refill_rate": 1}},
+        {"default": {"capacity": 0, "refill_rate": 1}},
+        {"default": {"capacity": 10, "refill_rate": -1}},
+    ])
+    def test_invalid_policies_rejected(self, data):
+        """Missing, non-numeric or out-of-range values raise ValueError."""
+        with pytest.raises(ValueError):
+            PolicyTable.from_dict(data)
+
+
+class TestLazyRescale:
+    """Test moving buckets to a new table on their next request."""
+
+    def test_bucket_keeps_its_fill_ratio(self, clock):
+        """A half-empty bucket is half full of the new capacity."""
+        limiter = RateLimiter(capacity=100, refill_rate=0, clock=clock)
+        for _ in range(50):
+            limiter.is_allowed("client")
+
+        limiter.policies = PolicyTable(LimitPolicy(200, 0))
+        bucket = limiter.clients["client"]
+        assert bucket.capacity == 100  # untouched until the client returns
+
+        assert limiter.is_allowed("client") is True
+        assert bucket.capacity == 200
+        assert bucket.tokens == 99
+
+    def test_override_applies_to_known_client(self, clock):
+        """A new per-client override reaches a client already being limited."""
+        limiter = RateLimiter(capacity=2, refill_rate=0, clock=clock)
+        limiter.is_allowed("vip")
+        limiter.is_allowed("vip")
+        assert limiter.is_allowed("vip") is False
+
+        limiter.policies = PolicyTable(LimitPolicy(2, 0), {"vip": LimitPolicy(2, 10)})
+        assert limiter.is_allowed("vip") is False
+        clock.now += 0.1
+        assert limiter.is_allowed("vip") is True
+        assert limiter.is_allowed("other") is True
+
+    def test_tokens_earned_before_the_change_are_kept(self, clock):
+        """Refill up to the change happens at the old rate."""
+        limiter = RateLimiter(capacity=10, refill_rate=1, clock=clock)
+        limiter.get_bucket("client").tokens = 0
+        clock.now += 4
+        limiter.policies = PolicyTable(LimitPolicy(10, 0))
+        assert limiter.get_client_stats("client")["tokens_remaining"] == 4
+        assert limiter.get_client_stats("client")["refill_rate"] == 0
+
+
+class TestPolicyReloader:
+    """Test reloading the policy file."""
+
+    def test_reload_swaps_table(self, tmp_path):
+        """A valid file replaces the limiter's table."""
+        path = tmp_path / "policies.json"
+        write_policies(path, (10, 1))
+        limiter = RateLimiter(policies=PolicyTable.load(str(path)))
+        reloader = PolicyReloader(str(path), limiter)
+
+        write_policies(path, (20, 2))
+        assert reloader.reload() is True
+        assert limiter.capacity == 20
+        assert reloader.reloads == 1
+
+    def test_invalid_file_keeps_running_table(self, tmp_path):
+        """A broken file is reported and the old policies stay in force."""
+        path = tmp_path / "policies.json"
+        write_policies(path, (10, 1))
+        limiter = RateLimiter(policies=PolicyTable.load(str(path)))
+        before = limiter.policies
+        reloader = PolicyReloader(str(path), limiter)
+
+        path.write_text("{not json")
+        assert reloader.reload() is False
+        assert limiter.policies is before
+        assert reloader.failures == 1
+        assert reloader.get_stats()["last_error"]
+
+    def test_check_reloads_only_on_change(self, tmp_path):
+        """check reloads once per change of the file."""
+        path = tmp_path / "policies.json"
+        write_policies(path, (10, 1))
+        limiter = RateLimiter(policies=PolicyTable.load(str(path)))
+        reloader = PolicyReloader(str(path), limiter)
+
+        assert reloader.check() is False
+        write_policies(path, (30, 1))
+        assert reloader.check() is True
+        assert reloader.check() is False
+        assert limiter.capacity == 30
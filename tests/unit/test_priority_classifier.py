@@ -0,0 +1,39 @@
+"""
+Tests for Priority Module
+"""
+
+import pytest
+from src.rate_limiting import RateLimiter
+from src.detection import SuspicionTracker
+from src.admission import Priority, PriorityClassifier
+
+
+class TestPriorityClassifier:
+    """Test admission priority classification."""
+
+    def _classifier(self, **kwargs):
+        limiter = RateLimiter(capacity=10, refill_rate=0.001)
+        return limiter, PriorityClassifier(SuspicionTracker(limiter), **kwargs)
+
+    def test_anonymous_is_normal(self):
+        """Unknown clients are normal priority."""
+        _, classifier = self._classifier()
+        assert classifier.classify("1.2.3.4") == Priority.NORMAL
+
+    def test_allowlisted_ip_is_trusted(self):
+        """Allowlisted IPs are trusted."""
+        _, classifier = self._classifier(allowlist=["10.0.0.1"])
+        assert classifier.classify("10.0.0.1") == Priority.TRUSTED
+
+    def test_known_api_key_is_trusted(self):
+        """Only configured API keys grant trusted priority."""
+        _, classifier = self._classifier(api_keys=["secret"])
+        assert classifier.classify("1.2.3.4", api_key="secret") == Priority.TRUSTED
+        assert classifier.classify("1.2.3.4", api_key="guess") == Priority.NORMAL
+
+    def test_depleted_client_is_suspect(self):
+        """A client that drained its bucket is a suspected crawler."""
+        limiter, classifier = self._classifier()
+        for _ in range(9):
+            limiter.is_allowed("crawler")
+        assert classifier.classify("crawler") == Priority.SUSPECT
@@ -0,0 +1,114 @@
+"""
+Tests for Profiling Module
+"""
+
+import asyncio
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+import pytest
+from src.metrics.profiling import (
+    ProfilerBusy,
+    SamplingProfiler,
+    collapsed,
+    estimate_size,
+    flame_tree,
+    trace_allocations,
+)
+
+
+def spin(stop):
+    while not stop.is_set():
+        sum(range(100))
+
+
+class TestSamplingProfiler:
+    """Test sampling thread stacks."""
+
+    def test_samples_other_threads(self):
+        """A busy thread shows up under its name and function."""
+        stop = threading.Event()
+        worker = threading.Thread(target=spin, args=(stop,), name="spinner")
+        worker.start()
+        try:
+            stacks = SamplingProfiler(interval=0.001).profile(0.1)
+        finally:
+            stop.set()
+            worker.join()
+
+        spinning = [stack for stack in stacks if stack.startswith("spinner;")]
+        assert spinning
+        assert any("spin (test_profiling.py" in stack for stack in spinning)
+
+    def test_one_profile_at_a_time(self):
+        """A second profile is refused while one runs."""
+        profiler = SamplingProfiler()
+        thread = threading.Thread(target=profiler.profile, args=(0.2,))
+        thread.start()
+        time.sleep(0.05)
+        try:
+            with pytest.raises(ProfilerBusy):
+                profiler.profile(0.01)
+        finally:
+            thread.join()
+
+    def test_collapsed_and_tree(self):
+        """Stacks render as collapsed lines and as a nested tree."""
+        stacks = {"main;a;b": 3, "main;a": 1, "main;c": 2}
+        assert collapsed(stacks) == "main;a 1\nmain;a;b 3\nmain;c 2\n"
+
+        tree = flame_tree(stacks)
+        assert tree["value"] == 6
+        (main,) = tree["children"]
+        assert [(c["name"], c["value"]) for c in main["children"]] == [("a", 4), ("c", 2)]
+        assert main["children"][0]["children"][0] == {"name": "b", "value": 3, "children": []}
+
+
+class Holder:
+    def __init__(self, items):
+        self.items = items
+
+
+class TestEstimateSize:
+    """Test estimating memory held by object graphs."""
+
+    def test_counts_nested_objects(self):
+        """Referenced objects add to the size."""
+        small = estimate_size(Holder([]))
+        large = estimate_size(Holder([str(n) * 100 for n in range(100)]))
+        assert large - small > 100 * 100
+
+    def test_sampled_tables_scale(self):
+        """Large containers are sampled and scaled to their length."""
+        table = {f"client-{n}": Holder(float(n)) for n in range(20_000)}
+        exact = estimate_size(table, sample=10 ** 6)
+        sampled = estimate_size(table, sample=100)
+        assert abs(sampled - exact) / exact < 0.1
+
+    def test_shared_objects_counted_once(self):
+        """Objects already seen add nothing."""
+        shared = [b"x" * 10_000]
+        seen = set()
+        first = estimate_size(Holder(shared), seen=seen)
+        second = estimate_size(Holder(shared), seen=seen)
+        assert first > 10_000 > second
+
+    def test_numpy_buffers(self):
+        """Arrays count their buffer, views do not."""
+        array = np.zeros(10_000)
+        assert estimate_size(array) >= array.nbytes
+        assert estimate_size(array[::2]) < 1000
+
+
+class TestTraceAllocations:
+    """Test bounded allocation tracing."""
+
+    def test_traces_for_a_window(self):
+        """Tracing starts and stops around the window."""
+        assert not tracemalloc.is_tracing()
+        report = asyncio.run(trace_allocations(0.01, limit=5))
+        assert not tracemalloc.is_tracing()
+        assert report["window_seconds"] == 0.01
+        assert len(report["top"]) <= 5
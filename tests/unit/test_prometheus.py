@@ -0,0 +1,124 @@
+"""
+Tests for Prometheus Module
+"""
+
+import threading
+
+import pytest
+from src.metrics.prometheus import ShardedCounter, ShardedHistogram, render, status_class
+
+
+@pytest.fixture
+def counter():
+    return ShardedCounter("requests_total", "Requests.", ("route", "decision"))
+
+
+@pytest.fixture
+def histogram():
+    return ShardedHistogram("duration_seconds", "Duration.", ("route",), buckets=(0.1, 1.0))
+
+
+class TestShardedCounter:
+    """Test labeled counters."""
+
+    def test_inc(self, counter):
+        """Series are counted per label combination."""
+        counter.inc(("/a", "allowed"))
+        counter.inc(("/a", "allowed"), 2)
+        counter.inc(("/a", "rejected"))
+
+        assert counter.values() == {("/a", "allowed"): 3, ("/a", "rejected"): 1}
+
+    def test_total_with_filter(self, counter):
+        """Totals can be restricted to some label values."""
+        counter.inc(("/a", "allowed"), 5)
+        counter.inc(("/a", "rejected"), 2)
+        counter.inc(("/b", "flagged"), 1)
+
+        assert counter.total() == 8
+        assert counter.total(decision=("rejected", "flagged")) == 3
+        assert counter.total(route=("/b",)) == 1
+
+    def test_threads_get_own_shards(self, counter):
+        """Concurrent increments from many threads are all counted."""
+        def work():
+            for _ in range(10000):
+                counter.inc(("/a", "allowed"))
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(counter._shards) == 8
+        assert counter.total() == 80000
+
+    def test_series_count(self, counter):
+        """Series held are counted per shard."""
+        counter.inc(("/a", "allowed"))
+        counter.inc(("/a", "allowed"))
+        counter.inc(("/b", "allowed"))
+        assert counter.series_count() == 2
+
+    def test_reset(self, counter):
+        """Reset zeroes every series."""
+        counter.inc(("/a", "allowed"))
+        counter.reset()
+        assert counter.total() == 0
+
+        counter.inc(("/a", "allowed"))
+        assert counter.total() == 1
+
+    def test_render(self, counter):
+        """Counters render with HELP, TYPE and escaped labels."""
+        counter.inc(('/a"b', "allowed"), 3)
+        assert counter.render() == [
+            "# HELP requests_total Requests.",
+            "# TYPE requests_total counter",
+            'requests_total{route="/a\\"b",decision="allowed"} 3',
+        ]
+
+
+class TestShardedHistogram:
+    """Test labeled histograms."""
+
+    def test_render_cumulative(self, histogram):
+        """Buckets are cumulative, with +Inf, sum and count."""
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(("/a",), value)
+
+        assert histogram.render()[2:] == [
+            'duration_seconds_bucket{route="/a",le="0.1"} 2',
+            'duration_seconds_bucket{route="/a",le="1.0"} 3',
+            'duration_seconds_bucket{route="/a",le="+Inf"} 4',
+            'duration_seconds_sum{route="/a"} 3.65',
+            'duration_seconds_count{route="/a"} 4',
+        ]
+
+    def test_merges_shards(self, histogram):
+        """Observations from several threads are merged."""
+        histogram.observe(("/a",), 0.5)
+        thread = threading.Thread(target=histogram.observe, args=(("/a",), 0.05))
+        thread.start()
+        thread.join()
+
+        assert histogram.values()[("/a",)] == [1, 1, 0, 0.55]
+
+
+class TestRender:
+    """Test the exposition helpers."""
+
+    def test_render_joins_metrics(self, counter, histogram):
+        """Metrics are rendered one after another, newline terminated."""
+        counter.inc(("/a", "allowed"))
+        text = render((counter, histogram))
+        assert text.endswith("\n")
+        assert "# TYPE requests_total counter" in text
+        assert "# TYPE duration_seconds histogram" in text
+
+    def test_status_class(self):
+        """Statuses are grouped by hundreds."""
+        assert status_class(200) == "2xx"
+        assert status_class(429) == "4xx"
+        assert status_class(504) == "5xx"
@@ -46,3 +46,22 @@ class TestRateLimiter:
         limiter.is_allowed("client1")
         stats = limiter.get_client_stats("client1")
         assert stats["tokens_remaining"] == 98
+
+    def test_share_of_policy(self):
+        """A limiter enforcing a share scales capacity and refill rate."""
+        limiter = RateLimiter(capacity=100, refill_rate=10.0, share=0.25)
+        assert limiter.get_client_stats("client1") == {
+            "tokens_remaining": 25, "capacity": 25, "refill_rate": 2.5
+        }
+        assert sum(limiter.is_allowed("client1") for _ in range(30)) == 25
+
+    def test_share_keeps_one_token(self):
+        """A small policy split many ways still admits a request."""
+        limiter = RateLimiter(capacity=2, refill_rate=1.0, share=0.125)
+        assert limiter.get_bucket("client1").capacity == 1
+
+    @pytest.mark.parametrize("share", [0, 1.5])
+    def test_invalid_share(self, share):
+        """Shares outside (0, 1] are rejected."""
+        with pytest.raises(ValueError):
+            RateLimiter(share=share)
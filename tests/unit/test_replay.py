@@ -0,0 +1,145 @@
+"""
+Tests for Replay Module
+"""
+
+import numpy as np
+import pytest
+from src.metrics.access_log import AccessLog
+from src.rate_limiting.rate_limiter import RateLimiter
+from src.rate_limiting.replay import (
+    LOG_CLASSES,
+    PolicyReplay,
+    SyntheticTrace,
+    parse_policy,
+    replay_logs,
+)
+
+
+POLICIES = [(100, 0.167), (5, 1.0), (20, 4.0)]
+
+
+def reference(clock, times, clients, policy, costs=None):
+    """Blocked flags from the real RateLimiter, clocked by the timestamps."""
+    limiter = RateLimiter(*policy, clock=clock)
+    blocked = []
+    for index, (t, client) in enumerate(zip(times.tolist(), clients.tolist())):
+        clock.now = t
+        cost = 1 if costs is None else costs[index]
+        blocked.append(not limiter.is_allowed(str(client), cost))
+    return np.array(blocked)
+
+
+def random_trace(size=5000, clients=40, seed=1):
+    rng = np.random.default_rng(seed)
+    times = np.sort(rng.uniform(0, 300, size))
+    # Skewed so a few busy clients outlast the rest
+    owners = np.minimum(rng.zipf(1.5, size) - 1, clients - 1)
+    return times, owners
+
+
+class TestPolicyReplay:
+    """Test replaying traffic through token bucket policies."""
+
+    def test_matches_rate_limiter(self, clock):
+        """Decisions equal those of RateLimiter on a simulated clock."""
+        times, clients = random_trace()
+        blocked = PolicyReplay(POLICIES).feed(times, clients)
+        for index, policy in enumerate(POLICIES):
+            assert np.array_equal(blocked[index], reference(clock, times, clients, policy))
+
+    def test_matches_across_chunks(self, clock):
+        """Bucket state carries over from one chunk to the next."""
+        times, clients = random_trace(seed=2)
+        replay = PolicyReplay(POLICIES)
+        blocked = np.hstack([
+            replay.feed(times[start:start + 700], clients[start:start + 700])
+            for start in range(0, len(times), 700)
+        ])
+        for index, policy in enumerate(POLICIES):
+            assert np.array_equal(blocked[index], reference(clock, times, clients, policy))
+
+    def test_costs(self, clock):
+        """Requests can cost more than one token."""
+        times, clients = random_trace(size=2000, seed=3)
+        costs = np.random.default_rng(3).integers(1, 4, len(times)).astype(float)
+        blocked = PolicyReplay(POLICIES).feed(times, clients, costs)
+        for index, policy in enumerate(POLICIES):
+            assert np.array_equal(blocked[index], reference(clock, times, clients, policy, costs))
+
+    def test_report_per_class(self):
+        """Blocked requests are summed per policy and client class."""
+        # Client 0 sends 10 requests at once, client 1 a single one
+        times = np.zeros(11)
+        clients = np.array([0] * 10 + [1])
+        replay = PolicyReplay([(4, 1.0)])
+        replay.feed(times, clients)
+
+        rows = replay.report(np.array([0, 1]), ["busy", "quiet"])
+        assert rows[0] == {
+            "policy": "4:1", "class": "busy", "clients": 1, "requests": 10,
+            "blocked": 6, "blocked_percent": 60.0, "clients_affected": 1,
+        }
+        assert rows[1]["blocked"] == 0
+        assert rows[1]["clients_affected"] == 0
+
+    def test_client_codes(self):
+        """Client keys get stable numbers across chunks."""
+        replay = PolicyReplay(POLICIES)
+        first = replay.client_codes(np.array(["b", "a", "b"]))
+        second = replay.client_codes(np.array(["c", "a"]))
+        assert first[0] == first[2] != first[1]
+        assert second[1] == first[1]
+        assert len(replay.clients) == 3
+
+    def test_parse_policy(self):
+        """Policies are written capacity:refill_rate."""
+        assert parse_policy("100:0.167") == (100.0, 0.167)
+        with pytest.raises(ValueError):
+            parse_policy("100")
+        with pytest.raises(ValueError):
+            parse_policy("0:1")
+
+
+class TestSyntheticTrace:
+    """Test synthetic traffic generation."""
+
+    def test_chunks_in_time_order(self):
+        """Chunks cover the trace in order, bursts included."""
+        trace = SyntheticTrace(1200, {"shopper": 50, "crawler": 2, "burst": 20}, seed=4)
+        chunks = list(trace.chunks(slice_seconds=100))
+        times = np.concatenate([t for t, _ in chunks])
+        assert len(chunks) == 12
+        assert np.all(np.diff(times) >= 0)
+        assert len(trace.client_classes) == 72
+
+    def test_crawlers_are_blocked_most(self):
+        """A strict policy blocks crawlers and spares shoppers."""
+        trace = SyntheticTrace(600, {"shopper": 100, "crawler": 3, "burst": 10})
+        replay = PolicyReplay([(100, 0.167)])
+        for times, clients in trace.chunks():
+            replay.feed(times, clients)
+        rows = {row["class"]: row for row in replay.report(trace.client_classes, trace.class_names)}
+        assert rows["shopper"]["blocked"] == 0
+        assert rows["crawler"]["blocked_percent"] > 50
+
+
+class TestReplayLogs:
+    """Test replaying recorded access logs."""
+
+    @pytest.mark.parametrize("log_format", ["binary", "jsonl"])
+    def test_replay_access_log(self, tmp_path, log_format):
+        """Logged requests are replayed and flagged clients classed apart."""
+        path = str(tmp_path / "access.log")
+        log = AccessLog(path, format=log_format)
+        for i in range(8):
+            log.append("10.0.0.1", "/products/search", "allowed", 200, 0.01, timestamp=1000.0 + i * 0.01)
+        log.append("10.0.0.2", "/products/search", "flagged", 429, 0.0, timestamp=1001.0)
+        log.append("10.0.0.2", "/products/search", "allowed", 200, 0.0, timestamp=1002.0)
+        log.close()
+
+        replay, classes = replay_logs([path], [(5, 1.0)], chunk_size=4)
+        rows = {row["class"]: row for row in replay.report(classes, LOG_CLASSES)}
+        assert rows["regular"]["requests"] == 8
+        assert rows["regular"]["blocked"] == 3
+        assert rows["flagged"]["clients"] == 1
+        assert rows["flagged"]["blocked"] == 0
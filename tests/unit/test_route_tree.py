@@ -0,0 +1,109 @@
+"""
+Tests for Route Tree Module
+"""
+
+import pytest
+from src.backend.route_tree import RouteError, RouteTree
+
+
+@pytest.fixture
+def tree():
+    """Tree with static, parameter and wildcard routes."""
+    tree = RouteTree()
+    for pattern in (
+        "/",
+        "/products/search",
+        "/products/{product_id:int}",
+        "/products/{product_id:int}/reviews",
+        "/api/v1/catalog/export",
+        "/api/v1/catalog/import",
+        "/users/{user}/orders/{order}",
+        "/users/{user}/{rest:path}",
+        "/static/{path:path}",
+    ):
+        tree.add(pattern, pattern, owner="test")
+    return tree
+
+
+def _matched(tree, path):
+    match = tree.match(path)
+    return None if match is None else (match.route.pattern, match.params)
+
+
+class TestRouteTree:
+    """Test route matching."""
+
+    def test_static(self, tree):
+        """Static routes match exactly, slashes at either end ignored."""
+        assert _matched(tree, "/products/search") == ("/products/search", {})
+        assert _matched(tree, "products/search/") == ("/products/search", {})
+        assert _matched(tree, "/") == ("/", {})
+
+    def test_static_beats_parameter(self, tree):
+        """A static segment is preferred over a parameter at the same place."""
+        assert _matched(tree, "/products/search")[0] == "/products/search"
+
+    def test_int_parameter(self, tree):
+        """Typed parameters are converted, and refuse values of another type."""
+        assert _matched(tree, "/products/42") == ("/products/{product_id:int}", {"product_id": 42})
+        assert _matched(tree, "/products/42/reviews")[1] == {"product_id": 42}
+        assert tree.match("/products/abc") is None
+        assert tree.match("/products/\u00b2") is None
+
+    def test_collapsed_static_chain(self, tree):
+        """Routes sharing a long static prefix both match; the prefix alone does not."""
+        assert _matched(tree, "/api/v1/catalog/export")[0] == "/api/v1/catalog/export"
+        assert _matched(tree, "/api/v1/catalog/import")[0] == "/api/v1/catalog/import"
+        assert tree.match("/api/v1/catalog") is None
+        assert tree.match("/api/v2/catalog/export") is None
+
+    def test_backtracks_to_wildcard(self, tree):
+        """A dead end below a parameter falls back to a wildcard."""
+        assert _matched(tree, "/users/7/orders/9") == ("/users/{user}/orders/{order}", {"user": "7", "order": "9"})
+        assert _matched(tree, "/users/7/orders") == ("/users/{user}/{rest:path}", {"user": "7", "rest": "orders"})
+
+    def test_wildcard(self, tree):
+        """Wildcards take the rest of the path, including nothing."""
+        assert _matched(tree, "/static/css/site/app.css")[1] == {"path": "css/site/app.css"}
+        assert _matched(tree, "/static")[1] == {"path": ""}
+
+    def test_no_match(self, tree):
+        """Unknown paths do not match."""
+        assert tree.match("/nope") is None
+        assert tree.match("/products//reviews") is None
+
+    def test_metadata(self, tree):
+        """Route metadata is returned with the match."""
+        assert tree.match("/products/1").metadata == {"owner": "test"}
+
+    def test_added_after_compile(self, tree):
+        """Routes added after matching started are picked up."""
+        tree.match("/")
+        tree.add("/late", "late")
+        assert tree.match("/late").handler == "late"
+
+
+class TestRouteErrors:
+    """Test invalid and conflicting routes."""
+
+    def test_duplicate(self, tree):
+        """The same pattern cannot be added twice."""
+        with pytest.raises(RouteError):
+            tree.add("/products/search", "again")
+
+    def test_replace(self, tree):
+        """A pattern can be replaced explicitly."""
+        tree.add("/products/search", "again", replace=True)
+        assert tree.match("/products/search").handler == "again"
+        assert len(tree.routes) == 9
+
+    def test_conflicting_parameter(self, tree):
+        """Two different parameters cannot share a position."""
+        with pytest.raises(RouteError):
+            tree.add("/products/{slug}/photos", "photos")
+
+    @pytest.mark.parametrize("pattern", ["/a/{path:path}/b", "/a/{x:float}", "/a/{1x}", "/a/b{c}"])
+    def test_malformed(self, pattern):
+        """Malformed patterns are refused."""
+        with pytest.raises(RouteError):
+            RouteTree().add(pattern, "bad")
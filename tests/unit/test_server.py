@@ -0,0 +1,212 @@
+"""
+Tests for Server Module
+"""
+
+import os
+import signal
+import socket
+
+import pytest
+from fastapi.testclient import TestClient
+from src.gateway.server import (
+    app_from_env, build_app, gossip_addresses, listen_socket, load_settings, prepare_shared_state, reload_on_hangup
+)
+from src.metrics import MetricsFile
+
+
+class TestSettings:
+    """Test reading launcher settings."""
+
+    def test_defaults(self):
+        """Defaults match the original single-worker gateway."""
+        settings = load_settings([], environ={})
+        assert settings.workers == 1
+        assert settings.capacity == 100
+        assert settings.refill_rate == 0.167
+        assert settings.tarpit is False
+
+    def test_environment_and_command_line(self):
+        """The environment sets defaults and the command line overrides them."""
+        environ = {"GATEWAY_WORKERS": "4", "GATEWAY_PORT": "9000", "GATEWAY_TARPIT": "yes"}
+        settings = load_settings(["--port", "9100"], environ=environ)
+        assert settings.workers == 4
+        assert settings.port == 9100
+        assert settings.tarpit is True
+
+    def test_lists_and_budgets(self):
+        """Route, IP and key sets are comma-separated; budgets are route=seconds."""
+        environ = {
+            "GATEWAY_THROTTLED_ROUTES": "/products/search, /products/search/batch",
+            "GATEWAY_ROUTE_BUDGETS": "/products/search=0.5,/products/search/batch=2",
+        }
+        settings = load_settings(["--api-keys", "k1,k2", "--no-request-timing"], environ=environ)
+        assert settings.throttled_routes == ["/products/search", "/products/search/batch"]
+        assert settings.route_budgets == {"/products/search": 0.5, "/products/search/batch": 2.0}
+        assert settings.api_keys == ["k1", "k2"]
+        assert settings.request_timing is False
+        assert settings.allowlist is None
+
+    def test_malformed_budget_rejected(self):
+        """A budget without a route is an error rather than silently dropped."""
+        with pytest.raises(ValueError):
+            load_settings([], environ={"GATEWAY_ROUTE_BUDGETS": "0.5"})
+
+    def test_gossip_addresses_cover_every_worker(self):
+        """Each worker gossips from its own port with every other worker."""
+        settings = load_settings([
+            "--workers", "2", "--gossip-bind", "10.0.0.1:7000", "--gossip-peers", "10.0.0.2:7000"
+        ], environ={})
+        bind, peers = gossip_addresses(settings, 1)
+        assert bind == "10.0.0.1:7001"
+        assert peers == ["10.0.0.1:7000", "10.0.0.2:7000", "10.0.0.2:7001"]
+        assert gossip_addresses(load_settings([], environ={})) == (None, [])
+
+
+class TestSharedState:
+    """Test state prepared before forking workers."""
+
+    def test_workers_share_metrics_and_secrets(self):
+        """Several workers get one metrics file and one set of signing keys."""
+        settings = load_settings(["--workers", "3"], environ={})
+        created = prepare_shared_state(settings)
+        try:
+            assert created == [settings.metrics_file]
+            assert os.path.basename(settings.metrics_file) != f"gateway-metrics-{os.getpid()}"
+            assert os.stat(settings.metrics_file).st_mode & 0o077 == 0
+            MetricsFile(settings.metrics_file).close()
+            assert len(bytes.fromhex(settings.cursor_secret)) == 32
+            assert settings.challenge_secret != settings.cursor_secret
+        finally:
+            for path in created:
+                os.remove(path)
+
+    def test_gossip_key_generated_for_one_node(self):
+        """Workers of a node without peers share a generated gossip key."""
+        settings = load_settings(["--workers", "2", "--gossip-bind", "127.0.0.1:7000"], environ={})
+        created = prepare_shared_state(settings)
+        for path in created:
+            os.remove(path)
+        assert len(bytes.fromhex(settings.gossip_secret)) == 32
+        assert build_app(settings, 1).state.gossip.secret == bytes.fromhex(settings.gossip_secret)
+
+    def test_gossip_peers_need_a_key(self):
+        """A key made up on one node would be unknown to its peers."""
+        settings = load_settings([
+            "--gossip-bind", "10.0.0.1:7000", "--gossip-peers", "10.0.0.2:7000"
+        ], environ={})
+        with pytest.raises(ValueError, match="gossip-secret"):
+            prepare_shared_state(settings)
+
+    def test_single_worker_keeps_defaults(self):
+        """A single worker needs no shared file or keys."""
+        settings = load_settings([], environ={})
+        assert prepare_shared_state(settings) == []
+        assert settings.metrics_file is None
+        assert settings.cursor_secret is None
+
+    def test_cursor_from_one_worker_verifies_on_another(self):
+        """Apps built from the same prepared settings accept each other's cursors."""
+        settings = load_settings(["--workers", "2", "--cursor-secret", "ab" * 32], environ={})
+        first = TestClient(build_app(settings, 0))
+        second = TestClient(build_app(settings, 1))
+
+        page = first.get("/products/search?category=electronics&limit=2").json()
+        cursor = page["data"]["data"]["next_cursor"]
+        response = second.get(f"/products/search?category=electronics&limit=2&cursor={cursor}")
+        assert response.status_code == 200
+
+    def test_workers_split_rate_limits(self):
+        """Workers with their own buckets each enforce 1/workers of a limit."""
+        settings = load_settings(["--workers", "4", "--capacity", "100", "--refill-rate", "2"], environ={})
+        stats = build_app(settings, 0).state.rate_limiter.get_client_stats("client")
+        assert (stats["capacity"], stats["refill_rate"]) == (25, 0.5)
+        assert build_app(settings).state.rate_limiter.share == 1.0
+
+    def test_cluster_workers_enforce_whole_limit(self):
+        """Gossiping workers see each other's usage, so none is scaled down."""
+        settings = load_settings(["--workers", "4", "--gossip-bind", "127.0.0.1:0"], environ={})
+        assert build_app(settings, 0).state.rate_limiter.share == 1.0
+
+    def test_features_passed_to_app(self):
+        """Feature settings reach the app built for each worker."""
+        settings = load_settings([
+            "--throttled-routes", "/products/search", "--challenged-routes", "/products/search",
+            "--max-concurrency", "8", "--no-enumeration-detection"
+        ], environ={})
+        app = build_app(settings, 0)
+        assert app.state.throttle_queue is not None
+        assert app.state.challenge is not None
+        assert app.state.enumeration_detector is None
+        assert app.state.admission_queue.max_concurrency == 8
+
+    def test_access_log_per_worker(self, tmp_path):
+        """Each worker appends to its own access log."""
+        settings = load_settings(["--access-log", str(tmp_path / "access.log")], environ={})
+        app = build_app(settings, 2)
+        assert app.state.access_log.path == str(tmp_path / "access.log.2")
+
+
+class TestAppFromEnv:
+    """Test the factory used by ASGI servers."""
+
+    def test_single_process(self, monkeypatch):
+        """The factory builds one app from the environment."""
+        monkeypatch.setenv("GATEWAY_CAPACITY", "7")
+        app = app_from_env()
+        assert app.state.rate_limiter.capacity == 7
+
+    def test_refuses_several_workers(self, monkeypatch):
+        """Workers it cannot prepare shared state for are refused."""
+        monkeypatch.setenv("GATEWAY_WORKERS", "4")
+        with pytest.raises(ValueError, match="python main.py"):
+            app_from_env()
+
+    def test_gossip_peers_need_a_key(self, monkeypatch):
+        """Gossip peers without a shared key fail at startup, not silently."""
+        monkeypatch.setenv("GATEWAY_GOSSIP_BIND", "127.0.0.1:7000")
+        monkeypatch.setenv("GATEWAY_GOSSIP_PEERS", "127.0.0.1:7001")
+        with pytest.raises(ValueError, match="gossip-secret"):
+            app_from_env()
+
+
+class TestHangup:
+    """Test SIGHUP handling in a worker."""
+
+    @pytest.fixture(autouse=True)
+    def restore_handler(self):
+        previous = signal.getsignal(signal.SIGHUP)
+        yield
+        signal.signal(signal.SIGHUP, previous)
+
+    def test_reloads_policies(self):
+        """SIGHUP reloads the policy file when there is one."""
+        reloads = []
+
+        class Reloader:
+            def reload(self):
+                reloads.append(1)
+
+        reload_on_hangup(Reloader())
+        os.kill(os.getpid(), signal.SIGHUP)
+        assert reloads == [1]
+
+    def test_ignored_without_policy_file(self):
+        """A worker without a policy file survives a forwarded SIGHUP."""
+        reload_on_hangup(None)
+        assert signal.getsignal(signal.SIGHUP) is signal.SIG_IGN
+        os.kill(os.getpid(), signal.SIGHUP)
+
+
+class TestListenSocket:
+    """Test binding the listening socket."""
+
+    def test_reuse_port(self):
+        """Several sockets can listen on one port with SO_REUSEPORT."""
+        if not hasattr(socket, "SO_REUSEPORT"):
+            pytest.skip("SO_REUSEPORT not supported")
+        first = listen_socket("127.0.0.1", 0)
+        port = first.getsockname()[1]
+        second = listen_socket("127.0.0.1", port)
+        assert second.getsockname()[1] == port
+        first.close()
+        second.close()
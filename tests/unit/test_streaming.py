@@ -0,0 +1,70 @@
+"""
+Tests for Streaming Module
+"""
+
+import asyncio
+import pytest
+from src.gateway.streaming import RecordStream, STREAM_CHUNK_SIZE, take
+
+
+def _counting_records(total, pulled):
+    """Generator that counts how many records were pulled from it."""
+    for i in range(total):
+        pulled.append(i)
+        yield {"id": i}
+
+
+class TestRecordStream:
+    """Test incremental record streaming."""
+
+    def test_yields_all_records_in_chunks(self):
+        """Every record arrives, in chunks of at most STREAM_CHUNK_SIZE."""
+        records = iter([{"id": i} for i in range(STREAM_CHUNK_SIZE * 2 + 5)])
+        stream = RecordStream(records, take(records))
+
+        async def collect():
+            return [chunk async for chunk in stream]
+
+        chunks = asyncio.run(collect())
+        assert [len(chunk) for chunk in chunks] == [STREAM_CHUNK_SIZE, STREAM_CHUNK_SIZE, 5]
+        assert chunks[-1][-1]["id"] == STREAM_CHUNK_SIZE * 2 + 4
+
+    def test_pulls_lazily(self):
+        """The backend iterator only advances as chunks are consumed."""
+        pulled = []
+        records = _counting_records(STREAM_CHUNK_SIZE * 10, pulled)
+        stream = RecordStream(records, take(records))
+
+        async def first_two():
+            chunks = stream.__aiter__()
+            await chunks.__anext__()
+            await chunks.__anext__()
+            await chunks.aclose()
+
+        asyncio.run(first_two())
+        assert len(pulled) == STREAM_CHUNK_SIZE * 2
+
+    def test_close_runs_callback_once(self):
+        """Closing releases resources exactly once and stops the generator."""
+        released = []
+        records = _counting_records(10, [])
+        stream = RecordStream(records, [], on_close=lambda: released.append(True))
+        stream.close()
+        stream.close()
+        assert released == [True]
+        assert list(records) == []
+
+    def test_errors_reported_in_band(self):
+        """A failure mid-stream becomes a final error record."""
+        def failing():
+            yield from ({"id": i} for i in range(STREAM_CHUNK_SIZE))
+            raise RuntimeError("backend went away")
+
+        records = failing()
+        stream = RecordStream(records, take(records))
+
+        async def collect():
+            return [chunk async for chunk in stream]
+
+        chunks = asyncio.run(collect())
+        assert chunks[-1] == [{"status": "error", "error": "backend went away"}]
@@ -0,0 +1,69 @@
+"""
+Tests for SuspicionTracker Module
+"""
+
+import pytest
+from src.rate_limiting import RateLimiter
+from src.detection import SuspicionTracker
+
+
+class TestSuspicionTracker:
+    """Test crawler suspicion scoring."""
+
+    def test_unknown_client_scores_zero(self):
+        """Clients without a bucket are not suspicious."""
+        tracker = SuspicionTracker(RateLimiter(capacity=10, refill_rate=0.001))
+        assert tracker.score("new") == 0.0
+        assert tracker.is_suspect("new") is False
+
+    def test_score_tracks_depletion(self):
+        """Score grows as the bucket drains."""
+        limiter = RateLimiter(capacity=10, refill_rate=0.001)
+        tracker = SuspicionTracker(limiter, suspect_threshold=0.8)
+        for _ in range(5):
+            limiter.is_allowed("client")
+        assert tracker.score("client") == pytest.approx(0.5)
+        assert tracker.is_suspect("client") is False
+
+        for _ in range(5):
+            limiter.is_allowed("client")
+        assert tracker.score("client") == pytest.approx(1.0)
+        assert tracker.is_suspect("client") is True
+
+    def test_flagging(self):
+        """Flagged clients are confirmed scrapers with maximum score."""
+        tracker = SuspicionTracker(RateLimiter(capacity=10, refill_rate=0.001))
+        tracker.flag("bot")
+        assert tracker.is_flagged("bot") is True
+        assert tracker.score("bot") == 1.0
+        assert tracker.get_flagged() == ["bot"]
+
+        tracker.unflag("bot")
+        assert tracker.is_flagged("bot") is False
+        assert tracker.score("bot") == 0.0
+
+    def test_flag_expires(self, clock):
+        """A flag with a ttl lapses, and is forgotten once it has."""
+        tracker = SuspicionTracker(RateLimiter(capacity=10, refill_rate=1), clock=clock)
+        tracker.flag("client", ttl=60)
+        assert tracker.is_flagged("client")
+        assert tracker.score("client") == 1.0
+
+        clock.now += 60
+        assert not tracker.is_flagged("client")
+        assert tracker.score("client") == 0.0
+        assert tracker.get_flagged() == []
+        assert tracker.flagged == {}
+
+    def test_flag_only_extended(self, clock):
+        """A shorter flag does not cut an existing one short."""
+        tracker = SuspicionTracker(RateLimiter(), clock=clock)
+        tracker.flag("manual")
+        tracker.flag("manual", ttl=1)
+        tracker.flag("auto", ttl=10)
+        tracker.flag("auto", ttl=1)
+
+        clock.now += 5
+        assert tracker.get_flagged() == ["auto", "manual"]
+        clock.now += 1000
+        assert tracker.get_flagged() == ["manual"]
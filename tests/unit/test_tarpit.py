@@ -0,0 +1,68 @@
+"""
+Tests for Tarpit Module
+"""
+
+import asyncio
+import json
+import time
+import pytest
+from src.gateway.tarpit import Tarpit
+
+
+async def _serve(response, disconnect_after=None):
+    """Run a response against an in-memory ASGI connection."""
+    messages = []
+    gone = asyncio.Event()
+
+    async def receive():
+        if disconnect_after is not None:
+            await asyncio.sleep(disconnect_after)
+        else:
+            await gone.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+
+    await response({"type": "http"}, receive, send)
+    gone.set()
+    return messages
+
+
+class TestTarpit:
+    """Test slow responses for confirmed scrapers."""
+
+    def test_drips_then_sends_rate_limit_body(self):
+        """Body arrives byte by byte (about one per interval) and ends in a 429 error."""
+        tarpit = Tarpit(interval=0.01, drips=3)
+        response = tarpit.open()
+        assert tarpit.active == 1
+
+        start = time.perf_counter()
+        messages = asyncio.run(_serve(response))
+        assert time.perf_counter() - start >= 0.015
+
+        assert messages[0]["status"] == 429
+        assert b"content-length" not in dict(messages[0]["headers"])
+        body = b"".join(m.get("body", b"") for m in messages[1:])
+        assert body.startswith(b"   ")
+        assert json.loads(body)["error"] == "Too many requests"
+        assert tarpit.active == 0
+
+    def test_hard_cap(self):
+        """No more than max_connections are tarpitted at once."""
+        tarpit = Tarpit(max_connections=2)
+        assert tarpit.open() is not None
+        assert tarpit.open() is not None
+        assert tarpit.open() is None
+        assert tarpit.get_stats()["rejected_when_full"] == 1
+
+    def test_disconnect_frees_slot(self):
+        """A client hanging up ends the tarpit early."""
+        tarpit = Tarpit(interval=0.01, drips=1000)
+        response = tarpit.open()
+
+        start = time.perf_counter()
+        asyncio.run(_serve(response, disconnect_after=0.03))
+        assert time.perf_counter() - start < 1.0
+        assert tarpit.active == 0
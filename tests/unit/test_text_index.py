@@ -0,0 +1,130 @@
+"""
+Tests for Text Index Module
+"""
+
+import random
+import numpy as np
+import pytest
+from src.backend.text_index import (
+    MIN_PREFIX_LENGTH,
+    POSTING_BLOCK,
+    PostingList,
+    TextIndex,
+    decode_varints,
+    encode_varints,
+    intersect,
+    tokenize,
+)
+
+
+NAMES = ["Red Shoe", "Blue Shoe", "Red Hat", "Green Hat Box", "Blue Box", "USB-C Cable", "Box Box\nSet"]
+
+
+def _brute_force(names, codes, query):
+    """Rows matching a query, checked one by one."""
+    tokens = tokenize(query)
+    matches = []
+    for row, code in enumerate(codes):
+        words = tokenize(names[code])
+        if len(tokens[-1]) < MIN_PREFIX_LENGTH:
+            last_matches = tokens[-1] in words
+        else:
+            last_matches = any(w.startswith(tokens[-1]) for w in words)
+        if all(token in words for token in tokens[:-1]) and last_matches:
+            matches.append(row)
+    return matches
+
+
+@pytest.fixture
+def codes():
+    """Name code per row for a few thousand rows."""
+    rng = random.Random(3)
+    return np.array([rng.randrange(len(NAMES)) for _ in range(3000)], dtype=np.int32)
+
+
+class TestVarints:
+    """Test varint encoding."""
+
+    def test_round_trip(self):
+        """Values of every byte length survive encoding."""
+        values = np.array([0, 1, 127, 128, 16383, 16384, 2 ** 31, 2 ** 50])
+        assert decode_varints(encode_varints(values)).tolist() == values.tolist()
+
+    def test_small_values_take_one_byte(self):
+        """Gaps below 128 cost a single byte."""
+        assert len(encode_varints(np.arange(128))) == 128
+
+
+class TestPostingList:
+    """Test gap-encoded posting lists."""
+
+    def test_bulk_and_incremental_agree(self):
+        """Appending rows one by one gives the same list as a bulk build."""
+        rows = np.array(sorted(random.Random(1).sample(range(100000), 1000)))
+        appended = PostingList()
+        for row in rows.tolist():
+            appended.append(row)
+        bulk = PostingList.from_rows(rows)
+
+        assert bytes(appended.data) == bytes(bulk.data)
+        assert list(appended.block_offsets) == list(bulk.block_offsets)
+        assert appended.rows().tolist() == rows.tolist()
+
+    def test_rows_near_decodes_only_needed_blocks(self):
+        """Probing by block finds the same matches as a full decode."""
+        rows = np.arange(0, POSTING_BLOCK * 20 * 3, 3)
+        posting = PostingList.from_rows(rows)
+        candidates = np.array([0, 1, 3 * POSTING_BLOCK * 7, 3 * POSTING_BLOCK * 20 - 3])
+
+        near = posting.rows_near(candidates)
+        assert len(near) <= 3 * POSTING_BLOCK
+        assert intersect(candidates, near).tolist() == intersect(candidates, rows).tolist()
+
+
+class TestTextIndex:
+    """Test token and prefix search."""
+
+    @pytest.mark.parametrize(
+        "query", ["red", "shoe", "red sh", "b", "hat bo", "box blue", "usb c", "zzz", "red green", "box set"]
+    )
+    def test_matches_brute_force(self, codes, query):
+        """Bulk-built index answers like a scan over all names."""
+        index = TextIndex.build(NAMES, codes)
+        assert index.search(query).tolist() == _brute_force(NAMES, codes, query)
+
+    def test_incremental_matches_bulk(self, codes):
+        """Adding rows one at a time gives the same answers."""
+        bulk = TextIndex.build(NAMES, codes)
+        incremental = TextIndex()
+        incremental.extend(0, (NAMES[code] for code in codes))
+
+        for query in ("red", "blue sh", "c"):
+            assert incremental.search(query).tolist() == bulk.search(query).tolist()
+        assert incremental.rows_indexed == len(codes)
+
+    def test_row_limit(self, codes):
+        """Rows past the limit are ignored."""
+        index = TextIndex.build(NAMES, codes)
+        assert index.search("red", row_limit=100).tolist() == _brute_force(NAMES, codes[:100], "red")
+
+    def test_case_and_punctuation_ignored(self):
+        """Queries are tokenized like names."""
+        index = TextIndex.build(NAMES, np.arange(len(NAMES)))
+        assert index.search("USB-C").tolist() == [5]
+
+    def test_short_last_token_matches_exactly(self):
+        """A final token below the minimum prefix length is not expanded."""
+        index = TextIndex.build(["a", "ab", "abc x"], np.arange(3))
+        assert index.search("a").tolist() == [0]
+        assert index.search("ab").tolist() == [1, 2]
+
+    def test_prefix_expansion_is_complete(self):
+        """A prefix matching thousands of terms finds every row."""
+        names = [f"part{n}" for n in range(2000)] + ["pars", "pass"]
+        index = TextIndex.build(names, np.arange(len(names)))
+        assert index.search("par").tolist() == list(range(2001))
+
+    def test_empty_query(self):
+        """A query without tokens matches nothing."""
+        index = TextIndex.build(NAMES, np.arange(len(NAMES)))
+        assert len(index.search("  --  ")) == 0
@@ -0,0 +1,82 @@
+"""
+Tests for ThrottleQueue Module
+"""
+
+import asyncio
+import time
+import pytest
+from src.rate_limiting import RateLimiter, ThrottleQueue
+
+
+def _drained_limiter(refill_rate, clients):
+    """Limiter whose listed clients have empty buckets."""
+    limiter = RateLimiter(capacity=5, refill_rate=refill_rate)
+    for client in clients:
+        limiter.get_bucket(client).tokens = 0
+    return limiter
+
+
+class TestThrottleQueue:
+    """Test delay-instead-of-reject throttling."""
+
+    def test_waits_for_next_token(self):
+        """An over-limit request is released when its token arrives."""
+        async def scenario():
+            queue = ThrottleQueue(_drained_limiter(20.0, ["a"]), max_delay=1.0)
+            start = time.perf_counter()
+            allowed = await queue.wait("a")
+            return allowed, time.perf_counter() - start, queue
+
+        allowed, elapsed, queue = asyncio.run(scenario())
+        assert allowed is True
+        assert 0.03 < elapsed < 0.5
+        assert queue.queue_depth == 0
+        assert queue.released == 1
+
+    def test_rejects_when_token_too_far(self):
+        """Requests that would wait past max_delay are rejected at once."""
+        async def scenario():
+            queue = ThrottleQueue(_drained_limiter(0.1, ["a"]), max_delay=0.5)
+            start = time.perf_counter()
+            allowed = await queue.wait("a")
+            return allowed, time.perf_counter() - start
+
+        allowed, elapsed = asyncio.run(scenario())
+        assert allowed is False
+        assert elapsed < 0.05
+
+    def test_per_client_overflow(self):
+        """A client cannot hold more than its share of waiting slots."""
+        async def scenario():
+            queue = ThrottleQueue(
+                _drained_limiter(50.0, ["heavy"]), max_delay=1.0, max_waiters_per_client=2
+            )
+            results = await asyncio.gather(*(queue.wait("heavy") for _ in range(4)))
+            return results, queue
+
+        results, queue = asyncio.run(scenario())
+        assert results.count(True) == 2
+        assert queue.overflowed == 2
+
+    def test_round_robin_across_clients(self):
+        """A heavy client does not starve a light one of the shared drain."""
+        async def scenario():
+            limiter = _drained_limiter(1000.0, ["heavy", "light"])
+            queue = ThrottleQueue(
+                limiter, max_delay=2.0, max_waiters_per_client=50, drain_rate=20.0
+            )
+            queue.drain.tokens = 0
+            order = []
+
+            async def request(client):
+                if await queue.wait(client):
+                    order.append(client)
+
+            heavy = [asyncio.create_task(request("heavy")) for _ in range(10)]
+            await asyncio.sleep(0)
+            light = asyncio.create_task(request("light"))
+            await asyncio.gather(*heavy, light)
+            return order
+
+        order = asyncio.run(scenario())
+        assert order.index("light") <= 2
@@ -0,0 +1,124 @@
+"""
+Tests for Timing Module
+"""
+
+import asyncio
+import time
+
+import pytest
+from src.metrics.timing import (
+    StageTimings,
+    begin_span,
+    current_span,
+    end_span,
+    server_timing,
+    stage,
+)
+
+
+class TestStage:
+    """Test timing stages within a span."""
+
+    def test_no_span(self):
+        """Without a span, stages are not timed."""
+        assert current_span() is None
+        with stage("backend"):
+            pass
+        assert current_span() is None
+
+    def test_stage_recorded(self):
+        """Stages add their duration to the active span."""
+        token = begin_span()
+        try:
+            with stage("backend"):
+                time.sleep(0.01)
+            span = current_span()
+        finally:
+            end_span(token)
+
+        assert span.stages["backend"] >= 10_000_000
+        assert current_span() is None
+
+    def test_repeated_stage_sums(self):
+        """A stage entered twice accumulates."""
+        token = begin_span()
+        try:
+            span = current_span()
+            span.add("limit", 5)
+            span.add("limit", 7)
+        finally:
+            end_span(token)
+        assert span.stages == {"limit": 12}
+
+    def test_stage_timed_on_exception(self):
+        """A stage that raises is still timed."""
+        token = begin_span()
+        try:
+            with pytest.raises(ValueError):
+                with stage("backend"):
+                    raise ValueError
+            assert "backend" in current_span().stages
+        finally:
+            end_span(token)
+
+    def test_span_follows_tasks_and_threads(self):
+        """Work started by the request adds to its span."""
+        def in_thread():
+            with stage("thread"):
+                pass
+
+        async def request():
+            token = begin_span()
+            try:
+                await asyncio.gather(asyncio.to_thread(in_thread), asyncio.ensure_future(in_task()))
+                return current_span()
+            finally:
+                end_span(token)
+
+        async def in_task():
+            with stage("task"):
+                await asyncio.sleep(0)
+
+        span = asyncio.run(request())
+        assert set(span.stages) == {"thread", "task"}
+
+
+class TestServerTiming:
+    """Test the Server-Timing header value."""
+
+    def test_format(self):
+        """Stages are reported in milliseconds."""
+        token = begin_span()
+        try:
+            span = current_span()
+            span.add("limit", 12_000)
+            span.add("backend", 3_402_000)
+        finally:
+            end_span(token)
+
+        assert server_timing(span) == "limit;dur=0.012, backend;dur=3.402"
+        assert server_timing(span, 4_000_000).endswith(", total;dur=4.000")
+
+
+class TestStageTimings:
+    """Test per-stage histograms."""
+
+    def test_record(self):
+        """Each stage and the total get their own histogram."""
+        timings = StageTimings(("limit", "backend"))
+        token = begin_span()
+        try:
+            span = current_span()
+            span.add("backend", 2_000_000)
+            span.add("serialize", 100_000)
+        finally:
+            end_span(token)
+
+        timings.record(span, total_ns=3_000_000)
+        assert timings.histograms["limit"].count == 0
+        assert timings.histograms["backend"].max == pytest.approx(0.002)
+        assert timings.histograms["serialize"].count == 1
+        assert timings.histograms["total"].max == pytest.approx(0.003)
+
+        timings.reset()
+        assert timings.histograms["backend"].count == 0
@@ -45,3 +45,36 @@ class TestTokenBucket:
         time.sleep(0.2)
         bucket._refill_tokens()
         assert bucket.tokens <= 100
+
+    def test_weighted_cost(self):
+        """A request can consume more than one token."""
+        bucket = TokenBucket(capacity=10, refill_rate=0.001)
+        assert bucket.allow_request(cost=4) is True
+        assert bucket.allow_request(cost=7) is False
+        assert 5.9 < bucket.tokens <= 6.1
+
+    def test_time_until_available(self):
+        """Reports how long until enough tokens have refilled."""
+        bucket = TokenBucket(capacity=10, refill_rate=10.0)
+        assert bucket.time_until_available() == 0.0
+        bucket.tokens = 0
+        assert 0.09 < bucket.time_until_available() <= 0.1
+        assert bucket.time_until_available(cost=11) == float("inf")
+
+    def test_simulated_clock(self, clock):
+        """An injected clock drives refills instead of wall time."""
+        bucket = TokenBucket(capacity=10, refill_rate=2.0, clock=clock)
+        bucket.tokens = 0
+        clock.now += 3.0
+        assert bucket.get_remaining_tokens() == 6
+        clock.now += 100.0
+        assert bucket.get_remaining_tokens() == 10
+
+    def test_rescale_keeps_fill_ratio(self, clock):
+        """Rescaling keeps the bucket as full as it was."""
+        bucket = TokenBucket(capacity=100, refill_rate=0, clock=clock)
+        bucket.tokens = 25
+        bucket.rescale(capacity=40, refill_rate=2, policy_version=3)
+        assert bucket.tokens == 10
+        assert bucket.refill_rate == 2
+        assert bucket.policy_version == 3
@@ -0,0 +1,100 @@
+"""
+Tests for Windows Module
+"""
+
+import pytest
+from src.metrics.windows import RollingWindows
+
+
+@pytest.fixture
+def windows(clock):
+    return RollingWindows(clock=clock)
+
+
+class TestRollingWindows:
+    """Test sliding-window rates."""
+
+    def test_empty(self, windows):
+        """No traffic reports zeros."""
+        stats = windows.get_stats()
+        assert set(stats) == {"1s", "1m", "5m"}
+        assert stats["1m"]["qps"] == 0
+        assert stats["1m"]["response_time_ms"]["p99"] is None
+
+    def test_current_second_not_reported(self, windows, clock):
+        """Only completed seconds count."""
+        windows.record(False, 0.01)
+        assert windows.get_stats()["1s"]["requests"] == 0
+
+        clock.now += 1
+        assert windows.get_stats()["1s"]["requests"] == 1
+
+    def test_rates(self, windows, clock):
+        """QPS, block rate and error rate over the last second."""
+        for _ in range(6):
+            windows.record(False, 0.01)
+        for _ in range(2):
+            windows.record(False, 0.01, failed=True)
+        for _ in range(2):
+            windows.record(True, 0.0)
+        clock.now += 1
+
+        stats = windows.get_stats()["1s"]
+        assert stats["requests"] == 10
+        assert stats["qps"] == 10
+        assert stats["block_rate_percent"] == 20.0
+        assert stats["error_rate_percent"] == 25.0
+        assert stats["average_response_time_seconds"] == pytest.approx(0.01)
+
+    def test_windows_slide(self, windows, clock):
+        """Old seconds leave the short windows first."""
+        for second in range(120):
+            windows.record(second >= 60, 0.001)
+            clock.now += 1
+
+        stats = windows.get_stats()
+        assert stats["1s"]["block_rate_percent"] == 100.0
+        assert stats["1m"]["requests"] == 60
+        assert stats["1m"]["block_rate_percent"] == 100.0
+        assert stats["5m"]["requests"] == 120
+        assert stats["5m"]["block_rate_percent"] == 50.0
+
+    def test_qps_before_window_fills(self, windows, clock):
+        """Right after start, rates are over the time actually covered."""
+        for _ in range(10):
+            for _ in range(5):
+                windows.record(False, 0.001)
+            clock.now += 1
+
+        stats = windows.get_stats()
+        assert stats["1m"]["qps"] == 5.0
+        assert stats["5m"]["qps"] == 5.0
+
+    def test_ring_reuses_slots(self, windows, clock):
+        """Seconds older than the longest window are dropped."""
+        windows.record(False, 0.001)
+        clock.now += 400
+        windows.record(False, 0.001)
+        clock.now += 1
+
+        assert windows.get_stats()["5m"]["requests"] == 1
+
+    def test_idle_gap(self, windows, clock):
+        """Traffic before a quiet spell is still in the longer windows."""
+        windows.record(False, 0.001)
+        clock.now += 30
+
+        stats = windows.get_stats()
+        assert stats["1s"]["requests"] == 0
+        assert stats["1m"]["requests"] == 1
+
+    def test_latency_percentiles(self, windows, clock):
+        """Percentiles are merged over the window's seconds."""
+        for second in range(10):
+            for ms in range(1, 101):
+                windows.record(False, ms / 1000)
+            clock.now += 1
+
+        latency = windows.get_stats()["1m"]["response_time_ms"]
+        assert latency["p50"] == pytest.approx(50, rel=0.07)
+        assert latency["p99"] == pytest.approx(99, rel=0.07)